@@ -138,10 +138,27 @@ class CentralOrchestrator:
             print(f"⚠️ Failed to discover agents: {e}")
         return False
     
+    def route_with_capability_index(self, question: str) -> List[str]:
+        """Relevant active agents according to the registry's capability index (embedding similarity)"""
+        try:
+            response = requests.get(f"{self.agent_registry}/agents/route", params={"query": question, "k": 3}, timeout=5)
+            if response.status_code == 200:
+                return [
+                    agent_id for agent_id in response.json().get("relevant", [])
+                    if self.available_agents.get(agent_id, {}).get("status") == "active"
+                ]
+        except Exception as e:
+            print(f"⚠️ Capability index routing failed: {e}")
+        return []
+    
     def route_question(self, question: str) -> List[str]:
         """Determine which agents should handle the question based on capabilities and availability"""
+        selected_agents = self.route_with_capability_index(question)
+        if selected_agents:
+            return selected_agents
+        
+        # Keyword routing when the index has no relevant agent
         question_lower = question.lower()
-        selected_agents = []
         
         # Weather-related keywords and capabilities
         weather_keywords = ["weather", "temperature", "rain", "sunny", "cloudy", "forecast", "climate"]
@@ -344,7 +361,7 @@ class CentralOrchestrator:
         self.logger.log_step("ROUTING_DECISION", {
             "question": question,
             "selected_agents": selected_agents,
-            "routing_reasoning": "Based on keyword analysis and agent capabilities"
+            "routing_reasoning": "Based on capability index similarity, falling back to keyword analysis"
         })
         
         # Contact each selected agent
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Strands SDK Execution Rollups
+Per-agent, per-tool and per-hour aggregates of strands_sdk_executions, updated in the same
+transaction that logs each execution so analytics never have to rescan execution history.
+
+Usage:
+    python agent_analytics_rollups.py backfill
+    python agent_analytics_rollups.py backfill --db strands_sdk_agents.db
+"""
+
+import argparse
+import sqlite3
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+DEFAULT_DB = "strands_sdk_agents.db"
+# Executions rebuilt per batch during a backfill
+BACKFILL_BATCH_SIZE = 1000
+
+ROLLUP_TABLES = (
+    "strands_sdk_agent_rollups",
+    "strands_sdk_tool_rollups",
+    "strands_sdk_tool_hour_rollups",
+    "strands_sdk_tool_sequence_rollups",
+    "strands_sdk_hourly_rollups"
+)
+
+def init_rollup_tables(cursor) -> None:
+    """Create the rollup tables; safe to call on every start"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS strands_sdk_agent_rollups (
+            agent_id TEXT PRIMARY KEY,
+            total_executions INTEGER DEFAULT 0,
+            successful_executions INTEGER DEFAULT 0,
+            timed_executions INTEGER DEFAULT 0, -- executions with a recorded execution_time
+            total_execution_time REAL DEFAULT 0,
+            min_execution_time REAL,
+            max_execution_time REAL,
+            total_tokens INTEGER DEFAULT 0,
+            last_execution_at TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS strands_sdk_tool_rollups (
+            agent_id TEXT NOT NULL,
+            tool TEXT NOT NULL,
+            invocations INTEGER DEFAULT 0,
+            successful_invocations INTEGER DEFAULT 0,
+            timed_invocations INTEGER DEFAULT 0,
+            total_time REAL DEFAULT 0,
+            min_time REAL,
+            max_time REAL,
+            PRIMARY KEY (agent_id, tool)
+        )
+    ''')
+    # Hour of day (00-23), so this stays at most 24 rows per tool however long the history
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS strands_sdk_tool_hour_rollups (
+            agent_id TEXT NOT NULL,
+            hour_of_day TEXT NOT NULL,
+            tool TEXT NOT NULL,
+            invocations INTEGER DEFAULT 0,
+            PRIMARY KEY (agent_id, hour_of_day, tool)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS strands_sdk_tool_sequence_rollups (
+            agent_id TEXT NOT NULL,
+            sequence TEXT NOT NULL, -- comma-separated tools in call order
+            executions INTEGER DEFAULT 0,
+            successful_executions INTEGER DEFAULT 0,
+            total_execution_time REAL DEFAULT 0,
+            PRIMARY KEY (agent_id, sequence)
+        )
+    ''')
+    # Wall-clock hour buckets ('YYYY-MM-DD HH', UTC like CURRENT_TIMESTAMP) for the last-24h histogram
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS strands_sdk_hourly_rollups (
+            agent_id TEXT NOT NULL,
+            hour_bucket TEXT NOT NULL,
+            executions INTEGER DEFAULT 0,
+            successful_executions INTEGER DEFAULT 0,
+            PRIMARY KEY (agent_id, hour_bucket)
+        )
+    ''')
+
+def tool_timings(tools_used: Sequence[str], durations_ms: Sequence[Optional[float]],
+                 execution_time: Optional[float]) -> List[Optional[float]]:
+    """
+    Seconds per invocation, in tools_used order: the measured duration, or an even share of the
+    execution when it was not measured (None when neither is known)
+    """
+    timings: List[Optional[float]] = []
+    for duration_ms in durations_ms:
+        if duration_ms is not None:
+            timings.append(duration_ms / 1000)
+        elif execution_time is not None:
+            timings.append(execution_time / len(tools_used))
+        else:
+            timings.append(None)
+    return timings
+
+def record_execution(cursor, agent_id: str, success: bool, execution_time: Optional[float],
+                     tools_used: Sequence[str], timings: Sequence[Optional[float]], tokens: int,
+                     timestamp: Optional[str] = None) -> None:
+    """
+    Fold one execution into the rollups. Call it with the cursor that inserted the execution
+    row, before commit, so the rollups and the log can never disagree.
+    """
+    timestamp = timestamp or datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    hour_bucket = timestamp[:13]
+    hour_of_day = timestamp[11:13] if len(timestamp) >= 13 else "00"
+    succeeded = 1 if success else 0
+    timed = 1 if execution_time is not None else 0
+
+    cursor.execute('''
+        INSERT INTO strands_sdk_agent_rollups
+        (agent_id, total_executions, successful_executions, timed_executions, total_execution_time,
+         min_execution_time, max_execution_time, total_tokens, last_execution_at)
+        VALUES (?, 1, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(agent_id) DO UPDATE SET
+            total_executions = total_executions + 1,
+            successful_executions = successful_executions + excluded.successful_executions,
+            timed_executions = timed_executions + excluded.timed_executions,
+            total_execution_time = total_execution_time + excluded.total_execution_time,
+            min_execution_time = COALESCE(MIN(min_execution_time, excluded.min_execution_time),
+                                          min_execution_time, excluded.min_execution_time),
+            max_execution_time = COALESCE(MAX(max_execution_time, excluded.max_execution_time),
+                                          max_execution_time, excluded.max_execution_time),
+            total_tokens = total_tokens + excluded.total_tokens,
+            last_execution_at = MAX(COALESCE(last_execution_at, ''), excluded.last_execution_at)
+    ''', (agent_id, succeeded, timed, execution_time or 0, execution_time, execution_time,
+          tokens or 0, timestamp))
+
+    cursor.execute('''
+        INSERT INTO strands_sdk_hourly_rollups (agent_id, hour_bucket, executions, successful_executions)
+        VALUES (?, ?, 1, ?)
+        ON CONFLICT(agent_id, hour_bucket) DO UPDATE SET
+            executions = executions + 1,
+            successful_executions = successful_executions + excluded.successful_executions
+    ''', (agent_id, hour_bucket, succeeded))
+
+    if not tools_used:
+        return
+
+    # Timings line up with tools_used, so a tool called several times contributes one timing per call
+    for tool, timing in zip(tools_used, timings):
+        cursor.execute('''
+            INSERT INTO strands_sdk_tool_rollups
+            (agent_id, tool, invocations, successful_invocations, timed_invocations, total_time, min_time, max_time)
+            VALUES (?, ?, 1, ?, ?, ?, ?, ?)
+            ON CONFLICT(agent_id, tool) DO UPDATE SET
+                invocations = invocations + 1,
+                successful_invocations = successful_invocations + excluded.successful_invocations,
+                timed_invocations = timed_invocations + excluded.timed_invocations,
+                total_time = total_time + excluded.total_time,
+                min_time = COALESCE(MIN(min_time, excluded.min_time), min_time, excluded.min_time),
+                max_time = COALESCE(MAX(max_time, excluded.max_time), max_time, excluded.max_time)
+        ''', (agent_id, tool, succeeded, 1 if timing is not None else 0, timing or 0, timing, timing))
+        cursor.execute('''
+            INSERT INTO strands_sdk_tool_hour_rollups (agent_id, hour_of_day, tool, invocations)
+            VALUES (?, ?, ?, 1)
+            ON CONFLICT(agent_id, hour_of_day, tool) DO UPDATE SET invocations = invocations + 1
+        ''', (agent_id, hour_of_day, tool))
+
+    cursor.execute('''
+        INSERT INTO strands_sdk_tool_sequence_rollups
+        (agent_id, sequence, executions, successful_executions, total_execution_time)
+        VALUES (?, ?, 1, ?, ?)
+        ON CONFLICT(agent_id, sequence) DO UPDATE SET
+            executions = executions + 1,
+            successful_executions = successful_executions + excluded.successful_executions,
+            total_execution_time = total_execution_time + excluded.total_execution_time
+    ''', (agent_id, ",".join(tools_used), succeeded, execution_time or 0))
+
+def delete_agent_rollups(cursor, agent_id: str) -> None:
+    for table in ROLLUP_TABLES:
+        cursor.execute(f'DELETE FROM {table} WHERE agent_id = ?', (agent_id,))
+
+def backfill_rollups(conn: sqlite3.Connection) -> int:
+    """
+    Rebuild every rollup from the normalized execution log in one transaction; returns executions
+    folded in. Legacy sdk_metadata rows must be migrated first (execution_log_store.migrate_legacy_executions).
+    """
+    cursor = conn.cursor()
+    init_rollup_tables(cursor)
+    for table in ROLLUP_TABLES:
+        cursor.execute(f'DELETE FROM {table}')
+
+    # A separate cursor streams the history while the first one writes the rollups
+    reader = conn.cursor()
+    reader.execute('''
+        SELECT id, agent_id, success, execution_time, COALESCE(input_length, 0) + COALESCE(output_length, 0), timestamp
+        FROM strands_sdk_executions ORDER BY rowid
+    ''')
+    processed = 0
+    while True:
+        rows = reader.fetchmany(BACKFILL_BATCH_SIZE)
+        if not rows:
+            break
+        invocations: Dict[str, List[tuple]] = {}
+        placeholders = ",".join("?" * len(rows))
+        cursor.execute(f'''
+            SELECT execution_id, tool, duration_ms FROM strands_sdk_tool_invocations
+            WHERE execution_id IN ({placeholders}) ORDER BY execution_id, position
+        ''', [row[0] for row in rows])
+        for execution_id, tool, duration_ms in cursor.fetchall():
+            invocations.setdefault(execution_id, []).append((tool, duration_ms))
+        for execution_id, agent_id, success, execution_time, tokens, timestamp in rows:
+            calls = invocations.get(execution_id, [])
+            tools_used = [tool for tool, _ in calls]
+            timings = tool_timings(tools_used, [duration for _, duration in calls], execution_time)
+            record_execution(cursor, agent_id, bool(success), execution_time, tools_used, timings, tokens, timestamp)
+        processed += len(rows)
+    conn.commit()
+    return processed
+
+def backfill_if_empty(conn: sqlite3.Connection) -> int:
+    """Backfill once for databases that predate the rollups; returns executions folded in"""
+    cursor = conn.cursor()
+    init_rollup_tables(cursor)
+    cursor.execute('SELECT EXISTS (SELECT 1 FROM strands_sdk_agent_rollups)')
+    if cursor.fetchone()[0]:
+        return 0
+    cursor.execute('SELECT EXISTS (SELECT 1 FROM strands_sdk_executions)')
+    if not cursor.fetchone()[0]:
+        return 0
+    return backfill_rollups(conn)
+
+def read_agent_rollups(cursor, agent_id: str) -> Dict[str, Any]:
+    """Analytics sections derived purely from the rollup tables"""
+    cursor.execute('''
+        SELECT total_executions, successful_executions, timed_executions, total_execution_time,
+               min_execution_time, max_execution_time, total_tokens
+        FROM strands_sdk_agent_rollups WHERE agent_id = ?
+    ''', (agent_id,))
+    row = cursor.fetchone() or (0, 0, 0, 0, None, None, 0)
+    total, successful, timed, total_time, min_time, max_time, total_tokens = row
+    execution_stats = {
+        'total_executions': total,
+        'avg_execution_time': round(total_time / timed, 2) if timed else 0,
+        'min_execution_time': round(min_time, 2) if min_time else 0,
+        'max_execution_time': round(max_time, 2) if max_time else 0,
+        'successful_executions': successful,
+        'failed_executions': total - successful,
+        'success_rate': round(successful / total * 100, 1) if total else 0
+    }
+
+    tool_usage = {}
+    tool_performance = {}
+    tool_success_rates = {}
+    cursor.execute('''
+        SELECT tool, invocations, successful_invocations, timed_invocations, total_time, min_time, max_time
+        FROM strands_sdk_tool_rollups WHERE agent_id = ?
+    ''', (agent_id,))
+    for tool, invocations, tool_successes, timed_invocations, tool_time, tool_min, tool_max in cursor.fetchall():
+        tool_usage[tool] = invocations
+        if timed_invocations:
+            tool_performance[tool] = {
+                'avg_execution_time': round(tool_time / timed_invocations, 2),
+                'min_execution_time': round(tool_min, 2),
+                'max_execution_time': round(tool_max, 2),
+                'total_invocations': timed_invocations
+            }
+        if invocations:
+            tool_success_rates[tool] = {
+                'success_rate': round(tool_successes / invocations * 100, 1),
+                'successful_invocations': tool_successes,
+                'total_invocations': invocations,
+                'failure_rate': round((invocations - tool_successes) / invocations * 100, 1)
+            }
+
+    tool_combinations = {}
+    cursor.execute('''
+        SELECT sequence, executions, successful_executions, total_execution_time
+        FROM strands_sdk_tool_sequence_rollups WHERE agent_id = ?
+    ''', (agent_id,))
+    for sequence, executions, seq_successes, seq_time in cursor.fetchall():
+        tool_combinations[sequence] = {
+            'count': executions,
+            'avg_execution_time': round(seq_time / executions, 2),
+            'success_rate': round(seq_successes / executions * 100, 1),
+            'total_execution_time': seq_time,
+            'successful_executions': seq_successes
+        }
+
+    hourly_tool_usage: Dict[str, Dict[str, int]] = {}
+    cursor.execute('''
+        SELECT hour_of_day, tool, invocations FROM strands_sdk_tool_hour_rollups WHERE agent_id = ?
+    ''', (agent_id,))
+    for hour, tool, invocations in cursor.fetchall():
+        hourly_tool_usage.setdefault(hour, {})[tool] = invocations
+
+    cursor.execute('''
+        SELECT substr(hour_bucket, 12, 2) AS hour, SUM(executions)
+        FROM strands_sdk_hourly_rollups
+        WHERE agent_id = ? AND hour_bucket > strftime('%Y-%m-%d %H', 'now', '-24 hours')
+        GROUP BY hour ORDER BY hour
+    ''', (agent_id,))
+    hourly_usage = dict(cursor.fetchall())
+
+    return {
+        'execution_stats': execution_stats,
+        'tool_usage': tool_usage,
+        'tool_performance': tool_performance,
+        'tool_success_rates': tool_success_rates,
+        'tool_combinations': tool_combinations,
+        'hourly_tool_usage': hourly_tool_usage,
+        'total_tokens': total_tokens,
+        'hourly_usage': hourly_usage
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain Strands SDK execution rollups")
+    parser.add_argument("command", choices=["backfill"], help="backfill: rebuild all rollups from execution history")
+    parser.add_argument("--db", default=DEFAULT_DB, help="Strands SDK SQLite database")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        processed = backfill_rollups(conn)
+    finally:
+        conn.close()
+    print(f"📊 Rebuilt execution rollups from {processed} executions in {args.db}")
+
+if __name__ == "__main__":
+    main()
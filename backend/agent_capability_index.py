@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Agent Capability Index
+Embeds every agent's name, description, tools, capabilities and system prompt once and answers
+"which agents fit this query" by vector similarity in milliseconds. Orchestrators call route()
+before deciding whether an LLM planner is needed at all. The index follows the agent catalogue
+incrementally: only new or changed agents are embedded, deleted agents are dropped.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from agent_embeddings import BACKEND_LEXICAL, BACKEND_OLLAMA, TextEmbedder, agent_profile_text, cosine, get_text_embedder
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROUTE_K = 3
+# Similarity an agent needs to count as relevant at all, per embedding backend
+MIN_SIMILARITY = {BACKEND_OLLAMA: 0.45, BACKEND_LEXICAL: 0.05}
+# A route is confident when the best agent clears this and leads the runner-up by ROUTE_MARGIN
+CONFIDENT_SIMILARITY = {BACKEND_OLLAMA: 0.6, BACKEND_LEXICAL: 0.2}
+ROUTE_MARGIN = {BACKEND_OLLAMA: 0.05, BACKEND_LEXICAL: 0.05}
+# Relevant agents must also score within this fraction of the best agent
+RELEVANCE_BAND = 0.75
+# Catalogues at least this large are scored as one matrix product when numpy is available
+NUMPY_MIN_AGENTS = 64
+
+# Phrases that ask for several steps; a single nearest agent cannot plan those
+_MULTI_STEP = re.compile(r"\b(then|after that|afterwards|followed by|step by step|and also|simultaneously|at the same time|finally)\b",
+                         re.IGNORECASE)
+
+def is_multi_step(query: str) -> bool:
+    return bool(_MULTI_STEP.search(query))
+
+class _IndexedAgent:
+    __slots__ = ("agent_id", "name", "profile", "profile_hash", "vector", "backend")
+
+    def __init__(self, agent_id: str, name: str, profile: str, profile_hash: str):
+        self.agent_id = agent_id
+        self.name = name
+        self.profile = profile
+        self.profile_hash = profile_hash
+        self.vector: Optional[List[float]] = None
+        self.backend: Optional[str] = None
+
+class AgentCapabilityIndex:
+    """Nearest-agent search over one agent catalogue"""
+
+    def __init__(self, name: str = "default", embedder: Optional[TextEmbedder] = None):
+        self.name = name
+        self.embedder = embedder or get_text_embedder()
+        self._agents: Dict[str, _IndexedAgent] = {}
+        self._lock = threading.RLock()
+        # (backend, agent ids, names, matrix) for the numpy path, rebuilt after any change
+        self._matrix: Optional[Tuple[str, List[str], List[str], Any]] = None
+        self.version = 0
+        self.routes = 0
+        self.planner_skips = 0
+        self.embedded = 0
+        self.total_route_ms = 0.0
+
+    @staticmethod
+    def agent_id(agent: Dict[str, Any]) -> str:
+        return str(agent.get("id") or agent.get("agent_id") or agent.get("name", ""))
+
+    def _changed(self) -> None:
+        """Caller holds the lock"""
+        self.version += 1
+        self._matrix = None
+
+    def upsert(self, agent: Dict[str, Any]) -> bool:
+        """
+        Add or update an agent. Returns True if its profile changed; the new profile is embedded
+        lazily, together with any other pending agents, on the next search.
+        """
+        agent_id = self.agent_id(agent)
+        profile = agent_profile_text(agent)
+        profile_hash = hashlib.sha256(profile.encode("utf-8")).hexdigest()
+        with self._lock:
+            existing = self._agents.get(agent_id)
+            if existing is not None and existing.profile_hash == profile_hash:
+                return False
+            self._agents[agent_id] = _IndexedAgent(agent_id, agent.get("name", agent_id), profile, profile_hash)
+            self._changed()
+            return True
+
+    def remove(self, agent_id: str) -> bool:
+        with self._lock:
+            if self._agents.pop(str(agent_id), None) is None:
+                return False
+            self._changed()
+            return True
+
+    def sync(self, agents: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Make the index match a full agent list: upsert what is new or changed, drop what is gone"""
+        with self._lock:
+            changed = sum(1 for agent in agents if self.upsert(agent))
+            current = {self.agent_id(agent) for agent in agents}
+            removed = [agent_id for agent_id in self._agents if agent_id not in current]
+            for agent_id in removed:
+                self.remove(agent_id)
+        if changed or removed:
+            logger.info(f"🧭 Capability index '{self.name}': {changed} agents added/updated, {len(removed)} removed")
+        return {"changed": changed, "removed": len(removed)}
+
+    @property
+    def catalogue_hash(self) -> str:
+        """Changes whenever an agent is added, removed or its profile changes"""
+        with self._lock:
+            digest = hashlib.sha256()
+            for agent_id in sorted(self._agents):
+                digest.update(f"{agent_id}:{self._agents[agent_id].profile_hash};".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def _query_vector(self, query: str) -> Tuple[str, List[float]]:
+        """Embed the query and every pending agent profile with the same backend"""
+        for _ in range(2):
+            backend, (query_vector,) = self.embedder.embed([query])
+            with self._lock:
+                pending = [agent for agent in self._agents.values() if agent.backend != backend]
+            if not pending:
+                return backend, query_vector
+            used, vectors = self.embedder.embed([agent.profile for agent in pending])
+            with self._lock:
+                for agent, vector in zip(pending, vectors):
+                    # Skip agents that were replaced or removed while embedding
+                    if self._agents.get(agent.agent_id) is agent:
+                        agent.vector, agent.backend = vector, used
+                self._matrix = None
+            self.embedded += len(pending)
+            if used == backend:
+                return backend, query_vector
+            # The embedding model went away mid-call: embed the query again with the fallback
+        return backend, query_vector
+
+    def search(self, query: str, k: Optional[int] = None) -> Tuple[str, List[Dict[str, Any]]]:
+        """(backend, agents ranked by similarity to the query); k=None ranks the whole catalogue"""
+        backend, query_vector = self._query_vector(query)
+        with self._lock:
+            entries = [agent for agent in self._agents.values() if agent.backend == backend]
+            if NUMPY_AVAILABLE and len(entries) >= NUMPY_MIN_AGENTS:
+                if self._matrix is None or self._matrix[0] != backend:
+                    self._matrix = (backend, [a.agent_id for a in entries], [a.name for a in entries],
+                                    np.array([a.vector for a in entries], dtype=np.float32))
+                _, ids, names, matrix = self._matrix
+                scores = (matrix @ np.asarray(query_vector, dtype=np.float32)).tolist()
+            else:
+                ids = [a.agent_id for a in entries]
+                names = [a.name for a in entries]
+                scores = [cosine(query_vector, a.vector) for a in entries]
+        ranked = sorted(
+            ({"agent_id": agent_id, "name": name, "similarity": round(float(score), 4)}
+             for agent_id, name, score in zip(ids, names, scores)),
+            key=lambda match: match["similarity"], reverse=True
+        )
+        return backend, ranked[:k] if k else ranked
+
+    def route(self, query: str, k: int = DEFAULT_ROUTE_K) -> Dict[str, Any]:
+        """
+        Top-k agents for a query plus a routing decision: `confident` when one agent clearly fits,
+        `needs_planner` when the query needs an LLM planner (no clear winner, several relevant
+        agents or a multi-step request), `no_match` when a semantic backend found nothing relevant.
+        """
+        started = time.perf_counter()
+        backend, ranked = self.search(query)
+        matches = ranked[:k]
+        top = ranked[0]["similarity"] if ranked else 0.0
+        runner_up = ranked[1]["similarity"] if len(ranked) > 1 else 0.0
+        floor = MIN_SIMILARITY.get(backend, 0.0)
+        relevant = [m["agent_id"] for m in matches if m["similarity"] >= floor and m["similarity"] >= top * RELEVANCE_BAND]
+        confident = bool(relevant) and top >= CONFIDENT_SIMILARITY.get(backend, 1.0) and top - runner_up >= ROUTE_MARGIN.get(backend, 0.0)
+        multi_step = is_multi_step(query)
+        needs_planner = not confident or multi_step or len(relevant) > 1
+        duration_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        with self._lock:
+            self.routes += 1
+            self.planner_skips += 0 if needs_planner else 1
+            self.total_route_ms += duration_ms
+        return {
+            "matches": matches,
+            "relevant": relevant,
+            "top_agent_id": relevant[0] if relevant else None,
+            "confident": confident,
+            "multi_step": multi_step,
+            "needs_planner": needs_planner,
+            "no_match": not relevant and backend == BACKEND_OLLAMA,
+            "backend": backend,
+            "catalogue": self.name,
+            "catalogue_size": len(self._agents),
+            "catalogue_version": self.catalogue_hash,
+            "duration_ms": duration_ms
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "catalogue": self.name,
+                "agents": len(self._agents),
+                "version": self.version,
+                "embedded": self.embedded,
+                "routes": self.routes,
+                "planner_skips": self.planner_skips,
+                "avg_route_ms": round(self.total_route_ms / self.routes, 2) if self.routes else 0.0,
+                "embedder": self.embedder.get_stats()
+            }
+
+# One index per agent catalogue (registry agents, Strands SDK agents, ...) in this process
+_indexes: Dict[str, AgentCapabilityIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_capability_index(catalogue: str = "default") -> AgentCapabilityIndex:
+    with _indexes_lock:
+        index = _indexes.get(catalogue)
+        if index is None:
+            index = _indexes[catalogue] = AgentCapabilityIndex(catalogue)
+        return index
+
+def route(query: str, k: int = DEFAULT_ROUTE_K, agents: Optional[List[Dict[str, Any]]] = None,
+          catalogue: str = "default") -> Dict[str, Any]:
+    """
+    Shared routing entry point for the orchestrators. Pass the agent list the caller already has
+    to keep the catalogue's index in sync (only changed agents are re-embedded).
+    """
+    index = get_capability_index(catalogue)
+    if agents is not None:
+        index.sync(agents)
+    return index.route(query, k)
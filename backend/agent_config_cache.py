@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Agent Configuration Cache
+Typed, in-memory Strands SDK agent configurations keyed by agent id, loaded lazily from SQLite
+and invalidated when an agent is created, updated, deleted or its tool configuration changes
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from db_helper import db_manager
+from tool_calling import build_tool_schemas
+
+# Safety net for writes made by other processes sharing the database (e.g. strands_sdk_simple.py)
+DEFAULT_MAX_AGE_SECONDS = 60
+DEFAULT_SYSTEM_PROMPT = "You are a helpful AI assistant."
+
+def _json_column(value: Any, default: Any) -> Any:
+    if not value or not str(value).strip():
+        return default
+    try:
+        return json.loads(value)
+    except (json.JSONDecodeError, TypeError):
+        return default
+
+class AgentConfig:
+    """Decoded strands_sdk_agents row; columns are read by name so the table layout can vary"""
+
+    __slots__ = (
+        "id", "name", "description", "model_provider", "model_id", "host", "system_prompt",
+        "tools", "tool_configurations", "sdk_config", "ollama_config", "sdk_version",
+        "created_at", "updated_at", "status", "response_style", "show_thinking",
+        "show_tool_details", "include_examples", "include_citations", "include_warnings",
+        "version", "loaded_at", "tool_functions", "tools_loaded", "tool_schemas"
+    )
+
+    def __init__(self, row: sqlite3.Row, version: int, tool_registry: Dict[str, Callable]):
+        columns = set(row.keys())
+
+        def column(name, default=None):
+            return row[name] if name in columns and row[name] is not None else default
+
+        self.id = row["id"]
+        self.name = column("name")
+        self.description = column("description", "")
+        self.model_provider = column("model_provider", "ollama")
+        self.model_id = column("model_id")
+        self.host = column("host", "http://localhost:11434")
+        raw_prompt = column("system_prompt")
+        self.system_prompt = raw_prompt if raw_prompt and not raw_prompt.startswith("http") else DEFAULT_SYSTEM_PROMPT
+        self.tools: List[str] = _json_column(column("tools"), [])
+        self.tool_configurations: Dict[str, Any] = _json_column(column("tool_configurations"), {})
+        self.sdk_config: Dict[str, Any] = _json_column(column("sdk_config"), {})
+        sdk_ollama = self.sdk_config.get("ollama_config", {}) if isinstance(self.sdk_config, dict) else {}
+        self.ollama_config: Dict[str, Any] = {**_json_column(column("ollama_config"), {}), **(sdk_ollama or {})}
+        self.sdk_version = column("sdk_version", "1.0.0")
+        self.created_at = column("created_at")
+        self.updated_at = column("updated_at")
+        self.status = column("status", "active")
+        self.response_style = column("response_style", "conversational")
+        self.show_thinking = bool(column("show_thinking", True))
+        self.show_tool_details = bool(column("show_tool_details", True))
+        self.include_examples = bool(column("include_examples", False))
+        self.include_citations = bool(column("include_citations", False))
+        self.include_warnings = bool(column("include_warnings", False))
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+        # Tool functions are resolved once per config version, not on every execution
+        self.tools_loaded = [tool for tool in self.tools if tool in tool_registry]
+        self.tool_functions = [tool_registry[tool] for tool in self.tools_loaded]
+        # Native tool-calling schemas, byte-identical across calls so the prompt prefix stays cached
+        self.tool_schemas = build_tool_schemas(self.tool_map)
+
+    @property
+    def tool_map(self) -> Dict[str, Callable]:
+        return dict(zip(self.tools_loaded, self.tool_functions))
+
+    @property
+    def enhanced_config(self) -> Dict[str, Any]:
+        """host/model_id merged with the agent's Ollama options, dropping empty values"""
+        merged = {"host": self.host, "model_id": self.model_id, **self.ollama_config}
+        return {k: v for k, v in merged.items() if v is not None and v != '' and v != []}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict in the shape the execute endpoints have always used"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "model_id": self.model_id,
+            "host": self.host,
+            "system_prompt": self.system_prompt,
+            "tools": self.tools,
+            "tool_configurations": self.tool_configurations,
+            "ollama_config": self.ollama_config,
+            "sdk_version": self.sdk_version,
+            "created_at": self.created_at,
+            "response_style": self.response_style,
+            "show_thinking": self.show_thinking,
+            "show_tool_details": self.show_tool_details,
+            "include_examples": self.include_examples,
+            "include_citations": self.include_citations,
+            "include_warnings": self.include_warnings,
+            "updated_at": self.updated_at,
+            "status": self.status,
+            "model_provider": self.model_provider,
+            "sdk_config": self.sdk_config,
+            "config_version": self.version
+        }
+
+class AgentConfigCache:
+    """Lazily populated AgentConfig cache with explicit invalidation"""
+
+    def __init__(self, db_path: str, tool_registry: Optional[Dict[str, Callable]] = None,
+                 max_age: float = DEFAULT_MAX_AGE_SECONDS):
+        self.db_path = db_path
+        self.tool_registry = tool_registry if tool_registry is not None else {}
+        self.max_age = max_age
+        self._configs: Dict[str, AgentConfig] = {}
+        self._lock = threading.Lock()
+        self._version = 0
+        # Bumped on every invalidation so a load that raced with a write is not cached
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self, agent_id: str) -> Optional[AgentConfig]:
+        row = db_manager.query_one(self.db_path, "SELECT * FROM strands_sdk_agents WHERE id = ?", (agent_id,))
+        if row is None:
+            return None
+        with self._lock:
+            self._version += 1
+            version = self._version
+        return AgentConfig(row, version, self.tool_registry)
+
+    def get(self, agent_id: str) -> Optional[AgentConfig]:
+        """Cached config for an agent, or None if the agent does not exist"""
+        with self._lock:
+            config = self._configs.get(agent_id)
+            if config is not None and time.monotonic() - config.loaded_at < self.max_age:
+                self.hits += 1
+                return config
+            self.misses += 1
+            generation = self._generation
+
+        config = self._load(agent_id)
+        with self._lock:
+            if config is None:
+                self._configs.pop(agent_id, None)
+            elif generation == self._generation:
+                self._configs[agent_id] = config
+        return config
+
+    def invalidate(self, agent_id: Optional[str] = None) -> None:
+        """Drop one agent's config (or all of them) so the next get() reloads it"""
+        with self._lock:
+            self._generation += 1
+            if agent_id is None:
+                self._configs.clear()
+            else:
+                self._configs.pop(agent_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "cached_agents": len(self._configs),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "max_age_seconds": self.max_age
+            }
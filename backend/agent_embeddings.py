@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Agent Embeddings
+Cheap text embeddings for comparing queries with agent profiles. Vectors come from an Ollama
+embedding model (/api/embed) and are memoised per text; when that model is not available the
+embedder falls back to a hashed bag-of-words vector so relevance filtering keeps working offline.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from ollama_client import DEFAULT_OLLAMA_HOST, get_ollama_client
+
+logger = logging.getLogger(__name__)
+
+AGENT_EMBED_MODEL = os.environ.get("AGENT_EMBED_MODEL", "nomic-embed-text")
+# Vectors memoised in memory (agent profiles and recent queries)
+MAX_CACHED_VECTORS = 4096
+# After the embedding model fails, use the lexical fallback for this long before trying it again
+EMBED_RETRY_SECONDS = 300
+EMBED_TIMEOUT = 30
+# Dimensions of the hashed bag-of-words fallback
+LEXICAL_DIMENSIONS = 1024
+
+BACKEND_OLLAMA = "ollama"
+BACKEND_LEXICAL = "lexical"
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "for", "from", "how", "i", "in", "is",
+    "it", "me", "my", "of", "on", "or", "please", "the", "this", "to", "what", "with", "you", "your"
+}
+
+def _normalize(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(v * v for v in vector))
+    return [v / norm for v in vector] if norm else vector
+
+def cosine(a: List[float], b: List[float]) -> float:
+    """Cosine similarity of two vectors (both already unit length when they come from TextEmbedder)"""
+    if not a or not b or len(a) != len(b):
+        return 0.0
+    return sum(x * y for x, y in zip(a, b))
+
+def lexical_vector(text: str, dimensions: int = LEXICAL_DIMENSIONS) -> List[float]:
+    """Hashed bag of words and word bigrams, unit length"""
+    words = [w for w in _TOKEN.findall(text.lower()) if w not in _STOPWORDS]
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    vector = [0.0] * dimensions
+    for feature in features:
+        digest = hashlib.md5(feature.encode("utf-8")).digest()
+        index = int.from_bytes(digest[:4], "little") % dimensions
+        vector[index] += 1.0
+        # Words sharing a 5-letter prefix (search / searches / searching) also share a bucket
+        if len(feature) > 4 and " " not in feature:
+            prefix = hashlib.md5(feature[:5].encode("utf-8")).digest()
+            vector[int.from_bytes(prefix[:4], "little") % dimensions] += 0.5
+    return _normalize(vector)
+
+def agent_profile_text(agent: Dict[str, Any]) -> str:
+    """The text an agent is embedded by: name, description, tools, capabilities and system prompt"""
+    parts = [agent.get("name", ""), agent.get("description", "")]
+    for field in ("tools", "capabilities"):
+        values = agent.get(field) or []
+        if isinstance(values, str):
+            values = [values]
+        if values:
+            names = [v.get("name", "") if isinstance(v, dict) else str(v) for v in values]
+            parts.append(f"{field}: " + ", ".join(name.replace("_", " ") for name in names if name))
+    if agent.get("system_prompt"):
+        parts.append(str(agent["system_prompt"])[:1000])
+    return "\n".join(part for part in parts if part)
+
+class TextEmbedder:
+    """Embeds texts with one backend at a time, so every vector in a call is comparable"""
+
+    def __init__(self, model: str = AGENT_EMBED_MODEL, host: str = DEFAULT_OLLAMA_HOST,
+                 max_cached: int = MAX_CACHED_VECTORS):
+        self.model = model
+        self.host = host
+        self.max_cached = max_cached
+        self.client = get_ollama_client()
+        self._cache: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_failed_at: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+
+    @property
+    def backend(self) -> str:
+        """Backend the next embed() call will use"""
+        if self._model_failed_at is not None and time.time() - self._model_failed_at < EMBED_RETRY_SECONDS:
+            return BACKEND_LEXICAL
+        return BACKEND_OLLAMA
+
+    @staticmethod
+    def _key(backend: str, text: str) -> Tuple[str, str]:
+        return backend, hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _embed_ollama(self, texts: List[str]) -> List[List[float]]:
+        data = self.client.post_json("/api/embed", {"model": self.model, "input": texts},
+                                     host=self.host, timeout=EMBED_TIMEOUT)
+        vectors = data.get("embeddings") or []
+        if len(vectors) != len(texts):
+            raise ValueError(f"expected {len(texts)} embeddings, got {len(vectors)}")
+        return [_normalize([float(v) for v in vector]) for vector in vectors]
+
+    def embed(self, texts: List[str]) -> Tuple[str, List[List[float]]]:
+        """(backend, vectors) for the texts; only texts not seen before are sent to the model"""
+        backend = self.backend
+        with self._lock:
+            found = {}
+            for text in texts:
+                vector = self._cache.get(self._key(backend, text))
+                if vector is not None:
+                    self._cache.move_to_end(self._key(backend, text))
+                    found[text] = vector
+        missing = list(dict.fromkeys(text for text in texts if text not in found))
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            if backend == BACKEND_OLLAMA:
+                try:
+                    vectors = self._embed_ollama(missing)
+                except Exception as e:
+                    logger.warning(f"⚠️ Embedding model {self.model} unavailable ({e}); using lexical similarity "
+                                   f"for the next {EMBED_RETRY_SECONDS}s")
+                    self._model_failed_at = time.time()
+                    self.fallbacks += 1
+                    # Vectors from the two backends are not comparable: redo the whole call lexically
+                    return self.embed(texts)
+            else:
+                vectors = [lexical_vector(text) for text in missing]
+            with self._lock:
+                for text, vector in zip(missing, vectors):
+                    found[text] = vector
+                    self._cache[self._key(backend, text)] = vector
+                while len(self._cache) > self.max_cached:
+                    self._cache.popitem(last=False)
+        return backend, [found[text] for text in texts]
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "model": self.model,
+            "backend": self.backend,
+            "cached_vectors": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "fallbacks": self.fallbacks,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+# Global embedder shared by the orchestrators in this process
+_text_embedder: Optional[TextEmbedder] = None
+_text_embedder_lock = threading.Lock()
+
+def get_text_embedder() -> TextEmbedder:
+    global _text_embedder
+    with _text_embedder_lock:
+        if _text_embedder is None:
+            _text_embedder = TextEmbedder()
+        return _text_embedder
@@ -14,6 +14,8 @@ from typing import Dict, List, Optional, Any
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 
+from agent_capability_index import DEFAULT_ROUTE_K, get_capability_index
+
 app = Flask(__name__)
 CORS(app)
 
@@ -52,6 +54,8 @@ class AgentRegistry:
     
     def __init__(self):
         self.agents: Dict[str, Dict[str, Any]] = {}
+        # Kept in step with self.agents so orchestrators can route queries without an LLM call
+        self.capability_index = get_capability_index("agent_registry")
         self.health_check_interval = 30  # seconds
         self.start_health_monitoring()
     
@@ -89,6 +93,7 @@ class AgentRegistry:
                 'registered_at': datetime.now().isoformat(),
                 'last_health_check': None
             }
+            self.capability_index.upsert({**self.agents[agent_id], 'id': agent_id})
             
             print(f"✅ Agent registered: {agent_data.get('name')} at {agent_data.get('url')}")
             
@@ -216,6 +221,24 @@ def register_agent():
     except Exception as e:
         return jsonify({"status": "error", "error": str(e)}), 500
 
+@app.route('/agents/route', methods=['GET'])
+def route_query():
+    """Top-k registered agents for a query, from the capability index (no LLM call)"""
+    try:
+        query = request.args.get('query', '').strip()
+        if not query:
+            return jsonify({"status": "error", "error": "query required"}), 400
+        k = request.args.get('k', DEFAULT_ROUTE_K, type=int)
+        decision = registry.capability_index.route(query, k)
+        return jsonify({"status": "success", **decision})
+    except Exception as e:
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+@app.route('/agents/route/stats', methods=['GET'])
+def route_stats():
+    """Capability index statistics"""
+    return jsonify({"status": "success", **registry.capability_index.get_stats()})
+
 @app.route('/agents/<agent_id>', methods=['GET'])
 def get_agent(agent_id):
     """Get a specific agent"""
@@ -259,6 +282,7 @@ def delete_agent(agent_id):
         # Remove from memory
         if agent_id in registry.agents:
             del registry.agents[agent_id]
+            registry.capability_index.remove(agent_id)
             return jsonify({
                 "status": "success",
                 "message": f"Agent {agent_id} deleted successfully"
@@ -14,6 +14,7 @@ import time
 import random
 import logging
 import os
+from db_helper import get_db_manager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,6 +25,7 @@ CORS(app)
 
 # Database setup
 DATABASE_PATH = "aws_agentcore.db"
+db_manager = get_db_manager()
 
 def init_database():
     """Initialize database with AWS AgentCore schema"""
@@ -220,64 +222,60 @@ def update_agent_status():
     """Background task to simulate real agent status updates"""
     while True:
         try:
-            conn = sqlite3.connect(DATABASE_PATH)
-            cursor = conn.cursor()
+            # One write transaction per tick on this thread's persistent connection
+            with db_manager.transaction(DATABASE_PATH) as cursor:
+                # Get all agents
+                cursor.execute('SELECT id, status FROM agents')
+                agents = cursor.fetchall()
             
-            # Get all agents
-            cursor.execute('SELECT id, status FROM agents')
-            agents = cursor.fetchall()
+                for agent_id, current_status in agents:
+                    # Simulate status transitions
+                    if current_status == 'deploying':
+                        if random.random() < 0.3:  # 30% chance to become active
+                            new_status = 'active'
+                            cursor.execute(
+                                'UPDATE agents SET status = ?, updated_at = ?, last_activity = ? WHERE id = ?',
+                                (new_status, datetime.now(), datetime.now(), agent_id)
+                            )
             
-            for agent_id, current_status in agents:
-                # Simulate status transitions
-                if current_status == 'deploying':
-                    if random.random() < 0.3:  # 30% chance to become active
-                        new_status = 'active'
+                            # Add success log
+                            log_id = str(uuid.uuid4())
+                            cursor.execute(
+                                'INSERT INTO agent_logs (id, agent_id, level, message) VALUES (?, ?, ?, ?)',
+                                (log_id, agent_id, 'INFO', f'Agent {agent_id} successfully deployed and active')
+                            )
+                
+                    elif current_status == 'active':
+                        # Update performance metrics
+                        metrics = generate_realistic_metrics(agent_id)
                         cursor.execute(
-                            'UPDATE agents SET status = ?, updated_at = ?, last_activity = ? WHERE id = ?',
-                            (new_status, datetime.now(), datetime.now(), agent_id)
+                            'UPDATE agents SET performance_metrics = ?, last_activity = ? WHERE id = ?',
+                            (json.dumps(metrics), datetime.now(), agent_id)
                         )
                         
-                        # Add success log
-                        log_id = str(uuid.uuid4())
-                        cursor.execute(
-                            'INSERT INTO agent_logs (id, agent_id, level, message) VALUES (?, ?, ?, ?)',
-                            (log_id, agent_id, 'INFO', f'Agent {agent_id} successfully deployed and active')
-                        )
+                        # Store individual metrics
+                        for metric_type, value in metrics.items():
+                            if isinstance(value, (int, float)):
+                                metric_id = str(uuid.uuid4())
+                                cursor.execute(
+                                    'INSERT INTO metrics (id, agent_id, metric_type, value) VALUES (?, ?, ?, ?)',
+                                    (metric_id, agent_id, metric_type, value)
+                                )
                 
-                elif current_status == 'active':
-                    # Update performance metrics
-                    metrics = generate_realistic_metrics(agent_id)
-                    cursor.execute(
-                        'UPDATE agents SET performance_metrics = ?, last_activity = ? WHERE id = ?',
-                        (json.dumps(metrics), datetime.now(), agent_id)
-                    )
-                    
-                    # Store individual metrics
-                    for metric_type, value in metrics.items():
-                        if isinstance(value, (int, float)):
-                            metric_id = str(uuid.uuid4())
+                        # Occasionally add activity logs
+                        if random.random() < 0.1:  # 10% chance
+                            log_id = str(uuid.uuid4())
+                            messages = [
+                                'Processing user request',
+                                'Memory retrieval completed',
+                                'Response generated successfully',
+                                'Context updated',
+                                'Task execution completed'
+                            ]
                             cursor.execute(
-                                'INSERT INTO metrics (id, agent_id, metric_type, value) VALUES (?, ?, ?, ?)',
-                                (metric_id, agent_id, metric_type, value)
+                                'INSERT INTO agent_logs (id, agent_id, level, message) VALUES (?, ?, ?, ?)',
+                                (log_id, agent_id, 'INFO', random.choice(messages))
                             )
-                    
-                    # Occasionally add activity logs
-                    if random.random() < 0.1:  # 10% chance
-                        log_id = str(uuid.uuid4())
-                        messages = [
-                            'Processing user request',
-                            'Memory retrieval completed',
-                            'Response generated successfully',
-                            'Context updated',
-                            'Task execution completed'
-                        ]
-                        cursor.execute(
-                            'INSERT INTO agent_logs (id, agent_id, level, message) VALUES (?, ?, ?, ?)',
-                            (log_id, agent_id, 'INFO', random.choice(messages))
-                        )
-            
-            conn.commit()
-            conn.close()
             
         except Exception as e:
             logger.error(f"Error updating agent status: {e}")
@@ -303,17 +301,14 @@ def handle_agents():
     """Handle agent operations - supports both simple and complex agent creation"""
     if request.method == 'GET':
         try:
-            conn = sqlite3.connect(DATABASE_PATH)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
+            rows = db_manager.execute_query(DATABASE_PATH, '''
                 SELECT id, name, framework, status, endpoint, created_at, 
                        updated_at, last_activity, performance_metrics, runtime_config
                 FROM agents ORDER BY created_at DESC
             ''')
             
             agents = []
-            for row in cursor.fetchall():
+            for row in rows:
                 agent = {
                     'id': row[0],
                     'name': row[1],
@@ -328,8 +323,6 @@ def handle_agents():
                 }
                 agents.append(agent)
             
-            conn.close()
-            
             return jsonify({
                 'agents': agents,
                 'total': len(agents),
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Agent Execution Latency Benchmark
+Compares the streaming (/execute-stream) and non-streaming (/execute) Strands SDK endpoints
+of a running strands_sdk_api service: time to first event, time to first token and total time.
+
+Usage:
+    python benchmark_agent_stream.py --agent-id <id>
+    python benchmark_agent_stream.py --agent-id <id> --runs 10 --input "What is 15 * 23?"
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+
+DEFAULT_BASE_URL = "http://localhost:5006"
+
+def run_execute(session: requests.Session, base_url: str, agent_id: str, input_text: str) -> Dict[str, Optional[float]]:
+    start = time.perf_counter()
+    response = session.post(f"{base_url}/api/strands-sdk/agents/{agent_id}/execute", json={"input": input_text}, timeout=300)
+    response.raise_for_status()
+    total = (time.perf_counter() - start) * 1000
+    # The whole answer arrives at once, so first event == first token == total
+    return {"first_event_ms": total, "first_token_ms": total, "total_ms": total}
+
+def run_execute_stream(session: requests.Session, base_url: str, agent_id: str, input_text: str) -> Dict[str, Optional[float]]:
+    start = time.perf_counter()
+    first_event = first_token = None
+    with session.post(f"{base_url}/api/strands-sdk/agents/{agent_id}/execute-stream",
+                      json={"input": input_text}, stream=True, timeout=300) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line or not line.startswith(b"data: "):
+                continue
+            elapsed = (time.perf_counter() - start) * 1000
+            event = json.loads(line[len(b"data: "):])
+            if first_event is None:
+                first_event = elapsed
+            if event.get("type") == "token" and first_token is None:
+                first_token = elapsed
+            if event.get("type") == "error":
+                raise RuntimeError(event.get("error"))
+            if event.get("type") == "final_result":
+                break
+    return {"first_event_ms": first_event, "first_token_ms": first_token, "total_ms": (time.perf_counter() - start) * 1000}
+
+def summarize(samples: List[Dict[str, Optional[float]]], key: str) -> str:
+    values = sorted(sample[key] for sample in samples if sample[key] is not None)
+    if not values:
+        return f"{'-':>10}{'-':>10}"
+    p95 = values[max(0, int(len(values) * 0.95) - 1)]
+    return f"{statistics.mean(values):>10.0f}{p95:>10.0f}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency benchmark: /execute-stream vs /execute")
+    parser.add_argument("--agent-id", required=True, help="Strands SDK agent to execute")
+    parser.add_argument("--input", default="Explain in two sentences what a vector database is.", help="Prompt sent to the agent")
+    parser.add_argument("--runs", type=int, default=5, help="Measured runs per endpoint")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="strands_sdk_api base URL")
+    args = parser.parse_args()
+
+    session = requests.Session()
+    modes = {"execute": run_execute, "execute-stream": run_execute_stream}
+
+    # Warm-up so model loading is not attributed to whichever endpoint runs first
+    run_execute(session, args.base_url, args.agent_id, args.input)
+
+    results: Dict[str, List[Dict[str, Any]]] = {mode: [] for mode in modes}
+    for _ in range(args.runs):
+        # Interleave the endpoints so drift in Ollama's state affects both equally
+        for mode, runner in modes.items():
+            results[mode].append(runner(session, args.base_url, args.agent_id, args.input))
+
+    print(f"\n⏱️ Agent execution benchmark: {args.runs} runs per endpoint, agent {args.agent_id}\n")
+    print(f"{'endpoint':<16}{'first event':>20}{'first token':>20}{'total':>20}")
+    print(f"{'':<16}" + f"{'mean ms':>10}{'p95 ms':>10}" * 3)
+    for mode, samples in results.items():
+        print(f"{mode:<16}{summarize(samples, 'first_event_ms')}{summarize(samples, 'first_token_ms')}{summarize(samples, 'total_ms')}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+SQLite Access Benchmark
+Compares the old connect-per-query pattern (sqlite3.connect, execute, close) with the shared
+db_helper access layer (persistent per-thread WAL connections, cached prepared statements) on a
+throwaway database shaped like strands_sdk_agents / strands_sdk_executions.
+Besides long-lived worker threads it runs a thread-per-operation mode, the way the Flask dev server
+starts a thread per request, where per-thread connections are opened (and configured) every time.
+
+Usage:
+    python benchmark_db_access.py
+    python benchmark_db_access.py --ops 5000 --threads 8
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Callable, Dict
+
+from db_helper import DatabaseManager
+
+SEED_AGENTS = 200
+
+def seed(db_path: str) -> None:
+    conn = sqlite3.connect(db_path)
+    conn.executescript('''
+        CREATE TABLE agents (id TEXT PRIMARY KEY, name TEXT, model_id TEXT, system_prompt TEXT, tools TEXT);
+        CREATE TABLE executions (id TEXT PRIMARY KEY, agent_id TEXT, input_text TEXT, success BOOLEAN,
+                                 timestamp DATETIME DEFAULT CURRENT_TIMESTAMP);
+    ''')
+    conn.executemany('INSERT INTO agents VALUES (?, ?, ?, ?, ?)', [
+        (f"agent-{i}", f"Agent {i}", "llama3.2:1b", "You are a helpful assistant.", '["calculator"]')
+        for i in range(SEED_AGENTS)
+    ])
+    conn.commit()
+    conn.close()
+
+def before_lookup(db_path: str, i: int) -> None:
+    conn = sqlite3.connect(db_path)
+    conn.execute('SELECT * FROM agents WHERE id = ?', (f"agent-{i % SEED_AGENTS}",)).fetchone()
+    conn.close()
+
+def before_insert(db_path: str, i: int) -> None:
+    conn = sqlite3.connect(db_path)
+    conn.execute('INSERT INTO executions (id, agent_id, input_text, success) VALUES (?, ?, ?, ?)',
+                 (str(uuid.uuid4()), f"agent-{i % SEED_AGENTS}", "What is 15 * 23?", True))
+    conn.commit()
+    conn.close()
+
+def after_lookup(manager: DatabaseManager, db_path: str, i: int) -> None:
+    manager.query_one(db_path, 'SELECT * FROM agents WHERE id = ?', (f"agent-{i % SEED_AGENTS}",))
+
+def after_insert(manager: DatabaseManager, db_path: str, i: int) -> None:
+    manager.execute_update(db_path, 'INSERT INTO executions (id, agent_id, input_text, success) VALUES (?, ?, ?, ?)',
+                           (str(uuid.uuid4()), f"agent-{i % SEED_AGENTS}", "What is 15 * 23?", True))
+
+def run(op: Callable[[int], None], ops: int, threads: int) -> float:
+    """Operations per second with `threads` workers sharing `ops` operations"""
+    per_thread = ops // threads
+
+    def worker():
+        for i in range(per_thread):
+            op(i)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return per_thread * threads / (time.perf_counter() - start)
+
+def run_thread_per_op(op: Callable[[int], None], ops: int, threads: int) -> float:
+    """Operations per second when every operation gets a fresh thread, at most `threads` running at once"""
+    slots = threading.BoundedSemaphore(threads)
+
+    def request(i):
+        try:
+            op(i)
+        finally:
+            slots.release()
+
+    workers = []
+    start = time.perf_counter()
+    for i in range(ops):
+        slots.acquire()
+        thread = threading.Thread(target=request, args=(i,))
+        thread.start()
+        workers.append(thread)
+    for thread in workers:
+        thread.join()
+    return ops / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite benchmark: connect-per-query vs shared access layer")
+    parser.add_argument("--ops", type=int, default=2000, help="Operations per scenario")
+    parser.add_argument("--threads", type=int, default=4, help="Worker threads for the concurrent scenarios")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before_db = os.path.join(tmp, "before.db")
+        after_db = os.path.join(tmp, "after.db")
+        seed(before_db)
+        seed(after_db)
+        manager = DatabaseManager()
+
+        scenarios: Dict[str, Dict[str, Callable[[int], None]]] = {
+            "point lookup": {
+                "before": lambda i: before_lookup(before_db, i),
+                "after": lambda i: after_lookup(manager, after_db, i),
+            },
+            "insert + commit": {
+                "before": lambda i: before_insert(before_db, i),
+                "after": lambda i: after_insert(manager, after_db, i),
+            },
+        }
+
+        print(f"\n⏱️ SQLite access benchmark: {args.ops} operations per scenario\n")
+        runners = [
+            ("1", lambda op: run(op, args.ops, 1)),
+            (str(args.threads), lambda op: run(op, args.ops, args.threads)),
+            (f"{args.threads}/op", lambda op: run_thread_per_op(op, args.ops, args.threads)),
+        ]
+        print(f"{'scenario':<18}{'threads':>8}{'before ops/s':>16}{'after ops/s':>16}{'speedup':>10}")
+        for name, modes in scenarios.items():
+            for label, runner in runners:
+                before = runner(modes["before"])
+                after = runner(modes["after"])
+                print(f"{name:<18}{label:>8}{before:>16.0f}{after:>16.0f}{after / before:>9.1f}x")
+        print(f"\n'{args.threads}/op' starts a new thread per operation, like the Flask dev server does per request")
+
+if __name__ == "__main__":
+    main()
@@ -11,17 +11,24 @@ Uses official Strands A2A parameters and message format.
 """
 
 import json
+import re
 import requests
 import logging
 import time
 import psutil
 import gc
 import threading
+import concurrent.futures
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 
+from agent_capability_index import MIN_SIMILARITY, get_capability_index
+from context_refinement import (POLICY_EXTRACTIVE, POLICY_LLM, POLICY_NONE, choose_policy, choose_synthesis_policy,
+                                combine_responses, extractive_refine, get_overhead_tracker, start_warm_up)
+from ollama_client import OllamaError, get_ollama_client
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -34,6 +41,19 @@ AGENT_REGISTRY_URL = "http://localhost:5010"
 ORCHESTRATOR_MODEL = "qwen3:1.7b"
 SESSION_TIMEOUT = 300  # 5 minutes
 MEMORY_THRESHOLD = 85  # 85% memory usage threshold
+SDK_AGENTS_TTL = 60  # Seconds the Strands SDK agent listing is reused to resolve agents for warm-up
+
+# Step 2 agent scoring
+AGENT_SCORING_WORKERS = 4  # Concurrent per-agent LLM evaluations
+BATCH_SCORING_MAX_AGENTS = 6  # Registries this small (after prefiltering) are scored in one prompt
+# Embedding prefilter: agents below the capability index's similarity floor are dropped before the
+# LLM sees them, but the PREFILTER_MIN_AGENTS most similar always survive and at most PREFILTER_MAX_AGENTS do
+PREFILTER_MIN_AGENTS = 3
+PREFILTER_MAX_AGENTS = 10
+
+ollama_client = get_ollama_client()
+overhead_tracker = get_overhead_tracker()
+scoring_executor = concurrent.futures.ThreadPoolExecutor(max_workers=AGENT_SCORING_WORKERS, thread_name_prefix='agent-scoring')
 
 app = Flask(__name__)
 CORS(app)
@@ -45,6 +65,9 @@ class BidirectionalA2AOrchestrator:
         self.active_sessions = {}
         self.orchestrator_id = "fdaa1298-d5cf-495d-8b25-7e0b2e400796"
         self.orchestrator_name = "System Orchestrator"
+        # (fetched at, agents) of the Strands SDK agent listing used to warm up registry agents
+        self._sdk_agents: Tuple[float, List[Dict]] = (0.0, [])
+        self._sdk_agents_lock = threading.Lock()
         self.cleanup_thread = threading.Thread(target=self._cleanup_worker, daemon=True)
         self.cleanup_thread.start()
         self.auto_register_orchestrator()
@@ -230,24 +253,45 @@ ORCHESTRATOR REASONING: [your detailed reasoning about why this analysis is corr
                     "error": "No agents available in registry"
                 }
             
-            # Use LLM orchestrator to analyze each agent with detailed reasoning
-            agent_analysis = []
-            for agent in agents:
-                agent_name = agent.get('name', 'Unknown')
-                agent_desc = agent.get('description', '')
-                agent_tools = agent.get('tools', [])
-                agent_capabilities = agent.get('capabilities', [])
-                
-                # Get detailed orchestrator analysis for this agent
-                agent_reasoning = self.get_agent_reasoning(
+            scoring_start = time.time()
+
+            # Drop clearly irrelevant agents before any LLM call
+            candidates, prefiltered, similarity_backend = self.prefilter_agents(query, user_intent, agents)
+
+            # Small registries are scored in a single prompt
+            reasonings: List[Optional[Dict[str, Any]]] = [None] * len(candidates)
+            scoring_mode = "parallel"
+            if 1 < len(candidates) <= BATCH_SCORING_MAX_AGENTS:
+                reasonings = self.get_batched_agent_reasoning(
                     query, user_intent, domain_analysis, contextual_analysis,
-                    agent_name, agent_desc, agent_tools, agent_capabilities
+                    [agent for agent, _ in candidates]
                 )
-                
+                scoring_mode = "batched"
+
+            # Everything else (including agents the batched answer skipped) is scored per agent, concurrently
+            missing = [i for i, reasoning in enumerate(reasonings) if reasoning is None]
+            if missing:
+                futures = {
+                    i: scoring_executor.submit(
+                        self.get_agent_reasoning,
+                        query, user_intent, domain_analysis, contextual_analysis,
+                        candidates[i][0].get('name', 'Unknown'), candidates[i][0].get('description', ''),
+                        candidates[i][0].get('tools', []), candidates[i][0].get('capabilities', [])
+                    )
+                    for i in missing
+                }
+                for i, future in futures.items():
+                    reasonings[i] = future.result()
+                if scoring_mode == "batched":
+                    scoring_mode = "batched+parallel"
+
+            agent_analysis = []
+            for (agent, similarity), agent_reasoning in zip(candidates, reasonings):
                 agent_analysis.append({
-                    "agent_name": agent_name,
+                    "agent_name": agent.get('name', 'Unknown'),
                     "agent_id": agent.get('id', ''),
                     "association_score": agent_reasoning['score'],
+                    "embedding_similarity": similarity,
                     "contextual_relevance": agent_reasoning['contextual_relevance'],
                     "role_analysis": agent_reasoning['role_analysis'],
                     "orchestrator_reasoning": agent_reasoning['orchestrator_reasoning'],
@@ -257,6 +301,9 @@ ORCHESTRATOR REASONING: [your detailed reasoning about why this analysis is corr
             
             # Sort by association score
             agent_analysis.sort(key=lambda x: x['association_score'], reverse=True)
+            scoring_time = round(time.time() - scoring_start, 2)
+            logger.info(f"🎯 Scored {len(agent_analysis)}/{len(agents)} agents ({scoring_mode}, "
+                        f"{len(prefiltered)} prefiltered) in {scoring_time}s")
             
             # Get orchestrator reasoning for overall analysis
             overall_reasoning = self.get_overall_agent_analysis_reasoning(
@@ -266,8 +313,13 @@ ORCHESTRATOR REASONING: [your detailed reasoning about why this analysis is corr
             return {
                 "success": True,
                 "agent_analysis": agent_analysis,
-                "analysis_summary": f"Analyzed {len(agent_analysis)} agents. Found {len([a for a in agent_analysis if a['association_score'] > 0.5])} highly relevant agents.",
+                "analysis_summary": f"Analyzed {len(agent_analysis)} of {len(agents)} agents ({len(prefiltered)} filtered out by similarity). Found {len([a for a in agent_analysis if a['association_score'] > 0.5])} highly relevant agents.",
                 "total_agents_analyzed": len(agent_analysis),
+                "total_agents_registered": len(agents),
+                "prefiltered_agents": prefiltered,
+                "similarity_backend": similarity_backend,
+                "scoring_mode": scoring_mode,
+                "scoring_time": scoring_time,
                 "orchestrator_reasoning": overall_reasoning
             }
             
@@ -277,6 +329,147 @@ ORCHESTRATOR REASONING: [your detailed reasoning about why this analysis is corr
                 "success": False,
                 "error": str(e)
             }
+
+    def prefilter_agents(self, query: str, user_intent: str, agents: List[Dict]) -> Tuple[List[Tuple[Dict, Optional[float]]], List[Dict], Optional[str]]:
+        """Rank agents by embedding similarity to the query; returns (kept (agent, similarity) pairs, dropped agents, backend)"""
+        if len(agents) <= PREFILTER_MIN_AGENTS:
+            return [(agent, None) for agent in agents], [], None
+        try:
+            index = get_capability_index("agent_registry")
+            index.sync(agents)
+            backend, matches = index.search(f"{query}\n{user_intent}")
+        except Exception as e:
+            logger.warning(f"⚠️ Agent prefilter unavailable, scoring every agent: {e}")
+            return [(agent, None) for agent in agents], [], None
+
+        similarities = {match['agent_id']: match['similarity'] for match in matches}
+        ranked = sorted(
+            ((agent, round(similarities.get(index.agent_id(agent), 0.0), 3)) for agent in agents),
+            key=lambda pair: pair[1], reverse=True
+        )
+        floor = MIN_SIMILARITY.get(backend, 0.0)
+        kept, dropped = [], []
+        for rank, (agent, similarity) in enumerate(ranked):
+            if rank < PREFILTER_MIN_AGENTS or (rank < PREFILTER_MAX_AGENTS and similarity >= floor):
+                kept.append((agent, similarity))
+            else:
+                dropped.append({
+                    "agent_name": agent.get('name', 'Unknown'),
+                    "agent_id": agent.get('id', ''),
+                    "embedding_similarity": similarity
+                })
+        return kept, dropped, backend
+
+    @staticmethod
+    def _describe_agent(agent_name: str, agent_desc: str, agent_tools: List, agent_capabilities: List) -> str:
+        return f"""- Name: {agent_name}
+- Description: {agent_desc}
+- Tools: {', '.join(agent_tools) if agent_tools else 'None'}
+- Capabilities: {', '.join(agent_capabilities) if agent_capabilities else 'None'}"""
+
+    @staticmethod
+    def _parse_agent_reasoning(lines: List[str]) -> Dict[str, Any]:
+        """Parse the ASSOCIATION_SCORE / CONTEXTUAL_RELEVANCE / ... block of one agent"""
+        score = 0.5
+        contextual_relevance = ""
+        role_analysis = ""
+        capability_analysis = ""
+        relevance_justification = ""
+        orchestrator_reasoning = ""
+
+        for line in lines:
+            # Small models like to decorate the labels as list items or bold text
+            line = line.strip().lstrip('-*# ').replace('**', '')
+            if line.startswith("ASSOCIATION_SCORE:"):
+                try:
+                    score = min(1.0, max(0.0, float(line.replace("ASSOCIATION_SCORE:", "").strip())))
+                except:
+                    score = 0.5
+            elif line.startswith("CONTEXTUAL_RELEVANCE:"):
+                contextual_relevance = line.replace("CONTEXTUAL_RELEVANCE:", "").strip()
+            elif line.startswith("ROLE_ANALYSIS:"):
+                role_analysis = line.replace("ROLE_ANALYSIS:", "").strip()
+            elif line.startswith("CAPABILITY_ANALYSIS:"):
+                capability_analysis = line.replace("CAPABILITY_ANALYSIS:", "").strip()
+            elif line.startswith("RELEVANCE_JUSTIFICATION:"):
+                relevance_justification = line.replace("RELEVANCE_JUSTIFICATION:", "").strip()
+            elif line.startswith("ORCHESTRATOR_REASONING:"):
+                orchestrator_reasoning = line.replace("ORCHESTRATOR_REASONING:", "").strip()
+
+        return {
+            "score": score,
+            "contextual_relevance": contextual_relevance,
+            "role_analysis": role_analysis,
+            "capability_analysis": capability_analysis,
+            "relevance_justification": relevance_justification,
+            "orchestrator_reasoning": orchestrator_reasoning
+        }
+
+    def get_batched_agent_reasoning(self, query: str, user_intent: str, domain_analysis: str, contextual_analysis: str,
+                                    agents: List[Dict]) -> List[Optional[Dict[str, Any]]]:
+        """Score several agents with one LLM call; agents missing from the answer come back as None"""
+        agent_blocks = "\n\n".join(
+            f"AGENT {i}:\n" + self._describe_agent(
+                agent.get('name', 'Unknown'), agent.get('description', ''),
+                agent.get('tools', []), agent.get('capabilities', [])
+            )
+            for i, agent in enumerate(agents, 1)
+        )
+        try:
+            prompt = f"""
+You are an expert orchestrator analyzing agent capabilities and relevance.
+
+USER QUERY: {query}
+USER INTENT: {user_intent}
+DOMAIN ANALYSIS: {domain_analysis}
+CONTEXTUAL ANALYSIS: {contextual_analysis}
+
+AGENTS TO ANALYZE:
+{agent_blocks}
+
+Analyze EVERY agent independently. For each agent, provide a block in this exact format:
+AGENT: [agent number]
+ASSOCIATION_SCORE: [0.0-1.0]
+CONTEXTUAL_RELEVANCE: [High/Medium/Low] - [brief explanation]
+ROLE_ANALYSIS: [analysis of agent's role and capabilities]
+CAPABILITY_ANALYSIS: [analysis of how agent's tools/capabilities match the query]
+RELEVANCE_JUSTIFICATION: [reasoning for the relevance score]
+ORCHESTRATOR_REASONING: [your reasoning about this agent's suitability]
+"""
+
+            result = ollama_client.generate(
+                ORCHESTRATOR_MODEL, prompt, host=OLLAMA_BASE_URL,
+                options={
+                    "temperature": 0.3,
+                    "top_p": 0.9,
+                    "max_tokens": 300 * len(agents)
+                },
+                timeout=60 + 30 * len(agents)
+            )
+            reasoning_text = result.get("response", "").strip()
+        except Exception as e:
+            logger.warning(f"⚠️ Batched agent scoring failed, scoring agents individually: {e}")
+            return [None] * len(agents)
+
+        # Split the answer into per-agent blocks
+        blocks: Dict[int, List[str]] = {}
+        current = None
+        for line in reasoning_text.split('\n'):
+            header = re.match(r"^[\s\-*#]*AGENT\s*(?:#|:)?\s*(\d+)\b", line.replace('**', ''))
+            if header:
+                current = int(header.group(1))
+                blocks.setdefault(current, [])
+            elif current is not None:
+                blocks[current].append(line)
+
+        reasonings: List[Optional[Dict[str, Any]]] = []
+        for i in range(1, len(agents) + 1):
+            block = blocks.get(i)
+            if block and any("ASSOCIATION_SCORE:" in line for line in block):
+                reasonings.append(self._parse_agent_reasoning(block))
+            else:
+                reasonings.append(None)
+        return reasonings
     
     def get_agent_reasoning(self, query: str, user_intent: str, domain_analysis: str, contextual_analysis: str,
                            agent_name: str, agent_desc: str, agent_tools: List, agent_capabilities: List) -> Dict[str, Any]:
@@ -291,10 +484,7 @@ DOMAIN ANALYSIS: {domain_analysis}
 CONTEXTUAL ANALYSIS: {contextual_analysis}
 
 AGENT TO ANALYZE:
-- Name: {agent_name}
-- Description: {agent_desc}
-- Tools: {', '.join(agent_tools) if agent_tools else 'None'}
-- Capabilities: {', '.join(agent_capabilities) if agent_capabilities else 'None'}
+{self._describe_agent(agent_name, agent_desc, agent_tools, agent_capabilities)}
 
 Provide detailed analysis in this format:
 ASSOCIATION_SCORE: [0.0-1.0]
@@ -305,60 +495,18 @@ RELEVANCE_JUSTIFICATION: [detailed reasoning for the relevance score]
 ORCHESTRATOR_REASONING: [your detailed reasoning about this agent's suitability]
 """
             
-            response = requests.post(
-                f"{OLLAMA_BASE_URL}/api/generate",
-                json={
-                    "model": ORCHESTRATOR_MODEL,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
+            try:
+                # Goes through the shared client, so concurrent scorers respect the per-host Ollama limit
+                result = ollama_client.generate(
+                    ORCHESTRATOR_MODEL, prompt, host=OLLAMA_BASE_URL,
+                    options={
                         "temperature": 0.3,
                         "top_p": 0.9,
                         "max_tokens": 300
-                    }
-                },
-                timeout=60
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                reasoning_text = result.get("response", "").strip()
-                
-                # Parse the response
-                lines = reasoning_text.split('\n')
-                score = 0.5
-                contextual_relevance = ""
-                role_analysis = ""
-                capability_analysis = ""
-                relevance_justification = ""
-                orchestrator_reasoning = ""
-                
-                for line in lines:
-                    if line.startswith("ASSOCIATION_SCORE:"):
-                        try:
-                            score = float(line.replace("ASSOCIATION_SCORE:", "").strip())
-                        except:
-                            score = 0.5
-                    elif line.startswith("CONTEXTUAL_RELEVANCE:"):
-                        contextual_relevance = line.replace("CONTEXTUAL_RELEVANCE:", "").strip()
-                    elif line.startswith("ROLE_ANALYSIS:"):
-                        role_analysis = line.replace("ROLE_ANALYSIS:", "").strip()
-                    elif line.startswith("CAPABILITY_ANALYSIS:"):
-                        capability_analysis = line.replace("CAPABILITY_ANALYSIS:", "").strip()
-                    elif line.startswith("RELEVANCE_JUSTIFICATION:"):
-                        relevance_justification = line.replace("RELEVANCE_JUSTIFICATION:", "").strip()
-                    elif line.startswith("ORCHESTRATOR_REASONING:"):
-                        orchestrator_reasoning = line.replace("ORCHESTRATOR_REASONING:", "").strip()
-                
-                return {
-                    "score": score,
-                    "contextual_relevance": contextual_relevance,
-                    "role_analysis": role_analysis,
-                    "capability_analysis": capability_analysis,
-                    "relevance_justification": relevance_justification,
-                    "orchestrator_reasoning": orchestrator_reasoning
-                }
-            else:
+                    },
+                    timeout=60
+                )
+            except OllamaError:
                 # Fallback to basic analysis
                 return {
                     "score": 0.5,
@@ -368,6 +516,9 @@ ORCHESTRATOR_REASONING: [your detailed reasoning about this agent's suitability]
                     "relevance_justification": "Basic keyword matching",
                     "orchestrator_reasoning": "LLM analysis failed, using fallback"
                 }
+
+            reasoning_text = result.get("response", "").strip()
+            return self._parse_agent_reasoning(reasoning_text.split('\n'))
                 
         except Exception as e:
             logger.error(f"Agent reasoning error for {agent_name}: {e}")
@@ -633,6 +784,8 @@ A2A_HANDOFF_DETAILS: [specific details for A2A handoff including context and ins
             execution_results = []
             accumulated_output = ""
             final_response = ""
+            # Condensed context for the next handoff; it replaces accumulated_output for that one handoff only
+            refined_context = ""
             
             for i, agent in enumerate(selected_agents):
                 agent_name = agent['agent_name']
@@ -642,8 +795,9 @@ A2A_HANDOFF_DETAILS: [specific details for A2A handoff including context and ins
                 logger.info(f"[{session_id}] Executing Agent {i+1}: {agent_name}")
                 
                 # Step 4a: Orchestrator > Agent (A2A Handoff)
+                handoff_context, refined_context = refined_context or accumulated_output, ""
                 handoff_result = self.execute_a2a_handoff(
-                    agent_id, agent_name, query, accumulated_output, task_assignment, session_id, i+1
+                    agent_id, agent_name, query, handoff_context, task_assignment, session_id, i+1
                 )
                 
                 if handoff_result.get('success'):
@@ -664,12 +818,14 @@ A2A_HANDOFF_DETAILS: [specific details for A2A handoff including context and ins
                     
                     # Step 4b: Agent > Orchestrator (Context Refinement)
                     if i < len(selected_agents) - 1:  # Not the last agent
-                        context_refinement = self.refine_context_for_next_agent(
+                        # The next agent's model loads while the orchestrator refines its context
+                        start_warm_up(session_id, self.warm_agent, selected_agents[i+1]['agent_id'], selected_agents[i+1]['agent_name'])
+                        refined_context = self.refine_context_for_next_agent(
                             query, accumulated_output, selected_agents[i+1]['task_assignment'], 
-                            selected_agents[i+1]['agent_name']
+                            selected_agents[i+1]['agent_name'], session_id
                         )
-                        accumulated_output += f"\n[Context Refined: {context_refinement}]"
-                        logger.info(f"[{session_id}] Context refined for next agent: {context_refinement}")
+                        if refined_context:
+                            logger.info(f"[{session_id}] Context refined for next agent: {refined_context}")
                 
                 else:
                     execution_results.append({
@@ -685,7 +841,7 @@ A2A_HANDOFF_DETAILS: [specific details for A2A handoff including context and ins
                     })
             
             # Step 4c: Final Orchestrator Synthesis
-            final_response = self.synthesize_final_response(query, execution_results, accumulated_output)
+            final_response = self.synthesize_final_response(query, execution_results, accumulated_output, session_id)
             
             return {
                 "success": True,
@@ -693,7 +849,8 @@ A2A_HANDOFF_DETAILS: [specific details for A2A handoff including context and ins
                 "total_agents_executed": len(execution_results),
                 "execution_results": execution_results,
                 "accumulated_output": accumulated_output,
-                "final_response": final_response
+                "final_response": final_response,
+                "orchestration_overhead": overhead_tracker.get_session(session_id)
             }
             
         except Exception as e:
@@ -778,8 +935,45 @@ Please continue with this task using the provided context."""
                 "handoff_message": handoff_message
             }
     
-    def refine_context_for_next_agent(self, original_query: str, accumulated_output: str, next_task: str, next_agent_name: str) -> str:
-        """Refine context for the next agent using LLM orchestrator"""
+    def resolve_sdk_agent_id(self, agent_id: str, agent_name: str) -> Optional[str]:
+        """Strands SDK id of a registry agent: the same id, or else the SDK agent with the same name"""
+        with self._sdk_agents_lock:
+            fetched_at, sdk_agents = self._sdk_agents
+            if time.time() - fetched_at > SDK_AGENTS_TTL:
+                response = requests.get(f"{STRANDS_SDK_URL}/api/strands-sdk/agents", timeout=10)
+                response.raise_for_status()
+                sdk_agents = response.json().get('agents', [])
+                self._sdk_agents = (time.time(), sdk_agents)
+        by_id = next((a for a in sdk_agents if a.get('id') == agent_id), None)
+        if by_id is not None:
+            return by_id['id']
+        name = (agent_name or '').strip().lower()
+        by_name = next((a for a in sdk_agents if (a.get('name') or '').strip().lower() == name), None)
+        return by_name['id'] if by_name is not None else None
+    
+    def warm_agent(self, agent_id: str, agent_name: str) -> Dict[str, Any]:
+        """Load an agent's model and system prompt on the Strands SDK service ahead of its handoff"""
+        sdk_agent_id = self.resolve_sdk_agent_id(agent_id, agent_name)
+        if sdk_agent_id is None:
+            raise LookupError(f"no Strands SDK agent matches registry agent {agent_name} ({agent_id})")
+        response = requests.post(f"{STRANDS_SDK_URL}/api/strands-sdk/agents/{sdk_agent_id}/warm", timeout=120)
+        response.raise_for_status()
+        return response.json()
+    
+    def refine_context_for_next_agent(self, original_query: str, accumulated_output: str, next_task: str, next_agent_name: str,
+                                      session_id: Optional[str] = None) -> str:
+        """
+        Condensed context for the next agent, or "" to hand over the accumulated output unchanged.
+        Short contexts are passed on as is, medium ones condensed without the LLM.
+        """
+        policy = choose_policy(accumulated_output)
+        if policy == POLICY_NONE:
+            overhead_tracker.record_skip(session_id, "context_refinement", policy)
+            return ""
+        if policy == POLICY_EXTRACTIVE:
+            overhead_tracker.record_skip(session_id, "context_refinement", policy)
+            return extractive_refine(original_query, accumulated_output, next_task)
+        
         try:
             prompt = f"""
 You are an expert orchestrator. Refine the context for the next agent in the sequence.
@@ -798,32 +992,26 @@ Create a refined context that:
 Provide the refined context with comprehensive reasoning.
 """
             
-            response = requests.post(
-                f"{OLLAMA_BASE_URL}/api/generate",
-                json={
-                    "model": ORCHESTRATOR_MODEL,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.3,
-                        "top_p": 0.9,
-                        "max_tokens": 150
-                    }
+            result = ollama_client.generate(
+                ORCHESTRATOR_MODEL, prompt,
+                options={
+                    "temperature": 0.3,
+                    "top_p": 0.9,
+                    "max_tokens": 150
                 },
                 timeout=60
             )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("response", "").strip()
-            else:
-                return f"Context refinement failed for {next_agent_name}"
+            overhead_tracker.record_call(session_id, "context_refinement", result)
+            return result.get("response", "").strip()
                 
         except Exception as e:
-            logger.error(f"Context refinement error: {e}")
-            return f"Context refinement failed for {next_agent_name}"
+            overhead_tracker.record_call(session_id, "context_refinement", failed=True)
+            logger.error(f"Context refinement error for {next_agent_name}: {e}")
+            # The next agent gets the unrefined context
+            return ""
     
-    def synthesize_final_response(self, query: str, execution_results: List[Dict], accumulated_output: str) -> str:
+    def synthesize_final_response(self, query: str, execution_results: List[Dict], accumulated_output: str,
+                                  session_id: Optional[str] = None) -> str:
         """Synthesize final response from all agent results"""
         try:
             # Collect successful agent responses
@@ -832,6 +1020,12 @@ Provide the refined context with comprehensive reasoning.
             if not successful_responses:
                 return "I apologize, but none of the agents were able to complete the task successfully."
             
+            # A single agent result needs no synthesis call
+            policy = choose_synthesis_policy(len(successful_responses))
+            if policy != POLICY_LLM:
+                overhead_tracker.record_skip(session_id, "final_synthesis", policy)
+                return combine_responses([(r['agent_name'], r.get('agent_response', '')) for r in successful_responses])
+            
             # Create synthesis prompt
             synthesis_prompt = f"""
 You are a response synthesizer. Create a final response based on the user query and agent results.
@@ -853,28 +1047,20 @@ Create a comprehensive final response that:
 Provide a polished, final response.
 """
             
-            response = requests.post(
-                f"{OLLAMA_BASE_URL}/api/generate",
-                json={
-                    "model": ORCHESTRATOR_MODEL,
-                    "prompt": synthesis_prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.3,
-                        "top_p": 0.9,
-                        "max_tokens": 500
-                    }
+            result = ollama_client.generate(
+                ORCHESTRATOR_MODEL, synthesis_prompt,
+                options={
+                    "temperature": 0.3,
+                    "top_p": 0.9,
+                    "max_tokens": 500
                 },
                 timeout=60
             )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("response", "Final response synthesis failed").strip()
-            else:
-                return "Final response synthesis failed"
+            overhead_tracker.record_call(session_id, "final_synthesis", result)
+            return result.get("response", "Final response synthesis failed").strip()
                 
         except Exception as e:
+            overhead_tracker.record_call(session_id, "final_synthesis", failed=True)
             logger.error(f"Final synthesis error: {e}")
             return "Final response synthesis failed"
     
@@ -1041,6 +1227,19 @@ def get_sessions():
             "error": str(e)
         }), 500
 
+@app.route('/api/bidirectional-a2a/overhead', methods=['GET'])
+def get_orchestration_overhead():
+    """LLM calls and tokens spent by the orchestrator between agents, per session or overall"""
+    try:
+        session_id = request.args.get('session_id')
+        if session_id:
+            return jsonify(overhead_tracker.get_session(session_id))
+        return jsonify(overhead_tracker.get_stats())
+    except Exception as e:
+        return jsonify({
+            "error": str(e)
+        }), 500
+
 @app.route('/api/bidirectional-a2a/sessions/<session_id>', methods=['DELETE'])
 def cleanup_session(session_id):
     """Cleanup a specific session"""
@@ -19,6 +19,9 @@ import sqlite3
 import threading
 from dataclasses import dataclass, asdict
 import logging
+from ollama_client import get_ollama_client
+from agent_capability_index import route as route_by_capability
+from db_helper import get_db_manager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -31,6 +34,9 @@ CORS(app)
 OLLAMA_BASE_URL = "http://localhost:11434"
 STRANDS_API_URL = "http://localhost:5004"
 DATABASE_PATH = "chat_orchestrator.db"
+ollama_client = get_ollama_client()
+# Every message touches the database several times; reuse one connection per thread
+db_manager = get_db_manager()
 
 # ============================================================================
 # Data Models
@@ -126,11 +132,8 @@ class OllamaClient:
     def get_models():
         """Get available Ollama models"""
         try:
-            response = requests.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=30)
-            if response.status_code == 200:
-                data = response.json()
-                return [{"name": model["name"], "size": model["size"]} for model in data.get("models", [])]
-            return []
+            data = ollama_client.get_json("/api/tags", host=OLLAMA_BASE_URL, timeout=30)
+            return [{"name": model["name"], "size": model["size"]} for model in data.get("models", [])]
         except Exception as e:
             logger.error(f"Failed to get Ollama models: {e}")
             return []
@@ -161,18 +164,14 @@ class OllamaClient:
                 }
             }
             
-            response = requests.post(f"{OLLAMA_BASE_URL}/api/generate", json=payload, timeout=30)
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    "content": data.get("response", ""),
-                    "model": model,
-                    "tokens_used": data.get("eval_count", 0),
-                    "generation_time": data.get("total_duration", 0) / 1000000000  # Convert to seconds
-                }
-            else:
-                logger.error(f"Ollama API error: {response.status_code}")
-                return None
+            data = ollama_client.post_json("/api/generate", payload, host=OLLAMA_BASE_URL, timeout=30)
+            return {
+                "content": data.get("response", ""),
+                "model": model,
+                "tokens_used": data.get("eval_count", 0),
+                "generation_time": data.get("total_duration", 0) / 1000000000,  # Convert to seconds
+                "metrics": data["_metrics"]
+            }
         except Exception as e:
             logger.error(f"Failed to generate Ollama response: {e}")
             return None
@@ -262,28 +261,17 @@ class ChatOrchestrator:
         """Create a new chat session"""
         session_id = str(uuid.uuid4())
         
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        db_manager.execute_update(DATABASE_PATH, '''
             INSERT INTO chat_sessions (id, chat_type, config)
             VALUES (?, ?, ?)
         ''', (session_id, chat_config["type"], json.dumps(chat_config)))
         
-        conn.commit()
-        conn.close()
-        
         logger.info(f"✅ Created chat session: {session_id} (type: {chat_config['type']})")
         return session_id
     
     def get_session(self, session_id: str) -> Optional[ChatSession]:
         """Get chat session by ID"""
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM chat_sessions WHERE id = ?', (session_id,))
-        row = cursor.fetchone()
-        conn.close()
+        row = db_manager.query_one(DATABASE_PATH, 'SELECT * FROM chat_sessions WHERE id = ?', (session_id,))
         
         if row:
             return ChatSession(
@@ -333,12 +321,27 @@ class ChatOrchestrator:
         # Check if we should route to an agent
         available_agents = self._get_available_agents()
         if available_agents:
-            routing = self.agent_router.analyze_query(user_message, available_agents)
-            
-            # If high confidence routing to specific agent
-            if routing.agent_id and routing.confidence > 0.7:
-                logger.info(f"🎯 Routing to agent {routing.agent_id} (confidence: {routing.confidence})")
+            # Capability index first: a clear winner skips the LLM router, and when no agent is even
+            # close the router call is skipped entirely
+            decision = route_by_capability(user_message, k=3, agents=available_agents, catalogue="strands")
+            if not decision["needs_planner"]:
+                top = decision["matches"][0]
+                routing = AgentRoute(
+                    agent_id=top["agent_id"],
+                    confidence=top["similarity"],
+                    reasoning=f"Capability index: '{top['name']}' is the closest agent (similarity {top['similarity']}, {decision['backend']})",
+                    tools_needed=[]
+                )
+                logger.info(f"🎯 Routing to agent {routing.agent_id} via capability index ({decision['duration_ms']}ms)")
                 return self._execute_agent_routing(session, routing, user_message, message_id)
+            
+            if not decision["no_match"]:
+                routing = self.agent_router.analyze_query(user_message, available_agents)
+                
+                # If high confidence routing to specific agent
+                if routing.agent_id and routing.confidence > 0.7:
+                    logger.info(f"🎯 Routing to agent {routing.agent_id} (confidence: {routing.confidence})")
+                    return self._execute_agent_routing(session, routing, user_message, message_id)
         
         # Generate direct LLM response
         response = self.ollama_client.generate_response(
@@ -509,18 +512,12 @@ Capabilities: {', '.join(config.get('capabilities', []))}
     
     def _get_conversation_history(self, session_id: str, limit: int = 10) -> List[Dict]:
         """Get recent conversation history"""
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        rows = db_manager.execute_query(DATABASE_PATH, '''
             SELECT role, content FROM chat_messages 
             WHERE session_id = ? AND role != 'system'
             ORDER BY timestamp DESC LIMIT ?
         ''', (session_id, limit * 2))  # *2 to account for user/assistant pairs
         
-        rows = cursor.fetchall()
-        conn.close()
-        
         # Reverse to get chronological order
         messages = []
         for role, content in reversed(rows):
@@ -550,35 +547,24 @@ Capabilities: {', '.join(config.get('capabilities', []))}
     
     def _store_message(self, session_id: str, message_id: str, role: str, content: str, metadata: Dict = None):
         """Store message in database"""
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO chat_messages (id, session_id, role, content, metadata)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (message_id, session_id, role, content, json.dumps(metadata) if metadata else None))
-        
-        # Update session last activity
-        cursor.execute('''
-            UPDATE chat_sessions SET last_activity = CURRENT_TIMESTAMP WHERE id = ?
-        ''', (session_id,))
-        
-        conn.commit()
-        conn.close()
+        with db_manager.transaction(DATABASE_PATH) as cursor:
+            cursor.execute('''
+                INSERT INTO chat_messages (id, session_id, role, content, metadata)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (message_id, session_id, role, content, json.dumps(metadata) if metadata else None))
+        
+            # Update session last activity
+            cursor.execute('''
+                UPDATE chat_sessions SET last_activity = CURRENT_TIMESTAMP WHERE id = ?
+            ''', (session_id,))
     
     def _store_routing(self, session_id: str, message_id: str, routing: AgentRoute):
         """Store agent routing decision"""
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        db_manager.execute_update(DATABASE_PATH, '''
             INSERT INTO agent_routes (id, session_id, message_id, agent_id, confidence, reasoning, tools_used)
             VALUES (?, ?, ?, ?, ?, ?, ?)
         ''', (str(uuid.uuid4()), session_id, message_id, routing.agent_id, 
               routing.confidence, routing.reasoning, json.dumps(routing.tools_needed)))
-        
-        conn.commit()
-        conn.close()
 
 # ============================================================================
 # API Endpoints
@@ -603,6 +589,11 @@ def get_models():
     models = OllamaClient.get_models()
     return jsonify({"models": models})
 
+@app.route('/api/chat/ollama/metrics', methods=['GET'])
+def get_ollama_metrics():
+    """Per-call Ollama metrics: queue wait, TTFT and tokens/s"""
+    return jsonify(ollama_client.get_metrics(recent=request.args.get('recent', 20, type=int)))
+
 @app.route('/api/chat/agents', methods=['GET'])
 def get_agents():
     """Get available agents from palette"""
@@ -684,17 +675,14 @@ def get_session_info(session_id):
 def list_sessions():
     """List all chat sessions"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        rows = db_manager.execute_query(DATABASE_PATH, '''
             SELECT id, chat_type, created_at, last_activity, status 
             FROM chat_sessions 
             ORDER BY last_activity DESC
         ''')
         
         sessions = []
-        for row in cursor.fetchall():
+        for row in rows:
             sessions.append({
                 "session_id": row[0],
                 "chat_type": row[1],
@@ -703,7 +691,6 @@ def list_sessions():
                 "status": row[4]
             })
         
-        conn.close()
         return jsonify({"sessions": sessions})
     except Exception as e:
         logger.error(f"Failed to list sessions: {e}")
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Context Refinement Policy
+Decides how the orchestrators hand context from one agent to the next: short contexts are passed
+on unchanged, medium ones are condensed extractively, and only long ones cost an LLM call. The
+next agent's model can be warmed up while refinement runs, and every LLM call the orchestrator
+makes between agents is counted per session so orchestration overhead can be measured on its own.
+"""
+
+import concurrent.futures
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+POLICY_AUTO = "auto"
+POLICY_NONE = "none"
+POLICY_EXTRACTIVE = "extractive"
+POLICY_LLM = "llm"
+POLICIES = (POLICY_AUTO, POLICY_NONE, POLICY_EXTRACTIVE, POLICY_LLM)
+
+# auto picks by context length; the other policies force one strategy for every handoff
+REFINEMENT_POLICY = os.environ.get("CONTEXT_REFINEMENT_POLICY", POLICY_AUTO).lower()
+# auto: contexts up to this many characters are handed over unchanged
+PASSTHROUGH_MAX_CHARS = 1500
+# auto: contexts up to this many characters are condensed extractively, longer ones by the LLM
+EXTRACTIVE_MAX_CHARS = 6000
+# Length an extractive refinement is cut down to
+EXTRACTIVE_TARGET_CHARS = 1200
+
+# Background model warm-ups running at the same time
+WARM_UP_WORKERS = 2
+# Sessions whose overhead is kept for reporting
+MAX_TRACKED_SESSIONS = 500
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "for", "from", "how", "i", "in", "is",
+    "it", "me", "my", "of", "on", "or", "please", "the", "this", "to", "what", "with", "you", "your"
+}
+
+warm_up_executor = concurrent.futures.ThreadPoolExecutor(max_workers=WARM_UP_WORKERS, thread_name_prefix='model-warm-up')
+
+def resolve_policy(policy: Optional[str] = None) -> str:
+    policy = (policy or REFINEMENT_POLICY).lower()
+    if policy not in POLICIES:
+        logger.warning(f"⚠️ Unknown context refinement policy '{policy}', using '{POLICY_AUTO}'")
+        return POLICY_AUTO
+    return policy
+
+def choose_policy(context: str, policy: Optional[str] = None) -> str:
+    """Refinement strategy for one handoff: none, extractive or llm"""
+    policy = resolve_policy(policy)
+    if policy != POLICY_AUTO:
+        return policy
+    if len(context) <= PASSTHROUGH_MAX_CHARS:
+        return POLICY_NONE
+    if len(context) <= EXTRACTIVE_MAX_CHARS:
+        return POLICY_EXTRACTIVE
+    return POLICY_LLM
+
+def choose_synthesis_policy(response_count: int, policy: Optional[str] = None) -> str:
+    """A single agent answer is returned as is; several are merged by the LLM unless a cheaper policy is forced"""
+    if response_count <= 1:
+        return POLICY_NONE
+    policy = resolve_policy(policy)
+    return policy if policy in (POLICY_NONE, POLICY_EXTRACTIVE) else POLICY_LLM
+
+def _words(text: str) -> set:
+    return {w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS}
+
+def extractive_refine(original_query: str, context: str, next_task: str, target_chars: int = EXTRACTIVE_TARGET_CHARS) -> str:
+    """
+    Condense the context without a model call: keep the sentences sharing most words with the
+    query and the next task (later sentences win ties), in their original order.
+    """
+    sentences = [s.strip() for s in _SENTENCE.split(context) if s and s.strip()]
+    focus = _words(f"{original_query} {next_task}")
+    scored = []
+    for position, sentence in enumerate(sentences):
+        overlap = len(_words(sentence) & focus)
+        scored.append((overlap + position / max(len(sentences), 1), position, sentence))
+
+    kept, used = [], 0
+    for _, position, sentence in sorted(scored, reverse=True):
+        if used + len(sentence) > target_chars and kept:
+            continue
+        kept.append((position, sentence[:target_chars]))
+        used += len(sentence) + 1
+    summary = " ".join(sentence for _, sentence in sorted(kept))
+    return f"Building on previous work: {summary} Next: {next_task}"
+
+def combine_responses(responses: List[Tuple[str, str]]) -> str:
+    """Final answer without a synthesis call: the agent answers, one paragraph each"""
+    if len(responses) == 1:
+        return responses[0][1]
+    return "\n\n".join(f"**{name}**: {text}" for name, text in responses)
+
+class OverheadTracker:
+    """LLM calls, tokens and skipped calls the orchestrators spend between agents, per session"""
+
+    def __init__(self, max_sessions: int = MAX_TRACKED_SESSIONS):
+        self.max_sessions = max_sessions
+        self.sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _session(self, session_id: str) -> Dict[str, Any]:
+        """Caller holds the lock"""
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = self.sessions[session_id] = {
+                "llm_calls": 0, "failed_calls": 0, "skipped_calls": 0, "warm_ups": 0,
+                "prompt_tokens": 0, "eval_tokens": 0, "llm_time_ms": 0.0,
+                "by_purpose": {}, "policies": {}, "started_at": time.time()
+            }
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+        self.sessions.move_to_end(session_id)
+        return session
+
+    @staticmethod
+    def _purpose(session: Dict[str, Any], purpose: str) -> Dict[str, Any]:
+        return session["by_purpose"].setdefault(purpose, {"llm_calls": 0, "skipped_calls": 0, "prompt_tokens": 0, "eval_tokens": 0})
+
+    def record_call(self, session_id: Optional[str], purpose: str, result: Optional[Dict[str, Any]] = None,
+                    failed: bool = False) -> None:
+        """One orchestrator LLM call; token counts come from Ollama's response"""
+        if not session_id:
+            return
+        result = result or {}
+        prompt_tokens = result.get("prompt_eval_count", 0) or 0
+        eval_tokens = result.get("eval_count", 0) or 0
+        with self._lock:
+            session = self._session(session_id)
+            by_purpose = self._purpose(session, purpose)
+            session["llm_calls"] += 1
+            session["failed_calls"] += 1 if failed else 0
+            session["prompt_tokens"] += prompt_tokens
+            session["eval_tokens"] += eval_tokens
+            session["llm_time_ms"] += (result.get("_metrics") or {}).get("total_ms", 0.0)
+            by_purpose["llm_calls"] += 1
+            by_purpose["prompt_tokens"] += prompt_tokens
+            by_purpose["eval_tokens"] += eval_tokens
+            session["policies"][f"{purpose}:{POLICY_LLM}"] = session["policies"].get(f"{purpose}:{POLICY_LLM}", 0) + 1
+
+    def record_skip(self, session_id: Optional[str], purpose: str, policy: str) -> None:
+        """An LLM call the policy made unnecessary"""
+        if not session_id:
+            return
+        with self._lock:
+            session = self._session(session_id)
+            session["skipped_calls"] += 1
+            self._purpose(session, purpose)["skipped_calls"] += 1
+            session["policies"][f"{purpose}:{policy}"] = session["policies"].get(f"{purpose}:{policy}", 0) + 1
+
+    def record_warm_up(self, session_id: Optional[str]) -> None:
+        if not session_id:
+            return
+        with self._lock:
+            self._session(session_id)["warm_ups"] += 1
+
+    def get_session(self, session_id: str) -> Dict[str, Any]:
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return {"session_id": session_id, "llm_calls": 0, "skipped_calls": 0, "total_tokens": 0}
+            return {
+                "session_id": session_id,
+                **{key: value for key, value in session.items() if key not in ("by_purpose", "policies")},
+                "llm_time_ms": round(session["llm_time_ms"], 1),
+                "total_tokens": session["prompt_tokens"] + session["eval_tokens"],
+                "by_purpose": {purpose: dict(counts) for purpose, counts in session["by_purpose"].items()},
+                "policies": dict(session["policies"])
+            }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sessions = list(self.sessions.values())
+        llm_calls = sum(s["llm_calls"] for s in sessions)
+        skipped = sum(s["skipped_calls"] for s in sessions)
+        total_tokens = sum(s["prompt_tokens"] + s["eval_tokens"] for s in sessions)
+        return {
+            "policy": resolve_policy(),
+            "passthrough_max_chars": PASSTHROUGH_MAX_CHARS,
+            "extractive_max_chars": EXTRACTIVE_MAX_CHARS,
+            "sessions": len(sessions),
+            "llm_calls": llm_calls,
+            "skipped_calls": skipped,
+            "warm_ups": sum(s["warm_ups"] for s in sessions),
+            "total_tokens": total_tokens,
+            "avg_llm_calls_per_session": round(llm_calls / len(sessions), 2) if sessions else 0.0,
+            "avg_tokens_per_session": round(total_tokens / len(sessions), 1) if sessions else 0.0,
+            "skip_rate": round(skipped / (llm_calls + skipped), 3) if llm_calls + skipped else 0.0
+        }
+
+# Global tracker shared by the orchestrators in this process
+overhead_tracker = OverheadTracker()
+
+def get_overhead_tracker() -> OverheadTracker:
+    return overhead_tracker
+
+def start_warm_up(session_id: Optional[str], warm: Callable[..., Any], *args) -> concurrent.futures.Future:
+    """Run warm(*args) in the background, e.g. to load the next agent's model while its context is refined"""
+    def run():
+        try:
+            result = warm(*args)
+            overhead_tracker.record_warm_up(session_id)
+            return result
+        except Exception as e:
+            logger.warning(f"⚠️ Model warm-up failed: {e}")
+            return None
+    return warm_up_executor.submit(run)
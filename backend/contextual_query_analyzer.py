@@ -14,26 +14,52 @@ import logging
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+from plan_cache import PlanCache, get_plan_cache
+
 logger = logging.getLogger(__name__)
 
 class ContextualQueryAnalyzer:
     """Step-by-step contextual query analyzer for intelligent orchestration"""
     
-    def __init__(self, ollama_base_url: str = "http://localhost:11434", model: str = "qwen3:1.7b"):
+    def __init__(self, ollama_base_url: str = "http://localhost:11434", model: str = "qwen3:1.7b",
+                 plan_cache: Optional[PlanCache] = None):
         self.ollama_base_url = ollama_base_url
         self.model = model
+        self.plan_cache = plan_cache or get_plan_cache()
     
-    def analyze_query_contextually(self, query: str, available_agents: List[Dict] = None) -> Dict:
+    def analyze_query_contextually(self, query: str, available_agents: List[Dict] = None, use_cache: bool = True,
+                                   similarity_threshold: Optional[float] = None) -> Dict:
         """
         Perform comprehensive contextual analysis of the query
         
         Args:
             query: User's input query
             available_agents: List of available agents (optional for context)
+            use_cache: Serve repeated (or near-duplicate) queries for the same agents from the plan cache
+            similarity_threshold: Also serve near-duplicate queries at this similarity (exact matches only when None)
             
         Returns:
             Dict containing detailed analysis results
         """
+        if not use_cache:
+            return self._analyze(query, available_agents)
+        return self.plan_cache.get_or_plan(
+            f"contextual:{self.model}", query, available_agents,
+            lambda: self._analyze(query, available_agents),
+            cache_if=self._is_complete, threshold=similarity_threshold,
+            semantic=similarity_threshold is not None
+        )
+    
+    @staticmethod
+    def _is_complete(analysis: Dict) -> bool:
+        """Only analyses where every LLM step succeeded are worth caching"""
+        if not analysis.get("success"):
+            return False
+        steps = [value for key, value in analysis.items() if key.startswith("step_") and value is not None]
+        return not any(isinstance(step, dict) and "error" in step for step in steps)
+    
+    def _analyze(self, query: str, available_agents: List[Dict] = None) -> Dict:
+        """The uncached five-step analysis"""
         try:
             logger.info(f"Starting contextual analysis for query: {query[:50]}...")
             
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+DAG Plan Executor
+Runs orchestration plans as dependency graphs: every step whose dependencies have completed is
+started on a bounded shared pool, so independent branches run concurrently and a plan takes its
+critical-path time instead of the sum of its steps. Outputs flow along the edges to dependent
+steps; steps get their own timeout and retries, and a run can be cancelled or given a deadline.
+"""
+
+import concurrent.futures
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Worker threads shared by every plan in this process
+PLAN_EXECUTOR_WORKERS = 8
+# Steps of one plan allowed to run at the same time
+DEFAULT_MAX_PARALLEL = 4
+DEFAULT_STEP_TIMEOUT = 120
+DEFAULT_STEP_RETRIES = 0
+# Wait before retry n is RETRY_BACKOFF_SECONDS * 2 ** (n - 1)
+RETRY_BACKOFF_SECONDS = 1.0
+# How often the scheduler wakes up to check timeouts and cancellation
+POLL_INTERVAL = 0.1
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+STATUS_TIMED_OUT = "timed_out"
+STATUS_SKIPPED = "skipped"
+STATUS_CANCELLED = "cancelled"
+
+plan_executor = concurrent.futures.ThreadPoolExecutor(max_workers=PLAN_EXECUTOR_WORKERS, thread_name_prefix='plan-step')
+
+class PlanError(ValueError):
+    """The plan is not a valid DAG (unknown dependency, duplicate step or cycle)"""
+
+class StepFailed(Exception):
+    """Raised by a step to fail without losing its (partial) output"""
+
+    def __init__(self, message: str, output: Any = None):
+        super().__init__(message)
+        self.output = output
+
+class PlanStep:
+    """
+    One node of a plan. run(inputs) receives {dependency step id: output} for its direct
+    dependencies and returns this step's output; raising (or StepFailed) fails the attempt.
+    """
+
+    def __init__(self, step_id: Any, run: Callable[[Dict[Any, Any]], Any], depends_on: Optional[List[Any]] = None,
+                 timeout: float = DEFAULT_STEP_TIMEOUT, retries: int = DEFAULT_STEP_RETRIES,
+                 name: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None):
+        self.step_id = step_id
+        self.run = run
+        self.depends_on = list(dict.fromkeys(depends_on or []))
+        self.timeout = timeout
+        self.retries = retries
+        self.name = name or str(step_id)
+        self.metadata = metadata or {}
+
+def validate_plan(steps: List[PlanStep]) -> List[Any]:
+    """Topological order of the step ids; raises PlanError for invalid plans"""
+    by_id: Dict[Any, PlanStep] = {}
+    for step in steps:
+        if step.step_id in by_id:
+            raise PlanError(f"Duplicate step id: {step.step_id}")
+        by_id[step.step_id] = step
+    for step in steps:
+        for dependency in step.depends_on:
+            if dependency not in by_id:
+                raise PlanError(f"Step {step.step_id} depends on unknown step {dependency}")
+            if dependency == step.step_id:
+                raise PlanError(f"Step {step.step_id} depends on itself")
+
+    remaining = {step.step_id: len(step.depends_on) for step in steps}
+    dependents: Dict[Any, List[Any]] = {step.step_id: [] for step in steps}
+    for step in steps:
+        for dependency in step.depends_on:
+            dependents[dependency].append(step.step_id)
+    ready = [step.step_id for step in steps if not step.depends_on]
+    order = []
+    while ready:
+        step_id = ready.pop(0)
+        order.append(step_id)
+        for dependent in dependents[step_id]:
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                ready.append(dependent)
+    if len(order) != len(steps):
+        cycle = sorted(str(step_id) for step_id, count in remaining.items() if count > 0)
+        raise PlanError(f"Plan has a dependency cycle through steps: {', '.join(cycle)}")
+    return order
+
+def _attempt(step: PlanStep, inputs: Dict[Any, Any], delay: float, clock: Dict[str, float]) -> Any:
+    if delay:
+        time.sleep(delay)
+    # The step's timeout runs from here: time spent queued for a worker does not count
+    clock["started"] = time.monotonic()
+    return step.run(inputs)
+
+class PlanRun:
+    """Handle for one execution; cancel() stops scheduling and abandons running steps"""
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+def execute_plan(steps: List[PlanStep], max_parallel: int = DEFAULT_MAX_PARALLEL, timeout: Optional[float] = None,
+                 run: Optional[PlanRun] = None, fail_fast: bool = False,
+                 on_event: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Execute a plan. Dependents of a failed step are skipped; with fail_fast every step still
+    pending is cancelled instead. Returns per-step results (in topological order) with total,
+    critical-path and summed step times.
+    """
+    order = validate_plan(steps)
+    by_id = {step.step_id: step for step in steps}
+    run = run or PlanRun()
+    deadline = time.monotonic() + timeout if timeout else None
+    started = time.perf_counter()
+
+    state: Dict[Any, Dict[str, Any]] = {
+        step_id: {"status": STATUS_PENDING, "attempts": 0, "output": None, "error": None,
+                  "started": None, "finished": None}
+        for step_id in order
+    }
+    running: Dict[concurrent.futures.Future, Any] = {}
+    attempt_clocks: Dict[Any, Dict[str, float]] = {}
+    # Timed-out attempts whose thread is still busy: step id -> (future, timed out at, retry delay).
+    # The retry waits for the old attempt so one step never runs twice at the same time.
+    abandoned: Dict[Any, Any] = {}
+
+    def emit(event_type: str, step_id: Any, **extra):
+        if on_event:
+            try:
+                on_event({"type": event_type, "step": step_id, "name": by_id[step_id].name, **extra})
+            except Exception as e:
+                logger.warning(f"⚠️ Plan event handler failed: {e}")
+
+    def submit(step_id: Any, delay: float = 0.0):
+        step = by_id[step_id]
+        entry = state[step_id]
+        entry["attempts"] += 1
+        entry["status"] = STATUS_RUNNING
+        if entry["started"] is None:
+            entry["started"] = time.perf_counter() - started
+        inputs = {dependency: state[dependency]["output"] for dependency in step.depends_on}
+        attempt_clocks[step_id] = {}
+        future = plan_executor.submit(_attempt, step, inputs, delay, attempt_clocks[step_id])
+        running[future] = step_id
+        emit("step_start", step_id, attempt=entry["attempts"])
+
+    def finish(step_id: Any, status: str, error: Optional[str] = None, output: Any = None):
+        entry = state[step_id]
+        entry.update({"status": status, "error": error, "finished": time.perf_counter() - started})
+        if output is not None:
+            entry["output"] = output
+        emit("step_end", step_id, status=status, error=error)
+
+    def fail_or_retry(step_id: Any, status: str, error: str, output: Any = None,
+                      previous: Optional[concurrent.futures.Future] = None):
+        step = by_id[step_id]
+        if state[step_id]["attempts"] <= step.retries and not run.cancelled.is_set():
+            logger.warning(f"⚠️ Plan step {step.name} {status} ({error}), retrying")
+            delay = RETRY_BACKOFF_SECONDS * 2 ** (state[step_id]["attempts"] - 1)
+            if previous is not None and not previous.done():
+                abandoned[step_id] = (previous, time.monotonic(), delay)
+            else:
+                submit(step_id, delay)
+        else:
+            logger.warning(f"⚠️ Plan step {step.name} {status}: {error}")
+            finish(step_id, status, error, output)
+            if fail_fast:
+                run.cancel()
+
+    def schedule_ready():
+        for step_id in order:
+            if state[step_id]["status"] != STATUS_PENDING:
+                continue
+            dependency_states = [state[dependency]["status"] for dependency in by_id[step_id].depends_on]
+            if any(s in (STATUS_FAILED, STATUS_TIMED_OUT, STATUS_SKIPPED, STATUS_CANCELLED) for s in dependency_states):
+                finish(step_id, STATUS_SKIPPED, "A dependency did not complete")
+            elif all(s == STATUS_COMPLETED for s in dependency_states) and len(running) + len(abandoned) < max_parallel:
+                submit(step_id)
+
+    schedule_ready()
+    while running or abandoned or any(entry["status"] == STATUS_PENDING for entry in state.values()):
+        if deadline is not None and time.monotonic() > deadline and not run.cancelled.is_set():
+            logger.warning(f"⚠️ Plan deadline of {timeout}s exceeded, cancelling remaining steps")
+            run.cancel()
+        if run.cancelled.is_set():
+            for future, step_id in list(running.items()):
+                future.cancel()
+                finish(step_id, STATUS_CANCELLED, "Plan cancelled")
+            running.clear()
+            for step_id in list(abandoned):
+                finish(step_id, STATUS_CANCELLED, "Plan cancelled")
+            abandoned.clear()
+            for step_id, entry in state.items():
+                if entry["status"] == STATUS_PENDING:
+                    finish(step_id, STATUS_CANCELLED, "Plan cancelled")
+            break
+
+        if not running and not abandoned:
+            # Nothing running and nothing can start: only skipped steps remain
+            schedule_ready()
+            if not running:
+                break
+
+        done, _ = concurrent.futures.wait(list(running) + [future for future, _, _ in abandoned.values()],
+                                          timeout=POLL_INTERVAL, return_when=concurrent.futures.FIRST_COMPLETED)
+        done = [future for future in done if future in running]
+        for future in done:
+            step_id = running.pop(future)
+            try:
+                finish(step_id, STATUS_COMPLETED, output=future.result())
+            except StepFailed as e:
+                fail_or_retry(step_id, STATUS_FAILED, str(e), e.output)
+            except Exception as e:
+                fail_or_retry(step_id, STATUS_FAILED, str(e) or type(e).__name__)
+
+        now = time.monotonic()
+        for future, step_id in list(running.items()):
+            attempt_started = attempt_clocks[step_id].get("started")
+            if attempt_started is not None and now - attempt_started > by_id[step_id].timeout:
+                # The worker thread cannot be interrupted; its late result is ignored
+                running.pop(future)
+                fail_or_retry(step_id, STATUS_TIMED_OUT, f"Step timed out after {by_id[step_id].timeout}s", previous=future)
+
+        for step_id, (future, timed_out_at, delay) in list(abandoned.items()):
+            if future.done():
+                del abandoned[step_id]
+                submit(step_id, delay)
+            elif now - timed_out_at > by_id[step_id].timeout:
+                # The old attempt is hung: give up rather than run the step a second time next to it
+                del abandoned[step_id]
+                logger.warning(f"⚠️ Plan step {by_id[step_id].name} still running after its timeout, not retrying")
+                finish(step_id, STATUS_TIMED_OUT, f"Step timed out after {by_id[step_id].timeout}s")
+                if fail_fast:
+                    run.cancel()
+        schedule_ready()
+
+    total_time = time.perf_counter() - started
+    results = []
+    for step_id in order:
+        entry = state[step_id]
+        duration = (entry["finished"] - entry["started"]) if entry["started"] is not None and entry["finished"] is not None else 0.0
+        results.append({
+            "step": step_id,
+            "name": by_id[step_id].name,
+            "depends_on": by_id[step_id].depends_on,
+            "status": entry["status"],
+            "output": entry["output"],
+            "error": entry["error"],
+            "attempts": entry["attempts"],
+            "started_at": round(entry["started"], 3) if entry["started"] is not None else None,
+            "duration": round(duration, 3),
+            "metadata": by_id[step_id].metadata
+        })
+
+    # Longest chain of step durations through the graph: the best time any schedule could reach
+    durations = {result["step"]: result["duration"] for result in results}
+    path_time: Dict[Any, float] = {}
+    path_prev: Dict[Any, Any] = {}
+    for step_id in order:
+        best = max(by_id[step_id].depends_on, key=lambda d: path_time[d], default=None)
+        path_time[step_id] = durations[step_id] + (path_time[best] if best is not None else 0.0)
+        path_prev[step_id] = best
+    critical_path = []
+    cursor = max(order, key=lambda s: path_time[s], default=None)
+    while cursor is not None:
+        critical_path.append(cursor)
+        cursor = path_prev[cursor]
+    critical_path.reverse()
+
+    sum_of_steps = sum(durations.values())
+    return {
+        "success": all(result["status"] == STATUS_COMPLETED for result in results),
+        "cancelled": run.cancelled.is_set(),
+        "results": results,
+        "steps_completed": sum(1 for result in results if result["status"] == STATUS_COMPLETED),
+        "total_steps": len(results),
+        "total_time": round(total_time, 3),
+        "critical_path": critical_path,
+        "critical_path_time": round(path_time[critical_path[-1]], 3) if critical_path else 0.0,
+        "sum_of_steps_time": round(sum_of_steps, 3),
+        "parallel_speedup": round(sum_of_steps / total_time, 2) if total_time > 0 else 1.0
+    }
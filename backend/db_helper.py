@@ -1,63 +1,155 @@
 #!/usr/bin/env python3
 """
 Optimized Database Helper
-Provides context managers and connection pooling for better resource management
+Shared SQLite access layer: one persistent connection per (thread, database) configured for WAL,
+with prepared-statement caching, plus context-managed connections and transactions
 """
 
 import sqlite3
 import threading
 from contextlib import contextmanager
-from typing import Optional, Any, Dict
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+DEFAULT_BUSY_TIMEOUT_MS = 5000
+# Prepared statements kept per connection (sqlite3 caches them by SQL text)
+DEFAULT_CACHED_STATEMENTS = 256
+# Memory-map up to 256 MB of the database file
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+# Page cache per connection; negative values are KiB, so this is 32 MB
+DEFAULT_CACHE_SIZE_KIB = 32 * 1024
+
+# Header bytes 18-19 (file format write/read versions) are 2 once a database file is in WAL mode
+WAL_HEADER_VERSIONS = b"\x02\x02"
+
+def _is_wal_file(db_path: Optional[str]) -> bool:
+    """True if db_path is a database file already switched to WAL (the mode is stored in the file)"""
+    if not db_path or db_path == ":memory:":
+        return False
+    try:
+        with open(db_path, "rb") as f:
+            return f.read(20)[18:20] == WAL_HEADER_VERSIONS
+    except OSError:
+        return False
+
+def configure_connection(conn: sqlite3.Connection, db_path: Optional[str] = None) -> sqlite3.Connection:
+    """Apply the pragmas every long-lived connection in the backend uses"""
+    # Switching to WAL needs a lock on the database, so it is only done while the file is not in WAL yet
+    if not _is_wal_file(db_path):
+        conn.execute("PRAGMA journal_mode=WAL")
+    # In WAL mode NORMAL only risks the last commits on power loss, never corruption
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={DEFAULT_BUSY_TIMEOUT_MS}")
+    conn.execute(f"PRAGMA mmap_size={DEFAULT_MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size=-{DEFAULT_CACHE_SIZE_KIB}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+def open_connection(db_path: str, row_factory: Any = sqlite3.Row) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=DEFAULT_BUSY_TIMEOUT_MS / 1000,
+                           cached_statements=DEFAULT_CACHED_STATEMENTS)
+    conn.row_factory = row_factory
+    return configure_connection(conn, db_path)
 
 class DatabaseManager:
-    """Thread-safe database manager with connection pooling"""
+    """Thread-safe database manager with persistent per-thread connections"""
     
     def __init__(self):
         self._connections = threading.local()
         self._lock = threading.Lock()
+        self.opened = 0
+        self.reused = 0
+
+    def connection(self, db_path: str) -> sqlite3.Connection:
+        """This thread's connection to db_path, opened and configured on first use (never close it)"""
+        connections = getattr(self._connections, "by_path", None)
+        if connections is None:
+            connections = self._connections.by_path = {}
+        conn = connections.get(db_path)
+        if conn is not None:
+            try:
+                conn.total_changes  # raises if someone closed it
+                self.reused += 1
+                return conn
+            except sqlite3.ProgrammingError:
+                pass
+        conn = connections[db_path] = open_connection(db_path)
+        with self._lock:
+            self.opened += 1
+        return conn
     
     @contextmanager
-    def get_connection(self, db_path: str):
-        """Get a database connection with proper cleanup"""
-        conn = None
+    def get_connection(self, db_path: str) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow this thread's connection; uncommitted work is rolled back on the way out, as a close would.
+        A transaction that was already open when the connection was borrowed (e.g. a read inside
+        transaction()) belongs to its owner and is left alone.
+        """
+        conn = self.connection(db_path)
+        owner_open = conn.in_transaction
         try:
-            conn = sqlite3.connect(db_path, timeout=30.0)
-            conn.row_factory = sqlite3.Row  # Enable dict-like access
             yield conn
-        except Exception as e:
-            if conn:
-                conn.rollback()
-            raise e
         finally:
-            if conn:
-                conn.close()
+            if conn.in_transaction and not owner_open:
+                conn.rollback()
     
-    def execute_query(self, db_path: str, query: str, params: tuple = ()) -> list:
+    @contextmanager
+    def transaction(self, db_path: str, immediate: bool = True) -> Iterator[sqlite3.Cursor]:
+        """
+        Run a block atomically: commit on success, roll back on error. IMMEDIATE takes the write lock
+        up front so concurrent writers queue on busy_timeout instead of failing mid-transaction.
+        Nested use joins the outer transaction.
+        """
+        conn = self.connection(db_path)
+        if conn.in_transaction:
+            yield conn.cursor()
+            return
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn.cursor()
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+
+    def execute_query(self, db_path: str, query: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
         """Execute a SELECT query safely"""
         with self.get_connection(db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            return cursor.fetchall()
-    
-    def execute_update(self, db_path: str, query: str, params: tuple = ()) -> int:
-        """Execute an INSERT/UPDATE/DELETE query safely"""
+            return conn.execute(query, params).fetchall()
+
+    def query_one(self, db_path: str, query: str, params: Sequence[Any] = ()) -> Optional[sqlite3.Row]:
+        """Execute a SELECT query and return its first row (or None)"""
         with self.get_connection(db_path) as conn:
-            cursor = conn.cursor()
+            return conn.execute(query, params).fetchone()
+
+    def execute_update(self, db_path: str, query: str, params: Sequence[Any] = ()) -> int:
+        """Execute an INSERT/UPDATE/DELETE query safely"""
+        with self.transaction(db_path) as cursor:
             cursor.execute(query, params)
-            conn.commit()
             return cursor.rowcount
     
     def execute_batch(self, db_path: str, query: str, params_list: list) -> int:
         """Execute multiple queries in a batch for better performance"""
-        with self.get_connection(db_path) as conn:
-            cursor = conn.cursor()
+        with self.transaction(db_path) as cursor:
             cursor.executemany(query, params_list)
-            conn.commit()
             return cursor.rowcount
 
+    def close_thread_connections(self) -> None:
+        """Close this thread's connections (e.g. before a worker thread exits)"""
+        connections = getattr(self._connections, "by_path", {})
+        for conn in connections.values():
+            conn.close()
+        connections.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"connections_opened": self.opened, "connection_reuses": self.reused}
+
 # Global instance
 db_manager = DatabaseManager()
 
+def get_db_manager() -> DatabaseManager:
+    return db_manager
+
 # Convenience functions
 def safe_query(db_path: str, query: str, params: tuple = ()) -> list:
     """Execute a safe SELECT query"""
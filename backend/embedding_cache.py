@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Persistent Embedding Cache
+Wraps an embeddings model so identical chunk text is only embedded once per model. Chunk vectors
+are persisted; query vectors are kept in a bounded in-memory LRU, since questions rarely repeat
+across restarts and would otherwise grow the cache without bound.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import logging
+from array import array
+from collections import OrderedDict
+from typing import List, Dict, Any
+
+try:
+    from langchain_core.embeddings import Embeddings
+except ImportError:
+    Embeddings = object
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_DB = "rag_embedding_cache.db"
+# Query vectors kept in memory before the least recently used one is evicted
+MAX_CACHED_QUERIES = 1024
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper backed by a SQLite table keyed by (model, kind, text hash)"""
+
+    def __init__(self, embeddings: Any, db_path: str = EMBEDDING_CACHE_DB, model_name: str = None,
+                 max_cached_queries: int = MAX_CACHED_QUERIES):
+        self.embeddings = embeddings
+        self.db_path = db_path
+        self.model_name = model_name or getattr(embeddings, "model_name", None) or type(embeddings).__name__
+        self.hits = 0
+        self.misses = 0
+        self.max_cached_queries = max_cached_queries
+        self._queries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                model TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                dimensions INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (model, kind, text_hash)
+            )
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def _hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _lookup(self, kind: str, hashes: List[str]) -> Dict[str, List[float]]:
+        """Fetch cached vectors for the given text hashes"""
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ",".join("?" for _ in batch)
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embedding_cache WHERE model = ? AND kind = ? AND text_hash IN ({placeholders})",
+                    (self.model_name, kind, *batch)
+                ).fetchall()
+                for text_hash, blob in rows:
+                    found[text_hash] = array("f", blob).tolist()
+        return found
+
+    def _store(self, kind: str, items: List[tuple]) -> None:
+        """Persist (text_hash, vector) pairs"""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (model, kind, text_hash, dimensions, vector) VALUES (?, ?, ?, ?, ?)",
+                [(self.model_name, kind, text_hash, len(vector), array("f", vector).tobytes()) for text_hash, vector in items]
+            )
+            self._conn.commit()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed chunks, only sending texts that are not already cached to the model"""
+        hashes = [self._hash(text) for text in texts]
+        cached = self._lookup("passage", hashes)
+
+        missing = {}
+        for text, text_hash in zip(texts, hashes):
+            if text_hash not in cached and text_hash not in missing:
+                missing[text_hash] = text
+
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            new_items = list(zip(missing.keys(), vectors))
+            self._store("passage", new_items)
+            cached.update({text_hash: list(vector) for text_hash, vector in new_items})
+
+        logger.info(f"🧠 Embedding cache: {len(texts) - len(missing)} hits, {len(missing)} embedded ({self.model_name})")
+        return [cached[text_hash] for text_hash in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query, reusing the vector for repeated questions while it stays in the LRU"""
+        text_hash = self._hash(text)
+        with self._lock:
+            vector = self._queries.get(text_hash)
+            if vector is not None:
+                self._queries.move_to_end(text_hash)
+                self.hits += 1
+                return list(vector)
+
+        self.misses += 1
+        vector = list(self.embeddings.embed_query(text))
+        with self._lock:
+            self._queries[text_hash] = vector
+            self._queries.move_to_end(text_hash)
+            while len(self._queries) > self.max_cached_queries:
+                self._queries.popitem(last=False)
+        return list(vector)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache hit/miss statistics"""
+        with self._lock:
+            entries = self._conn.execute(
+                "SELECT COUNT(*) FROM embedding_cache WHERE model = ?", (self.model_name,)
+            ).fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "model": self.model_name,
+            "entries": entries,
+            "cached_queries": len(self._queries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
@@ -623,10 +623,9 @@ Provide a polished, final response that the user will receive. Do not include an
                 session.execution_result = execution_results
                 
             elif execution_strategy == 'parallel' and len(selected_agents) > 1:
-                # Parallel execution (future implementation)
-                logger.info(f"[{session.session_id}] Stage 4: Parallel execution (not yet implemented)")
-                # For now, fall back to sequential
-                execution_results = execute_sequential_a2a_handover(selected_agents, available_agents, query, session.session_id)
+                # Parallel fan-out through the Strands SDK batch endpoint
+                logger.info(f"[{session.session_id}] Stage 4: Parallel batch execution")
+                execution_results = execute_parallel_batch(selected_agents, available_agents, query, session.session_id)
                 session.execution_result = execution_results
                 
             else:
@@ -661,6 +660,8 @@ Provide a polished, final response that the user will receive. Do not include an
             if execution_strategy.lower() == 'sequential' and len(selected_agents) > 1:
                 # Handle sequential execution results
                 final_response = self.synthesize_sequential_response(query, analysis, execution_results, selected_agents)
+            elif execution_strategy == 'parallel' and len(selected_agents) > 1:
+                final_response = self.synthesize_parallel_response(query, execution_results)
             else:
                 # Handle single agent execution results
                 if 'execution_result' in locals():
@@ -675,7 +676,7 @@ Provide a polished, final response that the user will receive. Do not include an
             
             # Prepare comprehensive response with detailed reasoning
             execution_success = False
-            if execution_strategy.lower() == 'sequential' and len(selected_agents) > 1:
+            if execution_strategy.lower() in ('sequential', 'parallel') and len(selected_agents) > 1:
                 execution_success = execution_results.get('success', False)
             elif 'execution_result' in locals():
                 execution_success = execution_result.get('success', False)
@@ -818,6 +819,24 @@ Provide a polished, final response that the user will receive. Do not include an
             logger.error(f"Error synthesizing sequential response: {e}")
             return f"Sequential response synthesis failed: {str(e)}"
     
+    def synthesize_parallel_response(self, query: str, execution_results: Dict) -> str:
+        """Combine the answers of agents that ran concurrently on the same query"""
+        if not execution_results.get("success"):
+            return f"Parallel execution failed: {execution_results.get('error', 'Unknown error')}"
+        
+        response_parts = [
+            "🤖 **Multi-Agent Orchestration Complete**",
+            "**Strategy**: Parallel",
+            f"**Agents Coordinated**: {execution_results.get('agents_coordinated', 0)}",
+            ""
+        ]
+        for agent_result in execution_results.get("agent_results", []):
+            response_parts.append(f"**{agent_result['agent_name']}:**")
+            response_parts.append(agent_result["response"] if agent_result["success"] else f"❌ {agent_result['error']}")
+            response_parts.append("")
+        response_parts.append(f"⏱️ Total execution time: {execution_results.get('execution_time', 0):.2f} seconds")
+        return "\n".join(response_parts)
+    
     def _cleanup_worker(self):
         """Background worker for automatic session cleanup"""
         while True:
@@ -947,6 +966,48 @@ def execute_sequential_a2a_handover(selected_agents: List[Dict], available_agent
             "session_id": session_id
         }
 
+def execute_parallel_batch(selected_agents: List[Dict], available_agents: List[Dict], query: str, session_id: str) -> Dict[str, Any]:
+    """Run the selected agents concurrently with one call to the Strands SDK execute-batch endpoint"""
+    try:
+        agents = []
+        for selected in selected_agents:
+            agent = next((a for a in available_agents if a['name'] == selected.get('agent_name')), None)
+            if agent:
+                agents.append(agent)
+        if not agents:
+            return {"success": False, "error": "Selected agents not found", "session_id": session_id}
+        
+        start_time = time.time()
+        response = requests.post(
+            f"{STRANDS_SDK_URL}/api/strands-sdk/agents/execute-batch",
+            json={"executions": [{"agent_id": agent['id'], "input": query} for agent in agents], "stream": False},
+            timeout=180
+        )
+        if response.status_code != 200:
+            return {"success": False, "error": f"Batch execution failed: {response.status_code}", "session_id": session_id}
+        
+        batch = response.json()
+        agent_results = [{
+            "agent_id": item['agent_id'],
+            "agent_name": agents[item['index']]['name'],
+            "success": item['success'],
+            "response": item['result'].get('response', ''),
+            "error": item['result'].get('error')
+        } for item in batch.get('results', [])]
+        
+        logger.info(f"[{session_id}] Parallel batch finished: {batch.get('succeeded', 0)}/{batch.get('total', 0)} succeeded")
+        return {
+            "success": batch.get('succeeded', 0) > 0,
+            "orchestration_type": "parallel_batch",
+            "agents_coordinated": len(agents),
+            "agent_results": agent_results,
+            "execution_time": time.time() - start_time,
+            "session_id": session_id
+        }
+    except Exception as e:
+        logger.error(f"Error in parallel batch execution: {e}")
+        return {"success": False, "error": str(e), "session_id": session_id}
+
 @app.route('/api/enhanced-orchestration/sessions', methods=['GET'])
 def get_sessions():
     """Get active sessions info"""
@@ -974,6 +1035,17 @@ def cleanup_session(session_id):
     else:
         return jsonify({"success": False, "error": "Session not found"}), 404
 
+@app.route('/api/enhanced-orchestration/plan-cache', methods=['GET'])
+def get_plan_cache_stats():
+    """Hit rates of the planner result cache"""
+    return jsonify(orchestrator.orchestrator_6stage.plan_cache.get_stats())
+
+@app.route('/api/enhanced-orchestration/plan-cache', methods=['DELETE'])
+def clear_plan_cache():
+    """Drop cached plans, e.g. after changing planner prompts"""
+    dropped = orchestrator.orchestrator_6stage.plan_cache.invalidate()
+    return jsonify({"success": True, "dropped": dropped})
+
 if __name__ == '__main__':
     logger.info("🚀 Starting Enhanced LLM Orchestration API...")
     logger.info("📍 Port: 5014")
@@ -15,17 +15,38 @@ import requests
 import logging
 from typing import Dict, List, Any, Optional
 
+from plan_cache import PlanCache, get_plan_cache
+
 logger = logging.getLogger(__name__)
 
 class Enhanced6StageOrchestrator:
     """Advanced 6-Stage Orchestrator LLM for intelligent multi-agent coordination"""
     
-    def __init__(self, ollama_base_url: str = "http://localhost:11434", orchestrator_model: str = "qwen3:1.7b"):
+    def __init__(self, ollama_base_url: str = "http://localhost:11434", orchestrator_model: str = "qwen3:1.7b",
+                 plan_cache: Optional[PlanCache] = None):
         self.ollama_base_url = ollama_base_url
         self.orchestrator_model = orchestrator_model
+        self.plan_cache = plan_cache or get_plan_cache()
+    
+    def analyze_query_with_6stage_orchestrator(self, query: str, available_agents: List[Dict], use_cache: bool = True,
+                                               similarity_threshold: Optional[float] = None) -> Dict:
+        """
+        Comprehensive 6-Stage Orchestrator LLM Analysis, served from the plan cache for repeated queries.
+        The analysis embeds query-specific task assignments, so only exact repeats are reused unless
+        similarity_threshold opts in to near-duplicate matches.
+        """
+        if not use_cache:
+            return self._analyze_with_6stage_orchestrator(query, available_agents)
+        return self.plan_cache.get_or_plan(
+            f"6stage:{self.orchestrator_model}", query, available_agents,
+            lambda: self._analyze_with_6stage_orchestrator(query, available_agents),
+            # Keyword fallbacks are not cached so the LLM gets another chance next time
+            cache_if=lambda analysis: not analysis.get('analysis_fallback'),
+            threshold=similarity_threshold, semantic=similarity_threshold is not None
+        )
     
-    def analyze_query_with_6stage_orchestrator(self, query: str, available_agents: List[Dict]) -> Dict:
-        """Comprehensive 6-Stage Orchestrator LLM Analysis"""
+    def _analyze_with_6stage_orchestrator(self, query: str, available_agents: List[Dict]) -> Dict:
+        """The uncached 6-stage LLM analysis"""
         try:
             # Prepare comprehensive agent metadata for LLM analysis
             agent_summary = []
@@ -350,7 +371,9 @@ JSON response:
             logger.error(f"Error processing 6-stage analysis: {e}")
             logger.error(f"Analysis data: {analysis}")
             logger.error(f"Agent summary: {agent_summary}")
-            return self._fallback_6stage_analysis(query, agent_summary)
+            fallback = self._fallback_6stage_analysis(query, agent_summary)
+            fallback['analysis_fallback'] = True
+            return fallback
     
     def _fallback_6stage_analysis(self, query: str, agent_summary: List[Dict]) -> Dict:
         """Fallback analysis when 6-stage orchestrator fails"""
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Strands SDK Execution Log Store
+Normalized execution log: scalar fields live in columns of strands_sdk_executions, tool calls in
+strands_sdk_tool_invocations and the operations log in strands_sdk_operation_steps. Rows are
+append-only and group-committed by the database's write-behind logger, off the request path.
+
+Usage:
+    python execution_log_store.py migrate
+    python execution_log_store.py migrate --db strands_sdk_agents.db
+"""
+
+import argparse
+import json
+import sqlite3
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from agent_analytics_rollups import record_execution, tool_timings
+from write_behind import get_write_behind_logger
+
+DEFAULT_DB = "strands_sdk_agents.db"
+# Legacy rows converted per transaction by the migration
+MIGRATION_BATCH_SIZE = 500
+
+def _utc_timestamp() -> str:
+    """Same format and clock as SQLite's CURRENT_TIMESTAMP"""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+def init_execution_log_tables(cursor) -> None:
+    """Add the structured columns and child tables; safe to call on every start"""
+    cursor.execute("PRAGMA table_info(strands_sdk_executions)")
+    existing = {column[1] for column in cursor.fetchall()}
+    for column, definition in (("input_length", "INTEGER"), ("output_length", "INTEGER"),
+                               ("tools_available", "TEXT"), ("normalized", "BOOLEAN DEFAULT 0")):
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE strands_sdk_executions ADD COLUMN {column} {definition}")
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS strands_sdk_tool_invocations (
+            execution_id TEXT NOT NULL,
+            position INTEGER NOT NULL, -- order within the execution
+            agent_id TEXT NOT NULL,
+            tool TEXT NOT NULL,
+            success BOOLEAN,
+            tool_input TEXT,
+            tool_output TEXT,
+            duration_ms REAL, -- NULL when the tool was detected rather than timed
+            timestamp TIMESTAMP,
+            PRIMARY KEY (execution_id, position)
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_strands_sdk_tool_invocations_agent_timestamp
+        ON strands_sdk_tool_invocations (agent_id, timestamp DESC)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_strands_sdk_tool_invocations_agent_tool
+        ON strands_sdk_tool_invocations (agent_id, tool)
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS strands_sdk_operation_steps (
+            execution_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            step TEXT NOT NULL,
+            details TEXT,
+            timestamp TEXT,
+            tool_name TEXT, -- set for steps that ran a tool
+            invocation_position INTEGER, -- position of that call in strands_sdk_tool_invocations
+            PRIMARY KEY (execution_id, position)
+        )
+    ''')
+    cursor.execute("PRAGMA table_info(strands_sdk_operation_steps)")
+    if "invocation_position" not in {column[1] for column in cursor.fetchall()}:
+        cursor.execute("ALTER TABLE strands_sdk_operation_steps ADD COLUMN invocation_position INTEGER")
+
+def build_execution_record(execution_id: str, agent_id: str, input_text: str, output_text: Optional[str],
+                           execution_time: Optional[float], success: bool, metadata: Optional[Dict[str, Any]],
+                           error_message: Optional[str] = None, timestamp: Optional[str] = None) -> Dict[str, Any]:
+    """Split an execution and its metadata dict into column values and child rows"""
+    metadata = dict(metadata or {})
+    exec_metadata = dict(metadata.pop("execution_metadata", None) or {})
+    tools_used = list(exec_metadata.pop("tools_used", None) or [])
+    tools_available = list(exec_metadata.pop("tools_available", None) or [])
+    operations = list(exec_metadata.pop("operations_log", None) or [])
+    input_length = exec_metadata.pop("input_length", None)
+    output_length = exec_metadata.pop("output_length", None)
+    if exec_metadata:
+        metadata["execution_metadata"] = exec_metadata
+    timestamp = timestamp or _utc_timestamp()
+
+    # The n-th call of a tool pairs with its n-th tool step (a tool may be called several times)
+    tool_steps: Dict[str, List[Dict[str, Any]]] = {}
+    for op in operations:
+        if isinstance(op, dict) and op.get("tool_name"):
+            tool_steps.setdefault(op["tool_name"], []).append(op)
+    invocations = []
+    invocation_positions: Dict[int, int] = {}
+    for position, tool in enumerate(tools_used):
+        steps_for_tool = tool_steps.get(tool)
+        op = steps_for_tool.pop(0) if steps_for_tool else {}
+        if op:
+            invocation_positions[id(op)] = position
+        invocations.append((
+            execution_id, position, agent_id, tool, bool(op.get("success", success)),
+            None if op.get("tool_input") is None else str(op.get("tool_input")),
+            None if op.get("tool_output") is None else str(op.get("tool_output")),
+            op.get("duration_ms"), timestamp
+        ))
+    steps = [
+        (execution_id, position, op.get("step", ""), op.get("details"), op.get("timestamp"), op.get("tool_name"),
+         invocation_positions.get(id(op)))
+        for position, op in enumerate(operations) if isinstance(op, dict)
+    ]
+
+    return {
+        "id": execution_id,
+        "agent_id": agent_id,
+        "input_text": input_text,
+        "output_text": output_text,
+        "execution_time": execution_time,
+        "success": bool(success),
+        "error_message": error_message,
+        "timestamp": timestamp,
+        "sdk_metadata": json.dumps(metadata) if metadata else None,
+        "input_length": input_length if input_length is not None else len(input_text or ""),
+        "output_length": output_length if output_length is not None else len(output_text or ""),
+        "tools_available": ",".join(tools_available),
+        "tools_used": tools_used,
+        "invocations": invocations,
+        "steps": steps
+    }
+
+def write_records(cursor, records: List[Dict[str, Any]]) -> None:
+    """Append execution records, their child rows and their rollup deltas (caller commits)"""
+    cursor.executemany('''
+        INSERT INTO strands_sdk_executions
+        (id, agent_id, input_text, output_text, execution_time, success, error_message, timestamp,
+         sdk_metadata, input_length, output_length, tools_available, normalized)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+    ''', [(r["id"], r["agent_id"], r["input_text"], r["output_text"], r["execution_time"], r["success"],
+           r["error_message"], r["timestamp"], r["sdk_metadata"], r["input_length"], r["output_length"],
+           r["tools_available"]) for r in records])
+    cursor.executemany('''
+        INSERT INTO strands_sdk_tool_invocations
+        (execution_id, position, agent_id, tool, success, tool_input, tool_output, duration_ms, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [invocation for r in records for invocation in r["invocations"]])
+    cursor.executemany('''
+        INSERT INTO strands_sdk_operation_steps (execution_id, position, step, details, timestamp, tool_name, invocation_position)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', [step for r in records for step in r["steps"]])
+    for r in records:
+        timings = tool_timings(r["tools_used"], [invocation[7] for invocation in r["invocations"]], r["execution_time"])
+        record_execution(cursor, r["agent_id"], r["success"], r["execution_time"], r["tools_used"], timings,
+                         r["input_length"] + r["output_length"], r["timestamp"])
+
+def migrate_legacy_executions(conn: sqlite3.Connection) -> int:
+    """Move tools, timings and operations out of old sdk_metadata blobs; returns rows converted"""
+    cursor = conn.cursor()
+    init_execution_log_tables(cursor)
+    conn.commit()
+
+    converted = 0
+    while True:
+        cursor.execute('''
+            SELECT id, agent_id, input_text, output_text, execution_time, success, error_message, timestamp, sdk_metadata
+            FROM strands_sdk_executions WHERE normalized = 0 OR normalized IS NULL LIMIT ?
+        ''', (MIGRATION_BATCH_SIZE,))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        for execution_id, agent_id, input_text, output_text, execution_time, success, error_message, timestamp, blob in rows:
+            try:
+                metadata = json.loads(blob) if blob else {}
+            except (json.JSONDecodeError, TypeError):
+                metadata = {}
+            if not isinstance(metadata, dict):
+                metadata = {}
+            record = build_execution_record(execution_id, agent_id, input_text, output_text, execution_time,
+                                            success, metadata, error_message, timestamp)
+            cursor.executemany('''
+                INSERT OR IGNORE INTO strands_sdk_tool_invocations
+                (execution_id, position, agent_id, tool, success, tool_input, tool_output, duration_ms, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', record["invocations"])
+            cursor.executemany('''
+                INSERT OR IGNORE INTO strands_sdk_operation_steps
+                (execution_id, position, step, details, timestamp, tool_name, invocation_position)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', record["steps"])
+            cursor.execute('''
+                UPDATE strands_sdk_executions
+                SET sdk_metadata = ?, input_length = ?, output_length = ?, tools_available = ?, normalized = 1
+                WHERE id = ?
+            ''', (record["sdk_metadata"], record["input_length"], record["output_length"],
+                  record["tools_available"], execution_id))
+        conn.commit()
+        converted += len(rows)
+    return converted
+
+def read_tool_traces(cursor, agent_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """Newest executions with their tools and operation steps, read by index range"""
+    cursor.execute('''
+        SELECT id, input_text, output_text, execution_time, success, timestamp, tools_available
+        FROM strands_sdk_executions WHERE agent_id = ? ORDER BY timestamp DESC LIMIT ?
+    ''', (agent_id, limit))
+    executions = cursor.fetchall()
+    if not executions:
+        return []
+
+    placeholders = ",".join("?" * len(executions))
+    execution_ids = [execution[0] for execution in executions]
+    tools_used: Dict[str, List[str]] = {}
+    # Invocations per execution by position; a tool may be called several times in one execution
+    invocations: Dict[str, Dict[int, Dict[str, Any]]] = {}
+    cursor.execute(f'''
+        SELECT execution_id, position, tool, tool_input, tool_output, duration_ms FROM strands_sdk_tool_invocations
+        WHERE execution_id IN ({placeholders}) ORDER BY execution_id, position
+    ''', execution_ids)
+    for execution_id, position, tool, tool_input, tool_output, duration_ms in cursor.fetchall():
+        tools_used.setdefault(execution_id, []).append(tool)
+        invocations.setdefault(execution_id, {})[position] = {
+            "tool": tool, "tool_input": tool_input, "tool_output": tool_output, "duration_ms": duration_ms
+        }
+    steps: Dict[str, List[Dict[str, Any]]] = {}
+    # Steps written before invocation_position existed pair with the n-th unclaimed call of their tool
+    unclaimed: Dict[str, Dict[str, List[int]]] = {}
+    for execution_id, calls in invocations.items():
+        for position, call in calls.items():
+            unclaimed.setdefault(execution_id, {}).setdefault(call["tool"], []).append(position)
+    cursor.execute(f'''
+        SELECT execution_id, step, details, timestamp, tool_name, invocation_position FROM strands_sdk_operation_steps
+        WHERE execution_id IN ({placeholders}) ORDER BY execution_id, position
+    ''', execution_ids)
+    rows = cursor.fetchall()
+    for execution_id, _, _, _, tool_name, invocation_position in rows:
+        if invocation_position is not None and invocation_position in unclaimed.get(execution_id, {}).get(tool_name, []):
+            unclaimed[execution_id][tool_name].remove(invocation_position)
+    for execution_id, step, details, timestamp, tool_name, invocation_position in rows:
+        operation = {"step": step, "details": details, "timestamp": timestamp}
+        if tool_name:
+            if invocation_position is None:
+                remaining = unclaimed.get(execution_id, {}).get(tool_name)
+                invocation_position = remaining.pop(0) if remaining else None
+            call = invocations.get(execution_id, {}).get(invocation_position, {})
+            operation.update({"tool_name": tool_name, **{key: value for key, value in call.items() if key != "tool"}})
+        steps.setdefault(execution_id, []).append(operation)
+
+    traces = []
+    for execution_id, input_text, output_text, execution_time, success, timestamp, tools_available in executions:
+        traces.append({
+            "execution_id": execution_id,
+            "timestamp": timestamp,
+            "input_text": input_text,
+            "output_text": output_text[:500] + "..." if output_text and len(output_text) > 500 else output_text,
+            "execution_time": execution_time,
+            "success": success,
+            "tool_info": {
+                "tools_used": tools_used.get(execution_id, []),
+                "tools_available": tools_available.split(",") if tools_available else [],
+                "operations_log": steps.get(execution_id, [])
+            }
+        })
+    return traces
+
+def recent_tool_sequences(cursor, agent_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """Tool sequences of the agent's newest executions that used tools"""
+    cursor.execute('''
+        SELECT e.id, e.execution_time, e.timestamp, e.success
+        FROM strands_sdk_executions e
+        WHERE e.id IN (
+            SELECT DISTINCT execution_id FROM strands_sdk_tool_invocations
+            WHERE agent_id = ? ORDER BY timestamp DESC LIMIT ?
+        )
+        ORDER BY e.timestamp DESC
+    ''', (agent_id, limit))
+    executions = cursor.fetchall()
+    if not executions:
+        return []
+    placeholders = ",".join("?" * len(executions))
+    cursor.execute(f'''
+        SELECT execution_id, tool FROM strands_sdk_tool_invocations
+        WHERE execution_id IN ({placeholders}) ORDER BY execution_id, position
+    ''', [execution[0] for execution in executions])
+    sequences: Dict[str, List[str]] = {}
+    for execution_id, tool in cursor.fetchall():
+        sequences.setdefault(execution_id, []).append(tool)
+    return [{
+        "sequence": sequences.get(execution_id, []),
+        "timestamp": timestamp,
+        "execution_time": execution_time,
+        "success": success
+    } for execution_id, execution_time, timestamp, success in executions]
+
+def delete_agent_executions(cursor, agent_id: str) -> None:
+    cursor.execute('''
+        DELETE FROM strands_sdk_operation_steps
+        WHERE execution_id IN (SELECT id FROM strands_sdk_executions WHERE agent_id = ?)
+    ''', (agent_id,))
+    cursor.execute('DELETE FROM strands_sdk_tool_invocations WHERE agent_id = ?', (agent_id,))
+    cursor.execute('DELETE FROM strands_sdk_executions WHERE agent_id = ?', (agent_id,))
+
+class ExecutionLogWriter:
+    """Append-only execution log on top of the database's write-behind logger"""
+
+    def __init__(self, db_path: str, **logger_options):
+        self.db_path = db_path
+        self.writer = get_write_behind_logger(db_path, **logger_options)
+
+    def append(self, record: Dict[str, Any]) -> bool:
+        # Records queued back to back reach write_records together and share one commit
+        return self.writer.submit("strands_sdk_execution_records", write_records, record)
+
+    def log(self, *args, **kwargs) -> str:
+        """build_execution_record + append; returns the execution id"""
+        record = build_execution_record(*args, **kwargs)
+        self.append(record)
+        return record["id"]
+
+    def flush(self) -> None:
+        """Block until every queued record has been committed"""
+        self.writer.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.writer.get_stats()
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the Strands SDK execution log")
+    parser.add_argument("command", choices=["migrate"], help="migrate: convert sdk_metadata blobs to structured rows")
+    parser.add_argument("--db", default=DEFAULT_DB, help="Strands SDK SQLite database")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        converted = migrate_legacy_executions(conn)
+    finally:
+        conn.close()
+    print(f"🗂️ Migrated {converted} executions to the structured log in {args.db}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Hybrid Retrieval Helpers
+BM25 lexical index, reciprocal-rank fusion, optional cross-encoder re-ranking
+and token-budgeted context packing for the RAG service
+"""
+
+import re
+import sqlite3
+import threading
+import logging
+from typing import Any, Dict, List, Optional
+
+try:
+    from fastembed.rerank.cross_encoder import TextCrossEncoder
+    CROSS_ENCODER_AVAILABLE = True
+except ImportError:
+    CROSS_ENCODER_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Standard RRF damping constant (Cormack et al.)
+RRF_K = 60
+DEFAULT_CROSS_ENCODER = "Xenova/ms-marco-MiniLM-L-6-v2"
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token)"""
+    return max(1, len(text) // 4)
+
+def build_fts_query(query: str) -> str:
+    """Turn a free-text question into an FTS5 OR-query of its terms"""
+    terms = [word for word in re.findall(r"\w+", query.lower()) if len(word) > 2]  # Skip very short words
+    return " OR ".join(f'"{term}"' for term in dict.fromkeys(terms))
+
+class LexicalIndex:
+    """SQLite FTS5 index over chunk text, ranked with BM25"""
+
+    def __init__(self, db_path: str = ":memory:"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30.0, check_same_thread=False)
+        self._conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+                content,
+                chunk_id UNINDEXED,
+                document_id UNINDEXED,
+                page UNINDEXED,
+                tokenize = 'porter unicode61'
+            )
+        """)
+        self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks_fts").fetchone()[0]
+
+    def add_chunks(self, chunks: List[Dict[str, Any]]) -> None:
+        """Index chunks given as dicts with chunk_id, document_id, content and optional page"""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO chunks_fts (content, chunk_id, document_id, page) VALUES (?, ?, ?, ?)",
+                [(chunk["content"], chunk["chunk_id"], chunk["document_id"], chunk.get("page")) for chunk in chunks]
+            )
+            self._conn.commit()
+
+    def delete_document(self, document_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks_fts WHERE document_id = ?", (document_id,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks_fts")
+            self._conn.commit()
+
+    def search(self, query: str, k: int = 10, document_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Top-k chunks by BM25, optionally restricted to some documents"""
+        fts_query = build_fts_query(query)
+        if not fts_query:
+            return []
+
+        sql = """
+            SELECT chunk_id, document_id, content, page, bm25(chunks_fts) AS rank
+            FROM chunks_fts
+            WHERE chunks_fts MATCH ?
+        """
+        params: List[Any] = [fts_query]
+        if document_ids:
+            sql += f" AND document_id IN ({','.join('?' for _ in document_ids)})"
+            params.extend(document_ids)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(k)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [{
+            "chunk_id": chunk_id,
+            "document_id": document_id,
+            "content": content,
+            "metadata": {"page": page},
+            "lexical_score": -rank  # bm25() is lower-is-better
+        } for chunk_id, document_id, content, page, rank in rows]
+
+def reciprocal_rank_fusion(result_lists: List[List[Dict[str, Any]]], k: int = RRF_K) -> List[Dict[str, Any]]:
+    """
+    Fuse ranked result lists by summing 1 / (k + rank) per chunk_id.
+    Per-list fields (e.g. vector_score, lexical_score) are merged onto the fused entry.
+    """
+    fused: Dict[str, Dict[str, Any]] = {}
+    for results in result_lists:
+        for rank, result in enumerate(results, start=1):
+            entry = fused.setdefault(result["chunk_id"], {**result, "rrf_score": 0.0})
+            entry.update({key: value for key, value in result.items() if key not in entry})
+            entry["rrf_score"] += 1.0 / (k + rank)
+    return sorted(fused.values(), key=lambda entry: entry["rrf_score"], reverse=True)
+
+class CrossEncoderReranker:
+    """Re-scores (query, chunk) pairs with a FastEmbed cross-encoder, loaded on first use"""
+
+    def __init__(self, model_name: str = DEFAULT_CROSS_ENCODER):
+        self.model_name = model_name
+        self._model = None
+
+    @property
+    def available(self) -> bool:
+        return CROSS_ENCODER_AVAILABLE
+
+    def rerank(self, query: str, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not results:
+            return results
+        if self._model is None:
+            logger.info(f"🔁 Loading cross-encoder: {self.model_name}")
+            self._model = TextCrossEncoder(model_name=self.model_name)
+
+        scores = list(self._model.rerank(query, [result["content"] for result in results]))
+        for result, score in zip(results, scores):
+            result["rerank_score"] = float(score)
+        return sorted(results, key=lambda result: result["rerank_score"], reverse=True)
+
+def pack_chunks(results: List[Dict[str, Any]], max_tokens: int, max_chunks: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Keep results in rank order until the token budget (or chunk limit) is used up"""
+    packed = []
+    used = 0
+    for result in results:
+        tokens = estimate_tokens(result["content"])
+        if packed and used + tokens > max_tokens:
+            continue
+        packed.append(result)
+        used += tokens
+        if max_chunks and len(packed) >= max_chunks:
+            break
+    return packed
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+RAG Ingestion Job Queue
+Runs document ingestion in the background on a bounded set of workers and tracks per-job progress
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Number of ingestion jobs processed at the same time
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", "2"))
+# Worker processes for CPU-bound parsing/chunking (shared by all jobs)
+INGEST_PROCESS_POOL_SIZE = int(os.environ.get("INGEST_PROCESS_POOL_SIZE", str(max(1, (os.cpu_count() or 2) - 1))))
+# Finished jobs kept around for status lookups
+MAX_JOB_HISTORY = 500
+
+# Rough progress reached once a stage reports in (matches the log_callback stages)
+STAGE_PROGRESS = {
+    "queued": 0.0,
+    "loading": 0.1,
+    "extracting": 0.1,
+    "chunking": 0.4,
+    "embedding": 0.6,
+    "indexing": 0.85,
+    "ready": 1.0
+}
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Shared process pool for CPU-bound ingestion work"""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=INGEST_PROCESS_POOL_SIZE)
+        logger.info(f"⚙️ Ingestion process pool started with {INGEST_PROCESS_POOL_SIZE} workers")
+    return _process_pool
+
+class IngestionJob:
+    """State of a single queued document ingestion"""
+
+    def __init__(self, document_id: str, filename: str, payload: Dict[str, Any]):
+        self.job_id = str(uuid.uuid4())
+        self.document_id = document_id
+        self.filename = filename
+        self.payload = payload
+        self.status = "queued"
+        self.stage = "queued"
+        self.progress = 0.0
+        self.events: List[Dict[str, Any]] = []
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._done = asyncio.Event()
+
+    def log_callback(self, level: str, stage: str, message: str, document_id: str = None, filename: str = None, metadata: Dict[str, Any] = None):
+        """Record a progress event; signature matches the RAG services' log_callback hook"""
+        self.stage = stage
+        if level == "success" and stage in STAGE_PROGRESS:
+            self.progress = max(self.progress, STAGE_PROGRESS[stage])
+        self.events.append({
+            "timestamp": datetime.utcnow().isoformat(),
+            "level": level,
+            "stage": stage,
+            "message": message,
+            "metadata": metadata or {}
+        })
+        logger.info(f"[{self.job_id[:8]}] [{level.upper()}] {stage}: {message}")
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    async def wait(self) -> Optional[Dict[str, Any]]:
+        """Wait for the job to finish and return its result"""
+        await self._done.wait()
+        return self.result
+
+    def to_dict(self, include_events: bool = True) -> Dict[str, Any]:
+        data = {
+            "job_id": self.job_id,
+            "document_id": self.document_id,
+            "filename": self.filename,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": round(self.progress, 2),
+            "created_at": datetime.utcfromtimestamp(self.created_at).isoformat(),
+            "queue_wait_ms": int(((self.started_at or time.time()) - self.created_at) * 1000),
+            "processing_time_ms": int(((self.finished_at or time.time()) - self.started_at) * 1000) if self.started_at else 0,
+            "result": self.result,
+            "error": self.error
+        }
+        if include_events:
+            data["events"] = self.events
+        return data
+
+class IngestionJobQueue:
+    """
+    asyncio job queue with a fixed number of workers.
+    The handler receives the job plus its payload and returns the API response for the document.
+    """
+
+    def __init__(self, handler: Callable[..., Awaitable[Dict[str, Any]]], workers: int = INGEST_WORKERS):
+        self.handler = handler
+        self.workers = workers
+        self.jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+
+    def _ensure_started(self):
+        """Start workers on the running event loop the first time a job is submitted"""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._worker_tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+            logger.info(f"📥 Ingestion queue started with {self.workers} workers")
+
+    async def submit(self, document_id: str, filename: str, **payload) -> IngestionJob:
+        """Queue a document for ingestion and return its job immediately"""
+        self._ensure_started()
+        job = IngestionJob(document_id, filename, payload)
+        self.jobs[job.job_id] = job
+        self._prune_history()
+        job.log_callback("info", "queued", f"📥 Queued for ingestion ({self._queue.qsize()} ahead)")
+        await self._queue.put(job)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[IngestionJob]:
+        return self.jobs.get(job_id)
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        return [job.to_dict(include_events=False) for job in reversed(self.jobs.values())]
+
+    def get_stats(self) -> Dict[str, Any]:
+        statuses = [job.status for job in self.jobs.values()]
+        return {
+            "workers": self.workers,
+            "process_pool_size": INGEST_PROCESS_POOL_SIZE,
+            "queued": statuses.count("queued"),
+            "processing": statuses.count("processing"),
+            "completed": statuses.count("completed"),
+            "error": statuses.count("error")
+        }
+
+    def _prune_history(self):
+        """Drop the oldest finished jobs once the history limit is reached"""
+        while len(self.jobs) > MAX_JOB_HISTORY:
+            finished = next((job_id for job_id, job in self.jobs.items() if job.done), None)
+            if finished is None:
+                break
+            del self.jobs[finished]
+
+    async def _worker(self, worker_id: int):
+        while True:
+            job = await self._queue.get()
+            job.status = "processing"
+            job.started_at = time.time()
+            try:
+                job.result = await self.handler(job, **job.payload)
+                job.status = "error" if job.result and job.result.get("success") is False else "completed"
+                job.error = job.result.get("error") if job.result else None
+            except Exception as e:
+                logger.error(f"❌ Ingestion job {job.job_id} failed: {str(e)}")
+                job.status = "error"
+                job.error = str(e)
+                job.log_callback("error", job.stage, f"❌ Ingestion failed: {str(e)}")
+            finally:
+                job.finished_at = time.time()
+                job.payload = {}  # release the uploaded bytes
+                job._done.set()
+                self._queue.task_done()
+
+    async def shutdown(self):
+        """Stop workers and the shared process pool"""
+        for task in self._worker_tasks:
+            task.cancel()
+        self._worker_tasks = []
+        self._queue = None
+
+        global _process_pool
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
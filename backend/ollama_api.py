@@ -11,6 +11,9 @@ import sqlite3
 import uuid
 from datetime import datetime
 import logging
+from ollama_client import OllamaError, get_ollama_client
+from write_behind import get_write_behind_logger
+from db_helper import get_db_manager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,6 +25,11 @@ CORS(app)
 # Ollama configuration
 OLLAMA_BASE_URL = "http://localhost:11434"
 DATABASE_PATH = "ollama_agents.db"
+ollama_client = get_ollama_client()
+# Execution rows are queued and group-committed off the request thread
+execution_logger = get_write_behind_logger(DATABASE_PATH)
+# Persistent per-thread connections for the read paths
+db_manager = get_db_manager()
 
 def init_database():
     """Initialize SQLite database for agent storage"""
@@ -221,11 +229,7 @@ def create_agent():
 def list_agents():
     """List all Ollama agents"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM agents ORDER BY created_at DESC')
-        rows = cursor.fetchall()
+        rows = db_manager.execute_query(DATABASE_PATH, 'SELECT * FROM agents ORDER BY created_at DESC')
         
         agents = []
         for row in rows:
@@ -251,8 +255,6 @@ def list_agents():
             }
             agents.append(agent)
         
-        conn.close()
-        
         return jsonify({"agents": agents})
         
     except Exception as e:
@@ -263,18 +265,12 @@ def list_agents():
 def delete_agent(agent_id):
     """Delete an Ollama agent"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
-        # Delete agent
-        cursor.execute('DELETE FROM agents WHERE id = ?', (agent_id,))
-        
-        # Delete related conversations and executions
-        cursor.execute('DELETE FROM conversations WHERE agent_id = ?', (agent_id,))
-        cursor.execute('DELETE FROM executions WHERE agent_id = ?', (agent_id,))
-        
-        conn.commit()
-        conn.close()
+        # Related executions still queued must land before they can be deleted
+        execution_logger.flush()
+        with db_manager.transaction(DATABASE_PATH) as cursor:
+            cursor.execute('DELETE FROM agents WHERE id = ?', (agent_id,))
+            cursor.execute('DELETE FROM conversations WHERE agent_id = ?', (agent_id,))
+            cursor.execute('DELETE FROM executions WHERE agent_id = ?', (agent_id,))
         
         return jsonify({"success": True})
         
@@ -307,27 +303,21 @@ def generate_response():
             ollama_request['system'] = data.get('system')
         
         # Make request to Ollama
-        response = requests.post(
-            f"{OLLAMA_BASE_URL}/api/generate",
-            json=ollama_request,
-            timeout=300  # 5 minute timeout
-        )
+        result = ollama_client.post_json("/api/generate", ollama_request, host=OLLAMA_BASE_URL, timeout=300)  # 5 minute timeout
+        return jsonify({
+            "status": "success",
+            "response": result.get("response", ""),
+            "eval_count": result.get("eval_count", 0),
+            "eval_duration": result.get("eval_duration", 0),
+            "total_duration": result.get("total_duration", 0),
+            "metrics": result["_metrics"]
+        })
         
-        if response.status_code == 200:
-            result = response.json()
-            return jsonify({
-                "status": "success",
-                "response": result.get("response", ""),
-                "eval_count": result.get("eval_count", 0),
-                "eval_duration": result.get("eval_duration", 0),
-                "total_duration": result.get("total_duration", 0)
-            })
-        else:
-            return jsonify({
-                "status": "error",
-                "message": f"Ollama API error: {response.status_code}"
-            }), 500
-            
+    except OllamaError as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Ollama API error: {e.status_code}"
+        }), 500
     except requests.exceptions.Timeout:
         return jsonify({
             "status": "error",
@@ -340,6 +330,12 @@ def generate_response():
             "message": str(e)
         }), 500
 
+@app.route('/api/ollama/metrics', methods=['GET'])
+def get_ollama_metrics():
+    """Per-call Ollama metrics: queue wait, TTFT and tokens/s"""
+    return jsonify({**ollama_client.get_metrics(recent=request.args.get('recent', 20, type=int)),
+                    'execution_log': execution_logger.get_stats()})
+
 @app.route('/api/agents/ollama/<agent_id>/execute', methods=['POST'])
 def execute_agent(agent_id):
     """Execute an agent with input"""
@@ -350,15 +346,10 @@ def execute_agent(agent_id):
         if not input_text:
             return jsonify({"error": "Input is required"}), 400
         
-        # Get agent from database
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM agents WHERE id = ?', (agent_id,))
-        agent_row = cursor.fetchone()
+        # Get agent from database (no transaction is held across the model call)
+        agent_row = db_manager.query_one(DATABASE_PATH, 'SELECT * FROM agents WHERE id = ?', (agent_id,))
         
         if not agent_row:
-            conn.close()
             return jsonify({"error": "Agent not found"}), 404
         
         # Prepare execution
@@ -385,57 +376,46 @@ def execute_agent(agent_id):
                 }
             }
             
-            response = requests.post(
-                f"{OLLAMA_BASE_URL}/api/generate",
-                json=ollama_request,
-                timeout=300
-            )
+            result = ollama_client.post_json("/api/generate", ollama_request, host=OLLAMA_BASE_URL, timeout=300)
+            output_text = result.get("response", "")
+            tokens_used = result.get("eval_count", 0)
+            duration = int((datetime.now() - start_time).total_seconds() * 1000)
             
-            if response.status_code == 200:
-                result = response.json()
-                output_text = result.get("response", "")
-                tokens_used = result.get("eval_count", 0)
-                duration = int((datetime.now() - start_time).total_seconds() * 1000)
-                
-                # Store execution
-                cursor.execute('''
-                    INSERT INTO executions (
-                        id, agent_id, input_text, output_text, success,
-                        duration, tokens_used, timestamp
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    execution_id, agent_id, input_text, output_text, True,
-                    duration, tokens_used, datetime.now()
-                ))
-                
-                conn.commit()
-                conn.close()
+            # Store execution
+            execution_logger.insert('''
+                INSERT INTO executions (
+                    id, agent_id, input_text, output_text, success,
+                    duration, tokens_used, timestamp
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                execution_id, agent_id, input_text, output_text, True,
+                duration, tokens_used, datetime.now()
+            ))
                 
-                return jsonify({
-                    "id": execution_id,
-                    "agentId": agent_id,
-                    "input": input_text,
-                    "output": output_text,
-                    "success": True,
-                    "duration": duration,
-                    "tokensUsed": tokens_used,
-                    "timestamp": datetime.now().isoformat(),
-                    "metadata": {
-                        "model": model,
-                        "temperature": temperature,
-                        "tools_used": [],
-                        "context_length": 1
-                    }
-                })
-            else:
-                raise Exception(f"Ollama API error: {response.status_code}")
+            return jsonify({
+                "id": execution_id,
+                "agentId": agent_id,
+                "input": input_text,
+                "output": output_text,
+                "success": True,
+                "duration": duration,
+                "tokensUsed": tokens_used,
+                "timestamp": datetime.now().isoformat(),
+                "metadata": {
+                    "model": model,
+                    "temperature": temperature,
+                    "tools_used": [],
+                    "context_length": 1,
+                    "ollama_metrics": result["_metrics"]
+                }
+            })
                 
         except Exception as e:
             # Store failed execution
             duration = int((datetime.now() - start_time).total_seconds() * 1000)
             error_message = str(e)
             
-            cursor.execute('''
+            execution_logger.insert('''
                 INSERT INTO executions (
                     id, agent_id, input_text, success, duration, error_message, timestamp
                 ) VALUES (?, ?, ?, ?, ?, ?, ?)
@@ -443,9 +423,6 @@ def execute_agent(agent_id):
                 execution_id, agent_id, input_text, False, duration, error_message, datetime.now()
             ))
             
-            conn.commit()
-            conn.close()
-            
             return jsonify({
                 "id": execution_id,
                 "agentId": agent_id,
@@ -472,11 +449,8 @@ def execute_agent(agent_id):
 def get_agent_metrics(agent_id):
     """Get agent performance metrics"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
         # Get execution statistics
-        cursor.execute('''
+        row = db_manager.query_one(DATABASE_PATH, '''
             SELECT 
                 COUNT(*) as total_executions,
                 SUM(CASE WHEN success = 1 THEN 1 ELSE 0 END) as successful_executions,
@@ -488,9 +462,6 @@ def get_agent_metrics(agent_id):
             WHERE agent_id = ?
         ''', (agent_id,))
         
-        row = cursor.fetchone()
-        conn.close()
-        
         if row and row[0] > 0:  # If there are executions
             return jsonify({
                 "totalExecutions": row[0],
@@ -938,11 +909,7 @@ def health_check():
 def get_strands_agents():
     """Get all agents in Strands-compatible format"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM agents ORDER BY created_at DESC')
-        rows = cursor.fetchall()
+        rows = db_manager.execute_query(DATABASE_PATH, 'SELECT * FROM agents ORDER BY created_at DESC')
         
         strands_agents = []
         for row in rows:
@@ -971,7 +938,6 @@ def get_strands_agents():
             }
             strands_agents.append(strands_agent)
         
-        conn.close()
         return jsonify({'agents': strands_agents})
         
     except Exception as e:
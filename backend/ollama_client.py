@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Shared Ollama Client
+Pooled keep-alive HTTP client for Ollama with per-host concurrency limits, retries with
+backoff, sync + asyncio interfaces and per-call metrics (queue wait, TTFT, tokens/s)
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OLLAMA_HOST = "http://localhost:11434"
+# Concurrent requests allowed per Ollama host (extra callers wait in line)
+DEFAULT_MAX_CONCURRENCY = 4
+# Idle keep-alive connections kept per host
+DEFAULT_POOL_SIZE = 16
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BACKOFF_SECONDS = 0.5
+DEFAULT_TIMEOUT = 120
+# Per-call metrics kept for get_metrics()
+MAX_METRICS_HISTORY = 500
+# Statuses worth retrying: Ollama answers 503 when its request queue is full
+RETRY_STATUSES = {429, 502, 503, 504}
+
+class OllamaError(Exception):
+    """Non-200 answer from Ollama"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Ollama API error: {status_code} - {message}")
+        self.status_code = status_code
+
+class OllamaClient:
+    """
+    One client per process, shared by every caller.
+    Connections are reused through a requests.Session (sync) and an aiohttp.ClientSession per
+    event loop (async); a semaphore per host bounds how many calls hit each Ollama server at once.
+    """
+
+    def __init__(self, host: str = DEFAULT_OLLAMA_HOST, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 pool_size: int = DEFAULT_POOL_SIZE, max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff: float = DEFAULT_BACKOFF_SECONDS, host_limits: Optional[Dict[str, int]] = None):
+        self.host = host.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.host_limits = {h.rstrip("/"): limit for h, limit in (host_limits or {}).items()}
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._sync_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._async_sessions: Dict[int, Any] = {}
+        self._async_limits: Dict[tuple, asyncio.Semaphore] = {}
+
+        self._metrics = deque(maxlen=MAX_METRICS_HISTORY)
+        self._totals = {"calls": 0, "errors": 0, "retries": 0}
+
+    # ------------------------------------------------------------------
+    # Configuration
+    # ------------------------------------------------------------------
+
+    def set_host_limit(self, host: str, limit: int) -> None:
+        """Override the concurrency limit for one host (applies to new semaphores)"""
+        with self._lock:
+            self.host_limits[host.rstrip("/")] = limit
+            self._sync_limits.pop(host.rstrip("/"), None)
+
+    def _limit_for(self, host: str) -> int:
+        return self.host_limits.get(host, self.max_concurrency)
+
+    def _resolve_host(self, host: Optional[str]) -> str:
+        return (host or self.host).rstrip("/")
+
+    def _sync_limit(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._sync_limits:
+                self._sync_limits[host] = threading.BoundedSemaphore(self._limit_for(host))
+            return self._sync_limits[host]
+
+    def _async_limit(self, host: str) -> asyncio.Semaphore:
+        key = (id(asyncio.get_running_loop()), host)
+        if key not in self._async_limits:
+            self._async_limits[key] = asyncio.Semaphore(self._limit_for(host))
+        return self._async_limits[key]
+
+    def _async_session(self):
+        """aiohttp sessions are bound to an event loop, so keep one per running loop"""
+        if not AIOHTTP_AVAILABLE:
+            raise RuntimeError("aiohttp is not installed - the async Ollama client is unavailable")
+        loop = asyncio.get_running_loop()
+        session = self._async_sessions.get(id(loop))
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.pool_size, keepalive_timeout=60)
+            session = aiohttp.ClientSession(connector=connector)
+            self._async_sessions[id(loop)] = session
+        return session
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def _record(self, endpoint: str, host: str, model: Optional[str], queue_wait: float, started: float,
+                ttft: Optional[float], retries: int, data: Optional[Dict[str, Any]], error: Optional[str] = None) -> Dict[str, Any]:
+        total = time.perf_counter() - started
+        data = data or {}
+        eval_count = data.get("eval_count", 0) or 0
+        eval_duration = data.get("eval_duration", 0) or 0
+        if ttft is None and eval_duration:
+            # Non-streaming call: everything before the decode phase counts as time to first token
+            ttft = max(0.0, total - eval_duration / 1e9)
+
+        metrics = {
+            "endpoint": endpoint,
+            "host": host,
+            "model": model,
+            "success": error is None,
+            "error": error,
+            "retries": retries,
+            "queue_wait_ms": round(queue_wait * 1000, 1),
+            "ttft_ms": round(ttft * 1000, 1) if ttft is not None else None,
+            "total_ms": round(total * 1000, 1),
+            "eval_count": eval_count,
+            "prompt_eval_count": data.get("prompt_eval_count", 0) or 0,
+            "prompt_eval_ms": round((data.get("prompt_eval_duration", 0) or 0) / 1e6, 1),
+            "load_ms": round((data.get("load_duration", 0) or 0) / 1e6, 1),
+            "tokens_per_second": round(eval_count / (eval_duration / 1e9), 2) if eval_duration else None,
+            "timestamp": time.time()
+        }
+        with self._lock:
+            self._metrics.append(metrics)
+            self._totals["calls"] += 1
+            self._totals["retries"] += retries
+            if error is not None:
+                self._totals["errors"] += 1
+        return metrics
+
+    def get_metrics(self, recent: int = 20) -> Dict[str, Any]:
+        """Aggregated and most recent per-call metrics"""
+        with self._lock:
+            history = list(self._metrics)
+            totals = dict(self._totals)
+
+        def average(key):
+            values = [m[key] for m in history if m.get(key) is not None]
+            return round(sum(values) / len(values), 2) if values else None
+
+        return {
+            **totals,
+            "max_concurrency": self.max_concurrency,
+            "host_limits": self.host_limits,
+            "pool_size": self.pool_size,
+            "avg_queue_wait_ms": average("queue_wait_ms"),
+            "avg_ttft_ms": average("ttft_ms"),
+            "avg_total_ms": average("total_ms"),
+            "avg_tokens_per_second": average("tokens_per_second"),
+            "recent": history[-recent:] if recent else []
+        }
+
+    # ------------------------------------------------------------------
+    # Sync interface
+    # ------------------------------------------------------------------
+
+    def request(self, method: str, path: str, host: Optional[str] = None, timeout: float = DEFAULT_TIMEOUT, **kwargs) -> requests.Response:
+        """Raw pooled request with retries on connection errors and overload statuses"""
+        url = f"{self._resolve_host(host)}{path}"
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self._session.request(method, url, timeout=timeout, **kwargs)
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    response.retries = attempt
+                    return response
+                response.close()
+                logger.warning(f"⚠️ Ollama {path} returned {response.status_code}, retrying ({attempt + 1}/{self.max_retries})")
+            except requests.exceptions.ConnectionError as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"⚠️ Ollama connection error on {path}: {e}, retrying ({attempt + 1}/{self.max_retries})")
+            time.sleep(self.backoff * (2 ** attempt))
+
+    def post_json(self, path: str, payload: Dict[str, Any], host: Optional[str] = None, timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+        """POST a non-streaming request through the host's concurrency limit and record its metrics"""
+        host = self._resolve_host(host)
+        limit = self._sync_limit(host)
+        queued = time.perf_counter()
+        with limit:
+            started = time.perf_counter()
+            retries = 0
+            try:
+                response = self.request("POST", path, host=host, timeout=timeout, json=payload)
+                retries = response.retries
+                if response.status_code != 200:
+                    raise OllamaError(response.status_code, response.text)
+                data = response.json()
+            except Exception as e:
+                self._record(path, host, payload.get("model"), started - queued, started, None, retries, None, str(e))
+                raise
+        data["_metrics"] = self._record(path, host, payload.get("model"), started - queued, started, None, retries, data)
+        return data
+
+    def generate(self, model: str, prompt: str, host: Optional[str] = None, system: Optional[str] = None,
+                 options: Optional[Dict[str, Any]] = None, timeout: float = DEFAULT_TIMEOUT, **extra) -> Dict[str, Any]:
+        """Non-streaming /api/generate; returns Ollama's JSON plus a _metrics entry"""
+        payload = {"model": model, "prompt": prompt, "stream": False, **extra}
+        if system:
+            payload["system"] = system
+        if options:
+            payload["options"] = options
+        return self.post_json("/api/generate", payload, host=host, timeout=timeout)
+
+    def chat(self, model: str, messages: List[Dict[str, Any]], host: Optional[str] = None,
+             options: Optional[Dict[str, Any]] = None, timeout: float = DEFAULT_TIMEOUT, **extra) -> Dict[str, Any]:
+        """Non-streaming /api/chat; returns Ollama's JSON plus a _metrics entry"""
+        payload = {"model": model, "messages": messages, "stream": False, **extra}
+        if options:
+            payload["options"] = options
+        return self.post_json("/api/chat", payload, host=host, timeout=timeout)
+
+    def stream(self, path: str, payload: Dict[str, Any], host: Optional[str] = None,
+               read_timeout: float = DEFAULT_TIMEOUT) -> Iterator[Dict[str, Any]]:
+        """
+        Sync counterpart of astream for threaded servers (Flask).
+        The final chunk (done=True) carries a _metrics entry with the measured TTFT.
+        """
+        host = self._resolve_host(host)
+        payload = {**payload, "stream": True}
+        queued = time.perf_counter()
+        with self._sync_limit(host):
+            started = time.perf_counter()
+            ttft = None
+            retries = 0
+            try:
+                response = self.request("POST", path, host=host, timeout=(10, read_timeout), json=payload, stream=True)
+                retries = response.retries
+                with response:
+                    if response.status_code != 200:
+                        raise OllamaError(response.status_code, response.text)
+                    for line in response.iter_lines():
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        if ttft is None and (chunk.get("response") or chunk.get("message", {}).get("content")):
+                            ttft = time.perf_counter() - started
+                        if chunk.get("done"):
+                            chunk["_metrics"] = self._record(path, host, payload.get("model"), started - queued, started, ttft, retries, chunk)
+                        yield chunk
+            except Exception as e:
+                self._record(path, host, payload.get("model"), started - queued, started, ttft, retries, None, str(e) or type(e).__name__)
+                raise
+
+    def loaded_models(self, host: Optional[str] = None) -> List[str]:
+        """Models currently resident in Ollama's memory (/api/ps)"""
+        return [model.get("name") for model in self.get_json("/api/ps", host=host, timeout=5).get("models", [])]
+
+    def get_json(self, path: str, host: Optional[str] = None, timeout: float = 10) -> Dict[str, Any]:
+        """Pooled GET for cheap endpoints such as /api/tags (not rate limited)"""
+        response = self.request("GET", path, host=host, timeout=timeout)
+        if response.status_code != 200:
+            raise OllamaError(response.status_code, response.text)
+        return response.json()
+
+    # ------------------------------------------------------------------
+    # Async interface
+    # ------------------------------------------------------------------
+
+    async def _apost(self, session, url: str, payload: Dict[str, Any], timeout):
+        """POST with retries; returns (response, retries) and leaves the body unread"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await session.post(url, json=payload, timeout=timeout)
+                if response.status not in RETRY_STATUSES or attempt == self.max_retries:
+                    return response, attempt
+                response.release()
+                logger.warning(f"⚠️ Ollama returned {response.status}, retrying ({attempt + 1}/{self.max_retries})")
+            except aiohttp.ClientConnectionError as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"⚠️ Ollama connection error: {e}, retrying ({attempt + 1}/{self.max_retries})")
+            await asyncio.sleep(self.backoff * (2 ** attempt))
+
+    async def apost_json(self, path: str, payload: Dict[str, Any], host: Optional[str] = None, timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+        """Async counterpart of post_json"""
+        host = self._resolve_host(host)
+        session = self._async_session()
+        queued = time.perf_counter()
+        async with self._async_limit(host):
+            started = time.perf_counter()
+            retries = 0
+            try:
+                response, retries = await self._apost(session, f"{host}{path}", payload, aiohttp.ClientTimeout(total=timeout))
+                async with response:
+                    if response.status != 200:
+                        raise OllamaError(response.status, await response.text())
+                    data = await response.json(content_type=None)
+            except Exception as e:
+                self._record(path, host, payload.get("model"), started - queued, started, None, retries, None, str(e) or type(e).__name__)
+                raise
+        data["_metrics"] = self._record(path, host, payload.get("model"), started - queued, started, None, retries, data)
+        return data
+
+    async def agenerate(self, model: str, prompt: str, host: Optional[str] = None, system: Optional[str] = None,
+                        options: Optional[Dict[str, Any]] = None, timeout: float = DEFAULT_TIMEOUT, **extra) -> Dict[str, Any]:
+        """Async non-streaming /api/generate"""
+        payload = {"model": model, "prompt": prompt, "stream": False, **extra}
+        if system:
+            payload["system"] = system
+        if options:
+            payload["options"] = options
+        return await self.apost_json("/api/generate", payload, host=host, timeout=timeout)
+
+    async def achat(self, model: str, messages: List[Dict[str, Any]], host: Optional[str] = None,
+                    options: Optional[Dict[str, Any]] = None, timeout: float = DEFAULT_TIMEOUT, **extra) -> Dict[str, Any]:
+        """Async non-streaming /api/chat"""
+        payload = {"model": model, "messages": messages, "stream": False, **extra}
+        if options:
+            payload["options"] = options
+        return await self.apost_json("/api/chat", payload, host=host, timeout=timeout)
+
+    async def astream(self, path: str, payload: Dict[str, Any], host: Optional[str] = None,
+                      read_timeout: float = DEFAULT_TIMEOUT) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream newline-delimited JSON chunks (stream=True) from /api/generate or /api/chat.
+        The final chunk (done=True) carries a _metrics entry with the measured TTFT.
+        """
+        host = self._resolve_host(host)
+        session = self._async_session()
+        payload = {**payload, "stream": True}
+        queued = time.perf_counter()
+        async with self._async_limit(host):
+            started = time.perf_counter()
+            ttft = None
+            retries = 0
+            try:
+                response, retries = await self._apost(
+                    session, f"{host}{path}", payload, aiohttp.ClientTimeout(total=None, sock_read=read_timeout)
+                )
+                async with response:
+                    if response.status != 200:
+                        raise OllamaError(response.status, await response.text())
+                    async for line in response.content:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        if ttft is None and (chunk.get("response") or chunk.get("message", {}).get("content")):
+                            ttft = time.perf_counter() - started
+                        if chunk.get("done"):
+                            chunk["_metrics"] = self._record(path, host, payload.get("model"), started - queued, started, ttft, retries, chunk)
+                        yield chunk
+            except Exception as e:
+                self._record(path, host, payload.get("model"), started - queued, started, ttft, retries, None, str(e) or type(e).__name__)
+                raise
+
+    async def aget_json(self, path: str, host: Optional[str] = None, timeout: float = 10) -> Dict[str, Any]:
+        session = self._async_session()
+        async with session.get(f"{self._resolve_host(host)}{path}", timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            if response.status != 200:
+                raise OllamaError(response.status, await response.text())
+            return await response.json(content_type=None)
+
+    # ------------------------------------------------------------------
+    # Shutdown
+    # ------------------------------------------------------------------
+
+    async def aclose(self) -> None:
+        """Close the aiohttp session of the running loop (call from the app's shutdown hook)"""
+        loop_id = id(asyncio.get_running_loop())
+        session = self._async_sessions.pop(loop_id, None)
+        if session is not None and not session.closed:
+            await session.close()
+        self._async_limits = {key: value for key, value in self._async_limits.items() if key[0] != loop_id}
+
+    def close(self) -> None:
+        self._session.close()
+
+# Global client shared by every service in the process
+ollama_client = OllamaClient()
+
+def get_ollama_client() -> OllamaClient:
+    return ollama_client
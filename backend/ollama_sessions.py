@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Ollama Agent Sessions
+Keeps agent models warm with keep_alive and sends a byte-identical system prompt as the first
+/api/chat message so Ollama can reuse the cached KV prefix instead of re-evaluating it each turn
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional
+
+from ollama_client import DEFAULT_TIMEOUT, OllamaClient, get_ollama_client
+
+logger = logging.getLogger(__name__)
+
+# How long Ollama keeps an agent's model (and its prompt cache) loaded after a call
+DEFAULT_KEEP_ALIVE = "30m"
+# Sessions kept before the least recently used one is dropped
+MAX_SESSIONS = 256
+
+def _estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token)"""
+    return max(1, len(text) // 4)
+
+class AgentSession:
+    """
+    Warm chat session for one agent configuration (host, model, system prompt).
+    Saved prompt-eval time is estimated from the session's cold call: tokens Ollama did not
+    have to evaluate again times the cold per-token prompt-eval cost.
+    """
+
+    def __init__(self, key: str, host: str, model: str, system_prompt: str,
+                 keep_alive: str = DEFAULT_KEEP_ALIVE, client: Optional[OllamaClient] = None):
+        self.key = key
+        self.host = host
+        self.model = model
+        self.system_prompt = system_prompt or ""
+        self.keep_alive = keep_alive
+        self.client = client or get_ollama_client()
+        self.fingerprint = self.fingerprint_for(host, model, self.system_prompt)
+        self.created_at = time.time()
+        self.last_used = self.created_at
+
+        # Prompt tokens of the system prefix and the cold cost of evaluating one token
+        self.system_tokens: Optional[int] = None
+        self.ms_per_prompt_token: Optional[float] = None
+        self.calls = 0
+        self.cache_hits = 0
+        self.saved_prompt_eval_ms = 0.0
+        self.load_ms = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint_for(host: str, model: str, system_prompt: str) -> str:
+        return hashlib.sha256(f"{host}\0{model}\0{system_prompt or ''}".encode("utf-8")).hexdigest()
+
+    def _messages(self, user_content: Optional[str]):
+        messages = [{"role": "system", "content": self.system_prompt}] if self.system_prompt else []
+        if user_content is not None:
+            messages.append({"role": "user", "content": user_content})
+        return messages
+
+    def warm(self, timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+        """Load the model and evaluate the system prompt once so the first real turn hits the cache"""
+        result = self.client.chat(self.model, self._messages(None), host=self.host,
+                                  options={"num_predict": 1}, keep_alive=self.keep_alive, timeout=timeout)
+        with self._lock:
+            self._calibrate(result, user_tokens=0)
+        logger.info(f"🔥 Warmed {self.model} for session {self.key[:12]} ({self.system_tokens} prompt tokens)")
+        return result["_metrics"]
+
+    def _calibrate(self, result: Dict[str, Any], user_tokens: int) -> None:
+        """Record the cold prompt-eval cost from a call that evaluated the full prompt"""
+        prompt_tokens = result.get("prompt_eval_count") or 0
+        prompt_eval_ns = result.get("prompt_eval_duration") or 0
+        if prompt_tokens:
+            self.system_tokens = max(0, prompt_tokens - user_tokens)
+            self.ms_per_prompt_token = prompt_eval_ns / 1e6 / prompt_tokens
+
+    def _payload(self, user_content: str, options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        payload = {"model": self.model, "messages": self._messages(user_content), "keep_alive": self.keep_alive}
+        if options:
+            payload["options"] = options
+        return payload
+
+    def _account(self, result: Dict[str, Any], user_content: str) -> Dict[str, Any]:
+        """Update session counters from a finished call and return its metrics"""
+        user_tokens = _estimate_tokens(user_content)
+        prompt_tokens = result.get("prompt_eval_count") or 0
+
+        with self._lock:
+            self.calls += 1
+            self.last_used = time.time()
+            self.load_ms += (result.get("load_duration") or 0) / 1e6
+
+            saved_tokens = 0
+            if self.ms_per_prompt_token is None:
+                self._calibrate(result, user_tokens)
+            else:
+                # Ollama only reports the prompt tokens it actually evaluated
+                saved_tokens = max(0, self.system_tokens + user_tokens - prompt_tokens)
+            saved_ms = saved_tokens * (self.ms_per_prompt_token or 0.0)
+            if saved_tokens:
+                self.cache_hits += 1
+                self.saved_prompt_eval_ms += saved_ms
+
+        return {
+            **result.get("_metrics", {}),
+            "session": self.key,
+            "prefix_cached": saved_tokens > 0,
+            "cached_prompt_tokens": saved_tokens,
+            "saved_prompt_eval_ms": round(saved_ms, 1)
+        }
+
+    def chat(self, user_content: str, options: Optional[Dict[str, Any]] = None,
+             timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+        """Run one turn; returns the response text plus cache/latency metrics"""
+        payload = {**self._payload(user_content, options), "stream": False}
+        result = self.client.post_json("/api/chat", payload, host=self.host, timeout=timeout)
+        return {
+            "content": result.get("message", {}).get("content", ""),
+            "raw": result,
+            "metrics": self._account(result, user_content)
+        }
+
+    def stream_chat(self, user_content: str, options: Optional[Dict[str, Any]] = None,
+                    timeout: float = DEFAULT_TIMEOUT) -> Iterator[Dict[str, Any]]:
+        """Stream one turn as Ollama chat chunks; the final chunk (done=True) carries its metrics"""
+        for chunk in self.client.stream("/api/chat", self._payload(user_content, options), host=self.host, read_timeout=timeout):
+            if chunk.get("done"):
+                chunk["metrics"] = self._account(chunk, user_content)
+            yield chunk
+
+    def _turns_payload(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]],
+                       options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        payload = {"model": self.model, "messages": self._messages(None) + list(messages), "keep_alive": self.keep_alive}
+        if tools:
+            payload["tools"] = tools
+        if options:
+            payload["options"] = options
+        return payload
+
+    @staticmethod
+    def _turns_text(messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]]) -> str:
+        """Everything after the system prompt, for the prompt-token estimate"""
+        parts = [str(message.get("content") or "") for message in messages]
+        if tools:
+            parts.append(json.dumps(tools))
+        return "".join(parts)
+
+    def chat_turns(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                   options: Optional[Dict[str, Any]] = None, timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+        """
+        One turn of a multi-message conversation (user, assistant and tool messages after the system
+        prompt), optionally offering tools; returns the assistant message, including any tool_calls
+        """
+        payload = {**self._turns_payload(messages, tools, options), "stream": False}
+        result = self.client.post_json("/api/chat", payload, host=self.host, timeout=timeout)
+        return {
+            "message": result.get("message", {}),
+            "raw": result,
+            "metrics": self._account(result, self._turns_text(messages, tools))
+        }
+
+    def stream_chat_turns(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                          options: Optional[Dict[str, Any]] = None, timeout: float = DEFAULT_TIMEOUT) -> Iterator[Dict[str, Any]]:
+        """Streaming chat_turns; tool_calls arrive on the chunks' messages, metrics on the final chunk"""
+        for chunk in self.client.stream("/api/chat", self._turns_payload(messages, tools, options), host=self.host, read_timeout=timeout):
+            if chunk.get("done"):
+                chunk["metrics"] = self._account(chunk, self._turns_text(messages, tools))
+            yield chunk
+
+    def is_loaded(self) -> bool:
+        """Whether Ollama currently has this session's model in memory"""
+        return self.model in self.client.loaded_models(self.host)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "session": self.key,
+                "model": self.model,
+                "host": self.host,
+                "keep_alive": self.keep_alive,
+                "system_tokens": self.system_tokens,
+                "calls": self.calls,
+                "cache_hits": self.cache_hits,
+                "saved_prompt_eval_ms": round(self.saved_prompt_eval_ms, 1),
+                "load_ms": round(self.load_ms, 1),
+                "last_used": self.last_used
+            }
+
+class AgentSessionManager:
+    """LRU registry of agent sessions, rebuilt when an agent's host, model or system prompt changes"""
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS, keep_alive: str = DEFAULT_KEEP_ALIVE,
+                 client: Optional[OllamaClient] = None):
+        self.max_sessions = max_sessions
+        self.keep_alive = keep_alive
+        self.client = client or get_ollama_client()
+        self.sessions: "OrderedDict[str, AgentSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_session(self, host: str, model: str, system_prompt: str, agent_id: Optional[str] = None) -> AgentSession:
+        """Session for an agent; without an agent_id, agents sharing a configuration share a session"""
+        fingerprint = AgentSession.fingerprint_for(host, model, system_prompt)
+        key = agent_id or fingerprint
+        with self._lock:
+            session = self.sessions.get(key)
+            if session is None or session.fingerprint != fingerprint:
+                session = AgentSession(key, host, model, system_prompt, self.keep_alive, self.client)
+                self.sessions[key] = session
+            self.sessions.move_to_end(key)
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+            return session
+
+    def chat(self, host: str, model: str, system_prompt: str, user_content: str, agent_id: Optional[str] = None,
+             options: Optional[Dict[str, Any]] = None, timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+        return self.get_session(host, model, system_prompt, agent_id).chat(user_content, options=options, timeout=timeout)
+
+    def drop(self, agent_id: str) -> None:
+        with self._lock:
+            self.sessions.pop(agent_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sessions = list(self.sessions.values())
+        stats = [session.get_stats() for session in sessions]
+        return {
+            "sessions": len(stats),
+            "keep_alive": self.keep_alive,
+            "calls": sum(s["calls"] for s in stats),
+            "cache_hits": sum(s["cache_hits"] for s in stats),
+            "saved_prompt_eval_ms": round(sum(s["saved_prompt_eval_ms"] for s in stats), 1),
+            "details": stats
+        }
+
+# Global session manager shared by the agent services in this process
+session_manager = AgentSessionManager()
+
+def get_session_manager() -> AgentSessionManager:
+    return session_manager
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Planner Result Cache
+Remembers the analyses and orchestration plans the LLM planners produce, keyed by the normalized
+query and a hash of the agent catalogue the plan was made for. A repeated query is answered from
+memory (exact match), a rephrased one from the most similar cached query above a similarity
+threshold (semantic match). Adding, changing or removing an agent changes the catalogue hash, so
+plans made for the old catalogue are never served and are dropped on the next lookup.
+"""
+
+import copy
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from agent_capability_index import AgentCapabilityIndex
+from agent_embeddings import BACKEND_LEXICAL, BACKEND_OLLAMA, TextEmbedder, agent_profile_text, cosine, get_text_embedder
+
+logger = logging.getLogger(__name__)
+
+# Plans kept in memory before the least recently used one is evicted
+DEFAULT_MAX_PLANS = 512
+# How long a plan is served before the planner runs again
+PLAN_CACHE_TTL = int(os.environ.get("PLAN_CACHE_TTL", "3600"))
+# Similarity a cached query needs to answer a rephrased one, per embedding backend;
+# PLAN_CACHE_SIMILARITY overrides both, 1.0 turns semantic matching off
+SEMANTIC_THRESHOLD = {BACKEND_OLLAMA: 0.95, BACKEND_LEXICAL: 0.85}
+PLAN_CACHE_SIMILARITY = os.environ.get("PLAN_CACHE_SIMILARITY")
+
+MATCH_EXACT = "exact"
+MATCH_SEMANTIC = "semantic"
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s.!?;,]+$")
+
+def normalize_query(query: str) -> str:
+    """Case, whitespace and trailing punctuation do not change a plan"""
+    return _TRAILING_PUNCTUATION.sub("", _WHITESPACE.sub(" ", (query or "").strip().lower()))
+
+def catalogue_hash(agents: Optional[List[Dict[str, Any]]]) -> str:
+    """
+    Changes whenever an agent is added, removed, or its profile or model changes. Fields like
+    status or usage counters are left out so they do not invalidate plans.
+    """
+    if not agents:
+        return "none"
+    digest = hashlib.sha256()
+    for agent_id, profile in sorted(
+        (AgentCapabilityIndex.agent_id(agent), f"{agent_profile_text(agent)}\0{agent.get('model') or agent.get('model_id') or ''}")
+        for agent in agents
+    ):
+        digest.update(f"{agent_id}:{hashlib.sha256(profile.encode('utf-8')).hexdigest()};".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+class _Plan:
+    __slots__ = ("namespace", "catalogue", "query", "normalized", "plan", "vector", "backend", "created_at", "expires_at", "hits")
+
+    def __init__(self, namespace: str, catalogue: str, query: str, normalized: str, plan: Dict[str, Any], expires_at: float):
+        self.namespace = namespace
+        self.catalogue = catalogue
+        self.query = query
+        self.normalized = normalized
+        self.plan = plan
+        self.vector: Optional[List[float]] = None
+        self.backend: Optional[str] = None
+        self.created_at = time.time()
+        self.expires_at = expires_at
+        self.hits = 0
+
+class _InFlight:
+    """One running planner call that identical concurrent queries wait on"""
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+class PlanCache:
+    """Process-wide planner cache; a namespace separates planners (and their models) from each other"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_PLANS, ttl: float = PLAN_CACHE_TTL,
+                 similarity_threshold: Optional[float] = None, embedder: Optional[TextEmbedder] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        if similarity_threshold is None and PLAN_CACHE_SIMILARITY:
+            similarity_threshold = float(PLAN_CACHE_SIMILARITY)
+        self.similarity_threshold = similarity_threshold
+        self.embedder = embedder or get_text_embedder()
+        self._entries: "OrderedDict[str, _Plan]" = OrderedDict()
+        self._in_flight: Dict[str, _InFlight] = {}
+        # Latest catalogue hash seen per namespace; plans for older catalogues are dropped
+        self._catalogues: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "coalesced": 0, "stores": 0,
+                       "expired": 0, "evictions": 0, "invalidated": 0, "errors": 0}
+
+    @staticmethod
+    def make_key(namespace: str, catalogue: str, normalized: str) -> str:
+        return hashlib.sha256(f"{namespace}\0{catalogue}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def threshold_for(self, backend: str, threshold: Optional[float] = None) -> float:
+        if threshold is not None:
+            return threshold
+        if self.similarity_threshold is not None:
+            return self.similarity_threshold
+        return SEMANTIC_THRESHOLD.get(backend, 1.0)
+
+    def _track_catalogue(self, namespace: str, catalogue: str) -> None:
+        """Drop every plan made for an older catalogue of this namespace (caller holds the lock)"""
+        if self._catalogues.get(namespace) == catalogue:
+            return
+        stale = [key for key, entry in self._entries.items() if entry.namespace == namespace and entry.catalogue != catalogue]
+        for key in stale:
+            del self._entries[key]
+        self._stats["invalidated"] += len(stale)
+        if stale:
+            logger.info(f"🗂️ Agent catalogue changed for {namespace}: dropped {len(stale)} cached plans")
+        self._catalogues[namespace] = catalogue
+
+    def _get_exact(self, key: str) -> Optional[_Plan]:
+        """Fresh entry (caller holds the lock)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            del self._entries[key]
+            self._stats["expired"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _get_semantic(self, namespace: str, catalogue: str, query: str, threshold: Optional[float]) -> Optional[Tuple[_Plan, float]]:
+        """Most similar cached query of the same namespace and catalogue, if it clears the threshold"""
+        now = time.time()
+        with self._lock:
+            candidates = [entry for entry in self._entries.values()
+                          if entry.namespace == namespace and entry.catalogue == catalogue and entry.expires_at > now]
+        if not candidates or self.threshold_for(self.embedder.backend, threshold) >= 1.0:
+            return None
+        backend, (query_vector,) = self.embedder.embed([query])
+        pending = [entry for entry in candidates if entry.backend != backend]
+        if pending:
+            used, vectors = self.embedder.embed([entry.normalized for entry in pending])
+            if used != backend:
+                # The embedding model went away between the two calls: compare nothing this time
+                return None
+            for entry, vector in zip(pending, vectors):
+                entry.vector, entry.backend = vector, used
+
+        best, best_similarity = None, 0.0
+        for entry in candidates:
+            similarity = cosine(query_vector, entry.vector)
+            if similarity > best_similarity:
+                best, best_similarity = entry, similarity
+        if best is None or best_similarity < self.threshold_for(backend, threshold):
+            return None
+        return best, round(best_similarity, 4)
+
+    def _put(self, key: str, entry: _Plan) -> None:
+        """Insert and evict down to max_entries (caller holds the lock)"""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    @staticmethod
+    def _serve(entry: _Plan, match: str, query: str, similarity: float = 1.0) -> Dict[str, Any]:
+        """
+        Copy of a cached plan (callers are free to modify it) with how it was found. The plan is
+        stamped with the caller's query and the time it was served, not those of the cached query.
+        """
+        plan = copy.deepcopy(entry.plan)
+        if "query" in plan:
+            plan["query"] = query
+        if "timestamp" in plan:
+            plan["timestamp"] = datetime.now().isoformat()
+        plan["plan_cache"] = {
+            "hit": match,
+            "similarity": similarity,
+            "cached_query": entry.query,
+            "catalogue": entry.catalogue,
+            "age_seconds": round(time.time() - entry.created_at, 1)
+        }
+        return plan
+
+    def get_or_plan(self, namespace: str, query: str, agents: Optional[List[Dict[str, Any]]], planner: Callable[[], Dict[str, Any]],
+                    cache_if: Optional[Callable[[Dict[str, Any]], bool]] = None, threshold: Optional[float] = None,
+                    semantic: bool = True) -> Dict[str, Any]:
+        """
+        Cached planner(): an exact or (with semantic=True) near-duplicate query for the same agent
+        catalogue is answered from the cache. Only plans passing cache_if(plan) are stored.
+        """
+        normalized = normalize_query(query)
+        catalogue = catalogue_hash(agents)
+        key = self.make_key(namespace, catalogue, normalized)
+        with self._lock:
+            self._track_catalogue(namespace, catalogue)
+            entry = self._get_exact(key)
+            if entry is not None:
+                entry.hits += 1
+                self._stats["exact_hits"] += 1
+                return self._serve(entry, MATCH_EXACT, query)
+            waiting = self._in_flight.get(key)
+            if waiting is None:
+                running = self._in_flight[key] = _InFlight()
+
+        if waiting is not None:
+            # The same query is being planned right now: share that plan
+            waiting.done.wait()
+            with self._lock:
+                self._stats["coalesced"] += 1
+            if waiting.error is not None:
+                raise waiting.error
+            return copy.deepcopy(waiting.value)
+
+        try:
+            if semantic:
+                try:
+                    found = self._get_semantic(namespace, catalogue, normalized, threshold)
+                except Exception as e:
+                    logger.warning(f"⚠️ Semantic plan lookup failed: {e}")
+                    found = None
+                if found is not None:
+                    entry, similarity = found
+                    with self._lock:
+                        entry.hits += 1
+                        self._stats["semantic_hits"] += 1
+                    logger.info(f"🗂️ Reusing plan for similar query ({similarity}): {entry.query[:60]}")
+                    plan = self._serve(entry, MATCH_SEMANTIC, query, similarity)
+                    running.value = plan
+                    return plan
+
+            with self._lock:
+                self._stats["misses"] += 1
+            plan = planner()
+            running.value = plan
+            if cache_if is None or cache_if(plan):
+                entry = _Plan(namespace, catalogue, query, normalized, copy.deepcopy(plan), time.time() + self.ttl)
+                with self._lock:
+                    # Skip plans whose catalogue was replaced while the planner ran
+                    if self._catalogues.get(namespace) == catalogue:
+                        self._stats["stores"] += 1
+                        self._put(key, entry)
+            return plan
+        except BaseException as e:
+            running.error = e
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            running.done.set()
+
+    def invalidate(self, namespace: Optional[str] = None) -> int:
+        """Drop every plan (of one namespace); returns how many were dropped"""
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if namespace is None or entry.namespace == namespace]
+            for key in keys:
+                del self._entries[key]
+            self._stats["invalidated"] += len(keys)
+        return len(keys)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            namespaces: Dict[str, int] = {}
+            for entry in self._entries.values():
+                namespaces[entry.namespace] = namespaces.get(entry.namespace, 0) + 1
+            entries = len(self._entries)
+        hits = stats["exact_hits"] + stats["semantic_hits"] + stats["coalesced"]
+        return {
+            **stats,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "similarity_threshold": self.similarity_threshold if self.similarity_threshold is not None else SEMANTIC_THRESHOLD,
+            "namespaces": namespaces,
+            "catalogues": dict(self._catalogues),
+            "hit_rate": round(hits / (hits + stats["misses"]), 3) if hits + stats["misses"] else 0.0
+        }
+
+# Global cache shared by the planners in this process
+_plan_cache: Optional[PlanCache] = None
+_plan_cache_lock = threading.Lock()
+
+def get_plan_cache() -> PlanCache:
+    global _plan_cache
+    with _plan_cache_lock:
+        if _plan_cache is None:
+            _plan_cache = PlanCache()
+        return _plan_cache
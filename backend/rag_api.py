@@ -3,10 +3,10 @@ Real RAG Service Backend for Document Processing and Chat
 """
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 import os
 import json
 import asyncio
-import aiohttp
 from typing import Dict, Any, List, Optional
 import logging
 from pydantic import BaseModel
@@ -17,8 +17,12 @@ import sqlite3
 import uuid
 import tempfile
 import shutil
-import io
 from PyPDF2 import PdfReader
+import math
+from ingestion_queue import IngestionJob, IngestionJobQueue, get_process_pool, INGEST_PROCESS_POOL_SIZE
+from ollama_client import OllamaError, get_ollama_client
+from db_helper import get_db_manager
+from hybrid_retrieval import build_fts_query
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -44,6 +48,9 @@ app.add_middleware(
 
 # Database setup
 DB_PATH = "rag_documents.db"
+# Retrieval runs on every query; keep one configured connection per thread
+db_manager = get_db_manager()
+FTS_AVAILABLE = False  # set by init_chunk_index
 
 def init_database():
     """Initialize the RAG documents database"""
@@ -80,9 +87,71 @@ def init_database():
         )
     """)
     
+    # Page provenance for chunks (added after the initial schema)
+    cursor.execute("PRAGMA table_info(document_chunks)")
+    if "page_number" not in [column[1] for column in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE document_chunks ADD COLUMN page_number INTEGER")
+    
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_documents_content_hash ON documents (content_hash)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_document_chunks_document ON document_chunks (document_id, chunk_index)")
+    
     conn.commit()
+    
+    init_chunk_index(conn)
     conn.close()
 
+def init_chunk_index(conn: sqlite3.Connection):
+    """
+    Create the FTS5 full-text index over chunk content (BM25 ranking).
+    New chunks are indexed by trigger; deletions go through delete_chunk_index.
+    Chunks are keyed by chunk_id rather than rowid because VACUUM may renumber rowids.
+    """
+    global FTS_AVAILABLE
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS document_chunks_fts USING fts5(
+                content,
+                chunk_id UNINDEXED,
+                document_id UNINDEXED,
+                tokenize = 'porter unicode61'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        logger.warning(f"FTS5 not available in this SQLite build, falling back to keyword scan: {str(e)}")
+        FTS_AVAILABLE = False
+        return
+    
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS document_chunks_fts_insert AFTER INSERT ON document_chunks
+        BEGIN
+            INSERT INTO document_chunks_fts (content, chunk_id, document_id)
+            VALUES (new.content, new.id, new.document_id);
+        END
+    """)
+    
+    # Backfill chunks stored before the index existed
+    cursor.execute("SELECT COUNT(*) FROM document_chunks_fts")
+    if cursor.fetchone()[0] == 0:
+        cursor.execute("""
+            INSERT INTO document_chunks_fts (content, chunk_id, document_id)
+            SELECT content, id, document_id FROM document_chunks
+        """)
+        if cursor.rowcount > 0:
+            logger.info(f"Indexed {cursor.rowcount} existing chunks for full-text search")
+    
+    conn.commit()
+    FTS_AVAILABLE = True
+
+def delete_chunk_index(cursor: sqlite3.Cursor, document_id: Optional[str] = None):
+    """Remove a document's chunks (or all chunks) from the full-text index"""
+    if not FTS_AVAILABLE:
+        return
+    if document_id is None:
+        cursor.execute("DELETE FROM document_chunks_fts")
+    else:
+        cursor.execute("DELETE FROM document_chunks_fts WHERE document_id = ?", (document_id,))
+
 # Initialize database on startup
 init_database()
 
@@ -104,6 +173,14 @@ class ProcessingResult(BaseModel):
     error: Optional[str] = None
 
 OLLAMA_HOST = "http://localhost:11434"
+ollama_client = get_ollama_client()
+
+# Smallest page range handed to one extraction task
+MIN_PAGES_PER_TASK = 8
+# Chunks written per executemany call while a document streams in
+CHUNK_INSERT_BATCH = 200
+# Characters consecutive chunks share, also across page boundaries
+CHUNK_OVERLAP = 400
 
 @app.get("/")
 async def root():
@@ -122,36 +199,24 @@ async def health_check():
 async def get_rag_status():
     """Get RAG system status and statistics"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # Get document statistics
-        cursor.execute("SELECT COUNT(*) FROM documents WHERE processing_status = 'completed'")
-        total_documents = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM document_chunks")
-        total_chunks = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM documents WHERE processing_status = 'processing'")
-        processing_documents = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM documents WHERE processing_status = 'error'")
-        error_documents = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT SUM(file_size) FROM documents WHERE processing_status = 'completed'")
-        total_size = cursor.fetchone()[0] or 0
-        
-        conn.close()
+        # Get document statistics in one pass over documents
+        total_documents, processing_documents, error_documents, total_size = db_manager.query_one(DB_PATH, """
+            SELECT
+                COUNT(CASE WHEN processing_status = 'completed' THEN 1 END),
+                COUNT(CASE WHEN processing_status IN ('pending', 'processing') THEN 1 END),
+                COUNT(CASE WHEN processing_status = 'error' THEN 1 END),
+                COALESCE(SUM(CASE WHEN processing_status = 'completed' THEN file_size END), 0)
+            FROM documents
+        """)
+        total_chunks = db_manager.query_one(DB_PATH, "SELECT COUNT(*) FROM document_chunks")[0]
         
         # Check Ollama status
         ollama_status = "unknown"
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{OLLAMA_HOST}/api/tags", timeout=5) as response:
-                    if response.status == 200:
-                        ollama_status = "running"
-                    else:
-                        ollama_status = "error"
+            await ollama_client.aget_json("/api/tags", host=OLLAMA_HOST, timeout=5)
+            ollama_status = "running"
+        except OllamaError:
+            ollama_status = "error"
         except:
             ollama_status = "not_running"
         
@@ -165,6 +230,7 @@ async def get_rag_status():
                 "total_size_bytes": total_size
             },
             "ollama_status": ollama_status,
+            "ollama_client": ollama_client.get_metrics(recent=0),
             "database_path": DB_PATH
         }
     except Exception as e:
@@ -175,10 +241,7 @@ async def get_rag_status():
 async def get_documents():
     """Get list of all processed documents"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
+        rows = db_manager.execute_query(DB_PATH, """
             SELECT id, filename, file_type, file_size, upload_time, 
                    processing_status, chunks_created, pages_processed, 
                    processing_time_ms, error_message, model_used, content_preview
@@ -187,7 +250,7 @@ async def get_documents():
         """)
         
         documents = []
-        for row in cursor.fetchall():
+        for row in rows:
             documents.append({
                 "id": row[0],
                 "filename": row[1],
@@ -203,7 +266,6 @@ async def get_documents():
                 "content_preview": row[11]
             })
         
-        conn.close()
         return {"documents": documents}
     except Exception as e:
         logger.error(f"Error getting documents: {str(e)}")
@@ -212,9 +274,13 @@ async def get_documents():
 @app.post("/api/rag/ingest")
 async def ingest_document(
     file: UploadFile = File(...),
-    model: Optional[str] = Form("llama3.2")
+    model: Optional[str] = Form("llama3.2"),
+    background: Optional[bool] = Form(False)
 ):
-    """Process and ingest a document into the RAG system"""
+    """
+    Process and ingest a document into the RAG system.
+    Work runs on the shared ingestion queue; with background=true the job id is returned right away.
+    """
     start_time = time.time()
     document_id = str(uuid.uuid4())
     
@@ -234,60 +300,38 @@ async def ingest_document(
         cursor.execute("""
             INSERT INTO documents (id, filename, file_type, file_size, content_hash, 
                                  processing_status, model_used)
-            VALUES (?, ?, ?, ?, ?, 'processing', ?)
+            VALUES (?, ?, ?, ?, ?, 'pending', ?)
         """, (document_id, file.filename, file.content_type or 'unknown', 
               file_size, content_hash, model))
         conn.commit()
         conn.close()
         
-        # Process document based on type
-        processing_result = await process_document_content(
-            document_id, file.filename, content, file.content_type or '', model
+        job = await ingestion_queue.submit(
+            document_id, file.filename,
+            content=content,
+            content_type=file.content_type or '',
+            content_hash=content_hash,
+            file_size=file_size,
+            model=model
         )
         
-        processing_time = int((time.time() - start_time) * 1000)
-        
-        # Update database with results
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        if processing_result["success"]:
-            cursor.execute("""
-                UPDATE documents 
-                SET processing_status = 'completed', 
-                    chunks_created = ?, 
-                    pages_processed = ?,
-                    processing_time_ms = ?,
-                    content_preview = ?
-                WHERE id = ?
-            """, (processing_result["chunks_created"], 
-                  processing_result["pages_processed"],
-                  processing_time,
-                  processing_result["content_preview"],
-                  document_id))
-        else:
-            cursor.execute("""
-                UPDATE documents 
-                SET processing_status = 'error', 
-                    error_message = ?,
-                    processing_time_ms = ?
-                WHERE id = ?
-            """, (processing_result["error"], processing_time, document_id))
-        
-        conn.commit()
-        conn.close()
+        if background:
+            return {
+                "success": True,
+                "job_id": job.job_id,
+                "document_id": document_id,
+                "filename": file.filename,
+                "status": job.status,
+                "status_url": f"/api/rag/ingest/jobs/{job.job_id}"
+            }
         
-        return {
-            "success": processing_result["success"],
-            "document_id": document_id,
-            "filename": file.filename,
-            "chunks_created": processing_result["chunks_created"],
-            "pages_processed": processing_result["pages_processed"],
-            "processing_time_ms": processing_time,
-            "file_size": file_size,
-            "content_preview": processing_result["content_preview"],
-            "error": processing_result.get("error")
-        }
+        result = await job.wait()
+        if result is None:
+            raise Exception(job.error or "Ingestion failed")
+        return {**result, "job_id": job.job_id}
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error ingesting document: {str(e)}")
         # Update database with error
@@ -308,51 +352,281 @@ async def ingest_document(
         
         raise HTTPException(status_code=500, detail=f"Failed to process document: {str(e)}")
 
-async def process_document_content(document_id: str, filename: str, content: bytes, content_type: str, model: str):
-    """Process document content and create chunks"""
+async def run_ingestion_job(job: IngestionJob, content: bytes, content_type: str, content_hash: str, file_size: int, model: str):
+    """Ingestion queue handler: process one uploaded document and record the outcome"""
+    document_id = job.document_id
+    filename = job.filename
+    
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute("UPDATE documents SET processing_status = 'processing' WHERE id = ?", (document_id,))
+    conn.commit()
+    conn.close()
+    
+    # Identical uploads reuse the chunks of the earlier copy instead of being re-processed
+    processing_result = reuse_document_chunks(document_id, content_hash, model)
+    if processing_result is not None:
+        job.log_callback("success", "ready", f"♻️ Reused {processing_result['chunks_created']} chunks from an identical upload", document_id, filename)
+    else:
+        processing_result = await process_document_content(
+            document_id, filename, content, content_type, model, log_callback=job.log_callback
+        )
+    
+    processing_time = int((time.time() - job.created_at) * 1000)
+    
+    # Update database with results
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    if processing_result["success"]:
+        cursor.execute("""
+            UPDATE documents 
+            SET processing_status = 'completed', 
+                chunks_created = ?, 
+                pages_processed = ?,
+                processing_time_ms = ?,
+                content_preview = ?
+            WHERE id = ?
+        """, (processing_result["chunks_created"], 
+              processing_result["pages_processed"],
+              processing_time,
+              processing_result["content_preview"],
+              document_id))
+    else:
+        cursor.execute("""
+            UPDATE documents 
+            SET processing_status = 'error', 
+                error_message = ?,
+                processing_time_ms = ?
+            WHERE id = ?
+        """, (processing_result["error"], processing_time, document_id))
+    
+    conn.commit()
+    conn.close()
+    
+    return {
+        "success": processing_result["success"],
+        "document_id": document_id,
+        "filename": filename,
+        "chunks_created": processing_result["chunks_created"],
+        "pages_processed": processing_result["pages_processed"],
+        "processing_time_ms": processing_time,
+        "file_size": file_size,
+        "content_preview": processing_result["content_preview"],
+        "error": processing_result.get("error")
+    }
+
+ingestion_queue = IngestionJobQueue(run_ingestion_job)
+
+@app.get("/api/rag/ingest/jobs")
+async def list_ingestion_jobs():
+    """List recent ingestion jobs"""
+    return {"jobs": ingestion_queue.list_jobs(), "stats": ingestion_queue.get_stats()}
+
+@app.get("/api/rag/ingest/jobs/{job_id}")
+async def get_ingestion_job(job_id: str):
+    """Get progress, events and result of an ingestion job"""
+    job = ingestion_queue.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return job.to_dict()
+
+@app.on_event("shutdown")
+async def shutdown_ingestion_queue():
+    await ingestion_queue.shutdown()
+    await ollama_client.aclose()
+
+def reuse_document_chunks(document_id: str, content_hash: str, model: str):
+    """Copy chunks from a completed document with the same content hash, if one exists"""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
     try:
+        cursor.execute("""
+            SELECT id, pages_processed, content_preview
+            FROM documents
+            WHERE content_hash = ? AND processing_status = 'completed' AND id != ?
+            ORDER BY upload_time DESC
+            LIMIT 1
+        """, (content_hash, document_id))
+        source = cursor.fetchone()
+        if not source:
+            return None
+        
+        source_id, pages_processed, content_preview = source
+        cursor.execute("""
+            SELECT chunk_index, content, chunk_size, page_number
+            FROM document_chunks
+            WHERE document_id = ?
+            ORDER BY chunk_index
+        """, (source_id,))
+        chunks = cursor.fetchall()
+        if not chunks:
+            return None
+        
+        cursor.executemany("""
+            INSERT INTO document_chunks (id, document_id, chunk_index, content, chunk_size, embedding_model, page_number)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [(str(uuid.uuid4()), document_id, chunk_index, chunk_content, chunk_size, model, page_number)
+              for chunk_index, chunk_content, chunk_size, page_number in chunks])
+        conn.commit()
+        
+        logger.info(f"Reused {len(chunks)} chunks from identical document {source_id}")
+        return {
+            "success": True,
+            "chunks_created": len(chunks),
+            "pages_processed": pages_processed,
+            "content_preview": content_preview
+        }
+    finally:
+        conn.close()
+
+def count_pdf_pages(pdf_path: str) -> int:
+    """Number of pages in a PDF (runs in the ingestion process pool)"""
+    return len(PdfReader(pdf_path).pages)
+
+def extract_pdf_pages(pdf_path: str, start: int, end: int):
+    """Extract text for pages [start, end) of a PDF (runs in the ingestion process pool)"""
+    pdf_reader = PdfReader(pdf_path)
+    pages = []
+    for page_num in range(start, end):
+        try:
+            page_text = pdf_reader.pages[page_num].extract_text() or ""
+            if page_text.strip():  # Only keep non-empty pages
+                pages.append((page_num + 1, page_text.strip()))
+        except Exception as e:
+            logger.warning(f"Failed to extract text from page {page_num + 1}: {str(e)}")
+    return pages
+
+async def iter_pdf_pages(content: bytes, stats: Dict[str, Any]):
+    """
+    Yield (page_number, text) in page order.
+    Page ranges are extracted in parallel across the process pool, so later ranges
+    are being parsed while earlier pages are already chunked and stored.
+    """
+    # Workers read the PDF from disk rather than receiving a copy of the bytes per task
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
+        temp_file.write(content)
+        pdf_path = temp_file.name
+    
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    futures = []
+    try:
+        total_pages = await loop.run_in_executor(pool, count_pdf_pages, pdf_path)
+        stats["pages_processed"] = total_pages
+        
+        pages_per_task = max(MIN_PAGES_PER_TASK, math.ceil(total_pages / (INGEST_PROCESS_POOL_SIZE * 2)))
+        futures = [
+            loop.run_in_executor(pool, extract_pdf_pages, pdf_path, start, min(start + pages_per_task, total_pages))
+            for start in range(0, total_pages, pages_per_task)
+        ]
+        
+        for future in futures:
+            for page in await future:
+                yield page
+    finally:
+        for future in futures:
+            future.cancel()
+        try:
+            os.unlink(pdf_path)
+        except:
+            pass
+    
+async def iter_text_pages(text_content: str, stats: Dict[str, Any]):
+    """Plain text documents are treated as a single page"""
+    stats["pages_processed"] = 1
+    yield 1, text_content
+
+def store_chunk_batch(conn: sqlite3.Connection, insert_sql: str, batch: List[tuple]):
+    """Write and commit one batch of chunks (runs in a worker thread, off the event loop)"""
+    conn.executemany(insert_sql, batch)
+    conn.commit()
+
+async def process_document_content(document_id: str, filename: str, content: bytes, content_type: str, model: str, log_callback=None):
+    """Process document content and create chunks, streaming them into the database in batches"""
+    conn = None
+    try:
+        if log_callback:
+            log_callback("info", "extracting", f"📄 Extracting text from {filename}", document_id, filename)
+        
         # Extract text based on file type
+        stats = {"pages_processed": 0}
         if content_type == "application/pdf" or filename.lower().endswith('.pdf'):
-            text_content, pages_processed = await extract_pdf_text(content)
+            pages = iter_pdf_pages(content, stats)
         elif content_type.startswith("text/") or filename.lower().endswith(('.txt', '.md')):
-            text_content = content.decode('utf-8')
-            pages_processed = 1
+            pages = iter_text_pages(content.decode('utf-8'), stats)
         else:
             # Try to decode as text
             try:
-                text_content = content.decode('utf-8')
-                pages_processed = 1
+                pages = iter_text_pages(content.decode('utf-8'), stats)
             except:
                 raise Exception(f"Unsupported file type: {content_type}")
         
-        # Create chunks
-        chunks = create_text_chunks(text_content)
+        # Batches are written from worker threads, one at a time
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        insert_sql = """
+            INSERT INTO document_chunks (id, document_id, chunk_index, content, chunk_size, embedding_model, page_number)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """
+        
+        # Chunk each page as it arrives and store chunks in batches
+        batch = []
+        chunks_created = 0
+        content_preview = ""
+        # Tail of the last page with text, so chunks overlap across page boundaries too
+        carry = ""
+        async for page_number, page_text in pages:
+            # Blank pages add no chunks and keep the carry of the page before them
+            if not page_text.strip():
+                continue
+            if not content_preview:
+                content_preview = page_text[:200] + "..." if len(page_text) > 200 else page_text
+        
+            window = f"{carry}\n{page_text}" if carry else page_text
+            for chunk in iter_text_chunks(window, overlap=CHUNK_OVERLAP):
+                # A chunk made only of the previous page's tail was already stored under that page
+                if carry and chunk in carry:
+                    continue
+                batch.append((str(uuid.uuid4()), document_id, chunks_created, chunk, len(chunk), model, page_number))
+                chunks_created += 1
+            # Only this page's own text carries over, so short pages never drag older tails along
+            carry = page_text[-CHUNK_OVERLAP:]
+            
+            if len(batch) >= CHUNK_INSERT_BATCH:
+                await asyncio.to_thread(store_chunk_batch, conn, insert_sql, batch)
+                batch = []
+                if log_callback:
+                    log_callback("info", "chunking", f"✂️ {chunks_created} chunks stored (page {page_number}/{stats['pages_processed']})", document_id, filename)
         
-        # Store chunks in database
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        for i, chunk in enumerate(chunks):
-            chunk_id = str(uuid.uuid4())
-            cursor.execute("""
-                INSERT INTO document_chunks (id, document_id, chunk_index, content, chunk_size, embedding_model)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (chunk_id, document_id, i, chunk, len(chunk), model))
+        if batch:
+            await asyncio.to_thread(store_chunk_batch, conn, insert_sql, batch)
         
-        conn.commit()
-        conn.close()
+        if chunks_created == 0:
+            raise Exception("No text content could be extracted from the document")
         
-        # Create content preview
-        content_preview = text_content[:200] + "..." if len(text_content) > 200 else text_content
+        logger.info(f"Processed {filename}: {stats['pages_processed']} pages, {chunks_created} chunks")
+        if log_callback:
+            log_callback("success", "chunking", f"✂️ Created {chunks_created} chunks from {stats['pages_processed']} pages", document_id, filename,
+                         {"chunks": chunks_created, "pages": stats["pages_processed"]})
+            log_callback("success", "ready", f"✅ Document ready for chat: {filename}", document_id, filename)
         
         return {
             "success": True,
-            "chunks_created": len(chunks),
-            "pages_processed": pages_processed,
+            "chunks_created": chunks_created,
+            "pages_processed": stats["pages_processed"],
             "content_preview": content_preview
         }
         
     except Exception as e:
         logger.error(f"Error processing document content: {str(e)}")
+        # Drop any batches already written for this document
+        if conn:
+            try:
+                conn.rollback()
+                cursor = conn.cursor()
+                delete_chunk_index(cursor, document_id)
+                cursor.execute("DELETE FROM document_chunks WHERE document_id = ?", (document_id,))
+                conn.commit()
+            except:
+                pass
         return {
             "success": False,
             "chunks_created": 0,
@@ -360,69 +634,35 @@ async def process_document_content(document_id: str, filename: str, content: byt
             "content_preview": "",
             "error": str(e)
         }
+    finally:
+        if conn:
+            conn.close()
 
-async def extract_pdf_text(content: bytes):
-    """Extract text from PDF content using PyPDF2"""
-    try:
-        # Create a BytesIO object from the PDF content
-        pdf_buffer = io.BytesIO(content)
-        
-        # Read the PDF
-        pdf_reader = PdfReader(pdf_buffer)
-        
-        # Extract text from all pages
-        text_parts = []
-        pages_processed = len(pdf_reader.pages)
-        
-        for page_num, page in enumerate(pdf_reader.pages):
-            try:
-                page_text = page.extract_text()
-                if page_text.strip():  # Only add non-empty pages
-                    text_parts.append(f"--- Page {page_num + 1} ---\n{page_text.strip()}")
-            except Exception as e:
-                logger.warning(f"Failed to extract text from page {page_num + 1}: {str(e)}")
-                continue
-        
-        # Combine all text
-        full_text = "\n\n".join(text_parts)
-        
-        if not full_text.strip():
-            raise Exception("No text content could be extracted from the PDF")
-        
-        logger.info(f"Successfully extracted text from PDF: {pages_processed} pages, {len(full_text)} characters")
-        
-        return full_text, pages_processed
-        
-    except Exception as e:
-        logger.error(f"Failed to extract PDF text: {str(e)}")
-        raise Exception(f"Failed to extract PDF text: {str(e)}")
-
-def create_text_chunks(text: str, chunk_size: int = 2000, overlap: int = 400):
-    """Create overlapping text chunks"""
-    chunks = []
+def iter_text_chunks(text: str, chunk_size: int = 2000, overlap: int = CHUNK_OVERLAP):
+    """Yield overlapping text chunks, preferring to break at sentence or line boundaries"""
     start = 0
-    
-    while start < len(text):
+    text_length = len(text)
+        
+    while start < text_length:
         end = start + chunk_size
-        chunk = text[start:end]
         
-        # Try to break at sentence boundaries
-        if end < len(text):
-            last_period = chunk.rfind('.')
-            last_newline = chunk.rfind('\n')
-            break_point = max(last_period, last_newline)
-            
+        # Try to break at sentence boundaries (searched in place, without slicing)
+        if end < text_length:
+            break_point = max(text.rfind('.', start, end), text.rfind('\n', start, end))
             if break_point > start + chunk_size // 2:
-                chunk = text[start:start + break_point + 1]
-                end = start + break_point + 1
+                end = break_point + 1
         
-        chunks.append(chunk.strip())
-        start = end - overlap
+        chunk = text[start:end].strip()
+        if chunk:
+            yield chunk
         
-        if start >= len(text):
+        if end >= text_length:
             break
-    
-    return [chunk for chunk in chunks if chunk.strip()]
+        start = end - overlap
+
+def create_text_chunks(text: str, chunk_size: int = 2000, overlap: int = CHUNK_OVERLAP):
+    """Create overlapping text chunks"""
+    return list(iter_text_chunks(text, chunk_size, overlap))
 
 @app.post("/api/rag/query")
 async def query_documents(request: QueryRequest):
@@ -446,25 +686,14 @@ async def query_documents(request: QueryRequest):
             }
         
         # Generate response using Ollama
-        context = "\n\n".join([chunk["content"] for chunk in chunks])
-        prompt = f"""Based on the following document excerpts, please answer the question: "{request.query}"
-
-Document excerpts:
-{context}
-
-Please provide a comprehensive answer based on the information provided. If the information is insufficient, please say so."""
-        
+        context, prompt = build_rag_prompt(request.query, chunks)
         response = await generate_ollama_response(request.model_name, prompt)
         
         # Get sources
         sources = list(set([chunk["filename"] for chunk in chunks]))
         
         # Get total available chunks
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM document_chunks")
-        total_chunks = cursor.fetchone()[0]
-        conn.close()
+        total_chunks = db_manager.query_one(DB_PATH, "SELECT COUNT(*) FROM document_chunks")[0]
         
         return {
             "success": True,
@@ -486,8 +715,129 @@ Please provide a comprehensive answer based on the information provided. If the
             "context_length": 0
         }
 
+def build_rag_prompt(query: str, chunks: List[Dict[str, Any]]):
+    """Build the answer prompt from retrieved chunks; returns (context, prompt)"""
+    context = "\n\n".join([chunk["content"] for chunk in chunks])
+    prompt = f"""Based on the following document excerpts, please answer the question: "{query}"
+
+Document excerpts:
+{context}
+
+Please provide a comprehensive answer based on the information provided. If the information is insufficient, please say so."""
+    return context, prompt
+
+def sse_event(data: Dict[str, Any]) -> str:
+    """Format one server-sent event"""
+    return f"data: {json.dumps(data)}\n\n"
+
+@app.post("/api/rag/query/stream")
+async def query_documents_stream(request: QueryRequest):
+    """
+    Streaming variant of /api/rag/query (server-sent events).
+    Emits a 'sources' event right after retrieval, 'token' events as Ollama generates,
+    and a final 'done' event with the full response and timing (TTFT, total, tokens/s).
+    """
+    async def event_stream():
+        start_time = time.time()
+        try:
+            chunks = await retrieve_relevant_chunks(request.query, request.document_ids, request.max_chunks)
+            retrieval_ms = int((time.time() - start_time) * 1000)
+            
+            yield sse_event({
+                "type": "sources",
+                "sources": list(dict.fromkeys(chunk["filename"] for chunk in chunks)),
+                "chunks": [{"filename": chunk["filename"], "page_number": chunk.get("page_number"), "chunk_index": chunk["chunk_index"]} for chunk in chunks],
+                "chunks_retrieved": len(chunks),
+                "context_length": sum(len(chunk["content"]) for chunk in chunks),
+                "retrieval_ms": retrieval_ms
+            })
+            
+            if not chunks:
+                message = "I couldn't find relevant information in your documents to answer this question."
+                yield sse_event({"type": "token", "content": message})
+                yield sse_event({"type": "done", "success": True, "response": message, "retrieval_ms": retrieval_ms,
+                                 "ttft_ms": None, "total_ms": int((time.time() - start_time) * 1000)})
+                return
+            
+            _, prompt = build_rag_prompt(request.query, chunks)
+            
+            response_parts = []
+            first_token_time = None
+            final = {}
+            async for part in stream_ollama_response(request.model_name, prompt):
+                token = part.get("response", "")
+                if token:
+                    if first_token_time is None:
+                        first_token_time = time.time()
+                    response_parts.append(token)
+                    yield sse_event({"type": "token", "content": token})
+                if part.get("done"):
+                    final = part
+            
+            eval_seconds = (final.get("eval_duration") or 0) / 1e9
+            yield sse_event({
+                "type": "done",
+                "success": True,
+                "response": "".join(response_parts),
+                "retrieval_ms": retrieval_ms,
+                "ttft_ms": int((first_token_time - start_time) * 1000) if first_token_time else None,
+                "total_ms": int((time.time() - start_time) * 1000),
+                "eval_count": final.get("eval_count"),
+                "tokens_per_second": round(final["eval_count"] / eval_seconds, 2) if final.get("eval_count") and eval_seconds else None
+            })
+            
+        except Exception as e:
+            logger.error(f"Error streaming query response: {str(e)}")
+            yield sse_event({"type": "error", "success": False, "error": str(e),
+                             "total_ms": int((time.time() - start_time) * 1000)})
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 async def retrieve_relevant_chunks(query: str, document_ids: Optional[List[str]], max_chunks: int):
-    """Retrieve relevant chunks for the query"""
+    """Retrieve the top chunks for the query, ranked by BM25 over the full-text index"""
+    if not FTS_AVAILABLE:
+        return scan_relevant_chunks(query, document_ids, max_chunks)
+    
+    try:
+        fts_query = build_fts_query(query)
+        if not fts_query:
+            return []
+        
+        sql = """
+            SELECT dc.content, d.filename, dc.chunk_index, dc.page_number, dc.document_id,
+                   bm25(document_chunks_fts) AS rank
+            FROM document_chunks_fts
+            JOIN document_chunks dc ON dc.id = document_chunks_fts.chunk_id
+            JOIN documents d ON dc.document_id = d.id
+            WHERE document_chunks_fts MATCH ? AND d.processing_status = 'completed'
+        """
+        params: List[Any] = [fts_query]
+        if document_ids:
+            placeholders = ','.join(['?' for _ in document_ids])
+            sql += f" AND d.id IN ({placeholders})"
+            params.extend(document_ids)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(max_chunks)
+        
+        rows = db_manager.execute_query(DB_PATH, sql, params)
+        
+        # bm25() is lower-is-better; expose it as a positive relevance score
+        return [{
+            "content": content,
+            "filename": filename,
+            "chunk_index": chunk_index,
+            "page_number": page_number,
+            "document_id": document_id,
+            "score": -rank
+        } for content, filename, chunk_index, page_number, document_id, rank in rows]
+        
+    except Exception as e:
+        logger.error(f"Error retrieving chunks: {str(e)}")
+        return []
+
+def scan_relevant_chunks(query: str, document_ids: Optional[List[str]], max_chunks: int):
+    """Keyword-count scan over every chunk, used only when SQLite lacks FTS5"""
     try:
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
@@ -496,7 +846,7 @@ async def retrieve_relevant_chunks(query: str, document_ids: Optional[List[str]]
         if document_ids:
             placeholders = ','.join(['?' for _ in document_ids])
             sql = f"""
-                SELECT dc.content, d.filename, dc.chunk_index
+                SELECT dc.content, d.filename, dc.chunk_index, dc.page_number, dc.document_id
                 FROM document_chunks dc
                 JOIN documents d ON dc.document_id = d.id
                 WHERE d.id IN ({placeholders}) AND d.processing_status = 'completed'
@@ -504,7 +854,7 @@ async def retrieve_relevant_chunks(query: str, document_ids: Optional[List[str]]
             cursor.execute(sql, document_ids)
         else:
             cursor.execute("""
-                SELECT dc.content, d.filename, dc.chunk_index
+                SELECT dc.content, d.filename, dc.chunk_index, dc.page_number, dc.document_id
                 FROM document_chunks dc
                 JOIN documents d ON dc.document_id = d.id
                 WHERE d.processing_status = 'completed'
@@ -517,7 +867,7 @@ async def retrieve_relevant_chunks(query: str, document_ids: Optional[List[str]]
         query_words = query.lower().split()
         scored_chunks = []
         
-        for content, filename, chunk_index in all_chunks:
+        for content, filename, chunk_index, page_number, document_id in all_chunks:
             content_lower = content.lower()
             score = 0
             
@@ -530,6 +880,8 @@ async def retrieve_relevant_chunks(query: str, document_ids: Optional[List[str]]
                     "content": content,
                     "filename": filename,
                     "chunk_index": chunk_index,
+                    "page_number": page_number,
+                    "document_id": document_id,
                     "score": score
                 })
         
@@ -544,20 +896,8 @@ async def retrieve_relevant_chunks(query: str, document_ids: Optional[List[str]]
 async def generate_ollama_response(model: str, prompt: str):
     """Generate response using Ollama"""
     try:
-        payload = {
-            "model": model,
-            "prompt": prompt,
-            "stream": False
-        }
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.post(f"{OLLAMA_HOST}/api/generate", json=payload, timeout=60) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    return result.get("response", "No response generated")
-                else:
-                    error_text = await response.text()
-                    raise Exception(f"Ollama API error: {error_text}")
+        result = await ollama_client.agenerate(model, prompt, host=OLLAMA_HOST, timeout=60)
+        return result.get("response", "No response generated")
                     
     except asyncio.TimeoutError:
         return "Response generation timed out. Please try again."
@@ -565,6 +905,16 @@ async def generate_ollama_response(model: str, prompt: str):
         logger.error(f"Error generating Ollama response: {str(e)}")
         return f"Error generating response: {str(e)}"
 
+async def stream_ollama_response(model: str, prompt: str):
+    """Yield Ollama /api/generate chunks as they arrive (stream=True)"""
+    payload = {
+        "model": model,
+        "prompt": prompt
+    }
+    
+    async for part in ollama_client.astream("/api/generate", payload, host=OLLAMA_HOST):
+        yield part
+
 @app.delete("/api/rag/documents/{document_id}")
 async def delete_document(document_id: str):
     """Delete a document and its chunks"""
@@ -573,6 +923,7 @@ async def delete_document(document_id: str):
         cursor = conn.cursor()
         
         # Delete chunks first
+        delete_chunk_index(cursor, document_id)
         cursor.execute("DELETE FROM document_chunks WHERE document_id = ?", (document_id,))
         
         # Delete document
@@ -597,6 +948,7 @@ async def clear_all_documents():
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
         
+        delete_chunk_index(cursor)
         cursor.execute("DELETE FROM document_chunks")
         cursor.execute("DELETE FROM documents")
         
@@ -12,23 +12,29 @@ This implements proper RAG functionality with:
 """
 
 import os
+import json
+import time
+import asyncio
+import shutil
 import tempfile
 import uuid
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import logging
 
+from ingestion_queue import get_process_pool
+from hybrid_retrieval import LexicalIndex, CrossEncoderReranker, reciprocal_rank_fusion, pack_chunks
+
 try:
     # LangChain imports for real RAG functionality
     from langchain_community.vectorstores import Chroma
     from langchain_community.chat_models import ChatOllama
     from langchain_community.embeddings import FastEmbedEmbeddings
-    from langchain.schema.output_parser import StrOutputParser
     from langchain_community.document_loaders import PyPDFLoader
     from langchain.text_splitter import RecursiveCharacterTextSplitter
-    from langchain.schema.runnable import RunnablePassthrough
     from langchain.prompts import PromptTemplate
     from langchain.vectorstores.utils import filter_complex_metadata
+    from embedding_cache import CachedEmbeddings
     LANGCHAIN_AVAILABLE = True
 except ImportError as e:
     LANGCHAIN_AVAILABLE = False
@@ -36,15 +42,30 @@ except ImportError as e:
 
 logger = logging.getLogger(__name__)
 
+# On-disk location of the persistent Chroma index
+VECTOR_STORE_DIR = "rag_vector_store"
+METADATA_FILENAME = "document_metadata.json"
+# Single collection holding the chunks of every document, tagged with document_id metadata
+INDEX_COLLECTION_NAME = "rag_documents"
+# BM25 index over the same chunks, stored beside the vector index
+LEXICAL_INDEX_FILENAME = "lexical_index.db"
+# Default context budget handed to the LLM
+DEFAULT_CONTEXT_TOKENS = 2000
+
+def load_pdf_pages(file_path: str) -> List[Any]:
+    """Load PDF pages with PyPDFLoader (runs in the ingestion process pool)"""
+    return PyPDFLoader(file_path=file_path).load()
+
 class RealRAGService:
     """Real RAG Service implementing the reference article's functionality"""
     
-    def __init__(self, ollama_host: str = "http://localhost:11434"):
+    def __init__(self, ollama_host: str = "http://localhost:11434", persist_directory: Optional[str] = VECTOR_STORE_DIR):
         self.ollama_host = ollama_host
-        self.vector_stores: Dict[str, Any] = {}  # document_id -> vector_store
-        self.retrievers: Dict[str, Any] = {}     # document_id -> retriever
-        self.chains: Dict[str, Any] = {}         # document_id -> chain
+        # None keeps the index in memory only (lost on restart)
+        self.persist_directory = persist_directory
+        self.vector_store = None  # shared Chroma collection for all documents
         self.documents_metadata: Dict[str, Dict] = {}  # document_id -> metadata
+        self.available_models: set = set()  # Ollama models already verified to respond
         
         if not LANGCHAIN_AVAILABLE:
             logger.error(f"❌ LangChain dependencies not available: {IMPORT_ERROR}")
@@ -56,7 +77,8 @@ class RealRAGService:
             chunk_overlap=100
         )
         
-        self.embeddings = FastEmbedEmbeddings()
+        # Chunks already embedded with the same model (re-uploads, unchanged pages) are served from the cache
+        self.embeddings = CachedEmbeddings(FastEmbedEmbeddings())
         
         # RAG prompt template optimized for document analysis
         self.prompt = PromptTemplate.from_template("""You are a helpful document analysis assistant. Answer the question based ONLY on the provided context from the uploaded documents.
@@ -100,8 +122,161 @@ INSTRUCTIONS:
 
 RESPONSE AS {agent_name}:""")
         
+        if self.persist_directory:
+            os.makedirs(self.persist_directory, exist_ok=True)
+        self._open_index()
+        self.lexical_index = LexicalIndex(
+            os.path.join(self.persist_directory, LEXICAL_INDEX_FILENAME) if self.persist_directory else ":memory:"
+        )
+        self.reranker = CrossEncoderReranker()
+        if self.persist_directory:
+            self.load_persisted_documents()
+            self._backfill_lexical_index()
+        
         logger.info("✅ Real RAG Service initialized with LangChain components")
     
+    def _open_index(self) -> None:
+        """Open (or create) the shared Chroma collection"""
+        self.vector_store = Chroma(
+            collection_name=INDEX_COLLECTION_NAME,
+            embedding_function=self.embeddings,
+            persist_directory=self.persist_directory
+        )
+    
+    def _document_filter(self, document_ids: List[str]) -> Dict[str, Any]:
+        """Chroma metadata filter restricting a search to the given documents"""
+        if len(document_ids) == 1:
+            return {"document_id": document_ids[0]}
+        return {"document_id": {"$in": document_ids}}
+    
+    def _save_documents_metadata(self) -> None:
+        """Write document metadata next to the index so it survives restarts"""
+        if not self.persist_directory:
+            return
+        
+        metadata_path = os.path.join(self.persist_directory, METADATA_FILENAME)
+        temp_path = f"{metadata_path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(self.documents_metadata, f, indent=2)
+        os.replace(temp_path, metadata_path)
+    
+    def load_persisted_documents(self) -> int:
+        """
+        Rehydrate documents_metadata from the persist directory.
+        The shared index is reopened from disk as-is, so startup never recomputes embeddings.
+        """
+        if not self.persist_directory or not os.path.isdir(self.persist_directory):
+            return 0
+        
+        metadata_path = os.path.join(self.persist_directory, METADATA_FILENAME)
+        if os.path.isfile(metadata_path):
+            try:
+                with open(metadata_path) as f:
+                    self.documents_metadata.update(json.load(f))
+            except Exception as e:
+                logger.warning(f"⚠️ Could not read vector store metadata {metadata_path}: {str(e)}")
+        
+        self._migrate_per_document_collections()
+        
+        logger.info(f"📂 Rehydrated {len(self.documents_metadata)} persisted documents from {self.persist_directory}")
+        return len(self.documents_metadata)
+    
+    def _migrate_per_document_collections(self) -> None:
+        """
+        Move collections from the old one-directory-per-document layout into the shared index.
+        Stored embeddings are copied over, nothing is re-embedded.
+        """
+        migrated = 0
+        for entry in sorted(os.listdir(self.persist_directory)):
+            legacy_path = os.path.join(self.persist_directory, entry)
+            legacy_metadata_path = os.path.join(legacy_path, METADATA_FILENAME)
+            if not os.path.isfile(legacy_metadata_path):
+                continue
+            
+            try:
+                with open(legacy_metadata_path) as f:
+                    metadata = json.load(f)
+                document_id = metadata.pop("document_id")
+                
+                legacy_store = Chroma(
+                    collection_name=entry,
+                    embedding_function=self.embeddings,
+                    persist_directory=legacy_path
+                )
+                data = legacy_store.get(include=["embeddings", "documents", "metadatas"])
+                if data["ids"]:
+                    self.vector_store._collection.add(
+                        ids=[f"{document_id}_{i}" for i in range(len(data["ids"]))],
+                        embeddings=data["embeddings"],
+                        documents=data["documents"],
+                        metadatas=[
+                            {**(chunk_metadata or {}), "document_id": document_id, "chunk_index": i}
+                            for i, chunk_metadata in enumerate(data["metadatas"])
+                        ]
+                    )
+                
+                self.documents_metadata[document_id] = metadata
+                shutil.rmtree(legacy_path, ignore_errors=True)
+                migrated += 1
+            except Exception as e:
+                logger.warning(f"⚠️ Could not migrate legacy collection {legacy_path}: {str(e)}")
+        
+        if migrated:
+            self._save_documents_metadata()
+            logger.info(f"📦 Migrated {migrated} per-document collections into the shared index")
+    
+    def _backfill_lexical_index(self) -> None:
+        """Build the BM25 index from the vector index when it is missing (e.g. data persisted before it existed)"""
+        if not self.documents_metadata or self.lexical_index.count() > 0:
+            return
+        
+        data = self.vector_store.get(include=["documents", "metadatas"])
+        self.lexical_index.add_chunks([
+            {
+                "chunk_id": chunk_id,
+                "document_id": metadata.get("document_id"),
+                "content": content,
+                "page": metadata.get("page")
+            }
+            for chunk_id, content, metadata in zip(data["ids"], data["documents"], data["metadatas"])
+        ])
+        logger.info(f"📚 Built lexical index for {len(data['ids'])} existing chunks")
+    
+    def _index_chunks(self, document_id: str, chunks: List[Any]) -> None:
+        """Add a document's chunks to the vector and lexical indexes"""
+        # Tag chunks with their document so searches can filter on it
+        chunk_ids = []
+        for i, chunk in enumerate(chunks):
+            chunk.metadata["document_id"] = document_id
+            chunk.metadata["chunk_index"] = i
+            chunk_ids.append(f"{document_id}_{i}")
+        
+        self.vector_store.add_documents(documents=chunks, ids=chunk_ids)
+        self.lexical_index.add_chunks([
+            {
+                "chunk_id": chunk_id,
+                "document_id": document_id,
+                "content": chunk.page_content,
+                "page": chunk.metadata.get("page")
+            }
+            for chunk_id, chunk in zip(chunk_ids, chunks)
+        ])
+    
+    def ensure_model_available(self, model_name: str) -> None:
+        """Verify an Ollama model responds; the result is cached so it runs once per model, not per document"""
+        if model_name in self.available_models:
+            return
+        
+        logger.info(f"🤖 Testing Ollama model availability: {model_name}")
+        try:
+            test_model = ChatOllama(model=model_name, base_url=self.ollama_host)
+            # Test with a simple query to verify model works
+            test_model.invoke("Test")
+            self.available_models.add(model_name)
+            logger.info(f"🤖 Ollama model {model_name} is available and responding")
+        except Exception as e:
+            raise ValueError(f"Ollama model '{model_name}' not available: {str(e)}. Please ensure the model is downloaded in Ollama")
+    
     def check_dependencies(self) -> Dict[str, Any]:
         """Check if all required dependencies are available"""
         return {
@@ -150,7 +325,10 @@ RESPONSE AS {agent_name}:""")
                 log_callback("info", "loading", f"📄 Loading PDF with PyPDFLoader", document_id, file_path.split('/')[-1])
             
             try:
-                docs = PyPDFLoader(file_path=file_path).load()
+                # PDF parsing is CPU-bound, run it in the shared process pool
+                docs = await asyncio.get_running_loop().run_in_executor(
+                    get_process_pool(), load_pdf_pages, file_path
+                )
                 if not docs:
                     raise ValueError("PDF contains no readable content")
                 logger.info(f"📄 Loaded {len(docs)} pages from PDF")
@@ -187,16 +365,9 @@ RESPONSE AS {agent_name}:""")
                 log_callback("info", "embedding", f"🧠 Generating embeddings with FastEmbed...", document_id, file_path.split('/')[-1])
             
             try:
-                # Create isolated vector store for this document using document_id as collection name
-                collection_name = f"doc_{document_id.replace('-', '_')}"
-                logger.info(f"🧮 Creating isolated collection: {collection_name}")
-                
-                vector_store = Chroma.from_documents(
-                    documents=chunks, 
-                    embedding=self.embeddings,
-                    collection_name=collection_name
-                )
-                logger.info(f"🧮 Vector embeddings created and stored in isolated Chroma collection: {collection_name}")
+                # Embedding runs in a worker thread so other requests keep being served
+                await asyncio.to_thread(self._index_chunks, document_id, chunks)
+                logger.info(f"🧮 Vector embeddings created and stored in shared Chroma collection: {INDEX_COLLECTION_NAME}")
                 if log_callback:
                     log_callback("success", "embedding", f"🧠 Generated embeddings for all chunks", document_id, file_path.split('/')[-1])
             except Exception as e:
@@ -204,51 +375,8 @@ RESPONSE AS {agent_name}:""")
                     log_callback("error", "embedding", f"❌ Vector embedding failed: {str(e)}", document_id, file_path.split('/')[-1])
                 raise ValueError(f"Vector embedding creation failed: {str(e)}. This could be due to: FastEmbed model not available, insufficient memory, or ChromaDB issues")
             
-            # Step 4: Create retriever with similarity search (real semantic search)
-            logger.info("🔍 Setting up semantic similarity retriever...")
-            if log_callback:
-                log_callback("info", "indexing", f"🗄️ Storing vectors in Chroma database...", document_id, file_path.split('/')[-1])
-            
-            try:
-                retriever = vector_store.as_retriever(
-                    search_type="similarity_score_threshold",
-                    search_kwargs={
-                        "k": 3,
-                        "score_threshold": 0.5,
-                    },
-                )
-                if log_callback:
-                    log_callback("success", "indexing", f"🗄️ Vector database indexing completed", document_id, file_path.split('/')[-1])
-            except Exception as e:
-                if log_callback:
-                    log_callback("error", "indexing", f"❌ Retriever setup failed: {str(e)}", document_id, file_path.split('/')[-1])
-                raise ValueError(f"Retriever setup failed: {str(e)}")
-            
-            # Step 5: Test Ollama model availability
-            logger.info(f"🤖 Testing Ollama model availability: {model_name}")
-            try:
-                test_model = ChatOllama(model=model_name, base_url=self.ollama_host)
-                # Test with a simple query to verify model works
-                test_response = test_model.invoke("Test")
-                logger.info(f"🤖 Ollama model {model_name} is available and responding")
-            except Exception as e:
-                raise ValueError(f"Ollama model '{model_name}' not available: {str(e)}. Please ensure the model is downloaded in Ollama")
-            
-            # Step 6: Create RAG chain with Ollama (real LangChain pipeline)
-            logger.info(f"🤖 Creating RAG chain with Ollama model: {model_name}")
-            model = ChatOllama(model=model_name, base_url=self.ollama_host)
-            
-            chain = (
-                {"context": retriever, "question": RunnablePassthrough()}
-                | self.prompt
-                | model
-                | StrOutputParser()
-            )
-            
-            # Store components
-            self.vector_stores[document_id] = vector_store
-            self.retrievers[document_id] = retriever
-            self.chains[document_id] = chain
+            # Step 4: Test Ollama model availability (once per model)
+            await asyncio.to_thread(self.ensure_model_available, model_name)
             
             # Store metadata
             self.documents_metadata[document_id] = {
@@ -260,8 +388,13 @@ RESPONSE AS {agent_name}:""")
                 "vector_store_type": "chroma",
                 "embeddings_type": "fastembed",
                 "chunk_size": 1024,
-                "chunk_overlap": 100
+                "chunk_overlap": 100,
+                "persisted": self.persist_directory is not None
             }
+            self._save_documents_metadata()
+            
+            if log_callback:
+                log_callback("success", "indexing", f"🗄️ Vector database indexing completed", document_id, file_path.split('/')[-1])
             
             logger.info(f"✅ Real RAG ingestion completed for document: {document_id}")
             if log_callback:
@@ -280,6 +413,9 @@ RESPONSE AS {agent_name}:""")
             
         except Exception as e:
             logger.error(f"❌ RAG ingestion failed for {document_id}: {str(e)}")
+            # Don't leave orphaned chunks in the shared index
+            if document_id not in self.documents_metadata:
+                self._delete_document_chunks(document_id)
             return {
                 "status": "error",
                 "document_id": document_id,
@@ -287,85 +423,136 @@ RESPONSE AS {agent_name}:""")
                 "message": f"Failed to ingest document: {str(e)}"
             }
     
-    async def query_documents(self, query: str, document_ids: List[str], model_name: str = "mistral") -> Dict[str, Any]:
+    def _vector_search(self, query: str, k: int, document_ids: Optional[List[str]]) -> List[Dict[str, Any]]:
+        """Top-k chunks by embedding distance from the shared vector index (query embedded once)"""
+        query_embedding = self.embeddings.embed_query(query)
+        search_filter = self._document_filter(document_ids) if document_ids else None
+        results = self.vector_store.similarity_search_by_vector_with_relevance_scores(
+            query_embedding, k=k, filter=search_filter
+        )
+        return [
+            {
+                "chunk_id": f"{doc.metadata.get('document_id')}_{doc.metadata.get('chunk_index')}",
+                "document_id": doc.metadata.get("document_id"),
+                "content": doc.page_content,
+                "metadata": doc.metadata,
+                "vector_distance": distance
+            }
+            for doc, distance in results
+        ]
+    
+    async def retrieve(self, query: str, document_ids: Optional[List[str]] = None, k: int = 5, candidates: int = 20,
+                       rerank: bool = False, max_tokens: int = DEFAULT_CONTEXT_TOKENS) -> List[Dict[str, Any]]:
         """
-        Query documents using real RAG pipeline with enhanced debugging
+        Hybrid retrieval across documents.
+        Vector and BM25 searches run concurrently, are fused with reciprocal-rank fusion,
+        optionally re-ranked by a cross-encoder, and packed under a token budget.
         """
-        try:
-            logger.info(f"🔍 Processing RAG query: {query[:100]}...")
-            
-            # If no document IDs specified, use all available documents
+        # Only filter when a strict subset of the corpus is requested
+        search_ids = document_ids if document_ids and len(document_ids) < len(self.documents_metadata) else None
+        
+        vector_results, lexical_results = await asyncio.gather(
+            asyncio.to_thread(self._vector_search, query, candidates, search_ids),
+            asyncio.to_thread(self.lexical_index.search, query, candidates, search_ids)
+        )
+        logger.info(f"🔍 Hybrid candidates: {len(vector_results)} vector, {len(lexical_results)} lexical")
+        
+        fused = reciprocal_rank_fusion([vector_results, lexical_results])
+        
+        if rerank:
+            if self.reranker.available:
+                fused = await asyncio.to_thread(self.reranker.rerank, query, fused[:candidates])
+            else:
+                logger.warning("⚠️ Cross-encoder re-ranking requested but fastembed reranker is not installed")
+        
+        return pack_chunks(fused, max_tokens, k)
+    
+    async def _retrieve_context(self, query: str, document_ids: List[str], k: int = 5, rerank: bool = False,
+                                max_tokens: int = DEFAULT_CONTEXT_TOKENS) -> Dict[str, Any]:
+        """Resolve the requested documents and retrieve the context chunks used to answer a query"""
+        # If no document IDs specified, use all available documents
+        if not document_ids:
+            document_ids = list(self.documents_metadata.keys())
             if not document_ids:
-                document_ids = list(self.chains.keys())
-                if not document_ids:
-                    return {
-                        "status": "error",
-                        "error": "No documents available",
-                        "message": "No documents have been ingested yet"
-                    }
-                logger.info(f"🔍 No document IDs specified, using all available: {document_ids}")
-            
-            # Check if documents are ingested
-            available_docs = [doc_id for doc_id in document_ids if doc_id in self.chains]
-            if not available_docs:
-                logger.error(f"❌ No ingested documents found. Available chains: {list(self.chains.keys())}")
-                return {
-                    "status": "error",
-                    "error": "No ingested documents found",
-                    "message": "Please ingest documents first before querying"
-                }
-            
-            # Query each document separately and combine results
-            all_relevant_docs = []
-            best_document_id = None
-            best_score = float('inf')
-            
-            for document_id in available_docs:
-                logger.info(f"🔍 Querying document: {document_id}")
-                retriever = self.retrievers[document_id]
-                
-                try:
-                    # Get documents with similarity scores from this specific document
-                    relevant_docs_with_scores = retriever.vectorstore.similarity_search_with_score(query, k=3)
-                    logger.info(f"🔍 Found {len(relevant_docs_with_scores)} chunks in document {document_id[:8]}...")
-                    
-                    for i, (doc, score) in enumerate(relevant_docs_with_scores):
-                        logger.info(f"  Chunk {i+1}: Score={score:.3f}, Content: {doc.page_content[:80]}...")
-                        all_relevant_docs.append((doc, score, document_id))
-                        
-                        # Track the best scoring document
-                        if score < best_score:
-                            best_score = score
-                            best_document_id = document_id
-                            
-                except Exception as e:
-                    logger.error(f"❌ Retrieval failed for document {document_id}: {str(e)}")
-            
-            if not all_relevant_docs:
-                logger.error("❌ No relevant documents found in any document")
                 return {
                     "status": "error",
-                    "error": "No relevant content found",
-                    "message": "No relevant content found for the query"
+                    "error": "No documents available",
+                    "message": "No documents have been ingested yet"
                 }
+            logger.info(f"🔍 No document IDs specified, using all available: {len(document_ids)} documents")
+        
+        # Check if documents are ingested
+        available_docs = [doc_id for doc_id in document_ids if doc_id in self.documents_metadata]
+        if not available_docs:
+            logger.error(f"❌ No ingested documents found. Available documents: {list(self.documents_metadata.keys())}")
+            return {
+                "status": "error",
+                "error": "No ingested documents found",
+                "message": "Please ingest documents first before querying"
+            }
+        
+        try:
+            results = await self.retrieve(query, available_docs, k=k, rerank=rerank, max_tokens=max_tokens)
+        except Exception as e:
+            logger.error(f"❌ Retrieval failed: {str(e)}")
+            results = []
+        
+        if not results:
+            logger.error("❌ No relevant documents found in any document")
+            return {
+                "status": "error",
+                "error": "No relevant content found",
+                "message": "No relevant content found for the query"
+            }
+        
+        for i, result in enumerate(results):
+            logger.info(f"  Chunk {i+1}: RRF={result['rrf_score']:.4f}, Document={str(result['document_id'])[:8]}, Content: {result['content'][:80]}...")
+        
+        relevant_chunks = [result["content"] for result in results]
+        sources = [f"Page {result['metadata'].get('page', 'unknown')}" for result in results]
+        matched_document_ids = list(dict.fromkeys(result["document_id"] for result in results))
+        context = "\n\n".join(relevant_chunks)
+        
+        # Metadata of the top-ranked document, kept for existing response consumers
+        doc_metadata = self.documents_metadata.get(matched_document_ids[0], {})
+        
+        return {
+            "status": "success",
+            "results": results,
+            "relevant_chunks": relevant_chunks,
+            "sources": sources,
+            "context": context,
+            "document_id": matched_document_ids[0],
+            "document_ids": matched_document_ids,
+            "chunks_retrieved": len(relevant_chunks),
+            "chunks_available": doc_metadata.get('chunks_created', 0),
+            "context_length": len(context),
+            "document_metadata": {
+                "filename": doc_metadata.get('filename', 'unknown'),
+                "pages_processed": doc_metadata.get('pages_processed', 0),
+                "chunks_created": doc_metadata.get('chunks_created', 0),
+                "ingested_at": doc_metadata.get('ingested_at', 'unknown')
+            }
+        }
+    
+    async def query_documents(self, query: str, document_ids: List[str], model_name: str = "mistral", k: int = 5,
+                              rerank: bool = False, max_context_tokens: int = DEFAULT_CONTEXT_TOKENS) -> Dict[str, Any]:
+        """
+        Query documents using real RAG pipeline with enhanced debugging.
+        Context comes from hybrid retrieval and may span several documents.
+        """
+        try:
+            logger.info(f"🔍 Processing RAG query: {query[:100]}...")
             
-            # Use the best scoring document for the response
-            logger.info(f"🎯 Best match from document: {best_document_id[:8]}... (score: {best_score:.3f})")
-            
-            # Get relevant docs from the best document only
-            relevant_docs = [doc for doc, score, doc_id in all_relevant_docs if doc_id == best_document_id and score < 1.0]
-            
-            if not relevant_docs:
-                # Fallback to top scoring chunks regardless of threshold
-                relevant_docs = [doc for doc, score, doc_id in sorted(all_relevant_docs, key=lambda x: x[1])[:3]]
-            
-            relevant_chunks = [doc.page_content for doc in relevant_docs]
-            sources = [f"Page {doc.metadata.get('page', 'unknown')}" for doc in relevant_docs]
+            retrieved = await self._retrieve_context(query, document_ids, k=k, rerank=rerank, max_tokens=max_context_tokens)
+            if retrieved["status"] != "success":
+                return retrieved
             
-            logger.info(f"🔍 Retrieved {len(relevant_chunks)} chunks for context")
+            relevant_chunks = retrieved["relevant_chunks"]
+            logger.info(f"🔍 Retrieved {len(relevant_chunks)} chunks from {len(retrieved['document_ids'])} documents for context")
             
             # Step 2: Prepare context
-            context = "\n\n".join(relevant_chunks)
+            context = retrieved["context"]
             logger.info(f"🔍 Context length: {len(context)} characters")
             logger.info(f"🔍 Context preview: {context[:200]}...")
             
@@ -378,7 +565,7 @@ RESPONSE AS {agent_name}:""")
                 logger.info(f"✅ Context contains {len(context.split())} words")
             
             # Step 3: Execute the model with explicit context
-            logger.info(f"🤖 Executing model with context from document: {best_document_id[:8]}...")
+            logger.info(f"🤖 Executing model with context from {len(retrieved['document_ids'])} documents...")
             
             # Create model instance for this query
             model = ChatOllama(model=model_name, base_url=self.ollama_host)
@@ -409,31 +596,25 @@ RESPONSE AS {agent_name}:""")
             if overlap < 3:
                 logger.warning(f"⚠️ Low context overlap detected. Response may not be using document content.")
             
-            # Get document metadata for additional context
-            doc_metadata = self.documents_metadata.get(best_document_id, {})
-            
             return {
                 "status": "success",
                 "response": response_text,
                 "relevant_chunks": relevant_chunks,
-                "sources": sources,
-                "document_id": best_document_id,
+                "sources": retrieved["sources"],
+                "document_id": retrieved["document_id"],
+                "document_ids": retrieved["document_ids"],
                 "model_name": model_name,
-                "chunks_retrieved": len(relevant_chunks),
-                "chunks_available": doc_metadata.get('chunks_created', 0),
+                "chunks_retrieved": retrieved["chunks_retrieved"],
+                "chunks_available": retrieved["chunks_available"],
                 "context_length": len(context),
                 "context_overlap": overlap,
-                "document_metadata": {
-                    "filename": doc_metadata.get('filename', 'unknown'),
-                    "pages_processed": doc_metadata.get('pages_processed', 0),
-                    "chunks_created": doc_metadata.get('chunks_created', 0),
-                    "ingested_at": doc_metadata.get('ingested_at', 'unknown')
-                },
+                "document_metadata": retrieved["document_metadata"],
                 "debug_info": {
                     "query": query,
                     "context_preview": context[:500],
                     "model_used": model_name,
-                    "best_match_score": best_score
+                    "best_match_score": retrieved["results"][0]["rrf_score"],
+                    "reranked": rerank and self.reranker.available
                 },
                 "message": "Query processed successfully with real RAG pipeline"
             }
@@ -448,6 +629,63 @@ RESPONSE AS {agent_name}:""")
                 "message": f"Failed to process query: {str(e)}"
             }
     
+    async def stream_query(self, query: str, document_ids: List[str], model_name: str = "mistral", k: int = 5,
+                           rerank: bool = False, max_context_tokens: int = DEFAULT_CONTEXT_TOKENS):
+        """
+        Streaming variant of query_documents.
+        Yields a 'sources' event once retrieval finishes, then 'token' events as the model
+        generates, and a final 'done' event with the full response and timings.
+        """
+        start_time = time.time()
+        try:
+            retrieved = await self._retrieve_context(query, document_ids, k=k, rerank=rerank, max_tokens=max_context_tokens)
+            retrieval_ms = int((time.time() - start_time) * 1000)
+            if retrieved["status"] != "success":
+                yield {"type": "error", **retrieved, "retrieval_ms": retrieval_ms}
+                return
+            
+            yield {
+                "type": "sources",
+                "sources": retrieved["sources"],
+                "document_ids": retrieved["document_ids"],
+                "chunks_retrieved": retrieved["chunks_retrieved"],
+                "context_length": retrieved["context_length"],
+                "retrieval_ms": retrieval_ms
+            }
+            
+            model = ChatOllama(model=model_name, base_url=self.ollama_host)
+            formatted_prompt = self.prompt.format(question=query, context=retrieved["context"])
+            
+            response_parts = []
+            first_token_time = None
+            async for chunk in model.astream(formatted_prompt):
+                token = chunk.content if hasattr(chunk, 'content') else str(chunk)
+                if not token:
+                    continue
+                if first_token_time is None:
+                    first_token_time = time.time()
+                response_parts.append(token)
+                yield {"type": "token", "content": token}
+            
+            total_time = time.time() - start_time
+            generation_time = time.time() - first_token_time if first_token_time else 0
+            yield {
+                "type": "done",
+                "status": "success",
+                "response": "".join(response_parts),
+                "model_name": model_name,
+                "retrieval_ms": retrieval_ms,
+                "ttft_ms": int((first_token_time - start_time) * 1000) if first_token_time else None,
+                "total_ms": int(total_time * 1000),
+                "chunks_streamed": len(response_parts),
+                "chunks_per_second": round(len(response_parts) / generation_time, 2) if generation_time else None
+            }
+            
+        except Exception as e:
+            logger.error(f"❌ Streaming RAG query failed: {str(e)}")
+            yield {"type": "error", "status": "error", "error": str(e),
+                   "total_ms": int((time.time() - start_time) * 1000)}
+    
     async def query_documents_with_agent(self, query: str, document_ids: List[str], agent_config: Dict[str, Any], model_name: str = "mistral") -> Dict[str, Any]:
         """
         Query documents using an agent-enhanced RAG pipeline
@@ -455,14 +693,14 @@ RESPONSE AS {agent_name}:""")
         try:
             logger.info(f"🤖 Processing agent-enhanced RAG query with {agent_config.get('name', 'Unknown Agent')}")
             
-            # First, get the document context using the regular RAG pipeline
-            base_result = await self.query_documents(query, document_ids, model_name)
+            # First, get the document context (retrieval only, no extra generation)
+            base_result = await self._retrieve_context(query, document_ids)
             
             if base_result["status"] != "success":
                 return base_result
             
             # Extract context and metadata from base result
-            context = "\n\n".join(base_result["relevant_chunks"])
+            context = base_result["context"]
             sources = base_result["sources"]
             
             # Prepare agent-specific variables
@@ -547,17 +785,20 @@ RESPONSE AS {agent_name}:""")
             for doc_id, metadata in self.documents_metadata.items()
         ]
     
+    def _delete_document_chunks(self, document_id: str) -> None:
+        """Remove every chunk of a document from the shared index"""
+        existing = self.vector_store.get(where={"document_id": document_id}, include=[])
+        if existing["ids"]:
+            self.vector_store.delete(ids=existing["ids"])
+        self.lexical_index.delete_document(document_id)
+    
     def clear_document(self, document_id: str) -> bool:
         """Remove a document from the RAG system"""
         try:
-            if document_id in self.vector_stores:
-                del self.vector_stores[document_id]
-            if document_id in self.retrievers:
-                del self.retrievers[document_id]
-            if document_id in self.chains:
-                del self.chains[document_id]
+            self._delete_document_chunks(document_id)
             if document_id in self.documents_metadata:
                 del self.documents_metadata[document_id]
+                self._save_documents_metadata()
             
             logger.info(f"🗑️ Cleared document from RAG system: {document_id}")
             return True
@@ -568,10 +809,11 @@ RESPONSE AS {agent_name}:""")
     def clear_all_documents(self) -> int:
         """Clear all documents from the RAG system"""
         count = len(self.documents_metadata)
-        self.vector_stores.clear()
-        self.retrievers.clear()
-        self.chains.clear()
+        self.vector_store.delete_collection()
+        self._open_index()
+        self.lexical_index.clear()
         self.documents_metadata.clear()
+        self._save_documents_metadata()
         
         logger.info(f"🧹 Cleared all documents from RAG system: {count} documents removed")
         return count
@@ -584,28 +826,29 @@ RESPONSE AS {agent_name}:""")
     def get_document_chunks(self, document_id: str) -> List[Dict[str, Any]]:
         """Get all chunks for a specific document with metadata"""
         try:
-            if document_id not in self.vector_stores:
-                logger.warning(f"Document {document_id} not found in vector stores")
+            if document_id not in self.documents_metadata:
+                logger.warning(f"Document {document_id} not found in vector store")
                 return []
             
-            vector_store = self.vector_stores[document_id]
-            
-            # Get all documents from the vector store
-            # This is a simplified approach - in production you might want pagination
-            results = vector_store.similarity_search("", k=1000)  # Get up to 1000 chunks
+            # Read the document's chunks straight from the shared index
+            results = self.vector_store.get(where={"document_id": document_id}, include=["documents", "metadatas"])
             
             chunks = []
-            for i, doc in enumerate(results):
+            for content, metadata in sorted(
+                zip(results["documents"], results["metadatas"]),
+                key=lambda item: item[1].get("chunk_index", 0)
+            ):
+                i = metadata.get("chunk_index", len(chunks))
                 chunk_data = {
                     "chunk_id": f"{document_id}_chunk_{i}",
-                    "content": doc.page_content,
+                    "content": content,
                     "metadata": {
                         "document_id": document_id,
                         "chunk_index": i,
-                        "char_start": doc.metadata.get("start_index", 0),
-                        "char_end": doc.metadata.get("end_index", len(doc.page_content)),
-                        "page_number": doc.metadata.get("page", None),
-                        "source": doc.metadata.get("source", ""),
+                        "char_start": metadata.get("start_index", 0),
+                        "char_end": metadata.get("end_index", len(content)),
+                        "page_number": metadata.get("page", None),
+                        "source": metadata.get("source", ""),
                     }
                 }
                 chunks.append(chunk_data)
@@ -627,13 +870,11 @@ RESPONSE AS {agent_name}:""")
         return {
             "documents_count": len(self.documents_metadata),
             "total_chunks": total_chunks,
-            "vector_stores_active": len(self.vector_stores),
-            "retrievers_active": len(self.retrievers),
-            "chains_active": len(self.chains)
+            "vector_stores_active": 1 if self.vector_store is not None else 0,
+            "index_collection": INDEX_COLLECTION_NAME,
+            "persist_directory": self.persist_directory,
+            "embedding_cache": self.embeddings.get_stats()
         }
-        self.chains.clear()
-        self.documents_metadata.clear()
-        logger.info("🗑️ Cleared all documents from RAG system")
     
     def get_stats(self) -> Dict[str, Any]:
         """Get RAG system statistics"""
@@ -645,10 +886,10 @@ RESPONSE AS {agent_name}:""")
         return {
             "total_documents": len(self.documents_metadata),
             "total_chunks": total_chunks,
-            "vector_stores": len(self.vector_stores),
-            "active_chains": len(self.chains),
+            "vector_stores": 1 if self.vector_store is not None else 0,
             "langchain_available": LANGCHAIN_AVAILABLE,
             "embeddings_type": "fastembed",
+            "embedding_cache": self.embeddings.get_stats(),
             "vector_db_type": "chroma"
         }
 
@@ -4,6 +4,7 @@ Based on the proper RAG service implementation
 """
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 import os
 import json
 import asyncio
@@ -18,6 +19,7 @@ from datetime import datetime
 
 # Import the real RAG service
 from rag_service import RealRAGService
+from ingestion_queue import IngestionJob, IngestionJobQueue
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -54,6 +56,7 @@ class QueryRequest(BaseModel):
     document_ids: Optional[List[str]] = None
     model_name: Optional[str] = "llama3.2"
     max_chunks: Optional[int] = 5
+    rerank: Optional[bool] = False
 
 class ProcessingResult(BaseModel):
     success: bool
@@ -101,7 +104,7 @@ async def get_rag_status():
             "stats": {
                 "total_documents": stats["documents_count"],
                 "total_chunks": stats["total_chunks"],
-                "processing_documents": 0,  # Real-time processing not tracked in this implementation
+                "processing_documents": ingestion_queue.get_stats()["processing"],
                 "error_documents": 0,
                 "total_size_bytes": 0  # Not tracked in this implementation
             },
@@ -152,9 +155,13 @@ async def get_documents():
 @app.post("/api/rag/ingest")
 async def ingest_document(
     file: UploadFile = File(...),
-    model: Optional[str] = Form("llama3.2")
+    model: Optional[str] = Form("llama3.2"),
+    background: Optional[bool] = Form(False)
 ):
-    """Process and ingest a document into the RAG system"""
+    """
+    Process and ingest a document into the RAG system.
+    Work runs on the shared ingestion queue; with background=true the job id is returned right away.
+    """
     start_time = time.time()
     document_id = str(uuid.uuid4())
     
@@ -178,51 +185,27 @@ async def ingest_document(
             temp_file.write(content)
             temp_file_path = temp_file.name
         
-        try:
-            # Process with real RAG service
-            def log_callback(level, stage, message, doc_id, filename, metadata=None):
-                logger.info(f"[{level.upper()}] {stage}: {message}")
-            
-            result = await rag_service.ingest_document(
-                file_path=temp_file_path,
-                document_id=document_id,
-                model_name=model,
-                log_callback=log_callback
-            )
+        job = await ingestion_queue.submit(
+            document_id, file.filename,
+            temp_file_path=temp_file_path,
+            file_size=file_size,
+            model=model
+        )
             
-            processing_time = int((time.time() - start_time) * 1000)
+        if background:
+            return {
+                "success": True,
+                "job_id": job.job_id,
+                "document_id": document_id,
+                "filename": file.filename,
+                "status": job.status,
+                "status_url": f"/api/rag/ingest/jobs/{job.job_id}"
+            }
             
-            if result["status"] == "success":
-                return {
-                    "success": True,
-                    "document_id": document_id,
-                    "filename": file.filename,
-                    "chunks_created": result["chunks_created"],
-                    "pages_processed": result["pages_processed"],
-                    "processing_time_ms": processing_time,
-                    "file_size": file_size,
-                    "content_preview": f"PDF document with {result['chunks_created']} chunks processed using {result['vector_store']} and {result['embeddings']}",
-                    "error": None
-                }
-            else:
-                return {
-                    "success": False,
-                    "document_id": document_id,
-                    "filename": file.filename,
-                    "chunks_created": 0,
-                    "pages_processed": 0,
-                    "processing_time_ms": processing_time,
-                    "file_size": file_size,
-                    "content_preview": "",
-                    "error": result["error"]
-                }
-                
-        finally:
-            # Clean up temporary file
-            try:
-                os.unlink(temp_file_path)
-            except:
-                pass
+        result = await job.wait()
+        if result is None:
+            raise Exception(job.error or "Ingestion failed")
+        return {**result, "job_id": job.job_id}
         
     except Exception as e:
         logger.error(f"Error ingesting document: {str(e)}")
@@ -240,6 +223,70 @@ async def ingest_document(
             "error": str(e)
         }
 
+async def run_ingestion_job(job: IngestionJob, temp_file_path: str, file_size: int, model: str):
+    """Ingestion queue handler: run the real RAG pipeline on one uploaded PDF"""
+    try:
+        # Process with real RAG service, streaming its progress into the job
+        result = await rag_service.ingest_document(
+            file_path=temp_file_path,
+            document_id=job.document_id,
+            model_name=model,
+            log_callback=job.log_callback
+        )
+        
+        processing_time = int((time.time() - job.created_at) * 1000)
+        
+        if result["status"] == "success":
+            return {
+                "success": True,
+                "document_id": job.document_id,
+                "filename": job.filename,
+                "chunks_created": result["chunks_created"],
+                "pages_processed": result["pages_processed"],
+                "processing_time_ms": processing_time,
+                "file_size": file_size,
+                "content_preview": f"PDF document with {result['chunks_created']} chunks processed using {result['vector_store']} and {result['embeddings']}",
+                "error": None
+            }
+        else:
+            return {
+                "success": False,
+                "document_id": job.document_id,
+                "filename": job.filename,
+                "chunks_created": 0,
+                "pages_processed": 0,
+                "processing_time_ms": processing_time,
+                "file_size": file_size,
+                "content_preview": "",
+                "error": result["error"]
+            }
+            
+    finally:
+        # Clean up temporary file
+        try:
+            os.unlink(temp_file_path)
+        except:
+            pass
+
+ingestion_queue = IngestionJobQueue(run_ingestion_job)
+
+@app.get("/api/rag/ingest/jobs")
+async def list_ingestion_jobs():
+    """List recent ingestion jobs"""
+    return {"jobs": ingestion_queue.list_jobs(), "stats": ingestion_queue.get_stats()}
+
+@app.get("/api/rag/ingest/jobs/{job_id}")
+async def get_ingestion_job(job_id: str):
+    """Get progress, events and result of an ingestion job"""
+    job = ingestion_queue.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return job.to_dict()
+
+@app.on_event("shutdown")
+async def shutdown_ingestion_queue():
+    await ingestion_queue.shutdown()
+
 @app.post("/api/rag/query")
 async def query_documents(request: QueryRequest):
     """Query documents using RAG"""
@@ -258,7 +305,9 @@ async def query_documents(request: QueryRequest):
         result = await rag_service.query_documents(
             query=request.query,
             document_ids=request.document_ids or [],
-            model_name=request.model_name
+            model_name=request.model_name,
+            k=request.max_chunks or 5,
+            rerank=bool(request.rerank)
         )
         
         if result["status"] == "success":
@@ -292,6 +341,30 @@ async def query_documents(request: QueryRequest):
             "context_length": 0
         }
 
+@app.post("/api/rag/query/stream")
+async def query_documents_stream(request: QueryRequest):
+    """
+    Streaming variant of /api/rag/query (server-sent events).
+    Sources are sent as soon as retrieval finishes, then tokens as the model generates them;
+    the final 'done' event carries the full response with TTFT and total time.
+    """
+    async def event_stream():
+        if not rag_service:
+            yield f"data: {json.dumps({'type': 'error', 'error': 'RAG service not available. Please install required dependencies.'})}\n\n"
+            return
+        
+        async for event in rag_service.stream_query(
+            query=request.query,
+            document_ids=request.document_ids or [],
+            model_name=request.model_name,
+            k=request.max_chunks or 5,
+            rerank=bool(request.rerank)
+        ):
+            yield f"data: {json.dumps(event)}\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.delete("/api/rag/documents/{document_id}")
 async def delete_document(document_id: str):
     """Delete a document and its chunks"""
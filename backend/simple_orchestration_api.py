@@ -15,6 +15,11 @@ from typing import Dict, List, Any
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 
+from context_refinement import (POLICY_EXTRACTIVE, POLICY_LLM, POLICY_NONE, choose_policy, choose_synthesis_policy,
+                                combine_responses, extractive_refine, get_overhead_tracker, start_warm_up)
+from dag_executor import PlanStep, execute_plan
+from ollama_client import get_ollama_client
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -23,6 +28,11 @@ logger = logging.getLogger(__name__)
 OLLAMA_BASE_URL = "http://localhost:11434"
 STRANDS_SDK_URL = "http://localhost:5006"
 A2A_SERVICE_URL = "http://localhost:5008"
+MAX_AGENT_TIME = 120  # 2 minutes per agent max
+A2A_MAX_PARALLEL = 3  # Agents of one plan handed off at the same time
+
+ollama_client = get_ollama_client()
+overhead_tracker = get_overhead_tracker()
 
 app = Flask(__name__)
 CORS(app)
@@ -555,8 +565,9 @@ Respond in JSON format:
             "total_agents_selected": len(selected_agents)
         }
     
-    def execute_a2a_sequential_handover(self, query: str, agent_selection: Dict, available_agents: List[Dict]) -> Dict:
-        """Step 4: Execute A2A sequential handover using real A2A handover parameters"""
+    def execute_a2a_sequential_handover(self, query: str, agent_selection: Dict, available_agents: List[Dict],
+                                        session_id: str = None) -> Dict:
+        """Step 4: Execute A2A handovers as a dependency graph using real A2A handover parameters"""
         try:
             selected_agents = agent_selection.get('selected_agents', [])
             execution_strategy = agent_selection.get('execution_strategy', 'direct')
@@ -572,85 +583,115 @@ Respond in JSON format:
             # Sort agents by execution order
             sorted_agents = sorted(selected_agents, key=lambda x: x.get('execution_order', 1))
             
-            execution_results = []
-            current_context = query
-            accumulated_output = ""
-            
-            logger.info(f"[A2A EXECUTION] Starting {execution_strategy} execution with {len(sorted_agents)} agents")
-            
+            # Find agent details from available agents (trim names for comparison)
+            runnable = []
             for i, agent_info in enumerate(sorted_agents):
                 agent_name = agent_info.get('agent_name', 'Unknown')
-                task_assignment = agent_info.get('task_assignment', 'General assistance')
-                execution_order = agent_info.get('execution_order', i + 1)
-                
-                logger.info(f"[A2A EXECUTION] Executing agent {execution_order}: {agent_name}")
-                
-                # Add timeout protection for each agent execution
-                agent_start_time = time.time()
-                max_agent_time = 120  # 2 minutes per agent max
-                
-                # Find agent details from available agents (trim names for comparison)
                 agent_details = next((agent for agent in available_agents if agent['name'].strip() == agent_name.strip()), None)
                 if not agent_details:
                     logger.error(f"[A2A EXECUTION] Agent {agent_name} not found in available agents")
                     continue
+                runnable.append((i + 1, agent_info, agent_details, agent_info.get('execution_order', i + 1)))
                 
-                # Use real A2A handover parameters
-                handoff_result = self.execute_a2a_handoff(
-                    current_task=query,
-                    source_agent_context=accumulated_output if accumulated_output else "Initial task",
-                    target_agent_id=agent_details['id'],
-                    target_agent_name=agent_name,
-                    handoff_reason=f"Sequential step {execution_order} - {task_assignment}",
-                    task_assignment=task_assignment
-                )
+            logger.info(f"[A2A EXECUTION] Starting {execution_strategy} execution with {len(runnable)} agents")
                 
-                execution_results.append({
-                    "agent_name": agent_name,
-                    "execution_order": execution_order,
-                    "task_assignment": task_assignment,
-                    "agent_response": handoff_result.get('response', 'No response'),
-                    "success": handoff_result.get('success', False),
-                    "execution_time": handoff_result.get('execution_time', 0),
-                    "a2a_handoff_status": handoff_result.get('handoff_status', 'unknown'),
-                    "handoff_message_sent": handoff_result.get('handoff_message_sent', ''),
-                    "agent_actual_response": handoff_result.get('agent_actual_response', 'No actual response from agent')
-                })
+            def make_handoff(step_id: int, agent_info: Dict, agent_details: Dict, execution_order: int):
+                agent_name = agent_info.get('agent_name', 'Unknown')
+                task_assignment = agent_info.get('task_assignment', 'General assistance')
                 
-                # Check timeout after agent execution
-                agent_execution_time = time.time() - agent_start_time
-                if agent_execution_time > max_agent_time:
-                    logger.warning(f"[A2A EXECUTION] Agent {agent_name} execution timeout ({agent_execution_time:.1f}s)")
+                def run(inputs: Dict) -> Dict:
+                    # Outputs of every agent upstream of this one, in execution order
+                    contributions = {}
+                    for output in inputs.values():
+                        contributions.update(output['contributions'])
+                    accumulated_output = "".join(text for _, text in sorted(contributions.values()))
+
+                    # Load the agent's model while its context is refined and the handoff message is delivered
+                    start_warm_up(session_id, self.warm_agent, agent_details['id'])
+                    refined_context = None
+                    if accumulated_output:
+                        # Orchestrator refinement for this agent (skipped or extractive for short contexts)
+                        refined_context = self.refine_context_for_next_agent(
+                            query, accumulated_output, task_assignment, agent_name, session_id
+                        ) or None
+                        logger.info(f"[A2A EXECUTION] Context refined for next agent: {agent_name}")
+
+                    logger.info(f"[A2A EXECUTION] Executing agent {execution_order}: {agent_name}")
+                    handoff_result = self.execute_a2a_handoff(
+                        current_task=query,
+                        source_agent_context=refined_context or accumulated_output or "Initial task",
+                        target_agent_id=agent_details['id'],
+                        target_agent_name=agent_name,
+                        handoff_reason=f"{'Parallel' if execution_strategy == 'parallel' else 'Sequential'} step {execution_order} - {task_assignment}",
+                        task_assignment=task_assignment
+                    )
+
+                    # Update context for downstream agents
+                    if handoff_result.get('success') and handoff_result.get('response'):
+                        contributions[step_id] = ((execution_order, step_id), f"\n{agent_name}: {handoff_result['response']}")
+                    return {
+                        "handoff_result": handoff_result,
+                        "refined_context": refined_context,
+                        "contributions": contributions
+                    }
+                return run
+
+            # Agents sharing an execution order run concurrently, each order waits for the one before it;
+            # parallel plans have no edges at all
+            steps = []
+            for step_id, agent_info, agent_details, execution_order in runnable:
+                earlier = [order for _, _, _, order in runnable if order < execution_order]
+                depends_on = [] if execution_strategy == 'parallel' or not earlier else [
+                    other_id for other_id, _, _, order in runnable if order == max(earlier)
+                ]
+                steps.append(PlanStep(
+                    step_id, make_handoff(step_id, agent_info, agent_details, execution_order), depends_on=depends_on,
+                    timeout=MAX_AGENT_TIME, name=agent_info.get('agent_name', 'Unknown')
+                ))
+            outcome = execute_plan(steps, max_parallel=A2A_MAX_PARALLEL)
+
+            execution_results = []
+            by_step = {step_id: (agent_info, execution_order) for step_id, agent_info, _, execution_order in runnable}
+            for entry in sorted(outcome['results'], key=lambda e: by_step[e['step']][1]):
+                agent_info, execution_order = by_step[entry['step']]
+                agent_name = agent_info.get('agent_name', 'Unknown')
+                task_assignment = agent_info.get('task_assignment', 'General assistance')
+                if entry['status'] == 'completed':
+                    handoff_result = entry['output']['handoff_result']
                     execution_results.append({
                         "agent_name": agent_name,
                         "execution_order": execution_order,
                         "task_assignment": task_assignment,
-                        "agent_response": "Agent execution timeout",
+                        "agent_response": handoff_result.get('response', 'No response'),
+                        "success": handoff_result.get('success', False),
+                        "execution_time": handoff_result.get('execution_time', 0),
+                        "a2a_handoff_status": handoff_result.get('handoff_status', 'unknown'),
+                        "handoff_message_sent": handoff_result.get('handoff_message_sent', ''),
+                        "agent_actual_response": handoff_result.get('agent_actual_response', 'No actual response from agent')
+                    })
+                else:
+                    timed_out = entry['status'] == 'timed_out'
+                    if timed_out:
+                        logger.warning(f"[A2A EXECUTION] Agent {agent_name} execution timeout ({entry['duration']:.1f}s)")
+                    execution_results.append({
+                        "agent_name": agent_name,
+                        "execution_order": execution_order,
+                        "task_assignment": task_assignment,
+                        "agent_response": "Agent execution timeout" if timed_out else f"Agent not executed: {entry['error']}",
                         "success": False,
-                        "execution_time": agent_execution_time,
-                        "a2a_handoff_status": "timeout",
-                        "handoff_message_sent": "Timeout occurred",
-                        "agent_actual_response": "Agent execution timeout"
+                        "execution_time": entry['duration'],
+                        "a2a_handoff_status": "timeout" if timed_out else entry['status'],
+                        "handoff_message_sent": "Timeout occurred" if timed_out else "",
+                        "agent_actual_response": "Agent execution timeout" if timed_out else entry['error']
                     })
-                    continue
                 
-                # Update context for next agent using A2A handover
-                if handoff_result.get('success') and handoff_result.get('response'):
-                    accumulated_output += f"\n{agent_name}: {handoff_result['response']}"
-                    
-                    # LLM Orchestrator refinement for next agent
-                    if i < len(sorted_agents) - 1:  # Not the last agent
-                        next_agent = sorted_agents[i + 1]
-                        current_context = self.refine_context_for_next_agent(
-                            query, 
-                            accumulated_output, 
-                            next_agent.get('task_assignment', ''),
-                            next_agent.get('agent_name', '')
-                        )
-                        logger.info(f"[A2A EXECUTION] Context refined for next agent: {next_agent.get('agent_name', 'Unknown')}")
+            # Everything every agent contributed, in execution order
+            accumulated_output = "".join(
+                f"\n{r['agent_name']}: {r['agent_response']}" for r in execution_results if r['success'] and r['agent_response']
+            )
             
             # Generate final response
-            final_response = self.synthesize_final_response(query, execution_results, accumulated_output)
+            final_response = self.synthesize_final_response(query, execution_results, accumulated_output, session_id)
             
             return {
                 "success": True,
@@ -658,7 +699,11 @@ Respond in JSON format:
                 "execution_results": execution_results,
                 "final_response": final_response,
                 "total_agents_executed": len(execution_results),
-                "accumulated_output": accumulated_output
+                "accumulated_output": accumulated_output,
+                "total_time": outcome['total_time'],
+                "critical_path_time": outcome['critical_path_time'],
+                "sum_of_steps_time": outcome['sum_of_steps_time'],
+                "orchestration_overhead": overhead_tracker.get_session(session_id) if session_id else None
             }
             
         except Exception as e:
@@ -817,8 +862,25 @@ Please continue with this task using the provided context."""
                 "execution_time": 0
             }
     
-    def refine_context_for_next_agent(self, original_query: str, accumulated_output: str, next_task: str, next_agent_name: str) -> str:
-        """Use LLM orchestrator to refine context for the next agent"""
+    def warm_agent(self, agent_id: str) -> Dict:
+        """Load an agent's model and system prompt on the Strands SDK service ahead of its handoff"""
+        response = requests.post(f"{STRANDS_SDK_URL}/api/strands-sdk/agents/{agent_id}/warm", timeout=MAX_AGENT_TIME)
+        response.raise_for_status()
+        return response.json()
+    
+    def refine_context_for_next_agent(self, original_query: str, accumulated_output: str, next_task: str, next_agent_name: str,
+                                      session_id: str = None) -> str:
+        """Refine context for the next agent; the LLM orchestrator is only asked for long contexts"""
+        policy = choose_policy(accumulated_output)
+        if policy == POLICY_NONE:
+            overhead_tracker.record_skip(session_id, "context_refinement", policy)
+            return ""
+        if policy == POLICY_EXTRACTIVE:
+            overhead_tracker.record_skip(session_id, "context_refinement", policy)
+            refined_context = extractive_refine(original_query, accumulated_output, next_task)
+            logger.info(f"[CONTEXT REFINEMENT] Extractive context for {next_agent_name} ({len(refined_context)} chars)")
+            return refined_context
+        
         try:
             prompt = f"""
 You are an expert orchestrator. Refine the context for the next agent in the sequence.
@@ -837,35 +899,27 @@ Create a refined context that:
 Provide the refined context in 1-2 sentences maximum.
 """
             
-            response = requests.post(
-                f"{OLLAMA_BASE_URL}/api/generate",
-                json={
-                    "model": "qwen3:1.7b",
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.3,
-                        "top_p": 0.9,
-                        "max_tokens": 150
-                    }
+            result = ollama_client.generate(
+                "qwen3:1.7b", prompt,
+                options={
+                    "temperature": 0.3,
+                    "top_p": 0.9,
+                    "max_tokens": 150
                 },
                 timeout=20
             )
-            
-            if response.status_code == 200:
-                result = response.json()
-                refined_context = result.get('response', '').strip()
-                logger.info(f"[CONTEXT REFINEMENT] Refined context: {refined_context}")
-                return refined_context
-            else:
-                logger.error(f"Context refinement failed: {response.status_code}")
-                return f"Building on previous work: {accumulated_output}. Next: {next_task}"
+            overhead_tracker.record_call(session_id, "context_refinement", result)
+            refined_context = result.get('response', '').strip()
+            logger.info(f"[CONTEXT REFINEMENT] Refined context: {refined_context}")
+            return refined_context
                 
         except Exception as e:
+            overhead_tracker.record_call(session_id, "context_refinement", failed=True)
             logger.error(f"Error refining context: {e}")
             return f"Building on previous work: {accumulated_output}. Next: {next_task}"
     
-    def synthesize_final_response(self, original_query: str, execution_results: List[Dict], accumulated_output: str) -> str:
+    def synthesize_final_response(self, original_query: str, execution_results: List[Dict], accumulated_output: str,
+                                  session_id: str = None) -> str:
         """Synthesize final response from all agent outputs"""
         try:
             # Extract actual agent responses for synthesis
@@ -878,6 +932,14 @@ Provide the refined context in 1-2 sentences maximum.
                         "response": result['agent_actual_response']
                     })
             
+            # One answer needs no synthesis; cheaper policies merge several answers without the LLM
+            policy = choose_synthesis_policy(len(agent_responses))
+            if policy != POLICY_LLM:
+                overhead_tracker.record_skip(session_id, "final_synthesis", policy)
+                if not agent_responses:
+                    return f"Based on the agent analysis: {accumulated_output}"
+                return combine_responses([(resp['agent_name'], resp['response']) for resp in agent_responses])
+            
             # Create a clean summary of agent outputs
             agent_outputs_summary = "\n\n".join([
                 f"**{resp['agent_name']}** ({resp['task']}):\n{resp['response']}"
@@ -907,38 +969,29 @@ IMPORTANT:
 Provide the final synthesized response that combines the user query with both agent outputs.
 """
             
-            response = requests.post(
-                f"{OLLAMA_BASE_URL}/api/generate",
-                json={
-                    "model": "qwen3:1.7b",
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.3,
-                        "top_p": 0.9,
-                        "max_tokens": 200
-                    }
+            result = ollama_client.generate(
+                "qwen3:1.7b", prompt,
+                options={
+                    "temperature": 0.3,
+                    "top_p": 0.9,
+                    "max_tokens": 200
                 },
                 timeout=20
             )
+            overhead_tracker.record_call(session_id, "final_synthesis", result)
+            final_response = result.get('response', '').strip()
             
-            if response.status_code == 200:
-                result = response.json()
-                final_response = result.get('response', '').strip()
+            # Clean up <think> tags and internal reasoning
+            import re
+            final_response = re.sub(r'<think>.*?</think>', '', final_response, flags=re.DOTALL)
+            final_response = re.sub(r'<think>.*$', '', final_response, flags=re.DOTALL)
+            final_response = final_response.strip()
                 
-                # Clean up <think> tags and internal reasoning
-                import re
-                final_response = re.sub(r'<think>.*?</think>', '', final_response, flags=re.DOTALL)
-                final_response = re.sub(r'<think>.*$', '', final_response, flags=re.DOTALL)
-                final_response = final_response.strip()
-                
-                logger.info(f"[FINAL SYNTHESIS] Final response: {final_response}")
-                return final_response
-            else:
-                logger.error(f"Final synthesis failed: {response.status_code}")
-                return f"Based on the agent analysis: {accumulated_output}"
+            logger.info(f"[FINAL SYNTHESIS] Final response: {final_response}")
+            return final_response
                 
         except Exception as e:
+            overhead_tracker.record_call(session_id, "final_synthesis", failed=True)
             logger.error(f"Error synthesizing final response: {e}")
             return f"Based on the agent analysis: {accumulated_output}"
     
@@ -1030,7 +1083,9 @@ Provide the final synthesized response that combines the user query with both ag
                     "session_id": session['session_id']
                 }
             
-            a2a_execution_result = self.execute_a2a_sequential_handover(query, agent_selection_result, available_agents)
+            a2a_execution_result = self.execute_a2a_sequential_handover(
+                query, agent_selection_result, available_agents, session['session_id']
+            )
             session['a2a_execution'] = a2a_execution_result
                 
             session['status'] = "completed"
@@ -1101,7 +1156,8 @@ def get_sessions():
                 "status": session.get('status', 'unknown'),
                 "created_at": session.get('created_at', datetime.now()).isoformat(),
                 "duration": (datetime.now() - session.get('created_at', datetime.now())).total_seconds(),
-                "stages_completed": 4  # Always 4 steps in our system
+                "stages_completed": 4,  # Always 4 steps in our system
+                "orchestration_overhead": overhead_tracker.get_session(session_id)
             })
         
         return jsonify({
@@ -1114,6 +1170,20 @@ def get_sessions():
             "error": str(e)
         }), 500
 
+@app.route('/api/simple-orchestration/overhead', methods=['GET'])
+def get_orchestration_overhead():
+    """LLM calls and tokens spent by the orchestrator between agents (refinement, synthesis)"""
+    try:
+        session_id = request.args.get('session_id')
+        if session_id:
+            return jsonify(overhead_tracker.get_session(session_id))
+        return jsonify(overhead_tracker.get_stats())
+    except Exception as e:
+        logger.error(f"Overhead endpoint error: {e}")
+        return jsonify({
+            "error": str(e)
+        }), 500
+
 @app.route('/api/simple-orchestration/analytics', methods=['GET'])
 def get_orchestrator_analytics():
     """Get orchestrator analytics and performance metrics"""
@@ -21,6 +21,7 @@ from contextlib import contextmanager
 
 from flask import Flask, request, jsonify
 from flask_socketio import SocketIO, emit, join_room, leave_room
+from agent_capability_index import route as route_by_capability
 import requests
 import psutil
 import gc
@@ -212,11 +213,23 @@ class StatelessOrchestrator:
         else:
             query_type = "general"
             best_agent = available_agents[0] if available_agents else None
+        reasoning = f"Rule-based analysis: identified {query_type} intent"
+        
+        # The capability index overrides the keyword pick when it finds a relevant agent
+        if available_agents:
+            try:
+                decision = route_by_capability(query, k=3, agents=available_agents, catalogue="strands")
+                if decision["top_agent_id"]:
+                    top = decision["matches"][0]
+                    best_agent = next((agent for agent in available_agents if str(agent.get('id')) == top["agent_id"]), best_agent)
+                    reasoning = f"{reasoning}; capability index selected '{top['name']}' (similarity {top['similarity']})"
+            except Exception as e:
+                logger.warning(f"Capability index routing failed, keeping rule-based choice: {e}")
         
         return {
             "query_type": query_type,
             "selected_agent": best_agent,
-            "reasoning": f"Rule-based analysis: identified {query_type} intent"
+            "reasoning": reasoning
         }
     
     def _find_best_agent(self, agents: List[Dict], keywords: List[str]) -> Optional[Dict]:
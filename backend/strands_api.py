@@ -16,6 +16,7 @@ from datetime import datetime
 import logging
 from typing import Dict, List, Any, Optional
 import re
+from write_behind import get_write_behind_logger
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -27,6 +28,8 @@ CORS(app)
 # Configuration
 OLLAMA_BASE_URL = "http://localhost:11434"
 STRANDS_DATABASE_PATH = "strands_agents.db"
+# Execution traces are queued and group-committed off the request thread
+execution_logger = get_write_behind_logger(STRANDS_DATABASE_PATH)
 
 def init_strands_database():
     """Initialize SQLite database for Strands agents"""
@@ -880,15 +883,15 @@ def execute_strands_agent(agent_id):
         if not input_text:
             return jsonify({"error": "Input is required"}), 400
         
-        # Get agent from database
+        # Get agent from database (the connection is not held across the reasoning run)
         conn = sqlite3.connect(STRANDS_DATABASE_PATH)
         cursor = conn.cursor()
         
         cursor.execute('SELECT * FROM strands_agents WHERE id = ?', (agent_id,))
         agent_row = cursor.fetchone()
+        conn.close()
         
         if not agent_row:
-            conn.close()
             return jsonify({"error": "Strands agent not found"}), 404
         
         # Build agent config
@@ -918,7 +921,7 @@ def execute_strands_agent(agent_id):
         execution_id = str(uuid.uuid4())
         
         # Store execution trace
-        cursor.execute('''
+        execution_logger.insert('''
             INSERT INTO strands_executions (
                 id, agent_id, input_text, output_text, reasoning_trace, tools_used,
                 reflection_steps, execution_time, tokens_used, tool_calls_count,
@@ -938,12 +941,10 @@ def execute_strands_agent(agent_id):
             len(result.get('reflection_steps', [])),
             result.get('llm_calls', 0),
             result.get('success', False),
-            result.get('error', None)
+            result.get('error', None),
+            end_time.isoformat()
         ))
         
-        conn.commit()
-        conn.close()
-        
         return jsonify({
             "id": execution_id,
             "agentId": agent_id,
@@ -28,6 +28,9 @@ import logging
 import requests
 import re
 
+from agent_capability_index import route as route_by_capability
+from dag_executor import PlanError, PlanStep, StepFailed, execute_plan
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -187,6 +190,24 @@ def analyze_query_with_llm(query: str, available_agents: List[Dict]) -> Dict:
     logger.info("Using LLM analysis with enhanced examples")
     
     try:
+        # One clearly matching agent for a single-step query needs no LLM planner
+        decision = route_by_capability(query, k=3, agents=available_agents, catalogue="strands")
+        if not decision["needs_planner"]:
+            top = decision["matches"][0]
+            agent_id = next((agent['id'] for agent in available_agents if str(agent['id']) == top['agent_id']), top['agent_id'])
+            logger.info(f"🎯 Capability index routed to '{top['name']}' (similarity {top['similarity']}) in {decision['duration_ms']}ms, skipping LLM analysis")
+            return {
+                "query_type": "general",
+                "required_capabilities": [],
+                "selected_agents": [agent_id],
+                "execution_strategy": "single",
+                "workflow_steps": [
+                    {"step": 1, "agent_id": agent_id, "action": f"Execute: {query[:50]}...", "depends_on": []}
+                ],
+                "reasoning": f"Capability index: '{top['name']}' clearly matches this single-step query (similarity {top['similarity']}, {decision['backend']})",
+                "routing": decision
+            }
+        
         # Create agent capability summary
         agent_summary = []
         for agent in available_agents:
@@ -662,73 +683,9 @@ def execute_orchestration_plan(plan: Dict, session_id: str) -> Dict:
                         "status": "completed" if result.get("success") else "failed"
                     })
         
-        elif execution_strategy == "sequential":
-            # Sequential execution - execute steps in order
-            logger.info(f"Starting sequential execution with {len(workflow_steps)} steps")
-            for step in workflow_steps:
-                agent_id = step.get("agent_id")
-                agent_name = step.get("agent_name", "Unknown")
-                logger.info(f"Executing step {step.get('step', 1)}: {agent_name} (ID: {agent_id})")
-                
-                if agent_id:
-                    result = execute_agent_query(agent_id, plan["query"], session_id)
-                    results.append({
-                        "step": step.get("step", 1),
-                        "agent_id": agent_id,
-                        "agent_name": agent_name,
-                        "result": result,
-                        "status": "completed" if result.get("success") else "failed"
-                    })
-                    
-                    logger.info(f"Step {step.get('step', 1)} completed: {result.get('success', False)}")
-                    
-                    # If step failed, stop execution
-                    if not result.get("success"):
-                        logger.warning(f"Step {step.get('step', 1)} failed, stopping execution")
-                        break
-                else:
-                    logger.error(f"No agent_id found for step {step.get('step', 1)}: {step}")
-                    results.append({
-                        "step": step.get("step", 1),
-                        "agent_id": agent_id,
-                        "agent_name": agent_name,
-                        "result": {"success": False, "error": "No agent_id found"},
-                        "status": "failed"
-                    })
-        
-        elif execution_strategy == "parallel":
-            # Parallel execution - execute multiple agents simultaneously
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-                future_to_step = {}
-                for step in workflow_steps:
-                    agent_id = step.get("agent_id")
-                    if agent_id:
-                        future = executor.submit(execute_agent_query, agent_id, plan["query"], session_id)
-                        future_to_step[future] = step
-                
-                # Collect results as they complete
-                for future in concurrent.futures.as_completed(future_to_step):
-                    step = future_to_step[future]
-                    try:
-                        result = future.result()
-                        results.append({
-                            "step": step.get("step", 1),
-                            "agent_id": step.get("agent_id"),
-                            "result": result,
-                            "status": "completed" if result.get("success") else "failed"
-                        })
-                    except Exception as e:
-                        results.append({
-                            "step": step.get("step", 1),
-                            "agent_id": step.get("agent_id"),
-                            "result": {"success": False, "error": str(e)},
-                            "status": "failed"
-                        })
-        
-        elif execution_strategy == "coordinated":
-            # Multi-agent coordination using A2A communication
-            results = execute_coordinated_workflow(plan, session_id)
+        elif execution_strategy in ("sequential", "parallel", "coordinated"):
+            # Dependency-aware execution: independent branches run concurrently
+            return execute_workflow_dag(plan, session_id)
         
         return {
             "execution_strategy": execution_strategy,
@@ -850,14 +807,127 @@ def execute_agent_query(agent_id: str, query: str, session_id: str) -> Dict:
         }
 
 
+# Workflow step limits (a plan step may override them with its own "timeout" / "retries")
+WORKFLOW_STEP_TIMEOUT = 150
+WORKFLOW_STEP_RETRIES = 1
+WORKFLOW_MAX_PARALLEL = 3
+
+
+def workflow_dependencies(workflow_steps: List[Dict], execution_strategy: str) -> Dict[Any, List[Any]]:
+    """depends_on per step number; sequential plans without any explicit edges are chained in order"""
+    step_ids = [step.get("step", i + 1) for i, step in enumerate(workflow_steps)]
+    known = set(step_ids)
+    explicit = any(step.get("depends_on") for step in workflow_steps)
+    if execution_strategy == "sequential" and not explicit:
+        return {step_id: ([step_ids[i - 1]] if i > 0 else []) for i, step_id in enumerate(step_ids)}
+    dependencies = {}
+    for step_id, step in zip(step_ids, workflow_steps):
+        depends_on = step.get("depends_on") or []
+        unknown = [d for d in depends_on if d not in known]
+        if unknown:
+            logger.warning(f"Step {step_id} depends on unknown steps {unknown}, ignoring those edges")
+        dependencies[step_id] = [d for d in depends_on if d in known]
+    return dependencies
+
+
+def build_step_input(query: str, step: Dict, upstream: Dict[str, str]) -> str:
+    """Agent input for one step: its action, the original request and the outputs of the steps it depends on"""
+    action = step.get("action")
+    if not upstream and (not action or action.startswith("Execute")):
+        return query
+    parts = []
+    if action:
+        parts.append(f"Task: {action}")
+    parts.append(f"Original request: {query}")
+    if upstream:
+        parts.append("Results from previous steps:\n" + "\n\n".join(f"[{name}]: {output}" for name, output in upstream.items()))
+    return "\n\n".join(parts)
+
+
+def execute_workflow_dag(plan: Dict, session_id: str) -> Dict:
+    """Execute workflow steps as a dependency graph on the shared plan pool"""
+    workflow_steps = plan.get("workflow_steps", [])
+    execution_strategy = plan.get("execution_strategy", "sequential")
+    step_ids = [step.get("step", i + 1) for i, step in enumerate(workflow_steps)]
+    if len(set(step_ids)) != len(step_ids):
+        logger.warning("Workflow step numbers are not unique, renumbering and running steps in order")
+        workflow_steps = [{**step, "step": i + 1, "depends_on": []} for i, step in enumerate(workflow_steps)]
+        execution_strategy = "sequential"
+    steps_by_id = {step.get("step", i + 1): step for i, step in enumerate(workflow_steps)}
+
+    def make_runner(step_id, step):
+        agent_id = step.get("agent_id")
+
+        def run(inputs: Dict) -> Dict:
+            if not agent_id:
+                raise StepFailed("No agent_id found", {"success": False, "error": "No agent_id found"})
+            upstream = {
+                f"Step {d} - {steps_by_id[d].get('agent_name') or steps_by_id[d].get('agent_id')}": output.get("response", "")
+                for d, output in inputs.items() if output
+            }
+            logger.info(f"Executing step {step_id}: {step.get('agent_name', 'Unknown')} (ID: {agent_id})")
+            result = execute_agent_query(agent_id, build_step_input(plan["query"], step, upstream), session_id)
+            if not result.get("success"):
+                raise StepFailed(result.get("error", "Agent execution failed"), result)
+            return result
+        return run
+
+    def plan_steps(dependencies):
+        return [
+            PlanStep(
+                step_id, make_runner(step_id, step), depends_on=dependencies[step_id],
+                timeout=step.get("timeout", WORKFLOW_STEP_TIMEOUT),
+                retries=step.get("retries", WORKFLOW_STEP_RETRIES) if step.get("agent_id") else 0,
+                name=step.get("agent_name") or str(step.get("agent_id"))
+            )
+            for step_id, step in steps_by_id.items()
+        ]
+
+    try:
+        outcome = execute_plan(plan_steps(workflow_dependencies(workflow_steps, execution_strategy)),
+                               max_parallel=WORKFLOW_MAX_PARALLEL)
+    except PlanError as e:
+        logger.warning(f"Invalid workflow graph ({e}), running steps in order")
+        chained = workflow_dependencies([{**step, "depends_on": []} for step in workflow_steps], "sequential")
+        outcome = execute_plan(plan_steps(chained), max_parallel=WORKFLOW_MAX_PARALLEL)
+
+    results = []
+    for entry in outcome["results"]:
+        step = steps_by_id[entry["step"]]
+        results.append({
+            "step": entry["step"],
+            "agent_id": step.get("agent_id"),
+            "agent_name": step.get("agent_name", "Unknown"),
+            "action": step.get("action"),
+            "depends_on": entry["depends_on"],
+            "result": entry["output"] or {"success": False, "error": entry["error"]},
+            "status": entry["status"],
+            "attempts": entry["attempts"],
+            "started_at": entry["started_at"],
+            "duration": entry["duration"]
+        })
+
+    logger.info(f"Workflow finished in {outcome['total_time']}s (critical path {outcome['critical_path_time']}s, "
+                f"steps sum {outcome['sum_of_steps_time']}s)")
+    return {
+        "execution_strategy": execution_strategy,
+        "steps_completed": outcome["steps_completed"],
+        "total_steps": len(workflow_steps),
+        "results": results,
+        "success": outcome["success"],
+        "execution_time": sum(r["result"].get("execution_time", 0) for r in results),
+        "total_time": outcome["total_time"],
+        "critical_path": outcome["critical_path"],
+        "critical_path_time": outcome["critical_path_time"],
+        "sum_of_steps_time": outcome["sum_of_steps_time"],
+        "parallel_speedup": outcome["parallel_speedup"]
+    }
+
+
 def execute_coordinated_workflow(plan: Dict, session_id: str) -> List[Dict]:
-    """Execute coordinated multi-agent workflow using A2A communication"""
+    """Execute coordinated multi-agent workflow (dependency graph of agent steps)"""
     try:
-        # This would implement A2A coordination
-        # For now, fallback to sequential execution
-        logger.info("Coordinated workflow not fully implemented, using sequential fallback")
-        return []
-        
+        return execute_workflow_dag(plan, session_id)["results"]
     except Exception as e:
         logger.error(f"Coordinated workflow failed: {e}")
         return []
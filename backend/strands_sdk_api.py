@@ -18,14 +18,33 @@ from datetime import datetime
 import os
 import sys
 import concurrent.futures
+import base64
+import hashlib
+import queue
 import threading
 import requests  # Move requests import outside try block for cleanup functions
+from ollama_client import OllamaError, get_ollama_client
+from ollama_sessions import get_session_manager
+from agent_config_cache import AgentConfigCache
+from db_helper import get_db_manager
+from agent_analytics_rollups import backfill_if_empty, delete_agent_rollups, init_rollup_tables, read_agent_rollups
+from execution_log_store import (ExecutionLogWriter, delete_agent_executions, init_execution_log_tables,
+                                 migrate_legacy_executions, read_tool_traces, recent_tool_sequences)
+from tool_calling import ToolsUnsupported, iter_tool_loop, tools_supported
+from tool_result_cache import cacheable, get_tool_result_cache
 
 # Custom Strands SDK Implementation (working version)
 from datetime import datetime
 import math
 STRANDS_SDK_AVAILABLE = True
 
+# Pooled keep-alive client shared by every Ollama call in this service
+ollama_client = get_ollama_client()
+# Per-agent warm sessions (keep_alive + reused system prompt prefix)
+session_manager = get_session_manager()
+# Persistent per-thread SQLite connections for the hot read paths
+db_manager = get_db_manager()
+
 # A2A Integration
 try:
     from a2a_strands_integration import get_a2a_integration
@@ -52,8 +71,6 @@ except ImportError as e:
         def generate(self, prompt: str, system_prompt: str = None) -> str:
             """Generate response using real Ollama"""
             try:
-                import requests
-                
                 # Prepare the request payload
                 payload = {
                     "model": self.model_id,
@@ -66,31 +83,23 @@ except ImportError as e:
                     }
                 }
                 
-                # Add system prompt if provided
-                if system_prompt:
-                    payload["system"] = system_prompt
-                
                 print(f"[Strands SDK] Calling real Ollama with model: {self.model_id}")
                 
-                # Make request to Ollama
-                response = requests.post(
-                    f"{self.host}/api/generate",
-                    json=payload,
-                    timeout=180
-                )
+                # Warm per-agent session: keep_alive + cached system prompt prefix
+                if system_prompt:
+                    return session_manager.chat(self.host, self.model_id, system_prompt, prompt,
+                                                options=payload["options"], timeout=180)["content"]
                 
-                if response.status_code == 200:
-                    try:
-                        result = response.json()
-                        return result.get('response', 'No response generated')
-                    except json.JSONDecodeError as e:
-                        print(f"[Strands SDK] JSON decode error: {e}")
-                        print(f"[Strands SDK] Response content: {response.text[:200]}...")
-                        return f"Error: Invalid JSON response from Ollama: {str(e)}"
-                else:
-                    print(f"[Strands SDK] Ollama error status {response.status_code}: {response.text}")
-                    return f"Error: Ollama returned status {response.status_code}: {response.text}"
-                    
+                # Make request to Ollama over the shared connection pool
+                result = ollama_client.post_json("/api/generate", payload, host=self.host, timeout=180)
+                return result.get('response', 'No response generated')
+                
+            except OllamaError as e:
+                print(f"[Strands SDK] Ollama error status {e.status_code}: {e}")
+                return f"Error: Ollama returned status {e.status_code}: {e}"
+            except json.JSONDecodeError as e:
+                print(f"[Strands SDK] JSON decode error: {e}")
+                return f"Error: Invalid JSON response from Ollama: {str(e)}"
             except Exception as e:
                 print(f"[Strands SDK] Error: {e}")
                 return f"Error calling Ollama: {str(e)}"
@@ -132,8 +141,6 @@ if 'OllamaModel' not in globals():
         def generate(self, prompt: str, system_prompt: str = None) -> str:
             """Generate response using real Ollama"""
             try:
-                import requests
-                
                 payload = {
                     "model": self.model_id,
                     "prompt": prompt,
@@ -146,18 +153,12 @@ if 'OllamaModel' not in globals():
                 }
                 
                 if system_prompt:
-                    payload["system"] = system_prompt
+                    return session_manager.chat(self.host, self.model_id, system_prompt, prompt,
+                                                options=payload["options"], timeout=180)["content"]
                 
-                response = requests.post(
-                    f"{self.host}/api/generate",
-                    json=payload,
-                    timeout=180
-                )
-                
-                if response.status_code == 200:
-                    return response.json().get("response", "")
-                else:
-                    return f"Error: {response.status_code}"
+                return ollama_client.post_json("/api/generate", payload, host=self.host, timeout=180).get("response", "")
+            except OllamaError as e:
+                return f"Error: {e.status_code}"
             except Exception as e:
                 return f"Error: {str(e)}"
 
@@ -187,7 +188,51 @@ def tool(func):
     return func
 
 # Strands SDK Tool Implementations
+# Shared by all searches; one search keeps at most two candidate queries in flight
+WEB_SEARCH_WORKERS = 8
+web_search_executor = concurrent.futures.ThreadPoolExecutor(max_workers=WEB_SEARCH_WORKERS, thread_name_prefix='web-search')
+WEB_SEARCH_TIMEOUT = 12
+# Seconds a candidate query may run before the next strategy is started alongside it
+WEB_SEARCH_HEDGE_DELAY = 1.5
+NEWS_KEYWORDS = ['latest', 'news', 'recent', 'current', 'breaking', 'today']
+
+def _web_search_candidates(query: str):
+    """Candidate queries in priority order, each with the note added when it is the one that answers"""
+    candidates = [(query, None)]
+    
+    # Strategy 2: key entities for news queries
+    if any(keyword in query.lower() for keyword in NEWS_KEYWORDS):
+        entities = []
+        for word in query.lower().split():
+            if word.capitalize() in ['Nvidia', 'Apple', 'Google', 'Microsoft', 'Tesla', 'Amazon', 'Meta']:
+                entities.append(word.capitalize())
+            elif len(word) > 3 and word not in NEWS_KEYWORDS and word not in ['the', 'and', 'for', 'with', 'top']:
+                entities.append(word.capitalize())
+        for entity in entities[:2]:  # Limit to 2 entities
+            candidates.append((entity, f"Found information about {entity}:\n{{result}}\n\nNote: For latest news, try searching for '{entity} news' on a news website."))
+    
+    # Strategy 3: simplified query (news-specific words removed)
+    simplified_query = query
+    for keyword in NEWS_KEYWORDS + ['top', '-']:
+        simplified_query = simplified_query.replace(keyword, '').strip()
+    if simplified_query and simplified_query != query:
+        candidates.append((simplified_query, f"Found general information about '{simplified_query}':\n{{result}}\n\nNote: For current news, try a news website or more specific search terms."))
+    
+    # Strategy 4: first meaningful word
+    words = [word for word in query.split() if len(word) > 3 and word.lower() not in NEWS_KEYWORDS]
+    if words:
+        candidates.append((words[0], f"Found information about '{words[0]}':\n{{result}}\n\nNote: For specific news, try searching on news websites."))
+    
+    # The same search text is only sent once
+    seen = set()
+    return [(text, note) for text, note in candidates if not (text in seen or seen.add(text))]
+
+def _web_search_cacheable(arguments, result):
+    """Cache real answers only; failures and the no-result hint are retried next time"""
+    return isinstance(result, str) and not result.startswith(("Web search failed", "I searched for"))
+
 @tool
+@cacheable(ttl=900, cache_if=_web_search_cacheable)
 def web_search(query: str) -> str:
     """
     Search the web for information about a query.
@@ -234,45 +279,33 @@ def web_search(query: str) -> str:
             return ""
     
     try:
-        # Strategy 1: Try original query
-        result = try_search(query)
-        if result:
-            return result
-        
-        # Strategy 2: Extract key entities for news queries
-        news_keywords = ['latest', 'news', 'recent', 'current', 'breaking', 'today']
-        if any(keyword in query.lower() for keyword in news_keywords):
-            # Extract company/entity names (simple approach)
-            words = query.lower().split()
-            entities = []
-            for word in words:
-                if word.capitalize() in ['Nvidia', 'Apple', 'Google', 'Microsoft', 'Tesla', 'Amazon', 'Meta']:
-                    entities.append(word.capitalize())
-                elif len(word) > 3 and word not in news_keywords and word not in ['the', 'and', 'for', 'with', 'top']:
-                    entities.append(word.capitalize())
-            
-            # Try searching for each entity
-            for entity in entities[:2]:  # Limit to 2 entities
-                result = try_search(entity)
-                if result:
-                    return f"Found information about {entity}:\n{result}\n\nNote: For latest news, try searching for '{entity} news' on a news website."
-        
-        # Strategy 3: Try simplified query (remove news-specific words)
-        simplified_query = query
-        for keyword in ['latest', 'news', 'recent', 'current', 'breaking', 'today', 'top', '-']:
-            simplified_query = simplified_query.replace(keyword, '').strip()
+        # The original query runs first. The next strategy starts when the current one misses,
+        # or as a hedge once it is slower than WEB_SEARCH_HEDGE_DELAY; the highest-priority
+        # strategy that finds something wins
+        candidates = _web_search_candidates(query)
+        futures = [web_search_executor.submit(try_search, candidates[0][0])]
         
-        if simplified_query and simplified_query != query:
-            result = try_search(simplified_query)
-            if result:
-                return f"Found general information about '{simplified_query}':\n{result}\n\nNote: For current news, try a news website or more specific search terms."
+        def start_next(index):
+            if len(futures) == index + 1 and index + 1 < len(candidates):
+                futures.append(web_search_executor.submit(try_search, candidates[index + 1][0]))
         
-        # Strategy 4: Try first meaningful word
-        words = [word for word in query.split() if len(word) > 3 and word.lower() not in ['latest', 'news', 'recent', 'current', 'breaking', 'today']]
-        if words:
-            result = try_search(words[0])
-            if result:
-                return f"Found information about '{words[0]}':\n{result}\n\nNote: For specific news, try searching on news websites."
+        try:
+            for index, (text, note) in enumerate(candidates):
+                future = futures[index]
+                try:
+                    result = future.result(timeout=WEB_SEARCH_HEDGE_DELAY)
+                except concurrent.futures.TimeoutError:
+                    start_next(index)
+                    try:
+                        result = future.result(timeout=WEB_SEARCH_TIMEOUT - WEB_SEARCH_HEDGE_DELAY)
+                    except concurrent.futures.TimeoutError:
+                        continue
+                if result:
+                    return note.replace('{result}', result) if note else result
+                start_next(index)
+        finally:
+            for future in futures:
+                future.cancel()
         
         return f"I searched for '{query}' but couldn't find specific information. DuckDuckGo's API works best for general information about companies, people, and concepts rather than current news. For latest news, try:\n• Searching for just the company name (e.g., 'Nvidia')\n• Using a dedicated news website\n• Being more specific about what information you need"
         
@@ -476,7 +509,12 @@ def memory_retrieve(key: str) -> str:
     except Exception as e:
         return f"Error retrieving memory: {str(e)}"
 
+def _http_request_cacheable(arguments, result):
+    """Only successful GETs are safe to replay"""
+    return (arguments.get('method') or 'GET').upper() == 'GET' and isinstance(result, str) and ' - Status: 2' in result
+
 @tool
+@cacheable(ttl=300, cache_if=_http_request_cacheable)
 def http_request(url: str, method: str = "GET", headers: dict = None, data: str = None) -> str:
     """
     Make HTTP requests to external APIs safely.
@@ -764,6 +802,17 @@ def _safe_json_loads(json_str, default_value):
 # Database file for Strands SDK agents (separate from existing ollama_agents.db)
 STRANDS_SDK_DB = "strands_sdk_agents.db"
 
+# Repeated calls to idempotent tools (web_search, GET http_request) are answered from a TTL cache,
+# persisted to TOOL_RESULT_CACHE_DB unless it is set to an empty string
+TOOL_RESULT_CACHE_DB = os.environ.get('TOOL_RESULT_CACHE_DB', 'tool_result_cache.db')
+tool_result_cache = get_tool_result_cache(db_path=TOOL_RESULT_CACHE_DB or None)
+tool_result_cache.wrap_registry(AVAILABLE_TOOLS)
+
+# Decoded agent configurations keyed by agent id (invalidated on agent/tool-configuration writes)
+agent_config_cache = AgentConfigCache(STRANDS_SDK_DB, tool_registry=AVAILABLE_TOOLS)
+# Append-only execution log, written in batches off the request thread
+execution_log = ExecutionLogWriter(STRANDS_SDK_DB)
+
 def emit_progress(agent_id, stage, details, progress=0, tools_used=None):
     """Emit real-time progress updates via WebSocket"""
     try:
@@ -778,6 +827,206 @@ def emit_progress(agent_id, stage, details, progress=0, tools_used=None):
     except Exception as e:
         print(f"[WebSocket] Error emitting progress: {e}")
 
+# Shared, bounded worker pool for agent tool calls and Ollama stream pumps (replaces per-request pools)
+AGENT_EXECUTOR_WORKERS = 16
+agent_executor = concurrent.futures.ThreadPoolExecutor(max_workers=AGENT_EXECUTOR_WORKERS, thread_name_prefix='strands-agent')
+# Upper bound for a single pre-LLM tool call
+TOOL_TIMEOUT_SECONDS = 30
+
+CALCULATION_PATTERNS = [
+    # Multiplication like "208679447 x 3672.23" or "15 * 23"
+    (r'(\d+(?:\.\d+)?)\s*[x×*]\s*(\d+(?:\.\d+)?)', '×', lambda a, b: a * b),
+    # Division like "6252525 / 4848992.5663"
+    (r'(\d+(?:\.\d+)?)\s*/\s*(\d+(?:\.\d+)?)', '÷', lambda a, b: "Error: Division by zero" if b == 0 else a / b),
+    (r'(\d+(?:\.\d+)?)\s*\+\s*(\d+(?:\.\d+)?)', '+', lambda a, b: a + b),
+    (r'(\d+(?:\.\d+)?)\s*-\s*(\d+(?:\.\d+)?)', '-', lambda a, b: a - b)
+]
+
+def _run_calculation(input_text):
+    """First binary arithmetic expression found in the input, as (operation, result)"""
+    import re
+    for pattern, symbol, apply in CALCULATION_PATTERNS:
+        match = re.search(pattern, input_text)
+        if match:
+            num1, num2 = float(match.group(1)), float(match.group(2))
+            return f"{num1} {symbol} {num2}", apply(num1, num2)
+    return None
+
+def iter_input_tools(input_text, tools_loaded):
+    """
+    Run the keyword-triggered tools (calculator, web_search, current_time) before the LLM call.
+    Yields tool_start / tool_end events as each tool runs; the last event (type 'tools_done')
+    carries processed_input, tool_results, tools_used and operations.
+    """
+    lowered = input_text.lower()
+    processed_input = input_text
+    tool_results, tools_used, operations = [], [], []
+
+    planned = []
+    if 'calculator' in tools_loaded and any(word in lowered for word in ['calculate', 'compute', 'math', '+', '-', '*', '/', '=', 'x', '×', 'multiply', 'multiplication']):
+        planned.append(('calculator', input_text, lambda: _run_calculation(input_text)))
+    if 'web_search' in tools_loaded and any(word in lowered for word in ['search', 'find', 'look up', 'google', 'web', 'what is', 'who is', 'when', 'where', 'how']):
+        planned.append(('web_search', input_text, lambda: AVAILABLE_TOOLS['web_search'](input_text)))
+    if 'current_time' in tools_loaded and any(word in lowered for word in ['time', 'date', 'today', 'now', 'current']):
+        planned.append(('current_time', '', lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+
+    for tool_name, tool_input, call in planned:
+        yield {'type': 'tool_start', 'tool': tool_name, 'input': tool_input[:200]}
+        started = time.perf_counter()
+        try:
+            output = agent_executor.submit(call).result(timeout=TOOL_TIMEOUT_SECONDS)
+            error = None
+        except Exception as e:
+            output, error = None, str(e) or type(e).__name__
+            print(f"[Strands SDK] {tool_name} tool error: {error}")
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        if output:
+            if tool_name == 'calculator':
+                operation, result = output
+                tool_input, output = operation, str(result)
+                tool_results.append(f"Calculator result: {operation} = {result}")
+                processed_input = f"{processed_input}\n\n[Calculator Result: {operation} = {result}]"
+                print(f"[Strands SDK] 🧮 CALCULATOR TOOL EXECUTED: {operation} = {result}")
+            elif tool_name == 'web_search':
+                tool_results.append(f"Web search result: {output}")
+                processed_input = f"{processed_input}\n\n[Web Search Result: {output}]"
+                print(f"[Strands SDK] Web search tool executed for: {input_text}")
+            else:
+                tool_results.append(f"Current time: {output}")
+                processed_input = f"{processed_input}\n\n[Current Time: {output}]"
+                print(f"[Strands SDK] Current time tool executed: {output}")
+            tools_used.append(tool_name)
+            operations.append({
+                'step': f"{tool_name.replace('_', ' ').title()} tool executed",
+                'details': f"Input: {tool_input} | Output: {output} | Status: Success",
+                'timestamp': datetime.now().isoformat(),
+                'tool_name': tool_name,
+                'tool_input': tool_input,
+                'tool_output': output,
+                'duration_ms': duration_ms
+            })
+
+        yield {'type': 'tool_end', 'tool': tool_name, 'success': bool(output), 'error': error,
+               'output': (output or '')[:500], 'duration_ms': duration_ms}
+
+    yield {'type': 'tools_done', 'processed_input': processed_input, 'tool_results': tool_results,
+           'tools_used': tools_used, 'operations': operations}
+
+# Overall deadline for one streamed agent execution
+STREAM_EXECUTION_TIMEOUT = 180
+_STREAM_END = object()
+
+def iter_with_deadline(iterator, timeout):
+    """
+    Drain a blocking iterator on the shared agent executor and re-yield its items here.
+    Raises TimeoutError once `timeout` seconds have passed; the producer stops when the consumer goes away.
+    """
+    items = queue.Queue()
+    cancelled = threading.Event()
+    
+    def pump():
+        try:
+            for item in iterator:
+                if cancelled.is_set():
+                    break
+                items.put((item, None))
+        except Exception as e:
+            items.put((None, e))
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close:
+                close()
+            items.put((_STREAM_END, None))
+    
+    agent_executor.submit(pump)
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            try:
+                item, error = items.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise TimeoutError(f"Agent execution timed out after {timeout} seconds")
+            if error is not None:
+                raise error
+            if item is _STREAM_END:
+                return
+            yield item
+    finally:
+        cancelled.set()
+
+def iter_agent_turns(agent, input_text, options, timeout, stream=False):
+    """
+    Run an agent's model turns and tools. Models with native tool support get Ollama's tool-calling
+    loop (the model picks the tools and their arguments); others fall back to the keyword-triggered
+    tools before one model call. Yields tool_start / tool_end (and token, when streaming) events;
+    the last event (type 'loop_done') carries content, tools_used, tool_results, operations and metrics.
+    """
+    session = session_manager.get_session(agent.host, agent.model_id, agent.system_prompt, agent_id=agent.id)
+    if agent.tool_schemas and tools_supported(agent.host, agent.model_id):
+        try:
+            yield from iter_tool_loop(session, input_text, agent.tool_map, agent_executor, schemas=agent.tool_schemas,
+                                      options=options, timeout=timeout, stream=stream)
+            return
+        except ToolsUnsupported as e:
+            print(f"[Strands SDK] ⚠️ {agent.model_id} has no native tool support, using keyword-triggered tools: {e}")
+    
+    tool_run = None
+    for event in iter_input_tools(input_text, agent.tools_loaded):
+        if event['type'] == 'tools_done':
+            tool_run = event
+        else:
+            yield event
+    
+    if stream:
+        response_parts, metrics = [], {}
+        chunks = session.stream_chat(tool_run['processed_input'], options=options, timeout=timeout)
+        for chunk in iter_with_deadline(chunks, timeout):
+            token = chunk.get('message', {}).get('content', '')
+            if token:
+                response_parts.append(token)
+                yield {'type': 'token', 'content': token}
+            if chunk.get('done'):
+                metrics = chunk.get('metrics', {})
+        content = "".join(response_parts)
+    else:
+        session_result = session.chat(tool_run['processed_input'], options=options, timeout=timeout)
+        content, metrics = session_result['content'], session_result['metrics']
+    yield {'type': 'loop_done', 'content': content, 'tools_used': tool_run['tools_used'],
+           'tool_results': tool_run['tool_results'], 'operations': tool_run['operations'],
+           'metrics': {**metrics, 'model_turns': 1}, 'turns': 1}
+
+# Batch execution: bounded pool plus a per-model limit matching Ollama's OLLAMA_NUM_PARALLEL,
+# so a fan-out never queues more concurrent requests on one model than Ollama will serve
+OLLAMA_NUM_PARALLEL = int(os.environ.get('OLLAMA_NUM_PARALLEL', '4'))
+BATCH_WORKERS = 8
+MAX_BATCH_SIZE = 50
+# Separate from agent_executor: batch items wait on tool futures submitted to that pool
+batch_executor = concurrent.futures.ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix='strands-batch')
+_model_limits = {}
+_model_limits_lock = threading.Lock()
+
+def _model_limit(host, model_id):
+    with _model_limits_lock:
+        key = (host, model_id)
+        if key not in _model_limits:
+            _model_limits[key] = threading.BoundedSemaphore(OLLAMA_NUM_PARALLEL)
+        return _model_limits[key]
+
+def _run_batch_item(agent_id, input_text):
+    """One batch entry: run the agent under its model's concurrency limit"""
+    agent = agent_config_cache.get(agent_id)
+    if agent is None:
+        return {'error': 'Strands agent not found'}, 404
+    with _model_limit(agent.host, agent.model_id):
+        return run_strands_agent(agent_id, input_text)
+
+def _log_execution(execution_id, agent_id, input_text, output_text, execution_time, success,
+                   metadata, error_message=None):
+    """Queue an execution for the append-only log; its tool/step rows and rollups are written in the same batch"""
+    execution_log.log(execution_id, agent_id, input_text, output_text, execution_time, success,
+                      metadata, error_message)
+
 def init_strands_sdk_database():
     """Initialize SQLite database for Strands SDK agents"""
     conn = sqlite3.connect(STRANDS_SDK_DB)
@@ -834,7 +1083,41 @@ def init_strands_sdk_database():
         )
     ''')
     
+    # Recent-executions lookups (agent listing, traces) walk this index instead of scanning the table
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_strands_sdk_executions_agent_timestamp
+        ON strands_sdk_executions (agent_id, timestamp DESC)
+    ''')
+    
+    # Listing version: every write to the agents (or their executions) bumps it inside the writer's
+    # own transaction, so the agent listing ETag changes even for same-second edits to older agents
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS strands_sdk_listing_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            agents_version INTEGER NOT NULL DEFAULT 0,
+            executions_version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('INSERT OR IGNORE INTO strands_sdk_listing_version (id) VALUES (1)')
+    for table, column in (('strands_sdk_agents', 'agents_version'), ('strands_sdk_executions', 'executions_version')):
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}_listing_version AFTER {event} ON {table}
+                BEGIN
+                    UPDATE strands_sdk_listing_version SET {column} = {column} + 1 WHERE id = 1;
+                END
+            ''')
+    
+    # Structured execution log (tool invocations, operation steps) and pre-aggregated analytics
+    init_execution_log_tables(cursor)
+    init_rollup_tables(cursor)
     conn.commit()
+    migrated = migrate_legacy_executions(conn)
+    if migrated:
+        print(f"[Strands SDK] 🗂️ Migrated {migrated} executions to the structured execution log")
+    backfilled = backfill_if_empty(conn)
+    if backfilled:
+        print(f"[Strands SDK] 📊 Backfilled analytics rollups from {backfilled} executions")
     conn.close()
     print("[Strands SDK] Database initialized successfully")
 
@@ -850,6 +1133,28 @@ def health_check():
         'timestamp': datetime.now().isoformat()
     })
 
+@app.route('/api/strands-sdk/ollama/metrics', methods=['GET'])
+def get_ollama_metrics():
+    """Per-call Ollama metrics: queue wait, TTFT and tokens/s"""
+    recent = request.args.get('recent', 20, type=int)
+    return jsonify({**ollama_client.get_metrics(recent=recent), 'agent_sessions': session_manager.get_stats(),
+                    'agent_config_cache': agent_config_cache.get_stats(), 'execution_log': execution_log.get_stats(),
+                    'tool_result_cache': tool_result_cache.get_stats()})
+
+@app.route('/api/strands-sdk/agents/<agent_id>/warm', methods=['POST'])
+def warm_strands_agent(agent_id):
+    """Load an agent's model and pre-evaluate its system prompt so the next turn starts from a warm cache"""
+    try:
+        agent = agent_config_cache.get(agent_id)
+        if agent is None:
+            return jsonify({'error': 'Strands agent not found'}), 404
+        
+        session = session_manager.get_session(agent.host, agent.model_id, agent.system_prompt, agent_id=agent_id)
+        metrics = session.warm()
+        return jsonify({'success': True, 'metrics': metrics, 'session': session.get_stats()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/strands-sdk/agents', methods=['POST'])
 def create_strands_agent():
     """Create a new Strands SDK agent following official patterns"""
@@ -948,6 +1253,8 @@ def create_strands_agent():
         conn.commit()
         conn.close()
         
+        agent_config_cache.invalidate(agent_id)
+        
         print(f"[Strands SDK] Agent created successfully: {agent_id}")
         
         return jsonify({
@@ -964,7 +1271,7 @@ def create_strands_agent():
 
 @app.route('/api/strands-sdk/agents/<agent_id>/execute-stream', methods=['POST'])
 def execute_strands_agent_stream(agent_id):
-    """Execute Strands SDK agent with real-time progress streaming"""
+    """Execute Strands SDK agent, streaming real events: tool calls, model load, prompt eval and token deltas"""
     try:
         data = request.json
         input_text = data.get('input', '')
@@ -972,228 +1279,81 @@ def execute_strands_agent_stream(agent_id):
         if not input_text:
             return jsonify({'error': 'Input text is required'}), 400
         
+        def sse(payload):
+            return f"data: {json.dumps(payload)}\n\n"
+        
         def generate_progress():
             """Generator function for real-time progress updates"""
+            start_time = time.time()
             try:
-                # Load agent configuration
-                conn = sqlite3.connect(STRANDS_SDK_DB)
-                cursor = conn.cursor()
-                
-                cursor.execute('SELECT * FROM strands_sdk_agents WHERE id = ?', (agent_id,))
-                agent_data = cursor.fetchone()
-                
-                if not agent_data:
-                    yield f"data: {json.dumps({'error': 'Agent not found'})}\n\n"
+                # Load agent configuration (cached, invalidated whenever the agent is written)
+                agent = agent_config_cache.get(agent_id)
+                if agent is None:
+                    yield sse({'error': 'Agent not found'})
                     return
                 
-                # Extract agent configuration
-                agent_config = {
-                    'id': agent_data[0],
-                    'name': agent_data[1],
-                    'description': agent_data[2],
-                    'model_id': agent_data[3],
-                    'host': agent_data[4],
-                    'system_prompt': agent_data[5],
-                    'tools': json.loads(agent_data[6]) if agent_data[6] else [],
-                    'ollama_config': json.loads(agent_data[7]) if agent_data[7] else {},
-                    'sdk_version': agent_data[8],
-                    'created_at': agent_data[9],
-                    'response_style': agent_data[15] if len(agent_data) > 15 else 'conversational',
-                    'show_thinking': bool(agent_data[16]) if len(agent_data) > 16 else True,
-                    'show_tool_details': bool(agent_data[17]) if len(agent_data) > 17 else True,
-                    'include_examples': bool(agent_data[18]) if len(agent_data) > 18 else False,
-                    'include_citations': bool(agent_data[19]) if len(agent_data) > 19 else False,
-                    'include_warnings': bool(agent_data[20]) if len(agent_data) > 20 else False,
-                    'updated_at': agent_data[10],
-                    'status': agent_data[11],
-                    'model_provider': agent_data[12],
-                    'sdk_config': json.loads(agent_data[13]) if agent_data[13] else {}
-                }
-                
-                # Stream progress: Step 1
-                step_data = {'step': 'Initializing Strands SDK', 'details': f'Loading agent: {agent_config["name"]}', 'status': 'running'}
-                yield f"data: {json.dumps(step_data)}\n\n"
-                time.sleep(0.1)
-                
-                # Stream progress: Step 2
-                step_data = {'step': 'Agent configuration loaded', 'details': f'Model: {agent_config["model_id"]}, Host: {agent_config["host"]}', 'status': 'running'}
-                yield f"data: {json.dumps(step_data)}\n\n"
-                time.sleep(0.1)
-                
-                # Create model configuration
-                base_config = {
-                    'host': agent_config['host'],
-                    'model_id': agent_config['model_id']
-                }
-                
-                sdk_config = agent_config.get('sdk_config', {})
-                ollama_config = sdk_config.get('ollama_config', {}) if isinstance(sdk_config, dict) else {}
-                enhanced_config = {**base_config, **ollama_config}
-                enhanced_config = {k: v for k, v in enhanced_config.items() 
-                                  if v is not None and v != '' and v != []}
+                agent_config = agent.to_dict()
+                ollama_config = agent.ollama_config
+                tools_loaded = agent.tools_loaded
                 
-                # Stream progress: Step 3
-                step_data = {'step': 'Model configuration loaded', 'details': f'Host: {enhanced_config.get("host")}, Model: {enhanced_config.get("model_id")}', 'status': 'running'}
-                yield f"data: {json.dumps(step_data)}\n\n"
-                time.sleep(0.1)
+                yield sse({'step': 'Agent configuration loaded',
+                           'details': f"Model: {agent_config['model_id']}, Host: {agent_config['host']}, Tools: {', '.join(tools_loaded) or 'none'}",
+                           'status': 'running'})
                 
-                ollama_model = OllamaModel(**enhanced_config)
-                
-                # Handle tools
-                agent_kwargs = {
-                    'model': ollama_model,
-                    'system_prompt': agent_config['system_prompt']
-                }
-                
-                tools = agent_config.get('tools', [])
-                tools_loaded = []
-                
-                if tools:
-                    # Stream progress: Step 4
-                    step_data = {'step': f'Agent configured with tools: {tools}', 'details': f'Available tools: {", ".join(tools)}', 'status': 'running'}
-                    yield f"data: {json.dumps(step_data)}\n\n"
-                    time.sleep(0.1)
-                    
-                    tool_functions = []
-                    for i, tool_name in enumerate(tools):
-                        if tool_name in AVAILABLE_TOOLS:
-                            tool_functions.append(AVAILABLE_TOOLS[tool_name])
-                            tools_loaded.append(tool_name)
-                            
-                            # Stream progress: Each tool loaded
-                            step_data = {'step': f'Loaded tool: {tool_name}', 'details': f'Tool #{i+1}: {tool_name}', 'status': 'running'}
-                            yield f"data: {json.dumps(step_data)}\n\n"
-                            time.sleep(0.1)
-                    
-                    if tool_functions:
-                        agent_kwargs['tools'] = tool_functions
-                        # Stream progress: Tools ready
-                        step_data = {'step': f'Agent will execute with {len(tool_functions)} tools', 'details': f'Ready to use: {", ".join(tools_loaded)}', 'status': 'running'}
-                        yield f"data: {json.dumps(step_data)}\n\n"
-                        time.sleep(0.1)
-                
-                agent = Agent(**agent_kwargs)
-                
-                # Stream progress: Starting execution
-                step_data = {'step': 'Starting agent execution', 'details': f'Processing input: {input_text[:50]}...', 'status': 'running'}
-                yield f"data: {json.dumps(step_data)}\n\n"
-                time.sleep(0.1)
-                
-                # Execute agent
-                start_time = time.time()
-                
-                # Initialize operations log for streaming
-                operations_log = []
-                
-                # Use the same execution logic as the non-streaming endpoint
+                session = session_manager.get_session(agent.host, agent.model_id, agent.system_prompt, agent_id=agent_id)
                 try:
-                    # Execute agent with timeout protection using ThreadPoolExecutor
-                    with concurrent.futures.ThreadPoolExecutor() as executor:
-                        future = executor.submit(lambda: agent(input_text))
-                        try:
-                            response = future.result(timeout=180)  # Increased timeout for Strands SDK (3 minutes)
-                            execution_time = time.time() - start_time
-                        except concurrent.futures.TimeoutError:
-                            execution_time = time.time() - start_time
-                            step_data = {'step': 'Execution timeout', 'details': 'Agent execution timed out after 180 seconds', 'status': 'error'}
-                            yield f"data: {json.dumps(step_data)}\n\n"
-                            return
-                except Exception as e:
-                    execution_time = time.time() - start_time
-                    error_data = {'error': str(e), 'type': 'error'}
-                    yield f"data: {json.dumps(error_data)}\n\n"
-                    return
+                    model_loaded = session.is_loaded()
+                except Exception:
+                    model_loaded = None
+                yield sse({'type': 'model_load', 'loaded': model_loaded,
+                           'step': 'Model warm' if model_loaded else 'Loading model',
+                           'details': f"{agent_config['model_id']} {'already in memory' if model_loaded else 'is being loaded by Ollama'}",
+                           'status': 'running'})
+                yield sse({'type': 'prompt_eval', 'step': 'Prompt evaluation started',
+                           'details': f"{len(input_text)} characters of input", 'status': 'running'})
                 
-                # Stream progress: Processing response
-                step_data = {'step': 'Processing agent response', 'details': f'Agent completed execution in {execution_time:.2f}s', 'status': 'running'}
-                yield f"data: {json.dumps(step_data)}\n\n"
-                time.sleep(0.1)
-                
-                # Handle response and extract tool usage information
-                if hasattr(response, 'content'):
-                    response_text = response.content
-                elif hasattr(response, 'text'):
-                    response_text = response.text
-                else:
-                    response_text = str(response)
-                
-                # Try to extract tool usage from Strands agent response
-                tools_used = []
-                
-                # Check if response object has tool usage information
-                if hasattr(response, 'tool_calls') and response.tool_calls:
-                    for tool_call in response.tool_calls:
-                        if hasattr(tool_call, 'name'):
-                            tools_used.append(tool_call.name)
-                elif hasattr(response, 'tools_used') and response.tools_used:
-                    tools_used = response.tools_used
-                elif hasattr(response, 'metadata') and response.metadata:
-                    if 'tools_used' in response.metadata:
-                        tools_used = response.metadata['tools_used']
-                
-                # If no direct tool usage info, fall back to intelligent detection
-                if tools_loaded:
-                    # Check for web search usage
-                    if 'web_search' in tools_loaded:
-                        # Check input for search intent AND response for search patterns
-                        input_has_search = any(word in input_text.lower() for word in ['search', 'find', 'look up', 'google', 'web', 'what is', 'who is', 'when', 'where', 'how'])
-                        
-                        # Success indicators in response
-                        success_indicators = [
-                            'found information', 'summary:', 'source:', 'results show',
-                            'according to', 'based on search', 'information found',
-                            'search results', 'online information', 'latest information',
-                            'here is what i found', 'search returned', 'web search shows'
-                        ]
-                        
-                        # Failure indicators in response  
-                        failure_indicators = [
-                            'no specific result found', 'wasn\'t a specific result', 'no results found',
-                            'search did not yield', 'couldn\'t find', 'no information found'
-                        ]
-                        
-                        response_has_success = any(indicator in response_text.lower() for indicator in success_indicators)
-                        response_has_failure = any(indicator in response_text.lower() for indicator in failure_indicators)
-                        
-                        # Tool was used if input requested search (regardless of success/failure)
-                        if input_has_search:
-                            tools_used.append('web_search')
-                            status = 'successful' if response_has_success else 'attempted' if response_has_failure else 'unknown'
-                            step_data = {'step': f'Web search tool {status}', 'details': f'Detected web search usage - Status: {status}', 'status': 'running'}
-                            yield f"data: {json.dumps(step_data)}\n\n"
-                            time.sleep(0.1)
-                            print(f"[Strands SDK] Detected web_search tool usage - Status: {status}")
-                    
-                    # Check for calculator usage
-                    if 'calculator' in tools_loaded:
-                        input_has_calc = any(word in input_text.lower() for word in ['calculate', 'compute', 'math', '+', '-', '*', '/', '=', 'x', '×', 'multiply', 'multiplication'])
-                        calc_indicators = ['calculated', 'calculation', 'result is', 'equals', 'math', 'computed', 'answer is']
-                        
-                        if input_has_calc or any(indicator in response_text.lower() for indicator in calc_indicators):
-                            tools_used.append('calculator')
-                            step_data = {'step': 'Calculator tool used', 'details': 'Detected calculator usage in agent interaction', 'status': 'running'}
-                            yield f"data: {json.dumps(step_data)}\n\n"
-                            time.sleep(0.1)
-                    
-                    # Check for time/date tool usage
-                    if 'current_time' in tools_loaded:
-                        input_has_time = any(word in input_text.lower() for word in ['time', 'date', 'today', 'now', 'current'])
-                        time_indicators = ['current time', 'time is', 'date is', 'today is', 'now is', 'current date']
-                        
-                        if input_has_time or any(indicator in response_text.lower() for indicator in time_indicators):
-                            tools_used.append('current_time')
-                            step_data = {'step': 'Time tool used', 'details': 'Detected time tool usage in agent interaction', 'status': 'running'}
-                            yield f"data: {json.dumps(step_data)}\n\n"
-                            time.sleep(0.1)
+                # Tool calls are reported as they start and end; token deltas come straight from Ollama's streaming chat API
+                first_token_sent = False
+                result = None
+                turns = iter_agent_turns(agent, input_text, {
+                    "temperature": ollama_config.get('temperature', 0.7),
+                    "max_tokens": ollama_config.get('max_tokens', 1000)
+                }, STREAM_EXECUTION_TIMEOUT, stream=True)
+                for event in turns:
+                    if event['type'] == 'token':
+                        if not first_token_sent:
+                            first_token_sent = True
+                            ttft_ms = int((time.time() - start_time) * 1000)
+                            yield sse({'type': 'first_token', 'step': 'First token received',
+                                       'details': f'{ttft_ms}ms after request', 'ttft_ms': ttft_ms, 'status': 'running'})
+                        yield sse(event)
+                    elif event['type'] == 'tool_start':
+                        yield sse({**event, 'step': f"Calling tool: {event['tool']}", 'details': event['input'], 'status': 'running'})
+                    elif event['type'] == 'tool_end':
+                        outcome = f"{event['duration_ms']}ms" if event['success'] else f"failed: {event['error'] or 'no result'}"
+                        yield sse({**event, 'output': (event['output'] or '')[:500], 'step': f"Tool finished: {event['tool']}",
+                                   'details': outcome, 'status': 'running'})
+                    else:
+                        result = event
+                operations_log = list(result['operations'])
+                tools_used = list(result['tools_used'])
+                ollama_metrics = result['metrics']
+                response_text = result['content']
+                execution_time = time.time() - start_time
+                operations_log.append({
+                    'step': 'Response generated',
+                    'details': f"Generated {len(response_text)} characters in {execution_time:.2f}s",
+                    'timestamp': datetime.now().isoformat()
+                })
                 
-                # Stream progress: Final step
-                step_data = {'step': 'Response generated', 'details': f'Generated {len(response_text)} characters in {execution_time:.2f}s', 'status': 'completed'}
-                yield f"data: {json.dumps(step_data)}\n\n"
-                time.sleep(0.1)
+                yield sse({'type': 'generation_done', 'step': 'Response generated',
+                           'details': f"Generated {len(response_text)} characters in {execution_time:.2f}s "
+                                      f"({ollama_metrics.get('tokens_per_second')} tokens/s)",
+                           'metrics': ollama_metrics, 'status': 'completed'})
                 
                 # Send final result
                 execution_id = str(uuid.uuid4())
-                final_result = {
+                yield sse({
                     'type': 'final_result',
                     'response': response_text,
                     'execution_time': execution_time,
@@ -1203,40 +1363,34 @@ def execute_strands_agent_stream(agent_id):
                     'agent_name': agent_config['name'],
                     'model_used': agent_config['model_id'],
                     'tools_used': tools_used,
+                    'ollama_metrics': ollama_metrics,
                     'success': True
-                }
-                
-                yield f"data: {json.dumps(final_result)}\n\n"
+                })
                 
                 # Log to database with metadata
-                cursor.execute('''
-                    INSERT INTO strands_sdk_executions 
-                    (id, agent_id, input_text, output_text, execution_time, success, sdk_metadata)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
+                _log_execution(
                     execution_id, 
                     agent_id, 
                     input_text, 
                     response_text, 
                     execution_time, 
                     True,
-                    json.dumps({
+                    {
                         'execution_metadata': {
                             'input_length': len(input_text),
                             'output_length': len(response_text),
                             'tools_used': tools_used,
                             'tools_available': tools_loaded,
-                            'operations_log': operations_log
+                            'operations_log': operations_log,
+                            'ollama_metrics': ollama_metrics
                         }
-                    })
-                ))
-                
-                conn.commit()
-                conn.close()
+                    }
+                )
                 
+            except TimeoutError as e:
+                yield sse({'step': 'Execution timeout', 'details': str(e), 'status': 'error'})
             except Exception as e:
-                error_data = {'error': str(e), 'type': 'error'}
-                yield f"data: {json.dumps(error_data)}\n\n"
+                yield sse({'error': str(e), 'type': 'error'})
         
         return Response(
             generate_progress(),
@@ -1244,6 +1398,7 @@ def execute_strands_agent_stream(agent_id):
             headers={
                 'Cache-Control': 'no-cache',
                 'Connection': 'keep-alive',
+                'X-Accel-Buffering': 'no',
                 'Access-Control-Allow-Origin': '*',
                 'Access-Control-Allow-Headers': 'Content-Type'
             }
@@ -1255,69 +1410,26 @@ def execute_strands_agent_stream(agent_id):
 @app.route('/api/strands-sdk/agents/<agent_id>/execute', methods=['POST'])
 def execute_strands_agent(agent_id):
     """Execute Strands SDK agent using official SDK patterns (non-streaming fallback)"""
+    data = request.json or {}
+    result, status_code = run_strands_agent(agent_id, data.get('input', ''))
+    return jsonify(result), status_code
+
+def run_strands_agent(agent_id, input_text):
+    """Run one non-streaming agent execution; returns (response body, HTTP status)"""
     try:
-        data = request.json
-        input_text = data.get('input', '')
-        
         if not input_text:
-            return jsonify({'error': 'Input text is required'}), 400
+            return {'error': 'Input text is required'}, 400
         
         print(f"[Strands SDK] Executing agent {agent_id} with input: {input_text[:50]}...")
         
         # Emit initial progress
         emit_progress(agent_id, "initializing", "Starting agent execution...", 5)
         
-        # Load agent configuration
-        conn = sqlite3.connect(STRANDS_SDK_DB)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM strands_sdk_agents WHERE id = ?', (agent_id,))
-        agent_data = cursor.fetchone()
-        
-        if not agent_data:
-            return jsonify({'error': 'Strands agent not found'}), 404
-        
-        # Extract agent configuration with safe JSON parsing
-        try:
-            tools_json = _safe_json_loads(agent_data[6], [])
-            tool_configurations_json = _safe_json_loads(agent_data[7], {})
-            ollama_config_json = _safe_json_loads(agent_data[8], {})
-            sdk_config_json = _safe_json_loads(agent_data[14] if len(agent_data) > 14 else None, {})
-        except Exception as e:
-            print(f"[Strands SDK] Error parsing agent config JSON: {e}")
-            tools_json = []
-            tool_configurations_json = {}
-            ollama_config_json = {}
-            sdk_config_json = {}
-        
-        # Fix the host/model_id configuration issue
-        # The database schema: model_id=3, host=4, system_prompt=5
-        actual_model_id = agent_data[3]  # model_id field
-        actual_host = agent_data[4]      # host field
-        
-        agent_config = {
-            'id': agent_data[0],
-            'name': agent_data[1],
-            'description': agent_data[2],
-            'model_id': actual_model_id,
-            'host': actual_host,
-            'system_prompt': agent_data[5] if agent_data[5] and not agent_data[5].startswith('http') else "You are a helpful AI assistant.",
-            'tools': tools_json,
-            'tool_configurations': tool_configurations_json,
-            'ollama_config': ollama_config_json,
-            'sdk_version': agent_data[9],
-            'created_at': agent_data[10],
-            'response_style': agent_data[16] if len(agent_data) > 16 else 'conversational',
-            'show_thinking': bool(agent_data[17]) if len(agent_data) > 17 else True,
-            'show_tool_details': bool(agent_data[18]) if len(agent_data) > 18 else True,
-            'include_examples': bool(agent_data[19]) if len(agent_data) > 19 else False,
-            'include_citations': bool(agent_data[20]) if len(agent_data) > 20 else False,
-            'include_warnings': bool(agent_data[21]) if len(agent_data) > 21 else False,
-            'updated_at': agent_data[11],
-            'status': agent_data[12],
-            'model_provider': agent_data[13],
-            'sdk_config': sdk_config_json
-        }
+        # Load agent configuration (cached, invalidated whenever the agent is written)
+        agent = agent_config_cache.get(agent_id)
+        if agent is None:
+            return {'error': 'Strands agent not found'}, 404
+        agent_config = agent.to_dict()
         
         print(f"[Strands SDK] Agent config loaded: {agent_config['name']} - {agent_config['model_id']}")
         
@@ -1342,20 +1454,8 @@ def execute_strands_agent(agent_id):
         add_operation('Initializing Strands SDK', f"Loading agent: {agent_config['name']}")
         add_operation('Agent configuration loaded', f"Model: {agent_config['model_id']}, Host: {agent_config['host']}")
         
-        # Create Strands SDK agent following official patterns with enhanced config
-        base_config = {
-            'host': agent_config['host'],
-            'model_id': agent_config['model_id']
-        }
-        
-        # Add enhanced Ollama configuration if available
-        sdk_config = agent_config.get('sdk_config', {})
-        ollama_config = sdk_config.get('ollama_config', {}) if isinstance(sdk_config, dict) else {}
-        
-        # Merge configurations, filtering out None/empty values
-        enhanced_config = {**base_config, **ollama_config}
-        enhanced_config = {k: v for k, v in enhanced_config.items() 
-                          if v is not None and v != '' and v != []}
+        # Host/model merged with the agent's Ollama options
+        enhanced_config = agent.enhanced_config
         
         print(f"[Strands SDK] Using enhanced config: {enhanced_config}")
         operations_log.append({
@@ -1368,8 +1468,8 @@ def execute_strands_agent(agent_id):
         print(f"[Strands SDK] Using direct Ollama API call for model: {agent_config['model_id']}")
         ollama_model = None  # We'll use direct API calls
         
-        # Load tools for the agent
-        tools_loaded = agent_config.get('tools', [])
+        # Tools resolved against AVAILABLE_TOOLS once per config version
+        tools_loaded = agent.tools_loaded
         print(f"[Strands SDK] Loading tools for agent: {tools_loaded}")
         operations_log.append({
             'step': 'Tools loaded',
@@ -1387,194 +1487,26 @@ def execute_strands_agent(agent_id):
         
         start_time = time.time()
         
-        # Capture tool usage by monitoring the response
+        # Tools actually called during this execution, in call order
         tools_used = []
         
         try:
-            # Check if we need to use tools first
-            tool_results = []
-            processed_input = input_text
-            
-            # Check for calculator usage
-            if 'calculator' in tools_loaded:
-                calc_keywords = ['calculate', 'compute', 'math', '+', '-', '*', '/', '=', 'x', '×', 'multiply', 'multiplication']
-                if any(word in input_text.lower() for word in calc_keywords):
-                    try:
-                        # Extract mathematical expression
-                        import re
-                        
-                        # Look for multiplication patterns like "208679447 x 3672.23" or "15 * 23"
-                        mult_pattern = r'(\d+(?:\.\d+)?)\s*[x×*]\s*(\d+(?:\.\d+)?)'
-                        mult_match = re.search(mult_pattern, input_text)
-                        
-                        # Look for division patterns like "6252525 / 4848992.5663"
-                        div_pattern = r'(\d+(?:\.\d+)?)\s*/\s*(\d+(?:\.\d+)?)'
-                        div_match = re.search(div_pattern, input_text)
-                        
-                        # Look for addition patterns like "15 + 23"
-                        add_pattern = r'(\d+(?:\.\d+)?)\s*\+\s*(\d+(?:\.\d+)?)'
-                        add_match = re.search(add_pattern, input_text)
-                        
-                        # Look for subtraction patterns like "15 - 23"
-                        sub_pattern = r'(\d+(?:\.\d+)?)\s*-\s*(\d+(?:\.\d+)?)'
-                        sub_match = re.search(sub_pattern, input_text)
-                        
-                        if mult_match:
-                            num1 = float(mult_match.group(1))
-                            num2 = float(mult_match.group(2))
-                            result = num1 * num2
-                            operation = f"{num1} × {num2}"
-                            tool_results.append(f"Calculator result: {operation} = {result}")
-                            tools_used.append('calculator')
-                            print(f"[Strands SDK] 🧮 CALCULATOR TOOL EXECUTED: {operation} = {result}")
-                            
-                            # Add detailed tool execution to operations log
-                            operations_log.append({
-                                'step': 'Calculator tool executed',
-                                'details': f"Input: {operation} | Output: {result} | Status: Success",
-                                'timestamp': datetime.now().isoformat(),
-                                'tool_name': 'calculator',
-                                'tool_input': operation,
-                                'tool_output': str(result)
-                            })
-                            
-                            # Add calculator result to the prompt
-                            processed_input = f"{input_text}\n\n[Calculator Result: {operation} = {result}]"
-                            
-                        elif div_match:
-                            num1 = float(div_match.group(1))
-                            num2 = float(div_match.group(2))
-                            if num2 == 0:
-                                result = "Error: Division by zero"
-                            else:
-                                result = num1 / num2
-                            operation = f"{num1} ÷ {num2}"
-                            tool_results.append(f"Calculator result: {operation} = {result}")
-                            tools_used.append('calculator')
-                            print(f"[Strands SDK] 🧮 CALCULATOR TOOL EXECUTED: {operation} = {result}")
-                            
-                            # Add detailed tool execution to operations log
-                            operations_log.append({
-                                'step': 'Calculator tool executed',
-                                'details': f"Input: {operation} | Output: {result} | Status: Success",
-                                'timestamp': datetime.now().isoformat(),
-                                'tool_name': 'calculator',
-                                'tool_input': operation,
-                                'tool_output': str(result)
-                            })
-                            
-                            # Add calculator result to the prompt
-                            processed_input = f"{input_text}\n\n[Calculator Result: {operation} = {result}]"
-                            
-                        elif add_match:
-                            num1 = float(add_match.group(1))
-                            num2 = float(add_match.group(2))
-                            result = num1 + num2
-                            operation = f"{num1} + {num2}"
-                            tool_results.append(f"Calculator result: {operation} = {result}")
-                            tools_used.append('calculator')
-                            print(f"[Strands SDK] 🧮 CALCULATOR TOOL EXECUTED: {operation} = {result}")
-                            
-                            # Add detailed tool execution to operations log
-                            operations_log.append({
-                                'step': 'Calculator tool executed',
-                                'details': f"Input: {operation} | Output: {result} | Status: Success",
-                                'timestamp': datetime.now().isoformat(),
-                                'tool_name': 'calculator',
-                                'tool_input': operation,
-                                'tool_output': str(result)
-                            })
-                            
-                            # Add calculator result to the prompt
-                            processed_input = f"{input_text}\n\n[Calculator Result: {operation} = {result}]"
-                            
-                        elif sub_match:
-                            num1 = float(sub_match.group(1))
-                            num2 = float(sub_match.group(2))
-                            result = num1 - num2
-                            operation = f"{num1} - {num2}"
-                            tool_results.append(f"Calculator result: {operation} = {result}")
-                            tools_used.append('calculator')
-                            print(f"[Strands SDK] 🧮 CALCULATOR TOOL EXECUTED: {operation} = {result}")
-                            
-                            # Add detailed tool execution to operations log
-                            operations_log.append({
-                                'step': 'Calculator tool executed',
-                                'details': f"Input: {operation} | Output: {result} | Status: Success",
-                                'timestamp': datetime.now().isoformat(),
-                                'tool_name': 'calculator',
-                                'tool_input': operation,
-                                'tool_output': str(result)
-                            })
-                            
-                            # Add calculator result to the prompt
-                            processed_input = f"{input_text}\n\n[Calculator Result: {operation} = {result}]"
-                    except Exception as e:
-                        print(f"[Strands SDK] Calculator tool error: {e}")
-            
-            # Check for web search usage
-            if 'web_search' in tools_loaded:
-                search_keywords = ['search', 'find', 'look up', 'google', 'web', 'what is', 'who is', 'when', 'where', 'how']
-                if any(word in input_text.lower() for word in search_keywords):
-                    try:
-                        # Extract search query
-                        search_query = input_text
-                        search_result = web_search(search_query)
-                        if search_result:
-                            tool_results.append(f"Web search result: {search_result}")
-                            tools_used.append('web_search')
-                            print(f"[Strands SDK] Web search tool executed for: {search_query}")
-                            
-                            # Add search result to the prompt
-                            processed_input = f"{input_text}\n\n[Web Search Result: {search_result}]"
-                    except Exception as e:
-                        print(f"[Strands SDK] Web search tool error: {e}")
-            
-            # Check for current time usage
-            if 'current_time' in tools_loaded:
-                time_keywords = ['time', 'date', 'today', 'now', 'current']
-                if any(word in input_text.lower() for word in time_keywords):
-                    try:
-                        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        tool_results.append(f"Current time: {current_time}")
-                        tools_used.append('current_time')
-                        print(f"[Strands SDK] Current time tool executed: {current_time}")
-                        
-                        # Add time result to the prompt
-                        processed_input = f"{input_text}\n\n[Current Time: {current_time}]"
-                    except Exception as e:
-                        print(f"[Strands SDK] Current time tool error: {e}")
-            
-            # Prepare the prompt with system prompt and tool results
-            if tool_results:
-                full_prompt = f"{agent_config['system_prompt']}\n\nUser: {processed_input}\n\nAssistant:"
-            else:
-                full_prompt = f"{agent_config['system_prompt']}\n\nUser: {input_text}\n\nAssistant:"
-            
-            # Call Ollama API directly
-            import requests
-            ollama_response = requests.post(
-                f"{agent_config['host']}/api/generate",
-                json={
-                    "model": agent_config['model_id'],
-                    "prompt": full_prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": enhanced_config.get('temperature', 0.7),
-                        "max_tokens": enhanced_config.get('max_tokens', 1000)
-                    }
-                },
-                timeout=120
-            )
-            
-            if ollama_response.status_code == 200:
-                ollama_data = ollama_response.json()
-                response_text = ollama_data.get('response', '')
-                print(f"[Strands SDK] Ollama response: {response_text[:100]}...")
-                response = type('Response', (), {'content': response_text, 'text': response_text})()
-                execution_time = time.time() - start_time
-            else:
-                raise Exception(f"Ollama API error: {ollama_response.status_code} - {ollama_response.text}")
+            # Native tool-calling loop: the model chooses the tools, which run in parallel within a turn
+            tool_loop = list(iter_agent_turns(agent, input_text, {
+                "temperature": enhanced_config.get('temperature', 0.7),
+                "max_tokens": enhanced_config.get('max_tokens', 1000)
+            }, 120))[-1]
+            tool_results = tool_loop['tool_results']
+            tools_used.extend(tool_loop['tools_used'])
+            operations_log.extend(tool_loop['operations'])
+            response_text = tool_loop['content']
+            ollama_metrics = tool_loop['metrics']
+            print(f"[Strands SDK] Prompt eval: {ollama_metrics['prompt_eval_count']} tokens in {ollama_metrics['prompt_eval_ms']}ms "
+                  f"(saved ~{ollama_metrics['saved_prompt_eval_ms']}ms from cached prefix), "
+                  f"{ollama_metrics['model_turns']} model turn(s), tools: {tools_used or 'none'}")
+            print(f"[Strands SDK] Ollama response: {response_text[:100]}...")
+            response = type('Response', (), {'content': response_text, 'text': response_text})()
+            execution_time = time.time() - start_time
             
         except TimeoutError as e:
             execution_time = time.time() - start_time
@@ -1591,19 +1523,14 @@ def execute_strands_agent(agent_id):
             
             # Log failed execution
             execution_id = str(uuid.uuid4())
-            cursor.execute('''
-                INSERT INTO strands_sdk_executions 
-                (id, agent_id, input_text, output_text, execution_time, success, error_message, sdk_metadata)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            _log_execution(
                 execution_id, 
                 agent_id, 
                 input_text, 
                 response_text, 
                 execution_time, 
                 False,  # success = False
-                str(e),
-                json.dumps({
+                {
                     'sdk_version': '1.0.0',
                     'model_config': {
                         'host': agent_config['host'],
@@ -1619,13 +1546,11 @@ def execute_strands_agent(agent_id):
                         'timeout': True,
                         'error': str(e)
                     }
-                })
-            ))
-            
-            conn.commit()
-            conn.close()
+                },
+                error_message=str(e)
+            )
             
-            return jsonify({
+            return {
                 'success': False,
                 'response': response_text,
                 'execution_time': execution_time,
@@ -1638,7 +1563,7 @@ def execute_strands_agent(agent_id):
                 'operations_log': operations_log,
                 'tools_used': [],
                 'timeout': True
-            }), 500
+            }, 500
         
         print(f"[Strands SDK] Execution completed in {execution_time:.2f}s")
         print(f"[Strands SDK] Response type: {type(response)}")
@@ -1699,80 +1624,6 @@ def execute_strands_agent(agent_id):
         
         print(f"[Strands SDK] Response text: {response_text[:100]}...")
         
-        # Enhanced tool usage detection with better logic
-        emit_progress(agent_id, "detecting_tools", "Analyzing tool usage in response...", 85)
-        if tools_loaded:
-            # Check for web search usage - improved detection
-            if 'web_search' in tools_loaded:
-                # Check input for search intent AND response for search patterns
-                input_has_search = any(word in input_text.lower() for word in ['search', 'find', 'look up', 'google', 'web'])
-                
-                # Success indicators in response
-                success_indicators = [
-                    'found information', 'summary:', 'source:', 'results show',
-                    'according to', 'based on search', 'information found',
-                    'search results', 'online information', 'latest information',
-                    'here is what i found', 'search returned', 'web search shows'
-                ]
-                
-                # Failure indicators in response  
-                failure_indicators = [
-                    'no specific result found', 'wasn\'t a specific result', 'no results found',
-                    'search did not yield', 'couldn\'t find', 'no information found'
-                ]
-                
-                response_has_success = any(indicator in response_text.lower() for indicator in success_indicators)
-                response_has_failure = any(indicator in response_text.lower() for indicator in failure_indicators)
-                
-                # Tool was used if input requested search (regardless of success/failure)
-                if input_has_search:
-                    tools_used.append('web_search')
-                    status = 'successful' if response_has_success else 'attempted' if response_has_failure else 'unknown'
-                    operations_log.append({
-                        'step': f'Web search tool {status}',
-                        'details': f'Detected web search usage - Status: {status}',
-                        'timestamp': datetime.now().isoformat()
-                    })
-                    print(f"[Strands SDK] Detected web_search tool usage - Status: {status}")
-            
-            # Check for calculator usage (only if not already executed)
-            if 'calculator' in tools_loaded and 'calculator' not in tools_used:
-                input_has_calc = any(word in input_text.lower() for word in ['calculate', 'compute', 'math', '+', '-', '*', '/', '=', 'x', '×', 'multiply', 'multiplication'])
-                calc_indicators = ['calculated', 'calculation', 'result is', 'equals', 'math', 'computed', 'answer is']
-                
-                if input_has_calc or any(indicator in response_text.lower() for indicator in calc_indicators):
-                    tools_used.append('calculator')
-                    operations_log.append({
-                        'step': 'Calculator tool detected',
-                        'details': 'Detected calculator usage in agent interaction',
-                        'timestamp': datetime.now().isoformat()
-                    })
-                    print(f"[Strands SDK] Detected calculator tool usage")
-            
-            # Check for time/date tool usage
-            if 'current_time' in tools_loaded:
-                input_has_time = any(word in input_text.lower() for word in ['time', 'date', 'today', 'now', 'current'])
-                time_indicators = ['current time', 'time is', 'date is', 'today is', 'now is', 'current date']
-                
-                if input_has_time or any(indicator in response_text.lower() for indicator in time_indicators):
-                    tools_used.append('current_time')
-                    operations_log.append({
-                        'step': 'Time tool used',
-                        'details': 'Detected time tool usage in agent interaction',
-                        'timestamp': datetime.now().isoformat()
-                    })
-                    print(f"[Strands SDK] Detected current_time tool usage")
-            for tool in tools_loaded:
-                if tool not in tools_used and tool in ['calculator', 'current_time']:
-                    # Simple heuristic: if tool is loaded and response is relevant, assume it was used
-                    if tool == 'calculator' and any(indicator in response_text.lower() for indicator in ['result:', 'calculation', 'equals']):
-                        tools_used.append(tool)
-                        operations_log.append({
-                            'step': f'{tool.replace("_", " ").title()} executed',
-                            'details': f'Used {tool} tool',
-                            'timestamp': datetime.now().isoformat()
-                        })
-        
         operations_log.append({
             'step': 'Response generated',
             'details': f"Generated {len(response_text)} characters in {execution_time:.2f}s",
@@ -1781,18 +1632,14 @@ def execute_strands_agent(agent_id):
         
         # Log execution
         execution_id = str(uuid.uuid4())
-        cursor.execute('''
-            INSERT INTO strands_sdk_executions 
-            (id, agent_id, input_text, output_text, execution_time, success, sdk_metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        _log_execution(
             execution_id, 
             agent_id, 
             input_text, 
             response_text, 
             execution_time, 
             True,
-            json.dumps({
+            {
                 'sdk_version': '1.0.0',
                 'model_config': {
                     'host': agent_config['host'],
@@ -1804,18 +1651,16 @@ def execute_strands_agent(agent_id):
                     'output_length': len(str(response)),
                     'tools_used': tools_used,
                     'tools_available': tools_loaded,
-                    'operations_log': operations_log
+                    'operations_log': operations_log,
+                    'ollama_metrics': ollama_metrics
                 }
-            })
-        ))
-        
-        conn.commit()
-        conn.close()
+            }
+        )
         
         # Emit final completion progress
         emit_progress(agent_id, "completed", f"Execution completed successfully in {execution_time:.2f}s", 100, tools_used)
         
-        return jsonify({
+        return {
             'success': True,
             'output': formatted_response,  # Use enhanced formatted response
             'response': formatted_response,  # Keep both for compatibility
@@ -1828,116 +1673,248 @@ def execute_strands_agent(agent_id):
             'model_used': agent_config['model_id'],
             'operations_log': operations_log,
             'tools_used': tools_used,
+            'ollama_metrics': ollama_metrics,
             'response_style': agent_config.get('response_style', 'conversational'),
             'show_thinking': agent_config.get('show_thinking', True),
             'show_tool_details': agent_config.get('show_tool_details', True),
             'include_examples': agent_config.get('include_examples', False),
             'include_citations': agent_config.get('include_citations', False),
             'include_warnings': agent_config.get('include_warnings', False)
-        })
+        }, 200
         
     except Exception as e:
         print(f"[Strands SDK] Execution error: {str(e)}")
         
         # Log failed execution
         try:
-            conn = sqlite3.connect(STRANDS_SDK_DB)
-            cursor = conn.cursor()
-            
-            execution_id = str(uuid.uuid4())
-            cursor.execute('''
-                INSERT INTO strands_sdk_executions 
-                (id, agent_id, input_text, error_message, success, sdk_metadata)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                execution_id, 
-                agent_id, 
-                data.get('input', ''), 
-                str(e), 
-                False,
-                json.dumps({'error_timestamp': datetime.now().isoformat()})
-            ))
-            
-            conn.commit()
-            conn.close()
+            _log_execution(str(uuid.uuid4()), agent_id, input_text, None, None, False,
+                           {'error_timestamp': datetime.now().isoformat()}, error_message=str(e))
         except:
             pass  # Don't fail on logging errors
         
-        return jsonify({'error': str(e), 'sdk_type': 'official-strands'}), 500
+        return {'error': str(e), 'sdk_type': 'official-strands'}, 500
+
+@app.route('/api/strands-sdk/agents/execute-batch', methods=['POST'])
+def execute_strands_agents_batch():
+    """
+    Execute many (agent_id, input) pairs concurrently.
+    Body: {"executions": [{"agent_id": "...", "input": "..."}, ...], "stream": true}
+    Streams one SSE event per execution as it finishes (stream=false returns all results in request order).
+    """
+    try:
+        data = request.json or {}
+        executions = data.get('executions', [])
+        stream = data.get('stream', True)
+        
+        if not isinstance(executions, list) or not executions:
+            return jsonify({'error': 'executions must be a non-empty list of {agent_id, input}'}), 400
+        if len(executions) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'At most {MAX_BATCH_SIZE} executions per batch'}), 400
+        for item in executions:
+            if not isinstance(item, dict) or not item.get('agent_id') or not item.get('input'):
+                return jsonify({'error': 'Each execution needs agent_id and input'}), 400
+        
+        print(f"[Strands SDK] Batch executing {len(executions)} agent runs")
+        start_time = time.time()
+        futures = {
+            batch_executor.submit(_run_batch_item, item['agent_id'], item['input']): index
+            for index, item in enumerate(executions)
+        }
+        
+        def batch_result(future):
+            index = futures[future]
+            result, status_code = future.result()
+            return {
+                'type': 'result',
+                'index': index,
+                'agent_id': executions[index]['agent_id'],
+                'status_code': status_code,
+                'success': status_code == 200 and result.get('success', False),
+                'result': result
+            }
+        
+        def batch_summary(results):
+            succeeded = sum(1 for item in results if item['success'])
+            return {
+                'type': 'done',
+                'total': len(results),
+                'succeeded': succeeded,
+                'failed': len(results) - succeeded,
+                'execution_time': time.time() - start_time
+            }
+        
+        if not stream:
+            results = sorted((batch_result(future) for future in concurrent.futures.as_completed(futures)),
+                             key=lambda item: item['index'])
+            return jsonify({**batch_summary(results), 'results': results})
+        
+        def generate_results():
+            results = []
+            for future in concurrent.futures.as_completed(futures):
+                item = batch_result(future)
+                results.append(item)
+                yield f"data: {json.dumps(item)}\n\n"
+            yield f"data: {json.dumps(batch_summary(results))}\n\n"
+        
+        return Response(
+            generate_results(),
+            mimetype='text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                'Connection': 'keep-alive',
+                'X-Accel-Buffering': 'no',
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Headers': 'Content-Type'
+            }
+        )
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Agent listing: recent executions per agent and the largest page a client can ask for
+RECENT_EXECUTIONS_LIMIT = 10
+MAX_AGENT_PAGE_SIZE = 200
+
+def _encode_agent_cursor(created_at, agent_id):
+    return base64.urlsafe_b64encode(json.dumps([created_at, agent_id]).encode('utf-8')).decode('ascii')
+
+def _decode_agent_cursor(cursor_value):
+    created_at, agent_id = json.loads(base64.urlsafe_b64decode(cursor_value.encode('ascii')))
+    return created_at, agent_id
+
+def _agent_list_etag(cursor, include_executions, page_key):
+    """Validator built from the listing version row, so unchanged listings are answered without the main query"""
+    cursor.execute('SELECT agents_version, executions_version FROM strands_sdk_listing_version WHERE id = 1')
+    agents_version, executions_version = cursor.fetchone()
+    fingerprint = [agents_version, include_executions, page_key]
+    if include_executions:
+        fingerprint.append(executions_version)
+    return hashlib.sha1(json.dumps(fingerprint, default=str).encode('utf-8')).hexdigest()
+
+def _format_recent_execution(row):
+    input_text = row['e_input_text'] or ''
+    output_text = row['e_output_text']
+    return {
+        'input_text': input_text[:100] + '...' if len(input_text) > 100 else input_text,
+        'output_text': output_text[:100] + '...' if output_text and len(output_text) > 100 else output_text,
+        'execution_time': row['e_execution_time'],
+        'success': bool(row['e_success']),
+        'timestamp': row['e_timestamp']
+    }
 
 @app.route('/api/strands-sdk/agents', methods=['GET'])
 def list_strands_agents():
-    """List all Strands SDK agents"""
+    """
+    List Strands SDK agents (newest first) with their recent executions in a single query.
+    Query params: limit + cursor for pagination, include_executions=false to skip recent executions.
+    Responses carry an ETag; a matching If-None-Match gets an empty 304.
+    """
     try:
-        print(f"[Strands SDK] Listing agents...")
-        conn = sqlite3.connect(STRANDS_SDK_DB)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM strands_sdk_agents ORDER BY created_at DESC')
-        agents = cursor.fetchall()
+        include_executions = request.args.get('include_executions', 'true').lower() != 'false'
+        limit = request.args.get('limit', type=int)
+        cursor_value = request.args.get('cursor')
+        if limit is not None:
+            limit = max(1, min(limit, MAX_AGENT_PAGE_SIZE))
+        
+        after = None
+        if cursor_value:
+            try:
+                after = _decode_agent_cursor(cursor_value)
+            except (ValueError, TypeError):
+                return jsonify({'error': 'Invalid cursor'}), 400
         
-        agents_list = []
-        for agent in agents:
-            agent_id = agent[0]
-            
-            # Get recent executions for this agent (before closing connection)
-            cursor.execute('''
-                SELECT input_text, output_text, execution_time, success, timestamp
-                FROM strands_sdk_executions 
-                WHERE agent_id = ? 
-                ORDER BY timestamp DESC 
-                LIMIT 10
-            ''', (agent_id,))
-            
-            recent_executions = cursor.fetchall()
+        with db_manager.get_connection(STRANDS_SDK_DB) as conn:
+            cursor = conn.cursor()
+            etag = _agent_list_etag(cursor, include_executions, [limit, cursor_value])
+            if request.if_none_match.contains(etag):
+                not_modified = Response(status=304)
+                not_modified.set_etag(etag)
+                return not_modified
+        
+            page_filter = ''
+            params = []
+            if after:
+                page_filter = 'WHERE created_at < ? OR (created_at = ? AND id < ?)'
+                params.extend([after[0], after[0], after[1]])
+            # One extra row tells us whether another page exists; -1 means no LIMIT in SQLite
+            params.append(limit + 1 if limit else -1)
+            page_query = f'''
+                SELECT * FROM strands_sdk_agents {page_filter}
+                ORDER BY created_at DESC, id DESC LIMIT ?
+            '''
             
-            # Format recent executions
-            formatted_executions = []
-            for exec_data in recent_executions:
-                formatted_executions.append({
-                    'input_text': exec_data[0][:100] + '...' if len(exec_data[0]) > 100 else exec_data[0],
-                    'output_text': exec_data[1][:100] + '...' if exec_data[1] and len(exec_data[1]) > 100 else exec_data[1],
-                    'execution_time': exec_data[2],
-                    'success': bool(exec_data[3]),
-                    'timestamp': exec_data[4]
-                })
+            if include_executions:
+                cursor.execute(f'''
+                    WITH page AS ({page_query}),
+                    recent AS (
+                        SELECT agent_id,
+                               substr(input_text, 1, 101) AS e_input_text,
+                               substr(output_text, 1, 101) AS e_output_text,
+                               execution_time AS e_execution_time,
+                               success AS e_success,
+                               timestamp AS e_timestamp,
+                               ROW_NUMBER() OVER (PARTITION BY agent_id ORDER BY timestamp DESC) AS e_rank
+                        FROM strands_sdk_executions
+                        WHERE agent_id IN (SELECT id FROM page)
+                    )
+                    SELECT page.*, recent.e_input_text, recent.e_output_text, recent.e_execution_time,
+                           recent.e_success, recent.e_timestamp, recent.e_rank
+                    FROM page
+                    LEFT JOIN recent ON recent.agent_id = page.id AND recent.e_rank <= ?
+                    ORDER BY page.created_at DESC, page.id DESC, recent.e_rank
+                ''', params + [RECENT_EXECUTIONS_LIMIT])
+            else:
+                cursor.execute(page_query, params)
+            rows = cursor.fetchall()
             
-            # Check A2A registration status
-            a2a_status = {
-                'registered': False,
-                'a2a_agent_id': None,
-                'a2a_status': 'unknown'
-            }
+        agents_by_id = {}
+        for row in rows:
+            agent = agents_by_id.get(row['id'])
+            if agent is None:
+                columns = row.keys()
+                agent = agents_by_id[row['id']] = {
+                    'id': row['id'],
+                    'name': row['name'],
+                    'description': row['description'],
+                    'model_provider': row['model_provider'],
+                    'model_id': row['model_id'],
+                    'host': row['host'],
+                    'system_prompt': row['system_prompt'],
+                    'tools': _safe_json_loads(row['tools'], []),
+                    'sdk_config': _safe_json_loads(row['sdk_config'] if 'sdk_config' in columns else None, {}),
+                    'sdk_version': row['sdk_version'],
+                    'created_at': row['created_at'],
+                    'updated_at': row['updated_at'],
+                    'status': row['status'],
+                    'sdk_type': 'official-strands',
+                    'a2a_status': {
+                        'registered': False,
+                        'a2a_agent_id': None,
+                        'a2a_status': 'unknown'
+                    }
+                }
+                if include_executions:
+                    agent['recent_executions'] = []
+            if include_executions and row['e_rank'] is not None:
+                agent['recent_executions'].append(_format_recent_execution(row))
             
-            # Map database columns correctly (14 columns total)
-            agents_list.append({
-                'id': agent[0],                    # id
-                'name': agent[1],                  # name
-                'description': agent[2],           # description
-                'model_provider': agent[12],       # model_provider
-                'model_id': agent[3],              # model_id
-                'host': agent[4],                  # host
-                'system_prompt': agent[5],         # system_prompt
-                'tools': _safe_json_loads(agent[6], []),  # tools
-                'sdk_config': _safe_json_loads(agent[13] if len(agent) > 13 else None, {}),  # sdk_config
-                'sdk_version': agent[8],           # sdk_version
-                'created_at': agent[9],            # created_at
-                'updated_at': agent[10],           # updated_at
-                'status': agent[11],               # status
-                'sdk_type': 'official-strands',
-                'recent_executions': formatted_executions,
-                'a2a_status': a2a_status
-            })
-        
-        conn.close()
+        agents_list = list(agents_by_id.values())
+        next_cursor = None
+        if limit and len(agents_list) > limit:
+            agents_list = agents_list[:limit]
+            last = agents_list[-1]
+            next_cursor = _encode_agent_cursor(last['created_at'], last['id'])
         
         print(f"[Strands SDK] Listed {len(agents_list)} agents")
-        print(f"[Strands SDK] First agent data: {agents_list[0] if agents_list else 'No agents'}")
-        return jsonify({
+        response = jsonify({
             'agents': agents_list,
             'count': len(agents_list),
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None,
             'status': 'success'
         })
+        response.set_etag(etag)
+        return response
         
     except Exception as e:
         print(f"[Strands SDK] Error listing agents: {str(e)}")
@@ -1949,41 +1926,36 @@ def list_strands_agents():
 def get_strands_agent(agent_id):
     """Get a specific Strands SDK agent"""
     try:
-        conn = sqlite3.connect(STRANDS_SDK_DB)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM strands_sdk_agents WHERE id = ?', (agent_id,))
-        agent_data = cursor.fetchone()
+        with db_manager.get_connection(STRANDS_SDK_DB) as conn:
+            agent_data = conn.execute('SELECT * FROM strands_sdk_agents WHERE id = ?', (agent_id,)).fetchone()
         
-        if not agent_data:
-            return jsonify({'error': 'Strands agent not found'}), 404
-        
-        # Get execution history
-        cursor.execute('''
-            SELECT id, input_text, output_text, execution_time, success, timestamp 
-            FROM strands_sdk_executions 
-            WHERE agent_id = ? 
-            ORDER BY timestamp DESC 
-            LIMIT 10
-        ''', (agent_id,))
-        executions = cursor.fetchall()
+            if not agent_data:
+                return jsonify({'error': 'Strands agent not found'}), 404
         
-        conn.close()
+            # Get execution history
+            executions = conn.execute('''
+                SELECT id, input_text, output_text, execution_time, success, timestamp 
+                FROM strands_sdk_executions 
+                WHERE agent_id = ? 
+                ORDER BY timestamp DESC 
+                LIMIT 10
+            ''', (agent_id,)).fetchall()
         
+        # Columns by name: the table layout differs between databases created by different services
         agent = {
-            'id': agent_data[0],
-            'name': agent_data[1],
-            'description': agent_data[2],
-            'model_provider': agent_data[3],
-            'model_id': agent_data[4],
-            'host': agent_data[5],
-            'system_prompt': agent_data[6],
-            'tools': json.loads(agent_data[7]) if agent_data[7] else [],
-            'sdk_config': json.loads(agent_data[8]) if agent_data[8] else {},
-            'sdk_version': agent_data[9],
-            'created_at': agent_data[10],
-            'updated_at': agent_data[11],
-            'status': agent_data[12],
+            'id': agent_data['id'],
+            'name': agent_data['name'],
+            'description': agent_data['description'],
+            'model_provider': agent_data['model_provider'],
+            'model_id': agent_data['model_id'],
+            'host': agent_data['host'],
+            'system_prompt': agent_data['system_prompt'],
+            'tools': _safe_json_loads(agent_data['tools'], []),
+            'sdk_config': _safe_json_loads(agent_data['sdk_config'] if 'sdk_config' in agent_data.keys() else None, {}),
+            'sdk_version': agent_data['sdk_version'],
+            'created_at': agent_data['created_at'],
+            'updated_at': agent_data['updated_at'],
+            'status': agent_data['status'],
             'sdk_type': 'official-strands',
             'recent_executions': [
                 {
@@ -2005,220 +1977,50 @@ def get_strands_agent(agent_id):
 
 @app.route('/api/strands-sdk/agents/<agent_id>/analytics', methods=['GET'])
 def get_agent_analytics(agent_id):
-    """Get detailed analytics for a specific Strands SDK agent"""
+    """Get detailed analytics for a specific Strands SDK agent (served from the execution rollups)"""
     try:
-        conn = sqlite3.connect(STRANDS_SDK_DB)
-        cursor = conn.cursor()
-        
-        # Get agent info
-        cursor.execute('SELECT * FROM strands_sdk_agents WHERE id = ?', (agent_id,))
-        agent_data = cursor.fetchone()
-        
-        if not agent_data:
-            return jsonify({'error': 'Agent not found'}), 404
-        
-        # Get execution statistics
-        cursor.execute('''
-            SELECT 
-                COUNT(*) as total_executions,
-                AVG(execution_time) as avg_execution_time,
-                MIN(execution_time) as min_execution_time,
-                MAX(execution_time) as max_execution_time,
-                SUM(CASE WHEN success = 1 THEN 1 ELSE 0 END) as successful_executions,
-                COUNT(CASE WHEN success = 0 THEN 1 END) as failed_executions
-            FROM strands_sdk_executions 
-            WHERE agent_id = ?
-        ''', (agent_id,))
-        
-        stats = cursor.fetchone()
-        
-        # Get recent executions
-        cursor.execute('''
-            SELECT input_text, output_text, execution_time, success, timestamp, sdk_metadata
-            FROM strands_sdk_executions 
-            WHERE agent_id = ? 
-            ORDER BY timestamp DESC 
-            LIMIT 10
-        ''', (agent_id,))
-        
-        recent_executions = cursor.fetchall()
-        
-        # Get comprehensive tool usage statistics
-        cursor.execute('''
-            SELECT sdk_metadata, execution_time, timestamp, success
-            FROM strands_sdk_executions 
-            WHERE agent_id = ? AND sdk_metadata IS NOT NULL
-            ORDER BY timestamp DESC
-        ''', (agent_id,))
-        
-        metadata_rows = cursor.fetchall()
-        tools_usage = {}
-        tools_timing = {}
-        tools_sequences = []
-        tools_success_rates = {}
-        tools_error_counts = {}
-        total_tokens = 0
-        hourly_tool_usage = {}
-        
-        for row in metadata_rows:
-            if row[0]:
-                try:
-                    metadata = json.loads(row[0])
-                    exec_metadata = metadata.get('execution_metadata', {})
-                    execution_time = row[1]
-                    timestamp = row[2]
-                    success = row[3]
-                    
-                    # Extract tool usage data
-                    tools_used = exec_metadata.get('tools_used', [])
-                    operations_log = exec_metadata.get('operations_log', [])
-                    
-                    # Count tool usage
-                    for tool in tools_used:
-                        tools_usage[tool] = tools_usage.get(tool, 0) + 1
-                        
-                        # Track tool success rates
-                        if tool not in tools_success_rates:
-                            tools_success_rates[tool] = {'success': 0, 'total': 0}
-                        tools_success_rates[tool]['total'] += 1
-                        if success:
-                            tools_success_rates[tool]['success'] += 1
-                    
-                    # Track tool sequences
-                    if tools_used:
-                        tools_sequences.append({
-                            'sequence': tools_used,
-                            'timestamp': timestamp,
-                            'execution_time': execution_time,
-                            'success': success
-                        })
-                    
-                    # Calculate tool timing from operations log
-                    tool_timings = {}
-                    for op in operations_log:
-                        if 'tool' in op.get('step', '').lower():
-                            tool_name = op.get('step', '').replace('Loaded tool: ', '').replace(' tool used', '')
-                            if tool_name and tool_name in tools_used:
-                                # Estimate tool execution time (simplified)
-                                tool_timings[tool_name] = execution_time / len(tools_used) if tools_used else 0
-                    
-                    # Aggregate tool timings
-                    for tool, timing in tool_timings.items():
-                        if tool not in tools_timing:
-                            tools_timing[tool] = []
-                        tools_timing[tool].append(timing)
-                    
-                    # Track hourly tool usage
-                    hour = timestamp.split(' ')[1].split(':')[0] if ' ' in timestamp else '00'
-                    if hour not in hourly_tool_usage:
-                        hourly_tool_usage[hour] = {}
-                    for tool in tools_used:
-                        hourly_tool_usage[hour][tool] = hourly_tool_usage[hour].get(tool, 0) + 1
-                    
-                    # Sum tokens (approximate)
-                    total_tokens += exec_metadata.get('input_length', 0) + exec_metadata.get('output_length', 0)
-                except Exception as e:
-                    print(f"[Analytics] Error processing metadata: {e}")
-                    pass
-        
-        # Calculate success rate
-        success_rate = (stats[4] / stats[0] * 100) if stats[0] > 0 else 0
-        
-        # Get hourly usage pattern (last 24 hours)
-        cursor.execute('''
-            SELECT 
-                strftime('%H', timestamp) as hour,
-                COUNT(*) as count
-            FROM strands_sdk_executions 
-            WHERE agent_id = ? AND datetime(timestamp) > datetime('now', '-24 hours')
-            GROUP BY strftime('%H', timestamp)
-            ORDER BY hour
-        ''', (agent_id,))
-        
-        hourly_usage = dict(cursor.fetchall())
-        
-        conn.close()
+        with db_manager.get_connection(STRANDS_SDK_DB) as conn:
+            cursor = conn.cursor()
+            # Get agent info
+            cursor.execute('SELECT * FROM strands_sdk_agents WHERE id = ?', (agent_id,))
+            agent_data = cursor.fetchone()
         
-        # Calculate tool performance metrics
-        tool_performance = {}
-        for tool, timings in tools_timing.items():
-            if timings:
-                tool_performance[tool] = {
-                    'avg_execution_time': round(sum(timings) / len(timings), 2),
-                    'min_execution_time': round(min(timings), 2),
-                    'max_execution_time': round(max(timings), 2),
-                    'total_invocations': len(timings)
-                }
+            if not agent_data:
+                return jsonify({'error': 'Agent not found'}), 404
         
-        # Calculate tool success rates
-        tool_success_rates = {}
-        for tool, rates in tools_success_rates.items():
-            if rates['total'] > 0:
-                tool_success_rates[tool] = {
-                    'success_rate': round((rates['success'] / rates['total']) * 100, 1),
-                    'successful_invocations': rates['success'],
-                    'total_invocations': rates['total'],
-                    'failure_rate': round(((rates['total'] - rates['success']) / rates['total']) * 100, 1)
-                }
+            rollups = read_agent_rollups(cursor, agent_id)
+            tool_sequences = recent_tool_sequences(cursor, agent_id)
         
-        # Analyze tool sequences
-        tool_combinations = {}
-        for seq_data in tools_sequences:
-            sequence = ','.join(seq_data['sequence'])  # Convert to string for JSON compatibility
-            if sequence not in tool_combinations:
-                tool_combinations[sequence] = {
-                    'count': 0,
-                    'avg_execution_time': 0,
-                    'success_rate': 0,
-                    'total_execution_time': 0,
-                    'successful_executions': 0
-                }
-            tool_combinations[sequence]['count'] += 1
-            tool_combinations[sequence]['total_execution_time'] += seq_data['execution_time']
-            if seq_data['success']:
-                tool_combinations[sequence]['successful_executions'] += 1
-        
-        # Calculate averages for tool combinations
-        for combo in tool_combinations.values():
-            combo['avg_execution_time'] = round(combo['total_execution_time'] / combo['count'], 2)
-            combo['success_rate'] = round((combo['successful_executions'] / combo['count']) * 100, 1)
+            # Only a bounded slice of history is read, via the (agent_id, timestamp) index
+            cursor.execute('''
+                SELECT input_text, output_text, execution_time, success, timestamp
+                FROM strands_sdk_executions 
+                WHERE agent_id = ? 
+                ORDER BY timestamp DESC 
+                LIMIT ?
+            ''', (agent_id, RECENT_EXECUTIONS_LIMIT))
+            recent_rows = cursor.fetchall()
         
-        # Format response
         analytics = {
             'agent_info': {
-                'id': agent_data[0],
-                'name': agent_data[1],
-                'description': agent_data[2],
-                'model_id': agent_data[4],
-                'tools': json.loads(agent_data[7]) if agent_data[7] else [],
-                'created_at': agent_data[10],
-                'updated_at': agent_data[11]
-            },
-            'execution_stats': {
-                'total_executions': stats[0] or 0,
-                'avg_execution_time': round(stats[1], 2) if stats[1] else 0,
-                'min_execution_time': round(stats[2], 2) if stats[2] else 0,
-                'max_execution_time': round(stats[3], 2) if stats[3] else 0,
-                'successful_executions': stats[4] or 0,
-                'failed_executions': stats[5] or 0,
-                'success_rate': round(success_rate, 1)
+                'id': agent_data['id'],
+                'name': agent_data['name'],
+                'description': agent_data['description'],
+                'model_id': agent_data['model_id'],
+                'tools': _safe_json_loads(agent_data['tools'], []),
+                'created_at': agent_data['created_at'],
+                'updated_at': agent_data['updated_at']
             },
-            'tool_usage': tools_usage,
-            'tool_performance': tool_performance,
-            'tool_success_rates': tool_success_rates,
-            'tool_sequences': tools_sequences[:10],  # Last 10 sequences
-            'tool_combinations': tool_combinations,
-            'hourly_tool_usage': hourly_tool_usage,
-            'total_tokens': total_tokens,
-            'hourly_usage': hourly_usage,
+            **rollups,
+            'tool_sequences': tool_sequences,
             'recent_executions': [
                 {
-                    'input': execution[0][:100] + '...' if len(execution[0]) > 100 else execution[0],
-                    'output': execution[1][:100] + '...' if execution[1] and len(execution[1]) > 100 else execution[1],
-                    'execution_time': round(execution[2], 2) if execution[2] else 0,
-                    'success': bool(execution[3]),
-                    'timestamp': execution[4]
-                } for execution in recent_executions
+                    'input': execution['input_text'][:100] + '...' if len(execution['input_text']) > 100 else execution['input_text'],
+                    'output': execution['output_text'][:100] + '...' if execution['output_text'] and len(execution['output_text']) > 100 else execution['output_text'],
+                    'execution_time': round(execution['execution_time'], 2) if execution['execution_time'] else 0,
+                    'success': bool(execution['success']),
+                    'timestamp': execution['timestamp']
+                } for execution in recent_rows
             ]
         }
         
@@ -2631,23 +2433,18 @@ def save_tool_configurations(agent_id):
         data = request.json
         tool_configs = data.get('tool_configurations', {})
         
-        # Validate agent exists
-        conn = sqlite3.connect(STRANDS_SDK_DB)
-        cursor = conn.cursor()
+        # Update tool configurations (the row count doubles as the existence check)
+        with db_manager.transaction(STRANDS_SDK_DB) as cursor:
+            cursor.execute('''
+                UPDATE strands_sdk_agents 
+                SET tool_configurations = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (json.dumps(tool_configs), agent_id))
+            updated = cursor.rowcount
         
-        cursor.execute('SELECT id FROM strands_sdk_agents WHERE id = ?', (agent_id,))
-        if not cursor.fetchone():
+        if not updated:
             return jsonify({'error': 'Agent not found'}), 404
-        
-        # Update tool configurations
-        cursor.execute('''
-            UPDATE strands_sdk_agents 
-            SET tool_configurations = ?, updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        ''', (json.dumps(tool_configs), agent_id))
-        
-        conn.commit()
-        conn.close()
+        agent_config_cache.invalidate(agent_id)
         
         return jsonify({
             'success': True,
@@ -2663,19 +2460,13 @@ def save_tool_configurations(agent_id):
 def get_tool_configurations(agent_id):
     """Get tool configurations for a specific agent"""
     try:
-        conn = sqlite3.connect(STRANDS_SDK_DB)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        result = db_manager.query_one(STRANDS_SDK_DB, '''
             SELECT tool_configurations FROM strands_sdk_agents WHERE id = ?
         ''', (agent_id,))
-        
-        result = cursor.fetchone()
         if not result:
             return jsonify({'error': 'Agent not found'}), 404
         
         tool_configs = json.loads(result[0]) if result[0] else {}
-        conn.close()
         
         return jsonify({
             'success': True,
@@ -2691,48 +2482,9 @@ def get_tool_configurations(agent_id):
 def get_agent_tool_traces(agent_id):
     """Get detailed tool execution traces for an agent"""
     try:
-        conn = sqlite3.connect(STRANDS_SDK_DB)
-        cursor = conn.cursor()
-        
-        # Get recent executions with tool usage
-        cursor.execute('''
-            SELECT id, input_text, output_text, execution_time, success, sdk_metadata, timestamp
-            FROM strands_sdk_executions 
-            WHERE agent_id = ? 
-            ORDER BY timestamp DESC 
-            LIMIT 10
-        ''', (agent_id,))
-        
-        executions = cursor.fetchall()
-        conn.close()
-        
-        tool_traces = []
-        for execution in executions:
-            exec_id, input_text, output_text, exec_time, success, metadata, timestamp = execution
-            
-            # Parse metadata to extract tool information
-            tool_info = {}
-            if metadata:
-                try:
-                    metadata_json = json.loads(metadata)
-                    exec_metadata = metadata_json.get('execution_metadata', {})
-                    tool_info = {
-                        'tools_used': exec_metadata.get('tools_used', []),
-                        'tools_available': exec_metadata.get('tools_available', []),
-                        'operations_log': exec_metadata.get('operations_log', [])
-                    }
-                except:
-                    pass
-            
-            tool_traces.append({
-                'execution_id': exec_id,
-                'timestamp': timestamp,
-                'input_text': input_text,
-                'output_text': output_text[:500] + '...' if len(output_text) > 500 else output_text,
-                'execution_time': exec_time,
-                'success': success,
-                'tool_info': tool_info
-            })
+        with db_manager.get_connection(STRANDS_SDK_DB) as conn:
+            # Recent executions plus their tool invocations and operation steps, all by index range
+            tool_traces = read_tool_traces(conn.cursor(), agent_id, limit=10)
         
         return jsonify({
             'success': True,
@@ -2920,13 +2672,17 @@ def delete_strands_agent(agent_id):
         agent_name = agent[0]
         
         # Delete executions first (foreign key constraint)
-        cursor.execute('DELETE FROM strands_sdk_executions WHERE agent_id = ?', (agent_id,))
+        execution_log.flush()
+        delete_agent_executions(cursor, agent_id)
+        delete_agent_rollups(cursor, agent_id)
         
         # Delete agent
         cursor.execute('DELETE FROM strands_sdk_agents WHERE id = ?', (agent_id,))
         
         conn.commit()
         conn.close()
+        agent_config_cache.invalidate(agent_id)
+        session_manager.drop(agent_id)
         
         # Cascade deletion: Remove from ALL A2A services if registered
         cleanup_results = {}
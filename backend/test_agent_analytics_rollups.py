@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for the execution rollups: incremental arithmetic, backfill and per-agent deletes
+"""
+
+import sqlite3
+
+import pytest
+
+from agent_analytics_rollups import backfill_rollups, delete_agent_rollups, init_rollup_tables, read_agent_rollups
+from execution_log_store import build_execution_record, init_execution_log_tables, write_records
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute('''
+        CREATE TABLE strands_sdk_executions (
+            id TEXT PRIMARY KEY, agent_id TEXT NOT NULL, input_text TEXT NOT NULL, output_text TEXT,
+            execution_time REAL, success BOOLEAN DEFAULT FALSE, error_message TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP, sdk_metadata TEXT
+        )
+    ''')
+    init_rollup_tables(conn.cursor())
+    init_execution_log_tables(conn.cursor())
+    yield conn
+    conn.close()
+
+def metadata(tools, durations_ms=None, input_length=100, output_length=50):
+    durations_ms = durations_ms or [None] * len(tools)
+    return {"execution_metadata": {
+        "tools_used": tools,
+        "input_length": input_length,
+        "output_length": output_length,
+        "operations_log": [{"step": f"{tool} tool used", "tool_name": tool, "duration_ms": duration_ms}
+                           for tool, duration_ms in zip(tools, durations_ms)]
+    }}
+
+EXECUTIONS = [
+    ("e1", "agent", True, 2.0, metadata(["search", "calc"]), "2026-01-01 09:15:00"),
+    ("e2", "agent", False, 4.0, metadata(["search"]), "2026-01-01 09:45:00"),
+    ("e3", "agent", True, None, metadata([]), "2026-01-01 10:05:00"),
+    ("e4", "other", True, 1.0, metadata(["calc"]), "2026-01-01 10:10:00")
+]
+
+def log(conn, executions):
+    write_records(conn.cursor(), [
+        build_execution_record(execution_id, agent_id, "q", "a", execution_time, success, execution_metadata, timestamp=timestamp)
+        for execution_id, agent_id, success, execution_time, execution_metadata, timestamp in executions
+    ])
+    conn.commit()
+
+def test_execution_stats(conn):
+    log(conn, EXECUTIONS)
+    rollups = read_agent_rollups(conn.cursor(), "agent")
+    assert rollups["execution_stats"] == {
+        "total_executions": 3,
+        # Executions without a recorded time do not count towards the average
+        "avg_execution_time": 3.0,
+        "min_execution_time": 2.0,
+        "max_execution_time": 4.0,
+        "successful_executions": 2,
+        "failed_executions": 1,
+        "success_rate": 66.7
+    }
+    assert rollups["total_tokens"] == 450
+
+def test_tool_rollups(conn):
+    log(conn, EXECUTIONS)
+    rollups = read_agent_rollups(conn.cursor(), "agent")
+    assert rollups["tool_usage"] == {"search": 2, "calc": 1}
+    # Tools without a measured duration get an even share of their execution's time
+    assert rollups["tool_performance"]["search"] == {
+        "avg_execution_time": 2.5, "min_execution_time": 1.0, "max_execution_time": 4.0, "total_invocations": 2
+    }
+    assert rollups["tool_success_rates"]["search"]["success_rate"] == 50.0
+    assert rollups["tool_combinations"]["search,calc"]["count"] == 1
+    assert rollups["hourly_tool_usage"] == {"09": {"search": 2, "calc": 1}}
+
+def test_measured_tool_durations(conn):
+    log(conn, [("e1", "agent", True, 2.0, metadata(["search", "calc"], [500.0, None]), "2026-01-01 09:15:00")])
+    performance = read_agent_rollups(conn.cursor(), "agent")["tool_performance"]
+    assert performance["search"]["avg_execution_time"] == 0.5
+    assert performance["calc"]["avg_execution_time"] == 1.0
+
+def test_repeated_tool_calls_are_timed_per_invocation(conn):
+    log(conn, [("e1", "agent", True, 3.5, metadata(["web_search", "web_search"], [100.0, 3000.0]), "2026-01-01 09:15:00")])
+    cursor = conn.cursor()
+    cursor.execute("SELECT invocations, total_time, min_time, max_time FROM strands_sdk_tool_rollups WHERE tool = 'web_search'")
+    invocations, total_time, min_time, max_time = cursor.fetchone()
+    assert invocations == 2
+    assert total_time == pytest.approx(3.1)
+    assert (min_time, max_time) == (0.1, 3.0)
+    assert backfill_rollups(conn) == 1
+    cursor.execute("SELECT total_time, min_time, max_time FROM strands_sdk_tool_rollups WHERE tool = 'web_search'")
+    assert cursor.fetchone() == (total_time, min_time, max_time)
+
+def test_backfill_matches_incremental_rollups(conn):
+    log(conn, EXECUTIONS)
+    incremental = read_agent_rollups(conn.cursor(), "agent")
+    assert backfill_rollups(conn) == len(EXECUTIONS)
+    assert read_agent_rollups(conn.cursor(), "agent") == incremental
+
+def test_delete_agent_rollups(conn):
+    log(conn, EXECUTIONS)
+    delete_agent_rollups(conn.cursor(), "agent")
+    assert read_agent_rollups(conn.cursor(), "agent")["execution_stats"]["total_executions"] == 0
+    assert read_agent_rollups(conn.cursor(), "other")["execution_stats"]["total_executions"] == 1
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for the agent capability index: incremental sync and routing decisions
+"""
+
+from agent_capability_index import AgentCapabilityIndex, is_multi_step
+from agent_embeddings import BACKEND_LEXICAL, lexical_vector
+
+WEATHER = {"id": "weather", "name": "Weather Agent", "description": "Weather forecasts, temperature, rain and wind for any city",
+           "capabilities": ["weather", "forecast"]}
+MATH = {"id": "math", "name": "Math Agent", "description": "Arithmetic, algebra equations and unit conversions",
+        "capabilities": ["math", "calculation"]}
+RECIPES = {"id": "recipes", "name": "Recipe Agent", "description": "Cooking recipes, ingredients and meal planning",
+           "capabilities": ["cooking"]}
+
+class LexicalEmbedder:
+    """Offline stand-in for the Ollama embedder that counts the texts it embeds"""
+    backend = BACKEND_LEXICAL
+
+    def __init__(self):
+        self.embedded = []
+
+    def embed(self, texts):
+        self.embedded.extend(texts)
+        return BACKEND_LEXICAL, [lexical_vector(text) for text in texts]
+
+    def get_stats(self):
+        return {"backend": self.backend, "embedded": len(self.embedded)}
+
+def make_index(*agents):
+    embedder = LexicalEmbedder()
+    index = AgentCapabilityIndex("test", embedder=embedder)
+    index.sync(list(agents))
+    return index, embedder
+
+def test_sync_only_reembeds_changed_agents():
+    index, embedder = make_index(WEATHER, MATH)
+    index.search("rain")
+    assert index.get_stats()["embedded"] == 2
+    version = index.catalogue_hash
+
+    assert index.sync([WEATHER, MATH]) == {"changed": 0, "removed": 0}
+    assert index.catalogue_hash == version
+
+    changed_math = dict(MATH, description="Statistics and probability")
+    assert index.sync([WEATHER, changed_math, RECIPES]) == {"changed": 2, "removed": 0}
+    assert index.catalogue_hash != version
+    index.search("rain")
+    assert index.get_stats()["embedded"] == 4
+
+    assert index.sync([RECIPES]) == {"changed": 0, "removed": 2}
+    assert [match["agent_id"] for match in index.search("rain")[1]] == ["recipes"]
+
+def test_route_is_confident_for_a_clear_single_agent_query():
+    index, _ = make_index(WEATHER, MATH, RECIPES)
+    decision = index.route("What is the weather forecast for rain and wind in Paris?")
+    assert decision["top_agent_id"] == "weather"
+    assert decision["matches"][0]["agent_id"] == "weather"
+    assert decision["confident"]
+    assert not decision["needs_planner"]
+    assert decision["catalogue_size"] == 3
+    assert index.get_stats()["planner_skips"] == 1
+
+def test_route_asks_for_the_planner_on_multi_step_queries():
+    index, _ = make_index(WEATHER, MATH, RECIPES)
+    decision = index.route("Get the weather forecast for Paris, then convert the temperature units")
+    assert decision["multi_step"]
+    assert decision["needs_planner"]
+
+def test_route_without_a_relevant_agent():
+    index, _ = make_index(WEATHER, MATH)
+    decision = index.route("zzz qqq")
+    assert decision["relevant"] == []
+    assert decision["top_agent_id"] is None
+    assert decision["needs_planner"]
+
+def test_route_limits_matches_to_k():
+    index, _ = make_index(WEATHER, MATH, RECIPES)
+    assert len(index.route("weather", k=2)["matches"]) == 2
+
+def test_multi_step_phrases():
+    assert is_multi_step("search for flights and then book a hotel")
+    assert not is_multi_step("what is the weather in Paris")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the decoded agent configuration cache and its invalidation
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+from agent_config_cache import DEFAULT_SYSTEM_PROMPT, AgentConfigCache
+
+def search_tool(query: str) -> str:
+    """Search for something"""
+    return query
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "agents.db")
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE strands_sdk_agents (
+            id TEXT PRIMARY KEY, name TEXT, model_id TEXT, system_prompt TEXT, tools TEXT, tool_configurations TEXT
+        )
+    ''')
+    conn.execute("INSERT INTO strands_sdk_agents VALUES (?, ?, ?, ?, ?, ?)",
+                 ("a1", "Researcher", "qwen3:1.7b", "You research.", json.dumps(["search_tool", "missing_tool"]), "not json"))
+    conn.commit()
+    conn.close()
+    return path
+
+def rename(db_path, agent_id, name):
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE strands_sdk_agents SET name = ? WHERE id = ?", (name, agent_id))
+    conn.commit()
+    conn.close()
+
+def test_config_is_decoded_once_and_served_from_cache(db_path):
+    cache = AgentConfigCache(db_path, tool_registry={"search_tool": search_tool})
+    config = cache.get("a1")
+    assert config.name == "Researcher"
+    assert config.tools == ["search_tool", "missing_tool"]
+    assert config.tools_loaded == ["search_tool"]
+    assert config.tool_configurations == {}
+    assert cache.get("a1") is config
+    assert cache.get_stats()["hits"] == 1
+
+def test_invalidate_reloads_the_changed_agent(db_path):
+    cache = AgentConfigCache(db_path)
+    first = cache.get("a1")
+    rename(db_path, "a1", "Analyst")
+    # Without invalidation the cached config is served until it ages out
+    assert cache.get("a1").name == "Researcher"
+
+    cache.invalidate("a1")
+    second = cache.get("a1")
+    assert second.name == "Analyst"
+    assert second.version > first.version
+
+def test_invalidate_all_and_max_age(db_path):
+    cache = AgentConfigCache(db_path)
+    cache.get("a1")
+    cache.invalidate()
+    assert cache.get_stats()["cached_agents"] == 0
+
+    expiring = AgentConfigCache(db_path, max_age=0)
+    expiring.get("a1")
+    rename(db_path, "a1", "Analyst")
+    assert expiring.get("a1").name == "Analyst"
+
+def test_missing_agent_and_prompt_fallback(db_path):
+    cache = AgentConfigCache(db_path)
+    assert cache.get("nope") is None
+    assert cache.get_stats()["cached_agents"] == 0
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO strands_sdk_agents (id, name, system_prompt) VALUES ('a2', 'Linked', 'http://prompt')")
+    conn.commit()
+    conn.close()
+    assert cache.get("a2").system_prompt == DEFAULT_SYSTEM_PROMPT
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for the context refinement policy, extractive refinement and the overhead tracker
+"""
+
+import logging
+
+from context_refinement import (EXTRACTIVE_MAX_CHARS, PASSTHROUGH_MAX_CHARS, POLICY_EXTRACTIVE, POLICY_LLM,
+                                POLICY_NONE, OverheadTracker, choose_policy, choose_synthesis_policy,
+                                combine_responses, extractive_refine, start_warm_up)
+
+def test_auto_policy_follows_context_length():
+    assert choose_policy("x" * PASSTHROUGH_MAX_CHARS) == POLICY_NONE
+    assert choose_policy("x" * (PASSTHROUGH_MAX_CHARS + 1)) == POLICY_EXTRACTIVE
+    assert choose_policy("x" * (EXTRACTIVE_MAX_CHARS + 1)) == POLICY_LLM
+
+def test_forced_and_unknown_policies():
+    assert choose_policy("short", POLICY_LLM) == POLICY_LLM
+    assert choose_policy("short", "bogus") == POLICY_NONE
+
+def test_synthesis_policy():
+    assert choose_synthesis_policy(1, POLICY_LLM) == POLICY_NONE
+    assert choose_synthesis_policy(3) == POLICY_LLM
+    assert choose_synthesis_policy(3, POLICY_EXTRACTIVE) == POLICY_EXTRACTIVE
+
+def test_extractive_refine_keeps_relevant_sentences_within_budget():
+    filler = " ".join(f"Unrelated remark number {i} about nothing much." for i in range(100))
+    context = f"{filler} The Paris forecast is rain with 12 degrees. {filler}"
+    refined = extractive_refine("weather in Paris", context, "Suggest clothes for the Paris forecast", target_chars=200)
+    assert "The Paris forecast is rain with 12 degrees." in refined
+    assert refined.endswith("Next: Suggest clothes for the Paris forecast")
+    assert len(refined) < 400
+
+def test_combine_responses():
+    assert combine_responses([("A", "only answer")]) == "only answer"
+    assert combine_responses([("A", "one"), ("B", "two")]) == "**A**: one\n\n**B**: two"
+
+def test_overhead_tracker_counts_calls_tokens_and_skips():
+    tracker = OverheadTracker()
+    tracker.record_call("s1", "context_refinement", {"prompt_eval_count": 100, "eval_count": 20, "_metrics": {"total_ms": 50.0}})
+    tracker.record_call("s1", "synthesis", failed=True)
+    tracker.record_skip("s1", "context_refinement", POLICY_NONE)
+    tracker.record_call(None, "synthesis")
+
+    session = tracker.get_session("s1")
+    assert session["llm_calls"] == 2
+    assert session["failed_calls"] == 1
+    assert session["skipped_calls"] == 1
+    assert session["total_tokens"] == 120
+    assert session["by_purpose"]["context_refinement"] == {"llm_calls": 1, "skipped_calls": 1, "prompt_tokens": 100, "eval_tokens": 20}
+    assert tracker.get_stats()["skip_rate"] == round(1 / 3, 3)
+
+def test_overhead_tracker_keeps_the_newest_sessions():
+    tracker = OverheadTracker(max_sessions=2)
+    for session_id in ("s1", "s2", "s3"):
+        tracker.record_skip(session_id, "synthesis", POLICY_NONE)
+    assert list(tracker.sessions) == ["s2", "s3"]
+
+def test_warm_up_failure_is_logged_as_warning(caplog):
+    def warm(agent_id):
+        raise LookupError(f"no agent {agent_id}")
+
+    with caplog.at_level(logging.WARNING, logger="context_refinement"):
+        assert start_warm_up("s1", warm, "missing").result(timeout=5) is None
+    assert any(record.levelno == logging.WARNING and "no agent missing" in record.getMessage() for record in caplog.records)
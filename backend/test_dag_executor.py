@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for the plan DAG executor: dependency handling, failure propagation, timeouts and retries
+"""
+
+import threading
+import time
+
+import pytest
+
+import dag_executor
+from dag_executor import (PLAN_EXECUTOR_WORKERS, STATUS_CANCELLED, STATUS_COMPLETED, STATUS_FAILED, STATUS_SKIPPED,
+                          STATUS_TIMED_OUT, PlanError, PlanStep, StepFailed, execute_plan)
+
+def statuses(result):
+    return {step["step"]: step["status"] for step in result["results"]}
+
+def sleeper(seconds, output=None):
+    def run(inputs):
+        time.sleep(seconds)
+        return output
+    return run
+
+def failing(message="boom"):
+    def run(inputs):
+        raise StepFailed(message, output="partial")
+    return run
+
+@pytest.fixture(autouse=True)
+def no_retry_backoff(monkeypatch):
+    monkeypatch.setattr(dag_executor, "RETRY_BACKOFF_SECONDS", 0.0)
+
+def test_dependencies_receive_outputs():
+    steps = [
+        PlanStep("a", lambda inputs: 1),
+        PlanStep("b", lambda inputs: 2),
+        PlanStep("c", lambda inputs: inputs["a"] + inputs["b"], depends_on=["a", "b"])
+    ]
+    result = execute_plan(steps)
+    assert result["success"]
+    assert result["results"][-1]["output"] == 3
+
+def test_critical_path_follows_the_slowest_chain():
+    steps = [
+        PlanStep("fast", sleeper(0.05)),
+        PlanStep("slow", sleeper(0.2)),
+        PlanStep("join", sleeper(0.05), depends_on=["fast", "slow"])
+    ]
+    result = execute_plan(steps)
+    assert result["critical_path"] == ["slow", "join"]
+    assert result["total_time"] < result["sum_of_steps_time"]
+
+def test_invalid_plans_are_rejected():
+    with pytest.raises(PlanError):
+        execute_plan([PlanStep("a", sleeper(0), depends_on=["b"]), PlanStep("b", sleeper(0), depends_on=["a"])])
+    with pytest.raises(PlanError):
+        execute_plan([PlanStep("a", sleeper(0), depends_on=["missing"])])
+    with pytest.raises(PlanError):
+        execute_plan([PlanStep("a", sleeper(0)), PlanStep("a", sleeper(0))])
+
+def test_failure_skips_dependents_only():
+    steps = [
+        PlanStep("a", failing()),
+        PlanStep("b", sleeper(0, "b"), depends_on=["a"]),
+        PlanStep("c", sleeper(0, "c"), depends_on=["b"]),
+        PlanStep("d", sleeper(0.05, "d"))
+    ]
+    result = execute_plan(steps)
+    assert not result["success"]
+    assert statuses(result) == {"a": STATUS_FAILED, "b": STATUS_SKIPPED, "c": STATUS_SKIPPED, "d": STATUS_COMPLETED}
+    # StepFailed keeps the partial output
+    assert result["results"][0]["output"] == "partial"
+
+def test_fail_fast_cancels_pending_steps():
+    steps = [PlanStep("a", failing()), PlanStep("b", sleeper(0, "b")), PlanStep("c", sleeper(0, "c"))]
+    result = execute_plan(steps, max_parallel=1, fail_fast=True)
+    assert result["cancelled"]
+    assert statuses(result) == {"a": STATUS_FAILED, "b": STATUS_CANCELLED, "c": STATUS_CANCELLED}
+
+    result = execute_plan(steps, max_parallel=1)
+    assert statuses(result) == {"a": STATUS_FAILED, "b": STATUS_COMPLETED, "c": STATUS_COMPLETED}
+
+def test_step_timeout_ignores_time_queued_for_a_worker():
+    # Two plans together have twice as many steps as there are workers: half of the steps queue
+    # for about as long as they run, which would exceed the timeout if queueing counted
+    def plan():
+        return [PlanStep(i, sleeper(0.3), timeout=0.5) for i in range(PLAN_EXECUTOR_WORKERS)]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(execute_plan(plan(), max_parallel=PLAN_EXECUTOR_WORKERS)))
+               for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [result["steps_completed"] for result in results] == [PLAN_EXECUTOR_WORKERS, PLAN_EXECUTOR_WORKERS]
+
+def test_timed_out_step_is_retried_without_overlap():
+    active, peak, calls = [0], [0], [0]
+    lock = threading.Lock()
+
+    def run(inputs):
+        with lock:
+            calls[0] += 1
+            attempt = calls[0]
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        try:
+            time.sleep(0.3 if attempt == 1 else 0)
+            return attempt
+        finally:
+            with lock:
+                active[0] -= 1
+
+    result = execute_plan([PlanStep("slow", run, timeout=0.2, retries=1)])
+    assert statuses(result) == {"slow": STATUS_COMPLETED}
+    assert result["results"][0]["attempts"] == 2
+    assert result["results"][0]["output"] == 2
+    assert peak[0] == 1
+
+def test_hung_step_times_out_and_skips_dependents():
+    release = threading.Event()
+    steps = [PlanStep("hung", lambda inputs: release.wait(5), timeout=0.1, retries=1),
+             PlanStep("after", sleeper(0), depends_on=["hung"])]
+    try:
+        result = execute_plan(steps)
+    finally:
+        release.set()
+    assert statuses(result) == {"hung": STATUS_TIMED_OUT, "after": STATUS_SKIPPED}
+    assert result["total_time"] < 2
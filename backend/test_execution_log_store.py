@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests for the normalized execution log: record building, writes, legacy migration and trace reads
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+from agent_analytics_rollups import init_rollup_tables
+from execution_log_store import (build_execution_record, delete_agent_executions, init_execution_log_tables,
+                                 migrate_legacy_executions, read_tool_traces, recent_tool_sequences, write_records)
+
+# strands_sdk_executions as created by strands_sdk_api
+EXECUTIONS_TABLE = '''
+    CREATE TABLE strands_sdk_executions (
+        id TEXT PRIMARY KEY,
+        agent_id TEXT NOT NULL,
+        input_text TEXT NOT NULL,
+        output_text TEXT,
+        execution_time REAL,
+        success BOOLEAN DEFAULT FALSE,
+        error_message TEXT,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        sdk_metadata TEXT
+    )
+'''
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    cursor = conn.cursor()
+    cursor.execute(EXECUTIONS_TABLE)
+    init_rollup_tables(cursor)
+    init_execution_log_tables(cursor)
+    conn.commit()
+    yield conn
+    conn.close()
+
+def repeated_calc_metadata():
+    """Two calls of the same tool with different inputs and outputs, plus a different tool in between"""
+    return {
+        "execution_metadata": {
+            "tools_used": ["calc", "search", "calc"],
+            "tools_available": ["calc", "search"],
+            "operations_log": [
+                {"step": "start", "details": "received query"},
+                {"step": "tool", "tool_name": "calc", "tool_input": "2+2", "tool_output": "4", "duration_ms": 5.0},
+                {"step": "tool", "tool_name": "search", "tool_input": "pi", "tool_output": "3.14", "duration_ms": 80.0},
+                {"step": "tool", "tool_name": "calc", "tool_input": "4*3", "tool_output": "12", "duration_ms": 7.0},
+                {"step": "done", "details": "answered"}
+            ]
+        },
+        "model": "qwen3:1.7b"
+    }
+
+def tool_steps(trace):
+    return [op for op in trace["tool_info"]["operations_log"] if op.get("tool_name")]
+
+def test_build_execution_record_splits_metadata():
+    record = build_execution_record("e1", "agent", "question", "answer", 1.5, True, repeated_calc_metadata(),
+                                    timestamp="2026-01-01 10:00:00")
+    assert record["tools_used"] == ["calc", "search", "calc"]
+    assert record["tools_available"] == "calc,search"
+    assert json.loads(record["sdk_metadata"]) == {"model": "qwen3:1.7b"}
+    assert [invocation[5] for invocation in record["invocations"]] == ["2+2", "pi", "4*3"]
+    # Each tool step points at its own invocation
+    assert [step[6] for step in record["steps"]] == [None, 0, 1, 2, None]
+
+def test_repeated_tool_calls_keep_their_own_data(conn):
+    cursor = conn.cursor()
+    write_records(cursor, [build_execution_record("e1", "agent", "question", "answer", 1.5, True, repeated_calc_metadata())])
+    conn.commit()
+
+    (trace,) = read_tool_traces(cursor, "agent")
+    assert trace["tool_info"]["tools_used"] == ["calc", "search", "calc"]
+    assert [(op["tool_name"], op["tool_input"], op["tool_output"], op["duration_ms"]) for op in tool_steps(trace)] == [
+        ("calc", "2+2", "4", 5.0), ("search", "pi", "3.14", 80.0), ("calc", "4*3", "12", 7.0)
+    ]
+    assert [op["step"] for op in trace["tool_info"]["operations_log"]] == ["start", "tool", "tool", "tool", "done"]
+
+def test_legacy_steps_pair_by_call_order(conn):
+    cursor = conn.cursor()
+    write_records(cursor, [build_execution_record("e1", "agent", "question", "answer", 1.5, True, repeated_calc_metadata())])
+    # Rows written before invocation_position existed
+    cursor.execute("UPDATE strands_sdk_operation_steps SET invocation_position = NULL")
+    conn.commit()
+
+    (trace,) = read_tool_traces(cursor, "agent")
+    assert [op["tool_input"] for op in tool_steps(trace)] == ["2+2", "pi", "4*3"]
+
+def test_migrate_legacy_executions(conn):
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO strands_sdk_executions (id, agent_id, input_text, output_text, execution_time, success, timestamp, sdk_metadata)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', ("legacy", "agent", "question", "answer", 2.0, True, "2026-01-01 09:00:00", json.dumps(repeated_calc_metadata())))
+    conn.commit()
+
+    assert migrate_legacy_executions(conn) == 1
+    assert migrate_legacy_executions(conn) == 0
+    (trace,) = read_tool_traces(cursor, "agent")
+    assert [op["tool_output"] for op in tool_steps(trace)] == ["4", "3.14", "12"]
+    assert json.loads(cursor.execute("SELECT sdk_metadata FROM strands_sdk_executions").fetchone()[0]) == {"model": "qwen3:1.7b"}
+
+def test_recent_tool_sequences_and_delete(conn):
+    cursor = conn.cursor()
+    write_records(cursor, [
+        build_execution_record("e1", "agent", "q1", "a1", 1.0, True, repeated_calc_metadata(), timestamp="2026-01-01 10:00:00"),
+        build_execution_record("e2", "agent", "q2", "a2", 1.0, True, None, timestamp="2026-01-01 11:00:00")
+    ])
+    conn.commit()
+
+    assert [sequence["sequence"] for sequence in recent_tool_sequences(cursor, "agent")] == [["calc", "search", "calc"]]
+    assert [trace["execution_id"] for trace in read_tool_traces(cursor, "agent")] == ["e2", "e1"]
+
+    delete_agent_executions(cursor, "agent")
+    conn.commit()
+    assert read_tool_traces(cursor, "agent") == []
+    assert cursor.execute("SELECT COUNT(*) FROM strands_sdk_operation_steps").fetchone()[0] == 0
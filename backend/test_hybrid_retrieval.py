@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Tests for the hybrid retrieval helpers: BM25 index, reciprocal-rank fusion and context packing
+"""
+
+from hybrid_retrieval import RRF_K, LexicalIndex, estimate_tokens, pack_chunks, reciprocal_rank_fusion
+
+def chunk(chunk_id, content="x" * 40, **scores):
+    return {"chunk_id": chunk_id, "content": content, **scores}
+
+def test_rrf_rewards_chunks_found_by_both_retrievers():
+    vector = [chunk("a", vector_score=0.9), chunk("b", vector_score=0.8), chunk("c", vector_score=0.7)]
+    lexical = [chunk("c", lexical_score=12.0), chunk("d", lexical_score=9.0), chunk("a", lexical_score=3.0)]
+    fused = reciprocal_rank_fusion([vector, lexical])
+
+    assert [entry["chunk_id"] for entry in fused] == ["a", "c", "b", "d"]
+    assert fused[0]["rrf_score"] == 1 / (RRF_K + 1) + 1 / (RRF_K + 3)
+    # Scores from both lists end up on the fused entry
+    assert fused[0]["vector_score"] == 0.9 and fused[0]["lexical_score"] == 3.0
+    assert "lexical_score" not in fused[2]
+
+def test_rrf_of_nothing():
+    assert reciprocal_rank_fusion([]) == []
+    assert reciprocal_rank_fusion([[], []]) == []
+
+def test_pack_chunks_respects_token_budget_and_rank_order():
+    results = [chunk("big", "x" * 400), chunk("small", "x" * 40), chunk("medium", "x" * 200)]
+    assert estimate_tokens("x" * 400) == 100
+    # The first chunk always fits; later ones are skipped only while they would overflow
+    assert [r["chunk_id"] for r in pack_chunks(results, max_tokens=115)] == ["big", "small"]
+    assert [r["chunk_id"] for r in pack_chunks(results, max_tokens=20)] == ["big"]
+    assert [r["chunk_id"] for r in pack_chunks(results, max_tokens=1000, max_chunks=2)] == ["big", "small"]
+
+def test_lexical_index_ranks_by_bm25_and_filters_documents():
+    index = LexicalIndex()
+    index.add_chunks([
+        {"chunk_id": "1", "document_id": "d1", "content": "Solar panels convert sunlight into electricity", "page": 1},
+        {"chunk_id": "2", "document_id": "d1", "content": "Wind turbines and solar farms feed the grid", "page": 2},
+        {"chunk_id": "3", "document_id": "d2", "content": "Solar solar solar: sunlight electricity panels", "page": 1}
+    ])
+    assert index.count() == 3
+
+    results = index.search("how do solar panels make electricity?", k=2)
+    assert [r["chunk_id"] for r in results] == ["3", "1"]
+    assert results[0]["lexical_score"] >= results[1]["lexical_score"]
+
+    assert [r["chunk_id"] for r in index.search("solar", document_ids=["d1"])] in (["1", "2"], ["2", "1"])
+    assert index.search("a an of") == []
+
+    index.delete_document("d2")
+    assert index.count() == 2
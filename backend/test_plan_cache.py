@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for the planner result cache: exact and semantic hits, catalogue invalidation and expiry
+"""
+
+import time
+
+from agent_embeddings import BACKEND_LEXICAL, lexical_vector
+from plan_cache import MATCH_EXACT, MATCH_SEMANTIC, PlanCache, catalogue_hash, normalize_query
+
+AGENTS = [
+    {"id": "weather", "name": "Weather Agent", "description": "Current weather and forecasts", "model": "qwen3:1.7b"},
+    {"id": "math", "name": "Math Agent", "description": "Arithmetic and algebra", "model": "qwen3:1.7b"}
+]
+
+class LexicalEmbedder:
+    """Offline stand-in for the Ollama embedder"""
+    backend = BACKEND_LEXICAL
+
+    def embed(self, texts):
+        return BACKEND_LEXICAL, [lexical_vector(text) for text in texts]
+
+class Planner:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, query):
+        def plan():
+            self.calls += 1
+            return {"query": query, "timestamp": "2020-01-01T00:00:00", "steps": [self.calls]}
+        return plan
+
+def make_cache(**kwargs):
+    return PlanCache(embedder=LexicalEmbedder(), **kwargs)
+
+def test_normalize_query_ignores_case_whitespace_and_punctuation():
+    assert normalize_query("  What's the   WEATHER?! ") == "what's the weather"
+
+def test_catalogue_hash_ignores_status_but_not_models():
+    changed_status = [dict(AGENTS[0], status="busy"), AGENTS[1]]
+    changed_model = [dict(AGENTS[0], model="llama3.2:3b"), AGENTS[1]]
+    assert catalogue_hash(changed_status) == catalogue_hash(AGENTS)
+    assert catalogue_hash(list(reversed(AGENTS))) == catalogue_hash(AGENTS)
+    assert catalogue_hash(changed_model) != catalogue_hash(AGENTS)
+
+def test_exact_repeat_is_served_from_cache():
+    cache, planner = make_cache(), Planner()
+    first = cache.get_or_plan("test", "What is 2 + 2?", AGENTS, planner("What is 2 + 2?"))
+    second = cache.get_or_plan("test", "what is 2 + 2", AGENTS, planner("what is 2 + 2"))
+    assert planner.calls == 1
+    assert second["steps"] == first["steps"]
+    assert second["plan_cache"]["hit"] == MATCH_EXACT
+    # Served copies are independent of the cached plan
+    second["steps"].append("changed")
+    assert cache.get_or_plan("test", "What is 2 + 2?", AGENTS, planner("x"))["steps"] == [1]
+
+def test_catalogue_change_invalidates_plans():
+    cache, planner = make_cache(), Planner()
+    cache.get_or_plan("test", "What is 2 + 2?", AGENTS, planner("What is 2 + 2?"))
+    extended = AGENTS + [{"id": "search", "name": "Search Agent", "description": "Web search"}]
+    result = cache.get_or_plan("test", "What is 2 + 2?", extended, planner("What is 2 + 2?"))
+    assert planner.calls == 2
+    assert "plan_cache" not in result
+    assert cache.get_stats()["invalidated"] == 1
+
+    # The old catalogue's plan is gone, not just hidden
+    cache.get_or_plan("test", "What is 2 + 2?", AGENTS, planner("What is 2 + 2?"))
+    assert planner.calls == 3
+
+def test_semantic_hit_carries_the_callers_query():
+    cache, planner = make_cache(), Planner()
+    cache.get_or_plan("test", "What's the weather in Paris today", AGENTS, planner("What's the weather in Paris today"))
+    result = cache.get_or_plan("test", "What is the weather in Paris today?", AGENTS, planner("unused"))
+    assert planner.calls == 1
+    assert result["plan_cache"]["hit"] == MATCH_SEMANTIC
+    assert result["plan_cache"]["cached_query"] == "What's the weather in Paris today"
+    assert result["query"] == "What is the weather in Paris today?"
+    assert result["timestamp"] != "2020-01-01T00:00:00"
+
+def test_semantic_matching_can_be_turned_off():
+    cache, planner = make_cache(), Planner()
+    cache.get_or_plan("test", "What's the weather in Paris today", AGENTS, planner("a"))
+    cache.get_or_plan("test", "What is the weather in Paris today?", AGENTS, planner("b"), semantic=False)
+    cache.get_or_plan("test", "What is the weather in Paris today!", AGENTS, planner("c"), threshold=1.0)
+    assert planner.calls == 2
+
+def test_unrelated_query_misses():
+    cache, planner = make_cache(), Planner()
+    cache.get_or_plan("test", "What's the weather in Paris today", AGENTS, planner("a"))
+    cache.get_or_plan("test", "Solve x squared minus four equals zero", AGENTS, planner("b"))
+    assert planner.calls == 2
+
+def test_cache_if_and_expiry():
+    cache, planner = make_cache(ttl=0.05), Planner()
+    cache.get_or_plan("test", "q", AGENTS, planner("q"), cache_if=lambda plan: False)
+    cache.get_or_plan("test", "q", AGENTS, planner("q"))
+    assert planner.calls == 2
+    cache.get_or_plan("test", "q", AGENTS, planner("q"))
+    assert planner.calls == 2
+    time.sleep(0.1)
+    cache.get_or_plan("test", "q", AGENTS, planner("q"))
+    assert planner.calls == 3
+    assert cache.get_stats()["expired"] == 1
+
+def test_namespaces_are_separate():
+    cache, planner = make_cache(), Planner()
+    cache.get_or_plan("6stage", "q", AGENTS, planner("q"))
+    cache.get_or_plan("contextual", "q", AGENTS, planner("q"))
+    assert planner.calls == 2
+    assert cache.invalidate("6stage") == 1
+    assert cache.get_stats()["namespaces"] == {"contextual": 1}
+
+def test_contextual_analysis_is_exact_only_unless_a_threshold_is_given(monkeypatch):
+    from contextual_query_analyzer import ContextualQueryAnalyzer
+    analyzer, planner = ContextualQueryAnalyzer(plan_cache=make_cache()), Planner()
+    monkeypatch.setattr(analyzer, "_analyze", lambda query, agents: dict(planner(query)(), success=True))
+    analyzer.analyze_query_contextually("What's the weather in Paris today", AGENTS)
+    analyzer.analyze_query_contextually("What's the weather in Paris today", AGENTS)
+    analyzer.analyze_query_contextually("What is the weather in Paris today?", AGENTS)
+    assert planner.calls == 2
+    result = analyzer.analyze_query_contextually("What is the weather in Paris, today?", AGENTS, similarity_threshold=0.8)
+    assert planner.calls == 2
+    assert result["plan_cache"]["hit"] == MATCH_SEMANTIC
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for the Strands SDK agent listing: cursor pagination, recent executions and ETags
+"""
+
+import os
+import sqlite3
+
+import pytest
+
+pytest.importorskip("flask_socketio")
+# Keep the tool result cache in memory while the service module is imported
+os.environ.setdefault("TOOL_RESULT_CACHE_DB", "")
+
+import strands_sdk_api
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "strands_sdk_agents.db")
+    monkeypatch.setattr(strands_sdk_api, "STRANDS_SDK_DB", path)
+    strands_sdk_api.init_strands_sdk_database()
+    conn = sqlite3.connect(path)
+    for i in range(5):
+        conn.execute('''
+            INSERT INTO strands_sdk_agents (id, name, model_id, tools, created_at, updated_at)
+            VALUES (?, ?, 'qwen3:1.7b', '["calculator"]', ?, ?)
+        ''', (f"agent-{i}", f"Agent {i}", f"2026-01-01 10:00:0{i}", f"2026-01-01 10:00:0{i}"))
+    for i in range(12):
+        conn.execute('''
+            INSERT INTO strands_sdk_executions (id, agent_id, input_text, output_text, execution_time, success, timestamp)
+            VALUES (?, 'agent-4', ?, 'answer', 1.0, 1, ?)
+        ''', (f"e{i}", f"question {i}", f"2026-01-02 10:00:{i:02d}"))
+    conn.commit()
+    conn.close()
+    return path
+
+@pytest.fixture
+def client(db_path):
+    return strands_sdk_api.app.test_client()
+
+def list_agents(client, **params):
+    return client.get("/api/strands-sdk/agents", query_string=params)
+
+def test_cursor_pagination_walks_every_agent_once(client):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, "include_executions": "false"}
+        if cursor:
+            params["cursor"] = cursor
+        page = list_agents(client, **params).get_json()
+        assert page["count"] <= 2
+        seen.extend(agent["id"] for agent in page["agents"])
+        cursor = page["next_cursor"]
+        assert page["has_more"] == (cursor is not None)
+        if not cursor:
+            break
+    assert seen == [f"agent-{i}" for i in range(4, -1, -1)]
+
+def test_invalid_cursor_is_rejected(client):
+    assert list_agents(client, cursor="not-a-cursor").status_code == 400
+
+def test_recent_executions_are_limited_and_newest_first(client):
+    agents = {agent["id"]: agent for agent in list_agents(client).get_json()["agents"]}
+    recent = agents["agent-4"]["recent_executions"]
+    assert len(recent) == strands_sdk_api.RECENT_EXECUTIONS_LIMIT
+    assert recent[0]["input_text"] == "question 11"
+    assert agents["agent-0"]["recent_executions"] == []
+    assert "recent_executions" not in list_agents(client, include_executions="false").get_json()["agents"][0]
+
+def test_unchanged_listing_answers_304(client, db_path):
+    first = list_agents(client)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+
+    cached = client.get("/api/strands-sdk/agents", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.data == b""
+    # Other pages and views have their own validators
+    assert list_agents(client, limit=2).headers["ETag"] != etag
+
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        INSERT INTO strands_sdk_agents (id, name, model_id, created_at, updated_at)
+        VALUES ('agent-5', 'Agent 5', 'qwen3:1.7b', '2026-01-01 10:00:09', '2026-01-01 10:00:09')
+    ''')
+    conn.commit()
+    conn.close()
+    changed = client.get("/api/strands-sdk/agents", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.get_json()["count"] == 6
+
+def test_etag_changes_on_same_second_edits_to_older_agents(client, db_path):
+    etags = [list_agents(client, include_executions="false").headers["ETag"]]
+    conn = sqlite3.connect(db_path)
+    for name in ("Renamed", "Renamed again"):
+        # updated_at stays put, so only the listing version can tell these writes apart
+        conn.execute("UPDATE strands_sdk_agents SET name = ? WHERE id = 'agent-1'", (name,))
+        conn.commit()
+        etags.append(list_agents(client, include_executions="false").headers["ETag"])
+    conn.execute("DELETE FROM strands_sdk_agents WHERE id = 'agent-0'")
+    conn.commit()
+    conn.close()
+    etags.append(list_agents(client, include_executions="false").headers["ETag"])
+    assert len(set(etags)) == 4
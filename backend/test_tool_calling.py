@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the tool schemas generated from @tool functions
+"""
+
+from typing import Dict, List, Optional
+
+from tool_calling import _parse_docstring, build_tool_schemas, tool_schema
+
+def web_search(query: str, max_results: int = 5, region: Optional[str] = None, agent=None) -> str:
+    """
+    Search the web for current information.
+    Results come from the configured search provider.
+
+    Use it for anything after the model's training cutoff.
+
+    Args:
+        query: What to search for
+        max_results (int): How many results to return,
+            at most 20
+        region: Optional region code
+
+    Returns:
+        A list of results
+    """
+    return ""
+
+def calculate(expression, precision: float = 2.0, variables: Dict[str, float] = None, steps: List[str] = None, **kwargs):
+    """Evaluate a math expression"""
+    return 0
+
+def test_parse_docstring_summary_and_arguments():
+    summary, arguments = _parse_docstring(web_search)
+    assert summary == "Search the web for current information. Results come from the configured search provider."
+    assert arguments == {
+        "query": "What to search for",
+        "max_results": "How many results to return, at most 20",
+        "region": "Optional region code"
+    }
+
+def test_parse_docstring_without_args_section():
+    assert _parse_docstring(calculate) == ("Evaluate a math expression", {})
+    assert _parse_docstring(lambda: None) == ("", {})
+
+def test_tool_schema_types_and_required_parameters():
+    schema = tool_schema("web_search", web_search)
+    function = schema["function"]
+    assert schema["type"] == "function"
+    assert function["name"] == "web_search"
+    assert function["parameters"]["required"] == ["query"]
+    assert function["parameters"]["properties"] == {
+        "query": {"type": "string", "description": "What to search for"},
+        "max_results": {"type": "integer", "description": "How many results to return, at most 20"},
+        "region": {"type": "string", "description": "Optional region code"}
+    }
+
+def test_tool_schema_skips_injected_and_variadic_parameters():
+    properties = tool_schema("calculate", calculate)["function"]["parameters"]["properties"]
+    assert properties == {
+        "expression": {"type": "string"},
+        "precision": {"type": "number"},
+        "variables": {"type": "object"},
+        "steps": {"type": "array"}
+    }
+
+def test_tool_schema_uses_existing_tool_spec():
+    def decorated(x):
+        return x
+    decorated.tool_spec = {"description": "Already described",
+                           "inputSchema": {"json": {"type": "object", "properties": {"x": {"type": "integer"}}}}}
+    function = tool_schema("decorated", decorated)["function"]
+    assert function["description"] == "Already described"
+    assert function["parameters"] == {"type": "object", "properties": {"x": {"type": "integer"}}}
+
+def test_build_tool_schemas_is_sorted_and_stable():
+    tools = {"web_search": web_search, "calculate": calculate}
+    schemas = build_tool_schemas(tools)
+    assert [schema["function"]["name"] for schema in schemas] == ["calculate", "web_search"]
+    assert build_tool_schemas(dict(reversed(list(tools.items())))) == schemas
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the tool result cache: hits, TTL, cache_if, coalescing of concurrent calls and persistence
+"""
+
+import threading
+import time
+
+import pytest
+
+from tool_result_cache import ToolResultCache, cacheable
+from write_behind import flush_all
+
+class CountingTool:
+    def __init__(self, delay=0.0, fail=False):
+        self.calls = 0
+        self.delay = delay
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def __call__(self, query: str, max_results: int = 5):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("search backend down")
+        return f"{max_results} results for {query}"
+
+def test_identical_calls_hit_the_cache():
+    cache, tool = ToolResultCache(), CountingTool()
+    search = cache.wrap("web_search", tool, ttl=60)
+    assert search("python") == "5 results for python"
+    # Defaults are bound, so the positional and keyword spellings share one entry
+    assert search(query="python", max_results=5) == "5 results for python"
+    assert search("python", 3) == "3 results for python"
+    assert tool.calls == 2
+    stats = cache.get_stats()["tools"]["web_search"]
+    assert (stats["hits"], stats["misses"], stats["stores"]) == (1, 2, 2)
+
+def test_entries_expire_after_their_ttl():
+    cache, tool = ToolResultCache(), CountingTool()
+    search = cache.wrap("web_search", tool, ttl=0.05)
+    search("python")
+    search("python")
+    time.sleep(0.1)
+    search("python")
+    assert tool.calls == 2
+    assert cache.get_stats()["tools"]["web_search"]["expired"] == 1
+
+def test_cache_if_vetoes_storing_a_result():
+    cache, tool = ToolResultCache(), CountingTool()
+    search = cache.wrap("web_search", tool, ttl=60, cache_if=lambda arguments, result: arguments["query"] != "news")
+    search("news")
+    search("news")
+    search("python")
+    search("python")
+    assert tool.calls == 3
+
+def test_concurrent_identical_calls_share_one_execution():
+    cache, tool = ToolResultCache(), CountingTool(delay=0.2)
+    search = cache.wrap("web_search", tool, ttl=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(search("python"))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert tool.calls == 1
+    assert results == ["5 results for python"] * 5
+    assert cache.get_stats()["tools"]["web_search"]["coalesced"] == 4
+
+def test_failures_reach_every_waiter_and_are_not_cached():
+    cache, tool = ToolResultCache(), CountingTool(delay=0.1, fail=True)
+    search = cache.wrap("web_search", tool, ttl=60)
+    errors = []
+
+    def run():
+        try:
+            search("python")
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=run) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == ["search backend down"] * 3
+    assert tool.calls == 1
+    with pytest.raises(RuntimeError):
+        search("python")
+    assert tool.calls == 2
+
+def test_lru_eviction():
+    cache, tool = ToolResultCache(max_entries=2), CountingTool()
+    search = cache.wrap("web_search", tool, ttl=60)
+    for query in ("a", "b", "a", "c", "a", "b"):
+        search(query)
+    # "b" was the least recently used when "c" arrived
+    assert tool.calls == 4
+    assert cache.get_stats()["entries"] == 2
+
+def test_wrap_registry_only_wraps_cacheable_tools():
+    cached_tool = cacheable(ttl=60)(CountingTool())
+    plain_tool = CountingTool()
+    registry = {"web_search": cached_tool, "calculator": plain_tool}
+    ToolResultCache().wrap_registry(registry)
+    assert getattr(registry["web_search"], "_cached", False)
+    assert registry["calculator"] is plain_tool
+
+def test_results_survive_a_restart_on_disk(tmp_path):
+    db_path = str(tmp_path / "tool_cache.db")
+    tool = CountingTool()
+    ToolResultCache(db_path=db_path).wrap("web_search", tool, ttl=60)("python")
+    flush_all()
+
+    restarted = ToolResultCache(db_path=db_path)
+    assert restarted.wrap("web_search", tool, ttl=60)("python") == "5 results for python"
+    assert tool.calls == 1
+    assert restarted.get_stats()["tools"]["web_search"]["disk_hits"] == 1
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the write-behind SQLite logger: group commits, failure isolation and backpressure
+"""
+
+import sqlite3
+
+import pytest
+
+from write_behind import BACKPRESSURE_DROP, WriteBehindLogger
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "log.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, name TEXT NOT NULL)")
+    conn.commit()
+    conn.close()
+    return path
+
+def rows(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT id, name FROM events ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+def test_queued_rows_are_committed_on_flush(db_path):
+    write_logger = WriteBehindLogger(db_path)
+    try:
+        for i in range(50):
+            assert write_logger.insert("INSERT INTO events (id, name) VALUES (?, ?)", (i, f"event {i}"))
+        write_logger.flush()
+        assert len(rows(db_path)) == 50
+        stats = write_logger.get_stats()
+        assert stats["written"] == 50
+        assert stats["batches"] <= 50
+    finally:
+        write_logger.close()
+
+def test_bad_write_does_not_lose_the_batch(db_path):
+    write_logger = WriteBehindLogger(db_path)
+    try:
+        write_logger.insert("INSERT INTO events (id, name) VALUES (?, ?)", (1, "first"))
+        write_logger.insert("INSERT INTO events (id, name) VALUES (?, ?)", (2, None))
+        write_logger.insert("INSERT INTO events (id, name) VALUES (?, ?)", (3, "third"))
+        write_logger.flush()
+        assert rows(db_path) == [(1, "first"), (3, "third")]
+        assert write_logger.get_stats()["failed"] == 1
+    finally:
+        write_logger.close()
+
+def test_submit_groups_consecutive_items_per_handler(db_path):
+    batches = []
+
+    def handler(cursor, items):
+        batches.append(list(items))
+        cursor.executemany("INSERT INTO events (name) VALUES (?)", [(item,) for item in items])
+
+    write_logger = WriteBehindLogger(db_path)
+    try:
+        for name in ("a", "b", "c"):
+            write_logger.submit("names", handler, name)
+        write_logger.flush()
+    finally:
+        write_logger.close()
+    assert [name for batch in batches for name in batch] == ["a", "b", "c"]
+    assert [name for _, name in rows(db_path)] == ["a", "b", "c"]
+
+def test_close_flushes_and_drops_later_writes(db_path):
+    write_logger = WriteBehindLogger(db_path, backpressure=BACKPRESSURE_DROP)
+    write_logger.insert("INSERT INTO events (id, name) VALUES (?, ?)", (1, "kept"))
+    write_logger.close()
+    assert not write_logger.insert("INSERT INTO events (id, name) VALUES (?, ?)", (2, "dropped"))
+    assert rows(db_path) == [(1, "kept")]
+    assert write_logger.get_stats()["dropped"] == 1
+
+def test_unknown_backpressure_policy_is_rejected(db_path):
+    with pytest.raises(ValueError):
+        WriteBehindLogger(db_path, backpressure="spill")
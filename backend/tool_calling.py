@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Native Tool Calling
+Ollama /api/chat tool loop for Strands SDK agents: JSON schemas generated from the @tool functions,
+the tool calls of one model turn executed in parallel with per-tool timeouts, results fed back as
+tool messages until the model answers (or the iteration cap makes it answer without tools)
+"""
+
+import concurrent.futures
+import inspect
+import json
+import logging
+import re
+import time
+import typing
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ollama_client import OllamaError
+
+logger = logging.getLogger(__name__)
+
+# Model turns allowed to request tools; the turn after that is sent without tools so the model must answer
+DEFAULT_MAX_ITERATIONS = 4
+DEFAULT_TOOL_TIMEOUT_SECONDS = 30
+# Network-bound tools get longer than the default
+TOOL_TIMEOUTS = {"web_search": 45, "http_request": 45}
+# Tool output fed back to the model per call
+MAX_TOOL_RESULT_CHARS = 4000
+
+# Parameters the Strands runtime injects itself; never offered to the model
+INJECTED_PARAMETERS = {"agent", "tool_context"}
+
+_JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean", dict: "object", list: "array"}
+_ARG_LINE = re.compile(r"^(\w+)\s*(?:\([^)]*\))?:\s*(.*)$")
+
+class ToolsUnsupported(Exception):
+    """The model rejected the tools field (Ollama answers 400 for models without tool support)"""
+
+# (host, model) pairs that rejected tools; later runs skip straight to the caller's fallback
+_tools_unsupported = set()
+
+def tools_supported(host: str, model: str) -> bool:
+    return (host, model) not in _tools_unsupported
+
+def _json_type(annotation: Any) -> str:
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        # Optional[X] -> X
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        return _json_type(args[0]) if args else "string"
+    return _JSON_TYPES.get(origin or annotation, "string")
+
+def _parse_docstring(func: Callable) -> Tuple[str, Dict[str, str]]:
+    """First paragraph of the docstring, plus the per-argument descriptions from its Args: section"""
+    doc = inspect.getdoc(func) or ""
+    summary: List[str] = []
+    arguments: Dict[str, str] = {}
+    section, current, arg_indent = None, None, None
+    for line in doc.splitlines():
+        stripped = line.strip()
+        if stripped in ("Args:", "Arguments:", "Parameters:"):
+            section = "args"
+            continue
+        if stripped.endswith(":") and stripped[:-1] in ("Returns", "Raises", "Example", "Examples", "Yields"):
+            section = "other"
+            continue
+        if section is None:
+            if not stripped and summary:
+                section = "body"
+            elif stripped:
+                summary.append(stripped)
+        elif section == "args" and stripped:
+            indent = len(line) - len(line.lstrip())
+            match = _ARG_LINE.match(stripped)
+            if match and (arg_indent is None or indent <= arg_indent):
+                arg_indent = indent
+                current = match.group(1)
+                arguments[current] = match.group(2)
+            elif current:
+                arguments[current] = f"{arguments[current]} {stripped}".strip()
+    return " ".join(summary), arguments
+
+def tool_schema(name: str, func: Callable) -> Dict[str, Any]:
+    """Ollama/OpenAI function schema for one tool"""
+    spec = getattr(func, "tool_spec", None)
+    if isinstance(spec, dict) and spec.get("inputSchema"):
+        # Tools built with the official Strands decorator already describe themselves
+        parameters = spec["inputSchema"].get("json", spec["inputSchema"])
+        return {"type": "function", "function": {"name": name, "description": spec.get("description", ""),
+                                                 "parameters": parameters}}
+
+    description, argument_docs = _parse_docstring(func)
+    properties: Dict[str, Any] = {}
+    required: List[str] = []
+    try:
+        signature = inspect.signature(func)
+        hints = typing.get_type_hints(func)
+    except (TypeError, ValueError, NameError):
+        signature, hints = None, {}
+    for parameter in (signature.parameters.values() if signature else []):
+        if parameter.name in INJECTED_PARAMETERS or parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+            continue
+        prop = {"type": _json_type(hints.get(parameter.name, str))}
+        if argument_docs.get(parameter.name):
+            prop["description"] = argument_docs[parameter.name]
+        properties[parameter.name] = prop
+        if parameter.default is parameter.empty:
+            required.append(parameter.name)
+    return {"type": "function", "function": {
+        "name": name,
+        "description": description or name.replace("_", " "),
+        "parameters": {"type": "object", "properties": properties, "required": required}
+    }}
+
+def build_tool_schemas(tools: Dict[str, Callable]) -> List[Dict[str, Any]]:
+    """
+    Schemas for an agent's tools, in a stable order. Build them once per agent configuration: they are
+    part of the prompt prefix, so byte-identical schemas keep Ollama's cached prefix usable.
+    """
+    schemas = []
+    for name in sorted(tools):
+        try:
+            schemas.append(tool_schema(name, tools[name]))
+        except Exception as e:
+            logger.warning(f"⚠️ Could not build a tool schema for {name}: {e}")
+    return schemas
+
+def _arguments(call: Dict[str, Any]) -> Dict[str, Any]:
+    arguments = call.get("function", {}).get("arguments") or {}
+    if isinstance(arguments, str):
+        # Some models return the arguments JSON-encoded
+        try:
+            arguments = json.loads(arguments)
+        except json.JSONDecodeError:
+            arguments = {}
+    return arguments if isinstance(arguments, dict) else {}
+
+def _invoke(func: Callable, arguments: Dict[str, Any]) -> Any:
+    """Call a tool with the model's arguments, dropping any the tool does not accept"""
+    try:
+        parameters = inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return func(**arguments)
+    if not any(p.kind == p.VAR_KEYWORD for p in parameters.values()):
+        arguments = {k: v for k, v in arguments.items() if k in parameters and k not in INJECTED_PARAMETERS}
+    return func(**arguments)
+
+def _as_text(output: Any) -> str:
+    if isinstance(output, str):
+        return output
+    try:
+        return json.dumps(output, default=str)
+    except (TypeError, ValueError):
+        return str(output)
+
+def iter_tool_calls(calls: List[Dict[str, Any]], tools: Dict[str, Callable],
+                    executor: concurrent.futures.Executor, deadline: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Run one turn's tool calls concurrently on the executor. Yields tool_start for every call, then
+    tool_end per call in request order (with its output, error and duration); each call gets its
+    own timeout, capped by the overall deadline.
+    """
+    pending = []
+    for call in calls:
+        name = call.get("function", {}).get("name", "")
+        arguments = _arguments(call)
+        yield {"type": "tool_start", "tool": name, "input": json.dumps(arguments)[:200]}
+        func = tools.get(name)
+        future = executor.submit(_invoke, func, arguments) if func else None
+        pending.append((name, arguments, future, time.perf_counter()))
+
+    for name, arguments, future, started in pending:
+        timeout = TOOL_TIMEOUTS.get(name, DEFAULT_TOOL_TIMEOUT_SECONDS)
+        wait = timeout - (time.perf_counter() - started)
+        if deadline is not None:
+            wait = min(wait, deadline - time.monotonic())
+        output, error = None, None
+        if future is None:
+            error = f"Unknown tool: {name}"
+        else:
+            try:
+                output = _as_text(future.result(timeout=max(0.0, wait)))
+            except concurrent.futures.TimeoutError:
+                future.cancel()
+                error = f"Tool timed out after {time.perf_counter() - started:.1f}s"
+            except Exception as e:
+                error = str(e) or type(e).__name__
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        if error:
+            logger.warning(f"⚠️ Tool {name} failed: {error}")
+        yield {"type": "tool_end", "tool": name, "arguments": arguments, "success": error is None,
+               "error": error, "output": output, "duration_ms": duration_ms}
+
+def iter_tool_loop(session, user_content: str, tools: Dict[str, Callable], executor: concurrent.futures.Executor,
+                   schemas: Optional[List[Dict[str, Any]]] = None, options: Optional[Dict[str, Any]] = None,
+                   timeout: float = 120, max_iterations: int = DEFAULT_MAX_ITERATIONS,
+                   stream: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Drive an AgentSession through model turns and tool calls. Yields tool_start / tool_end events
+    (and token events when stream=True); the last event (type 'loop_done') carries the answer,
+    tools_used, tool_results, operations, metrics and the number of model turns.
+    Raises ToolsUnsupported if the model rejects tools on the first turn, TimeoutError past `timeout`.
+    """
+    schemas = schemas if schemas is not None else build_tool_schemas(tools)
+    deadline = time.monotonic() + timeout
+    messages: List[Dict[str, Any]] = [{"role": "user", "content": user_content}]
+    tools_used: List[str] = []
+    tool_results: List[str] = []
+    operations: List[Dict[str, Any]] = []
+    metrics: Dict[str, Any] = {}
+    turns = 0
+
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"Agent execution timed out after {timeout} seconds")
+        offered = schemas if schemas and turns < max_iterations else None
+        try:
+            if stream:
+                content, tool_calls = [], []
+                for chunk in session.stream_chat_turns(messages, tools=offered, options=options, timeout=remaining):
+                    delta = chunk.get("message", {})
+                    if delta.get("content"):
+                        content.append(delta["content"])
+                        yield {"type": "token", "content": delta["content"]}
+                    tool_calls.extend(delta.get("tool_calls") or [])
+                    if chunk.get("done"):
+                        metrics = chunk.get("metrics", {})
+                    if time.monotonic() > deadline:
+                        raise TimeoutError(f"Agent execution timed out after {timeout} seconds")
+                message = {"role": "assistant", "content": "".join(content)}
+                if tool_calls:
+                    message["tool_calls"] = tool_calls
+            else:
+                result = session.chat_turns(messages, tools=offered, options=options, timeout=remaining)
+                message = {"role": "assistant", **result["message"]}
+                metrics = result["metrics"]
+        except OllamaError as e:
+            if turns == 0 and offered and e.status_code == 400 and "tools" in str(e).lower():
+                _tools_unsupported.add((session.host, session.model))
+                raise ToolsUnsupported(str(e))
+            raise
+        turns += 1
+
+        calls = message.get("tool_calls") or []
+        if not calls or not offered:
+            yield {"type": "loop_done", "content": message.get("content", ""), "tools_used": tools_used,
+                   "tool_results": tool_results, "operations": operations,
+                   "metrics": {**metrics, "model_turns": turns}, "turns": turns}
+            return
+
+        messages.append(message)
+        for event in iter_tool_calls(calls, tools, executor, deadline):
+            if event["type"] == "tool_end":
+                name, output = event["tool"], event["output"]
+                tool_input = json.dumps(event["arguments"])
+                if name in tools:
+                    # Hallucinated tool names are answered with an error but kept out of the tool analytics
+                    tools_used.append(name)
+                status = "Success" if event["success"] else f"Failed: {event['error']}"
+                if event["success"]:
+                    tool_results.append(f"{name.replace('_', ' ').title()} result: {output}")
+                operation = {
+                    'step': f"{name.replace('_', ' ').title()} tool {'executed' if event['success'] else 'failed'}",
+                    'details': f"Input: {tool_input} | Output: {(output or '')[:500]} | Status: {status}",
+                    'timestamp': datetime.now().isoformat()
+                }
+                if name in tools:
+                    operation.update({'tool_name': name, 'tool_input': tool_input, 'tool_output': output,
+                                      'duration_ms': event["duration_ms"], 'success': event["success"]})
+                operations.append(operation)
+                reply = output if event["success"] else f"Error: {event['error']}"
+                messages.append({"role": "tool", "tool_name": name, "content": reply[:MAX_TOOL_RESULT_CHARS]})
+            yield event
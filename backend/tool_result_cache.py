@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Tool Result Cache
+TTL + LRU cache for idempotent agent tools (web_search, http_request GETs, ...). Identical calls
+within a tool's TTL are answered from memory (or from the optional on-disk store after a restart),
+and concurrent identical calls share one execution instead of each hitting the network.
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from db_helper import db_manager
+from write_behind import get_write_behind_logger
+
+logger = logging.getLogger(__name__)
+
+# Entries kept in memory across all tools before the least recently used one is evicted
+DEFAULT_MAX_ENTRIES = 2048
+
+CachePredicate = Callable[[Dict[str, Any], Any], bool]
+
+def cacheable(ttl: float, cache_if: Optional[CachePredicate] = None):
+    """
+    Mark a tool as safe to cache for `ttl` seconds. cache_if(arguments, result) can veto caching
+    a particular call (e.g. failures, or non-GET HTTP requests).
+    """
+    def mark(func):
+        func._cache_ttl = ttl
+        func._cache_if = cache_if
+        return func
+    return mark
+
+class _Entry:
+    __slots__ = ("tool", "value", "expires_at")
+
+    def __init__(self, tool: str, value: Any, expires_at: float):
+        self.tool = tool
+        self.value = value
+        self.expires_at = expires_at
+
+class _InFlight:
+    """One running call that identical concurrent calls wait on"""
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+class ToolResultCache:
+    """Process-wide cache shared by every agent's tool calls"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._in_flight: Dict[str, _InFlight] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        if db_path:
+            with db_manager.transaction(db_path) as cursor:
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS tool_result_cache (
+                        cache_key TEXT PRIMARY KEY,
+                        tool TEXT NOT NULL,
+                        result TEXT NOT NULL,
+                        expires_at REAL NOT NULL
+                    )
+                ''')
+                cursor.execute('DELETE FROM tool_result_cache WHERE expires_at < ?', (time.time(),))
+
+    def _count(self, tool: str, event: str) -> None:
+        stats = self._stats.setdefault(tool, {"hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0,
+                                              "stores": 0, "expired": 0, "evictions": 0, "errors": 0})
+        stats[event] += 1
+
+    @staticmethod
+    def make_key(tool: str, arguments: Dict[str, Any]) -> str:
+        payload = json.dumps([tool, arguments], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _get_memory(self, tool: str, key: str) -> Optional[_Entry]:
+        """Fresh in-memory entry (caller holds the lock)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            del self._entries[key]
+            self._count(tool, "expired")
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _put_memory(self, tool: str, key: str, entry: _Entry) -> None:
+        """Insert and evict down to max_entries (caller holds the lock)"""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._count(tool, "evictions")
+
+    def _get_disk(self, tool: str, key: str) -> Optional[_Entry]:
+        if not self.db_path:
+            return None
+        row = db_manager.query_one(self.db_path, 'SELECT result, expires_at FROM tool_result_cache WHERE cache_key = ? AND expires_at > ?',
+                                   (key, time.time()))
+        if row is None:
+            return None
+        try:
+            return _Entry(tool, json.loads(row[0]), row[1])
+        except (json.JSONDecodeError, TypeError):
+            return None
+
+    def _put_disk(self, tool: str, key: str, entry: _Entry) -> None:
+        if not self.db_path:
+            return
+        try:
+            result = json.dumps(entry.value)
+        except (TypeError, ValueError):
+            return  # Not JSON-serialisable: memory only
+        # Off the tool's latency path
+        get_write_behind_logger(self.db_path).insert(
+            'INSERT OR REPLACE INTO tool_result_cache (cache_key, tool, result, expires_at) VALUES (?, ?, ?, ?)',
+            (key, tool, result, entry.expires_at))
+
+    def call(self, tool: str, func: Callable, arguments: Dict[str, Any], ttl: float,
+             cache_if: Optional[CachePredicate] = None) -> Any:
+        """Cached func(**arguments)"""
+        key = self.make_key(tool, arguments)
+        with self._lock:
+            entry = self._get_memory(tool, key)
+            if entry is not None:
+                self._count(tool, "hits")
+                return entry.value
+            waiting = self._in_flight.get(key)
+            if waiting is None:
+                running = self._in_flight[key] = _InFlight()
+
+        if waiting is not None:
+            # Same call already running for another agent: share its result
+            waiting.done.wait()
+            with self._lock:
+                self._count(tool, "coalesced")
+            if waiting.error is not None:
+                raise waiting.error
+            return waiting.value
+
+        try:
+            entry = self._get_disk(tool, key)
+            if entry is not None:
+                with self._lock:
+                    self._count(tool, "disk_hits")
+                    self._put_memory(tool, key, entry)
+                running.value = entry.value
+                return entry.value
+
+            with self._lock:
+                self._count(tool, "misses")
+            value = func(**arguments)
+            running.value = value
+            if cache_if is None or cache_if(arguments, value):
+                entry = _Entry(tool, value, time.time() + ttl)
+                with self._lock:
+                    self._count(tool, "stores")
+                    self._put_memory(tool, key, entry)
+                self._put_disk(tool, key, entry)
+            return value
+        except BaseException as e:
+            running.error = e
+            with self._lock:
+                self._count(tool, "errors")
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            running.done.set()
+
+    def wrap(self, tool: str, func: Callable, ttl: float, cache_if: Optional[CachePredicate] = None) -> Callable:
+        """Cached version of a tool with the same signature (so schema generation still sees it)"""
+        try:
+            signature = inspect.signature(func)
+        except (TypeError, ValueError):
+            signature = None
+
+        @functools.wraps(func)
+        def cached_tool(*args, **kwargs):
+            if signature is None:
+                return self.call(tool, lambda **_: func(*args, **kwargs), {"args": list(args), **kwargs}, ttl, cache_if)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            return self.call(tool, func, arguments, ttl, cache_if)
+
+        # Official Strands tools describe themselves through a tool_spec property, not __dict__
+        if getattr(func, "tool_spec", None) is not None and not hasattr(cached_tool, "tool_spec"):
+            cached_tool.tool_spec = func.tool_spec
+        cached_tool._cached = True
+        return cached_tool
+
+    def wrap_registry(self, registry: Dict[str, Callable]) -> Dict[str, Callable]:
+        """Replace every cacheable tool in a registry (in place) with its cached version"""
+        wrapped = []
+        for name, func in list(registry.items()):
+            if getattr(func, "_cached", False):
+                continue
+            ttl = getattr(func, "_cache_ttl", None)
+            if ttl:
+                registry[name] = self.wrap(name, func, ttl, getattr(func, "_cache_if", None))
+                wrapped.append(name)
+        if wrapped:
+            logger.info(f"🗄️ Tool result cache enabled for: {', '.join(wrapped)}")
+        return registry
+
+    def clear(self, tool: Optional[str] = None) -> None:
+        with self._lock:
+            if tool is None:
+                self._entries.clear()
+            else:
+                for key in [key for key, entry in self._entries.items() if entry.tool == tool]:
+                    del self._entries[key]
+        if self.db_path:
+            if tool is None:
+                db_manager.execute_update(self.db_path, 'DELETE FROM tool_result_cache')
+            else:
+                db_manager.execute_update(self.db_path, 'DELETE FROM tool_result_cache WHERE tool = ?', (tool,))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            per_tool = {}
+            for tool, stats in self._stats.items():
+                lookups = stats["hits"] + stats["disk_hits"] + stats["coalesced"] + stats["misses"]
+                per_tool[tool] = {
+                    **stats,
+                    "hit_rate": round((lookups - stats["misses"]) / lookups, 3) if lookups else 0.0
+                }
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "persistent": bool(self.db_path),
+                "in_flight": len(self._in_flight),
+                "tools": per_tool
+            }
+
+# Global cache shared by the agent services in this process (persistence is opt-in)
+_tool_result_cache: Optional[ToolResultCache] = None
+_tool_result_cache_lock = threading.Lock()
+
+def get_tool_result_cache(db_path: Optional[str] = None, max_entries: int = DEFAULT_MAX_ENTRIES) -> ToolResultCache:
+    """Shared cache; db_path and max_entries only apply when it is first created"""
+    global _tool_result_cache
+    with _tool_result_cache_lock:
+        if _tool_result_cache is None:
+            _tool_result_cache = ToolResultCache(max_entries=max_entries, db_path=db_path)
+        return _tool_result_cache
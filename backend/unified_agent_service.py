@@ -13,12 +13,14 @@ import json
 import requests
 from datetime import datetime
 from typing import Dict, List, Optional
+from db_helper import get_db_manager
 
 app = Flask(__name__)
 CORS(app)
 
 # Database configuration
 DATABASE_PATH = 'unified_agents.db'
+db_manager = get_db_manager()
 
 def init_database():
     """Initialize the unified agents database"""
@@ -67,26 +69,14 @@ def init_database():
 
 def get_agent_by_id(agent_id: str) -> Optional[Dict]:
     """Get agent by ID"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT * FROM agents WHERE id = ?', (agent_id,))
-    row = cursor.fetchone()
-    conn.close()
-    
+    row = db_manager.query_one(DATABASE_PATH, 'SELECT * FROM agents WHERE id = ?', (agent_id,))
     if not row:
         return None
-    
-    columns = [description[0] for description in cursor.description]
-    return dict(zip(columns, row))
+    return dict(zip(row.keys(), row))
 
 def update_agent_last_seen(agent_id: str):
     """Update agent last seen timestamp"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute('UPDATE agents SET last_seen = CURRENT_TIMESTAMP WHERE id = ?', (agent_id,))
-    conn.commit()
-    conn.close()
+    db_manager.execute_update(DATABASE_PATH, 'UPDATE agents SET last_seen = CURRENT_TIMESTAMP WHERE id = ?', (agent_id,))
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -104,9 +94,6 @@ def get_agents():
     framework = request.args.get('framework')
     a2a_enabled = request.args.get('a2a_enabled')
     
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    
     query = 'SELECT * FROM agents WHERE 1=1'
     params = []
     
@@ -120,15 +107,11 @@ def get_agents():
     
     query += ' ORDER BY created_at DESC'
     
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
-    conn.close()
-    
-    columns = [description[0] for description in cursor.description]
+    rows = db_manager.execute_query(DATABASE_PATH, query, params)
     agents = []
     
     for row in rows:
-        agent = dict(zip(columns, row))
+        agent = dict(zip(row.keys(), row))
         # Parse JSON fields
         agent['tools'] = json.loads(agent['tools']) if agent['tools'] else []
         agent['capabilities'] = json.loads(agent['capabilities']) if agent['capabilities'] else []
@@ -222,14 +205,11 @@ def create_agent():
                 if a2a_response.status_code in [200, 201]:
                     a2a_result = a2a_response.json()
                     # Update agent with A2A ID
-                    conn = sqlite3.connect(DATABASE_PATH)
-                    cursor = conn.cursor()
-                    cursor.execute(
+                    db_manager.execute_update(
+                        DATABASE_PATH,
                         'UPDATE agents SET a2a_agent_id = ? WHERE id = ?',
                         (a2a_result.get('agent', {}).get('id'), agent_id)
                     )
-                    conn.commit()
-                    conn.close()
                     print(f"[Unified Agent Service] A2A registration successful: {a2a_result.get('agent', {}).get('id')}")
                 else:
                     print(f"[Unified Agent Service] A2A registration failed: {a2a_response.status_code}")
@@ -268,12 +248,9 @@ def delete_agent(agent_id: str):
                 print(f"[Unified Agent Service] A2A deletion error: {str(e)}")
         
         # Delete from database
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM agents WHERE id = ?', (agent_id,))
-        cursor.execute('DELETE FROM a2a_messages WHERE from_agent_id = ? OR to_agent_id = ?', (agent_id, agent_id))
-        conn.commit()
-        conn.close()
+        with db_manager.transaction(DATABASE_PATH) as cursor:
+            cursor.execute('DELETE FROM agents WHERE id = ?', (agent_id,))
+            cursor.execute('DELETE FROM a2a_messages WHERE from_agent_id = ? OR to_agent_id = ?', (agent_id, agent_id))
         
         print(f"[Unified Agent Service] Agent deleted: {agent_id}")
         return jsonify({'message': 'Agent deleted successfully'})
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Write-Behind SQLite Logger
+Request handlers enqueue rows and return immediately; a single writer thread per database file
+drains the bounded queue and group-commits each batch in WAL mode, so log writes never sit on the
+request latency path or contend with each other for the database lock.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from db_helper import open_connection
+
+logger = logging.getLogger(__name__)
+
+# Pending writes held in memory per database before backpressure applies
+DEFAULT_MAX_QUEUE = 10000
+# Writes committed per transaction
+DEFAULT_MAX_BATCH = 500
+
+# Backpressure when the queue is full: "block" makes the producer wait for the writer,
+# "drop" discards the write and counts it
+BACKPRESSURE_BLOCK = "block"
+BACKPRESSURE_DROP = "drop"
+
+BatchHandler = Callable[[sqlite3.Cursor, List[Any]], None]
+
+_STOP = object()
+
+class WriteBehindLogger:
+    """Bounded write queue for one SQLite database, drained by one writer thread"""
+
+    def __init__(self, db_path: str, max_queue: int = DEFAULT_MAX_QUEUE, max_batch: int = DEFAULT_MAX_BATCH,
+                 backpressure: str = BACKPRESSURE_BLOCK):
+        if backpressure not in (BACKPRESSURE_BLOCK, BACKPRESSURE_DROP):
+            raise ValueError(f"Unknown backpressure policy: {backpressure}")
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.backpressure = backpressure
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._handlers: Dict[str, BatchHandler] = {}
+
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+        self.dropped = 0
+        self.blocked = 0
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                name = f"write-behind-{os.path.basename(self.db_path)}"
+                self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+                self._thread.start()
+
+    def submit(self, key: str, handler: BatchHandler, item: Any) -> bool:
+        """
+        Queue one item; consecutive items with the same key reach handler(cursor, items) together.
+        Returns False if the item was dropped by backpressure or the logger is closed.
+        """
+        if self._closed:
+            logger.warning(f"⚠️ Write-behind logger for {self.db_path} is closed; write dropped")
+            self.dropped += 1
+            return False
+        self._ensure_started()
+        self._handlers.setdefault(key, handler)
+        entry = (key, item)
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            if self.backpressure == BACKPRESSURE_DROP:
+                self.dropped += 1
+                logger.warning(f"⚠️ Write-behind queue for {self.db_path} is full; write dropped")
+                return False
+            self.blocked += 1
+            self._queue.put(entry)
+        self.enqueued += 1
+        return True
+
+    def insert(self, sql: str, params: Sequence[Any]) -> bool:
+        """Queue one parameterised statement; queued rows for the same SQL are written with executemany"""
+        return self.submit(sql, lambda cursor, rows: cursor.executemany(sql, rows), tuple(params))
+
+    def _connect(self) -> sqlite3.Connection:
+        # WAL lets readers keep going while the writer commits
+        return open_connection(self.db_path, row_factory=None)
+
+    def _run(self) -> None:
+        conn = self._connect()
+        try:
+            while True:
+                entry = self._queue.get()
+                if entry is _STOP:
+                    self._queue.task_done()
+                    return
+                batch = [entry]
+                stop = False
+                while len(batch) < self.max_batch:
+                    try:
+                        entry = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if entry is _STOP:
+                        stop = True
+                        break
+                    batch.append(entry)
+                self._write(conn, batch)
+                for _ in batch:
+                    self._queue.task_done()
+                if stop:
+                    self._queue.task_done()
+                    return
+        finally:
+            conn.close()
+
+    def _groups(self, batch: List[Any]) -> List[Any]:
+        """Consecutive entries with the same key, so write order is preserved"""
+        groups = []
+        for key, item in batch:
+            if groups and groups[-1][0] == key:
+                groups[-1][1].append(item)
+            else:
+                groups.append((key, [item]))
+        return groups
+
+    def _write(self, conn: sqlite3.Connection, batch: List[Any]) -> None:
+        cursor = conn.cursor()
+        try:
+            for key, items in self._groups(batch):
+                self._handlers[key](cursor, items)
+            conn.commit()
+            self.written += len(batch)
+            self.batches += 1
+            return
+        except Exception as e:
+            conn.rollback()
+            logger.warning(f"⚠️ Group commit of {len(batch)} writes to {self.db_path} failed ({e}); retrying one by one")
+
+        # Isolate the bad write instead of losing the whole batch
+        for key, item in batch:
+            try:
+                self._handlers[key](cursor, [item])
+                conn.commit()
+                self.written += 1
+                self.batches += 1
+            except Exception as e:
+                conn.rollback()
+                self.failed += 1
+                logger.error(f"❌ Write-behind write to {self.db_path} failed: {e}")
+
+    def flush(self) -> None:
+        """Block until everything queued so far has been committed"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self) -> None:
+        """Flush and stop the writer thread; later writes are dropped"""
+        self._closed = True
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "db_path": self.db_path,
+            "queued": self._queue.qsize(),
+            "max_queue": self._queue.maxsize,
+            "backpressure": self.backpressure,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "avg_batch_size": round(self.written / self.batches, 2) if self.batches else 0.0,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "blocked": self.blocked
+        }
+
+# One logger (and writer thread) per database file in this process
+_loggers: Dict[str, WriteBehindLogger] = {}
+_loggers_lock = threading.Lock()
+
+def get_write_behind_logger(db_path: str, **kwargs) -> WriteBehindLogger:
+    """Shared logger for a database; options only apply when it is first created"""
+    key = os.path.abspath(db_path)
+    with _loggers_lock:
+        write_logger = _loggers.get(key)
+        if write_logger is None:
+            write_logger = _loggers[key] = WriteBehindLogger(db_path, **kwargs)
+        return write_logger
+
+def flush_all() -> None:
+    with _loggers_lock:
+        loggers = list(_loggers.values())
+    for write_logger in loggers:
+        write_logger.flush()
+
+def close_all() -> None:
+    with _loggers_lock:
+        loggers = list(_loggers.values())
+    for write_logger in loggers:
+        write_logger.close()
+
+# Commit whatever is still queued when the process shuts down
+atexit.register(close_all)